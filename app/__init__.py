@@ -13,11 +13,19 @@ def create_app(config_name='default'):
     from .routes.neubauer import bp as neubauer_bp
     from .routes.concentrations import bp as concentrations_bp
     from .routes.ph import bp as ph_bp
+    from .routes.compounds import bp as compounds_bp
+    from .routes.api import bp as api_bp
 
     app.register_blueprint(main_bp)
     app.register_blueprint(conversions_bp)
     app.register_blueprint(neubauer_bp)
     app.register_blueprint(concentrations_bp)
     app.register_blueprint(ph_bp)
+    app.register_blueprint(compounds_bp)
+    app.register_blueprint(api_bp)
+
+    # Cargar el catálogo de compuestos y su índice de autocompletado
+    from .services.compound_service import CompoundService
+    CompoundService.init_app(app)
 
     return app
@@ -4,6 +4,9 @@ class Config:
     """Configuración base para la aplicación."""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     DEBUG = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
+    COMPOUND_DB_PATH = os.environ.get('COMPOUND_DB_PATH') or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'compuestos.db'
+    )
 
 class DevelopmentConfig(Config):
     """Configuración para desarrollo."""
@@ -18,6 +21,7 @@ class TestingConfig(Config):
     """Configuración para pruebas."""
     TESTING = True
     DEBUG = True
+    COMPOUND_DB_PATH = ':memory:'
 
 config = {
     'development': DevelopmentConfig,
@@ -0,0 +1,154 @@
+"""Representaciones compactas de los modelos para guardar muchos resultados en memoria."""
+from dataclasses import MISSING, field, fields, is_dataclass, make_dataclass
+from enum import Enum
+from typing import Any, Dict, Generic, Iterable, Iterator, List, Optional, Type, TypeVar, Union, get_args, get_origin
+
+import numpy as np
+
+T = TypeVar('T')
+
+def frozen_variant(cls: type) -> type:
+    """
+    Crea una variante inmutable y con __slots__ de un dataclass.
+    
+    La variante tiene los mismos campos, tipos y valores por defecto que la
+    clase original y se llama Frozen<Clase>.
+    """
+    specs = []
+    for f in fields(cls):
+        if f.default is not MISSING:
+            specs.append((f.name, f.type, field(default=f.default)))
+        elif f.default_factory is not MISSING:
+            specs.append((f.name, f.type, field(default_factory=f.default_factory)))
+        else:
+            specs.append((f.name, f.type))
+    
+    variant = make_dataclass(f"Frozen{cls.__name__}", specs, frozen=True, slots=True)
+    variant.__module__ = cls.__module__
+    variant.__doc__ = f"Variante inmutable y compacta de {cls.__name__}."
+    return variant
+
+def freeze(instance: Any, variant: type) -> Any:
+    """Copia una instancia de dataclass a su variante inmutable."""
+    return variant(**{f.name: getattr(instance, f.name) for f in fields(instance)})
+
+class StructOfArrays(Generic[T]):
+    """
+    Contenedor columnar para muchas instancias de un mismo dataclass.
+    
+    Cada campo se guarda en un arreglo tipado: los números reales en float64
+    (None como NaN), los enteros en int64 (los opcionales con una máscara
+    booleana de None aparte, para devolverlos como int), los enums y textos
+    como códigos enteros sobre la lista de valores distintos, y cualquier otro
+    tipo en un arreglo de objetos. Así no se paga un objeto Python por cada
+    valor de cada resultado.
+    """
+    
+    __slots__ = ('record_type', '_columns', '_categories', '_missing', '_length')
+    
+    def __init__(self, record_type: Type[T], columns: Dict[str, np.ndarray],
+                 categories: Dict[str, List[Any]], length: int,
+                 missing: Optional[Dict[str, np.ndarray]] = None):
+        self.record_type = record_type
+        self._columns = columns
+        self._categories = categories
+        self._missing = missing or {}
+        self._length = length
+    
+    @classmethod
+    def from_records(cls, record_type: Type[T], records: Iterable[T]) -> 'StructOfArrays[T]':
+        """Construye el contenedor a partir de instancias del dataclass indicado."""
+        if not is_dataclass(record_type):
+            raise TypeError(f"{record_type!r} no es un dataclass")
+        
+        records = list(records)
+        columns = {}
+        categories = {}
+        missing = {}
+        for f in fields(record_type):
+            values = [getattr(record, f.name) for record in records]
+            kind, base_type = _column_kind(f.type)
+            
+            if kind == 'float':
+                columns[f.name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            elif kind == 'int':
+                columns[f.name] = np.array(values, dtype=np.int64)
+            elif kind == 'optional_int':
+                missing[f.name] = np.array([v is None for v in values], dtype=np.bool_)
+                columns[f.name] = np.array([0 if v is None else v for v in values], dtype=np.int64)
+            elif kind == 'bool':
+                columns[f.name] = np.array(values, dtype=np.bool_)
+            elif kind == 'category':
+                lookup: Dict[Any, int] = {}
+                codes = np.empty(len(values), dtype=np.int32)
+                for position, value in enumerate(values):
+                    codes[position] = -1 if value is None else lookup.setdefault(value, len(lookup))
+                columns[f.name] = codes
+                categories[f.name] = list(lookup)
+            else:
+                array = np.empty(len(values), dtype=object)
+                array[:] = values
+                columns[f.name] = array
+        
+        return cls(record_type, columns, categories, len(records), missing)
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __getitem__(self, index: int) -> T:
+        """Reconstruye la instancia de la posición indicada."""
+        if not -self._length <= index < self._length:
+            raise IndexError("Índice fuera de rango")
+        values = {}
+        for name, column in self._columns.items():
+            value = column[index]
+            if name in self._categories:
+                values[name] = None if value < 0 else self._categories[name][value]
+            elif name in self._missing:
+                values[name] = None if self._missing[name][index] else value.item()
+            elif column.dtype == np.float64:
+                values[name] = None if np.isnan(value) else float(value)
+            elif column.dtype == object:
+                values[name] = value
+            else:
+                values[name] = value.item()
+        return self.record_type(**values)
+    
+    def __iter__(self) -> Iterator[T]:
+        for index in range(self._length):
+            yield self[index]
+    
+    def column(self, name: str) -> np.ndarray:
+        """Devuelve la columna de un campo (códigos enteros para enums y textos, 0 en los enteros None)."""
+        return self._columns[name]
+    
+    def missing(self, name: str) -> np.ndarray:
+        """Devuelve la máscara de valores None de una columna de enteros opcionales."""
+        return self._missing[name]
+    
+    def categories(self, name: str) -> List[Any]:
+        """Devuelve los valores distintos de una columna categórica, indexados por código."""
+        return self._categories[name]
+    
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por los arreglos (sin contar objetos de columnas genéricas)."""
+        return sum(column.nbytes for column in (*self._columns.values(), *self._missing.values()))
+
+def _column_kind(annotation: Any):
+    """Clasifica la anotación de un campo para elegir el tipo de columna."""
+    optional = False
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        optional = len(args) < len(get_args(annotation))
+        annotation = args[0] if len(args) == 1 else object
+    
+    if annotation is float:
+        return 'float', float
+    if annotation is int:
+        return ('optional_int' if optional else 'int'), int
+    if annotation is bool and not optional:
+        return 'bool', bool
+    if annotation is str or (isinstance(annotation, type) and issubclass(annotation, Enum)):
+        return 'category', annotation
+    return 'object', annotation
@@ -0,0 +1,22 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+@dataclass(slots=True)
+class Compound:
+    """Compuesto del catálogo con sus datos fisicoquímicos básicos."""
+    id: int
+    name: str
+    formula: Optional[str] = None
+    molar_mass: Optional[float] = None
+    synonyms: List[str] = field(default_factory=list)
+    pka_values: List[float] = field(default_factory=list)
+
+@dataclass(slots=True)
+class CompoundSuggestion:
+    """Sugerencia de autocompletado: el nombre que coincidió y su compuesto."""
+    matched_name: str
+    compound: Compound
+
+class CompoundError(Exception):
+    """Excepción personalizada para errores del catálogo de compuestos."""
+    pass
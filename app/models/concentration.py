@@ -1,6 +1,10 @@
 from dataclasses import dataclass
-from enum import Enum
-from typing import Optional
+from enum import Enum, IntEnum
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .compact import frozen_variant
 
 class CalculationType(Enum):
     """Tipos de cálculos de concentración soportados."""
@@ -11,7 +15,7 @@ class CalculationType(Enum):
     PPM = "ppm"
     PERCENTAGE = "porcentaje"
 
-@dataclass
+@dataclass(slots=True)
 class ConcentrationRequest:
     """Representa una solicitud de cálculo de concentración."""
     calculation_type: CalculationType
@@ -34,6 +38,7 @@ class ConcentrationRequest:
     # Para masa/volumen
     mass_g: Optional[float] = None
     molecular_weight: Optional[float] = None
+    formula: Optional[str] = None  # Alternativa a molecular_weight, p. ej. "CuSO4·5H2O"
     volume_ml: Optional[float] = None
     
     # Para concentraciones masa/volumen
@@ -44,7 +49,9 @@ class ConcentrationRequest:
     ppm: Optional[float] = None
     percentage: Optional[float] = None
 
-@dataclass
+FrozenConcentrationRequest = frozen_variant(ConcentrationRequest)
+
+@dataclass(slots=True)
 class ConcentrationResult:
     """Resultado de un cálculo de concentración."""
     calculation_type: CalculationType
@@ -54,7 +61,10 @@ class ConcentrationResult:
     molality: Optional[float] = None
     moles: Optional[float] = None
     volume_l: Optional[float] = None
+    kg_solvent: Optional[float] = None
     mass_g: Optional[float] = None
+    molecular_weight: Optional[float] = None
+    volume_ml: Optional[float] = None
     
     # Para diluciones
     c1: Optional[float] = None
@@ -72,6 +82,87 @@ class ConcentrationResult:
     formula_used: Optional[str] = None
     notes: Optional[str] = None
 
+FrozenConcentrationResult = frozen_variant(ConcentrationResult)
+
+class DilutionSeriesMode(Enum):
+    """Formas de definir las concentraciones de una serie de diluciones."""
+    FACTOR = "factor"
+    LOGARITHMIC = "logaritmica"
+    TARGETS = "objetivos"
+
+@dataclass(slots=True)
+class DilutionSeriesRequest:
+    """Solicitud para calcular una serie de diluciones completa."""
+    mode: DilutionSeriesMode
+    stock_concentration: float
+    final_volume: float
+    
+    # Para factor constante y serie logarítmica
+    num_steps: Optional[int] = None
+    dilution_factor: Optional[float] = None
+    final_concentration: Optional[float] = None
+    
+    # Para concentraciones objetivo explícitas
+    target_concentrations: Optional[List[float]] = None
+
+@dataclass(slots=True)
+class DilutionSeriesResult:
+    """Resultado de una serie de diluciones: una posición por tubo."""
+    mode: DilutionSeriesMode
+    stock_concentration: float
+    final_volume: float
+    concentrations: List[float]
+    step_factors: List[float]
+    cumulative_dilutions: List[float]
+    transfer_volumes: List[float]
+    diluent_volumes: List[float]
+    total_volumes: List[float]
+    stock_volume_needed: float
+    total_diluent_volume: float
+    formula_used: Optional[str] = None
+    notes: Optional[str] = None
+
+class BatchErrorCode(IntEnum):
+    """Códigos de error por fila en los cálculos por lotes."""
+    OK = 0
+    INSUFFICIENT_PARAMETERS = 1
+    NON_POSITIVE_VALUE = 2
+    UNSUPPORTED_TYPE = 3
+    INVALID_FORMULA = 4
+    OVERDETERMINED = 5
+
+@dataclass(slots=True)
+class ConcentrationBatchResult:
+    """Resultado columnar de un cálculo de concentración por lotes."""
+    # Una columna float64 por campo de resultado; NaN donde no se calculó
+    columns: Dict[str, np.ndarray]
+    # Un BatchErrorCode por fila; las filas con error tienen NaN en todas las columnas
+    error_codes: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.error_codes)
+
 class ConcentrationError(Exception):
     """Excepción personalizada para errores en cálculos de concentración."""
-    pass
\ No newline at end of file
+    pass
+
+class ConcentrationUnit(Enum):
+    """Representaciones de una misma concentración."""
+    MOLAR = "M"
+    MILLIMOLAR = "mM"
+    MICROMOLAR = "µM"
+    MG_ML = "mg/mL"
+    G_L = "g/L"
+    PPM = "ppm"
+    PPB = "ppb"
+    PERCENT_WV = "% p/v"
+
+@dataclass(slots=True)
+class ConcentrationRepresentations:
+    """Una concentración expresada en todas las unidades; None donde falta la masa molar."""
+    value: float
+    unit: ConcentrationUnit
+    values: Dict[ConcentrationUnit, Optional[float]]
+    molar_mass: Optional[float] = None
+    density: float = 1.0   # g/mL de la solución, usada para ppm y ppb (p/p)
+    notes: Optional[str] = None
@@ -1,5 +1,8 @@
 from dataclasses import dataclass
 from enum import Enum
+from typing import Optional
+
+from .compact import frozen_variant
 
 class UnitType(Enum):
     """Tipos de unidades soportadas por el sistema."""
@@ -7,7 +10,7 @@ class UnitType(Enum):
     TEMPERATURE = "temperatura" 
     VOLUME = "volumen"
 
-@dataclass
+@dataclass(slots=True)
 class ConversionRequest:
     """Representa una solicitud de conversión de unidades."""
     value: float
@@ -15,7 +18,9 @@ class ConversionRequest:
     to_unit: str
     unit_type: UnitType
 
-@dataclass
+FrozenConversionRequest = frozen_variant(ConversionRequest)
+
+@dataclass(slots=True)
 class ConversionResult:
     """Resultado de una conversión de unidades."""
     original_value: float
@@ -23,6 +28,34 @@ class ConversionResult:
     from_unit: str
     to_unit: str
     unit_type: UnitType
+
+FrozenConversionResult = frozen_variant(ConversionResult)
+
+@dataclass(slots=True)
+class CompoundConversionRequest:
+    """Solicitud de conversión entre expresiones de unidades compuestas (p. ej. mg/dL → mmol/L)."""
+    value: float
+    from_expr: str
+    to_expr: str
+    molar_mass: Optional[float] = None
+
+@dataclass(frozen=True, slots=True)
+class ConversionPlan:
+    """Plan compilado para convertir entre dos expresiones de unidades."""
+    from_expr: str
+    to_expr: str
+    molar_mass: Optional[float]
+    factor: float
+
+@dataclass(slots=True)
+class CompoundConversionResult:
+    """Resultado de una conversión entre unidades compuestas."""
+    original_value: float
+    converted_value: float
+    from_expr: str
+    to_expr: str
+    factor: float
+    molar_mass: Optional[float] = None
     
 class ConversionError(Exception):
     """Excepción personalizada para errores de conversión."""
@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+@dataclass(slots=True)
+class CountingSnapshot:
+    """Estado de una sesión de conteo en vivo después del último clic."""
+    session_id: str
+    version: int                          # Aumenta en 1 con cada clic
+    live_counts: List[int]                # Células vivas por cuadrante
+    dead_counts: List[int]                # Células teñidas (azul tripano) por cuadrante
+    total_cells: int
+    dead_cells: int
+    average_cells: float
+    concentration: float
+    concentration_ci_low: float
+    concentration_ci_high: float
+    cv_percent: Optional[float] = None    # None con menos de 2 cuadrantes o sin células
+    viability_percent: Optional[float] = None
+
+class CountingSessionError(Exception):
+    """Excepción personalizada para errores en las sesiones de conteo en vivo."""
+    pass
+
+class CountingSessionNotFound(CountingSessionError):
+    """La sesión no existe, ya se cerró o expiró."""
+    pass
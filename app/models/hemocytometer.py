@@ -0,0 +1,35 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import List, Optional, Tuple
+
+class CellPolarity(Enum):
+    """Cómo se ven las células respecto del fondo de la micrografía."""
+    AUTO = "auto"
+    BRIGHT = "clara"
+    DARK = "oscura"
+
+@dataclass(slots=True)
+class CellCountRequest:
+    """Parámetros para contar células en una micrografía de la cámara de Neubauer."""
+    cell_diameter_px: float = 12.0          # Diámetro típico de una célula en la imagen
+    polarity: CellPolarity = CellPolarity.AUTO
+    sensitivity: float = 5.0                # Umbral en desviaciones robustas del fondo
+    max_quadrants: Optional[int] = None     # Usar solo los primeros N cuadrantes detectados
+
+@dataclass(slots=True)
+class CellCountResult:
+    """Conteo automático: cuadrantes detectados y células en cada uno."""
+    image_width: int
+    image_height: int
+    row_lines: List[int]                    # Posición (px) de las líneas horizontales de la cuadrícula
+    column_lines: List[int]                 # Posición (px) de las líneas verticales
+    quadrant_boxes: List[Tuple[int, int, int, int]]   # (x0, y0, x1, y1) de cada cuadrante, por filas
+    quadrant_counts: List[int]
+    cell_positions: List[Tuple[float, float]]         # (x, y) de cada célula contada
+    polarity: CellPolarity
+    tiles: int                              # Número de franjas en que se procesó la imagen
+    notes: Optional[str] = None
+
+class HemocytometerError(Exception):
+    """Excepción personalizada para errores en el conteo automático de imágenes."""
+    pass
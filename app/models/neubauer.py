@@ -1,15 +1,25 @@
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import List, Optional
 
-@dataclass
+import numpy as np
+
+from .compact import frozen_variant
+
+@dataclass(slots=True)
 class NeubauerRequest:
     """Representa una solicitud de cálculo de Neubauer."""
     num_quadrants: int
     quadrant_volume: float
     dilution_factor: float
-    cell_counts: List[int]
+    cell_counts: List[int]                    # Células vivas (sin teñir) por cuadrante
+    # Células teñidas con azul tripano por cuadrante; None en los cuadrantes sin conteo de muertas
+    dead_counts: Optional[List[Optional[int]]] = None
+    confidence_level: float = 0.95
+
+FrozenNeubauerRequest = frozen_variant(NeubauerRequest)
 
-@dataclass
+@dataclass(slots=True)
 class NeubauerResult:
     """Resultado de un cálculo de Neubauer."""
     concentration: float
@@ -18,6 +28,55 @@ class NeubauerResult:
     num_quadrants: int
     volume_per_quadrant: float
     dilution_factor: float
+    # Intervalo de confianza de Poisson para la concentración
+    concentration_ci_low: Optional[float] = None
+    concentration_ci_high: Optional[float] = None
+    confidence_level: float = 0.95
+    # Variabilidad entre cuadrantes
+    cv_percent: Optional[float] = None              # None con menos de 2 cuadrantes
+    chi_square: Optional[float] = None              # Índice de dispersión Σ(x - x̄)²/x̄
+    outlier_quadrants: List[int] = field(default_factory=list)   # Cuadrantes atípicos (desde 1)
+    # Viabilidad con azul tripano: vivas / (vivas + muertas) en los cuadrantes con conteo de muertas
+    dead_cells: Optional[int] = None
+    viability_percent: Optional[float] = None
+    viability_ci_low: Optional[float] = None
+    viability_ci_high: Optional[float] = None
+
+FrozenNeubauerResult = frozen_variant(NeubauerResult)
+
+class NeubauerBatchErrorCode(IntEnum):
+    """Códigos de error por muestra en el procesamiento por lotes."""
+    OK = 0
+    NO_COUNTS = 1
+    NEGATIVE_COUNT = 2
+    NON_POSITIVE_PARAMETER = 3
+    NON_INTEGER_COUNT = 4
+
+@dataclass(slots=True)
+class NeubauerBatchResult:
+    """Resultado columnar de muchas muestras; NaN en las muestras con error."""
+    sample_ids: List[str]
+    concentrations: np.ndarray
+    total_cells: np.ndarray
+    average_cells: np.ndarray
+    num_quadrants: np.ndarray
+    quadrant_volumes: np.ndarray
+    dilution_factors: np.ndarray
+    error_codes: np.ndarray
+    # Estadística por muestra; NaN cuando no aplica
+    concentration_ci_low: np.ndarray
+    concentration_ci_high: np.ndarray
+    cv_percent: np.ndarray
+    chi_square: np.ndarray
+    outliers: np.ndarray            # Matriz muestras × cuadrantes de cuadrantes atípicos
+    dead_cells: np.ndarray
+    viability_percent: np.ndarray
+    viability_ci_low: np.ndarray
+    viability_ci_high: np.ndarray
+    confidence_level: float = 0.95
+    
+    def __len__(self) -> int:
+        return len(self.error_codes)
 
 class NeubauerError(Exception):
     """Excepción personalizada para errores en cálculos de Neubauer."""
@@ -1,21 +1,40 @@
 from dataclasses import dataclass
-from enum import Enum
-from typing import Optional
+from enum import Enum, IntEnum, IntFlag
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .compact import frozen_variant
 
 class PHCalculationType(Enum):
     """Tipos de cálculo disponibles para la herramienta de pH."""
     STRONG_ACID = "acido_fuerte"
     STRONG_BASE = "base_fuerte"
+    WEAK_ACID = "acido_debil"
+    WEAK_BASE = "base_debil"
+    BUFFER = "amortiguador"
 
-@dataclass
+@dataclass(slots=True)
 class PHRequest:
     """Datos necesarios para calcular el pH de una solución."""
     calculation_type: PHCalculationType
     concentration_m: float
     equivalents: float = 1.0
     kw: float = 1e-14
+    # Solo para ácidos y bases débiles: Ka del ácido o Kb de la base...
+    dissociation_constant: Optional[float] = None
+    # ...o bien el pKa del ácido (para una base, el pKa de su ácido conjugado)
+    pka: Optional[float] = None
+    # Solo para amortiguadores: concentración de la base conjugada (la del ácido es concentration_m)
+    conjugate_concentration_m: Optional[float] = None
+    # Con temperatura, Kw sale de la tabla de PHService en lugar de `kw`
+    temperature_c: Optional[float] = None
+    pka_temperature_coefficient: float = 0.0       # dpKa/dT (1/°C) para corregir el pKa dado a 25 °C
+    ionic_strength: float = 0.0                    # Fuerza iónica del medio (M) para la corrección de Davies
 
-@dataclass
+FrozenPHRequest = frozen_variant(PHRequest)
+
+@dataclass(slots=True)
 class PHResult:
     """Resultado del cálculo de pH."""
     calculation_type: PHCalculationType
@@ -25,6 +44,120 @@ class PHResult:
     hydroxide: float
     formula_used: str
     notes: Optional[str] = None
+    ionization_percent: Optional[float] = None    # Fracción disociada de un ácido o base débil
+    pkw: float = 14.0                              # pH + pOH en las condiciones del cálculo
+    activity_coefficient: float = 1.0              # γ de H₃O⁺ y OH⁻; pH = −log₁₀(γ·[H₃O⁺])
+
+FrozenPHResult = frozen_variant(PHResult)
+
+class PHBatchErrorCode(IntEnum):
+    """Códigos de error por fila en el cálculo de pH por lotes."""
+    OK = 0
+    UNSUPPORTED_TYPE = 1
+    NON_POSITIVE_CONCENTRATION = 2
+    NON_POSITIVE_EQUIVALENTS = 3
+    TOO_CONCENTRATED = 4
+    WEAK_EQUIVALENTS = 5          # Ácido o base débil con equivalentes distintos de 1
+    MISSING_CONSTANT = 6          # Falta Ka/Kb o pKa, o no es válido
+    MISSING_CONJUGATE = 7         # Amortiguador sin concentración de base conjugada
+    INVALID_CONDITIONS = 8        # Temperatura o fuerza iónica fuera de rango
+
+class PHBatchNote(IntFlag):
+    """Notas por fila del cálculo por lotes; una fila puede tener varias."""
+    NONE = 0
+    VERY_DILUTE = 1
+    APPROXIMATION = 2             # √(K·C) se aleja de la solución exacta
+    HENDERSON = 4                 # Henderson–Hasselbalch se aleja del balance de carga
+
+@dataclass(slots=True)
+class PHBatchResult:
+    """Resultado columnar de muchos cálculos de pH; NaN en las filas con error."""
+    calculation_types: List[Optional[PHCalculationType]]
+    concentrations: np.ndarray
+    ph: np.ndarray
+    poh: np.ndarray
+    hydronium: np.ndarray
+    hydroxide: np.ndarray
+    pkw: np.ndarray
+    ionization_percent: np.ndarray  # NaN salvo en ácidos y bases débiles
+    error_codes: np.ndarray
+    notes: np.ndarray               # Combinación de PHBatchNote por fila
+    
+    def __len__(self) -> int:
+        return len(self.error_codes)
+
+@dataclass(slots=True)
+class TitrationRequest:
+    """Titulación de un ácido con una base (o al revés), fuertes o débiles."""
+    analyte_type: PHCalculationType
+    analyte_concentration_m: float
+    analyte_volume_ml: float
+    titrant_type: PHCalculationType
+    titrant_concentration_m: float
+    max_titrant_volume_ml: Optional[float] = None   # Por defecto, el doble del volumen de equivalencia
+    # Ka/Kb o pKa de las especies débiles, con el mismo criterio que en PHRequest
+    analyte_constant: Optional[float] = None
+    analyte_pka: Optional[float] = None
+    titrant_constant: Optional[float] = None
+    titrant_pka: Optional[float] = None
+    points: int = 10001                             # Puntos de la curva completa
+    plot_points: int = 500                          # Puntos de la curva reducida para graficar
+    kw: float = 1e-14
+    temperature_c: Optional[float] = None           # Kw de la tabla; los pKa se dan a esta temperatura
+    ionic_strength: float = 0.0
+
+FrozenTitrationRequest = frozen_variant(TitrationRequest)
+
+@dataclass(slots=True)
+class TitrationResult:
+    """Curva de titulación: pH frente al volumen de titulante agregado."""
+    # Curva completa; los arreglos son de solo lectura porque se comparten desde la caché
+    volumes_ml: np.ndarray
+    ph: np.ndarray
+    # Curva reducida con el algoritmo largest-triangle-three-buckets
+    plot_volumes_ml: np.ndarray
+    plot_ph: np.ndarray
+    # Puntos de equivalencia detectados en los máximos de |dpH/dV|
+    equivalence_volumes_ml: List[float]
+    equivalence_ph: List[float]
+    expected_equivalence_ml: float                  # Ca·Va / Cb
+
+@dataclass(slots=True)
+class BufferRequest:
+    """Diseño de un amortiguador a partir de un ácido (poliprótico o no) y un pH objetivo."""
+    acid_name: str
+    pka_values: Tuple[float, ...]                   # Todos los pKa del ácido, p. ej. fosfato (2.15, 7.20, 12.35)
+    target_ph: float
+    concentration_m: float                          # Concentración total del amortiguador
+    volume_ml: float = 1000.0
+    kw: float = 1e-14
+    # Con temperatura, Kw sale de la tabla y los pKa del catálogo se corrigen con su dpKa/dT
+    temperature_c: Optional[float] = None
+    ionic_strength: float = 0.0
+
+@dataclass(slots=True)
+class BufferResult:
+    """Receta del amortiguador: cuánto de la forma ácida y de la básica del par elegido."""
+    acid_name: str
+    pka_values: List[float]
+    target_ph: float
+    concentration_m: float
+    volume_ml: float
+    pka_used: float                                 # pKa aparente del par elegido en las condiciones dadas
+    acid_species: str                               # Forma ácida del par, p. ej. "H₂A⁻"
+    base_species: str                               # Forma básica del par, p. ej. "HA²⁻"
+    henderson_ratio: float                          # [base]/[ácido] según Henderson–Hasselbalch
+    exact_ratio: float                              # [base]/[ácido] del balance de carga completo
+    acid_form_m: float
+    base_form_m: float
+    acid_form_mmol: float
+    base_form_mmol: float
+    buffer_capacity: float                          # β = dC_base/dpH (mol/L por unidad de pH)
+    species: List[str]                              # Todas las especies, de la más protonada a la menos
+    species_fractions: List[float]                  # Fracción α de cada especie en el pH objetivo
+    notes: Optional[str] = None
+    temperature_c: Optional[float] = None
+    ionic_strength: float = 0.0
 
 class PHError(Exception):
     """Excepción personalizada para errores en el cálculo de pH."""
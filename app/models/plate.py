@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import List, Optional
+
+class PlateFormat(Enum):
+    """Formatos de placa soportados por el planificador."""
+    WELLS_96 = "96"
+    WELLS_384 = "384"
+
+@dataclass(slots=True)
+class PlateLayoutRequest:
+    """Solicitud para planificar las diluciones de una placa multipocillo."""
+    plate_format: PlateFormat
+    stock_concentrations: List[float]
+    target_concentrations: List[float]
+    replicates: int = 1
+    well_volume: float = 100.0         # µL finales por pocillo
+    min_transfer_volume: float = 0.5   # µL, volumen mínimo que se puede pipetear con precisión
+
+@dataclass(slots=True)
+class PlateLayoutResult:
+    """Mapa de placa con los volúmenes a pipetear: una posición por pocillo ocupado."""
+    plate_format: PlateFormat
+    rows: int
+    columns: int
+    well_volume: float
+    wells: List[str]
+    target_concentrations: List[float]
+    stock_indices: List[int]
+    stock_concentrations: List[float]
+    stock_volumes: List[float]
+    diluent_volumes: List[float]
+    stock_consumption: List[float]     # µL usados de cada stock, en el orden de la solicitud
+    total_diluent_volume: float
+    # Concentración objetivo por fila y columna de la placa; None en los pocillos vacíos
+    plate_map: List[List[Optional[float]]]
+    notes: Optional[str] = None
+
+class PlateError(Exception):
+    """Excepción personalizada para errores en la planificación de placas."""
+    pass
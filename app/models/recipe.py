@@ -0,0 +1,63 @@
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Dict, List, Optional
+
+import numpy as np
+
+@dataclass(slots=True)
+class RecipeComponent:
+    """Soluto de la receta con su concentración final deseada."""
+    name: str
+    target_concentration: float
+    unit: str = "mM"                    # Expresión de unidad, p. ej. "mM", "M", "g/L", "mg/mL"
+    molar_mass: Optional[float] = None  # g/mol; necesaria si stock y objetivo mezclan masa y moles
+
+@dataclass(slots=True)
+class RecipeStock:
+    """Solución stock disponible; puede contener uno o varios solutos."""
+    name: str
+    concentrations: Dict[str, float]    # Concentración de cada soluto en el stock
+    unit: str = "mM"
+
+@dataclass(slots=True)
+class RecipeRequest:
+    """Solicitud para preparar una solución con varios componentes."""
+    final_volume_ml: float
+    components: List[RecipeComponent]
+    stocks: List[RecipeStock] = field(default_factory=list)
+    min_transfer_volume_ml: float = 0.001   # 1 µL
+
+class RecipeErrorCode(IntEnum):
+    """Códigos de error por receta en la resolución por lotes."""
+    OK = 0
+    UNREACHABLE = 1            # Los stocks no permiten obtener esas proporciones
+    NEGATIVE_VOLUME = 2        # Algún stock necesitaría un volumen negativo
+    EXCEEDS_FINAL_VOLUME = 3   # Los stocks suman más que el volumen final
+    BELOW_MIN_VOLUME = 4       # Algún volumen es menor que el mínimo pipeteable
+
+@dataclass(slots=True)
+class RecipeResult:
+    """Receta resuelta: volumen de cada stock, masa de cada sólido y diluyente."""
+    final_volume_ml: float
+    stock_volumes_ml: Dict[str, float]
+    solid_masses_g: Dict[str, float]
+    diluent_volume_ml: float
+    notes: Optional[str] = None
+
+@dataclass(slots=True)
+class RecipeBatchResult:
+    """Resultado columnar de muchas recetas con los mismos componentes y stocks."""
+    stock_names: List[str]
+    solid_names: List[str]
+    # Una fila por receta; NaN en las recetas con error
+    stock_volumes_ml: np.ndarray
+    solid_masses_g: np.ndarray
+    diluent_volumes_ml: np.ndarray
+    error_codes: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.error_codes)
+
+class RecipeError(Exception):
+    """Excepción personalizada para errores al resolver recetas."""
+    pass
@@ -0,0 +1,118 @@
+"""API JSON versionada de las calculadoras: recibe los campos de la solicitud y devuelve el resultado."""
+from flask import Blueprint, jsonify, request
+
+from ..models.concentration import CalculationType, ConcentrationError, ConcentrationRequest
+from ..models.conversion import ConversionError, ConversionRequest, UnitType
+from ..models.neubauer import NeubauerError, NeubauerRequest
+from ..models.ph import PHCalculationType, PHError, PHRequest
+from ..services.concentration_service import ConcentrationService
+from ..services.conversion_service import ConversionService
+from ..services.counting_session_service import CountingSessionService
+from ..services.neubauer_service import NeubauerService
+from ..services.ph_service import PHService
+from ..utils.schema import Field, Schema, field_errors
+from ..utils.serialization import to_json
+from .schemas import CONCENTRATION_SCHEMA, CONVERSION_SCHEMA, PH_SCHEMA
+
+bp = Blueprint('api_v1', __name__, url_prefix='/api/v1')
+
+# Las claves del JSON son los campos de cada dataclass de solicitud; los
+# límites y mensajes son los mismos que aplican los formularios
+_CONVERSION_SCHEMA = CONVERSION_SCHEMA.keyed_by_target()
+
+_CONCENTRATION_SCHEMA = CONCENTRATION_SCHEMA.keyed_by_target()
+
+_NEUBAUER_SCHEMA = Schema(
+    Field('cell_counts', 'conteos de células vivas', kind='int_list', minimum=0),
+    Field('dead_counts', 'conteos de células muertas', kind='int_list', required=False, minimum=0),
+    Field('num_quadrants', 'número de cuadrantes', kind='int', required=False, minimum=0, exclusive_minimum=True,
+          maximum=CountingSessionService.MAX_QUADRANTS),
+    Field('quadrant_volume', 'volumen del cuadrante', minimum=0, exclusive_minimum=True),
+    Field('dilution_factor', 'factor de dilución', required=False, default=1.0, minimum=0, exclusive_minimum=True),
+    Field('confidence_level', 'nivel de confianza', required=False, default=0.95, minimum=0,
+          exclusive_minimum=True, maximum=1),
+)
+
+# Valores válidos uno por uno que juntos desbordan un cálculo (p. ej. un exponente enorme)
+_OUT_OF_RANGE = "Los valores indicados llevan a un resultado fuera del rango numérico"
+
+_PH_API_SCHEMA = PH_SCHEMA.extend(
+    Field('pka_temperature_coefficient', 'coeficiente de temperatura del pKa', required=False, default=0.0),
+)
+
+def _validate(schema: Schema):
+    """Valida el cuerpo JSON; devuelve (valores, None) o (None, respuesta de error 400)."""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return None, (jsonify({'error': "El cuerpo de la solicitud debe ser un objeto JSON"}), 400)
+    result = schema.validate(payload)
+    if not result.ok:
+        return None, (jsonify({'error': result.message, 'errores': field_errors(result.errors)}), 400)
+    return result.values, None
+
+@bp.route('/conversiones', methods=['POST'])
+def conversion():
+    """Convierte un valor entre unidades; devuelve el ConversionResult."""
+    values, error = _validate(_CONVERSION_SCHEMA)
+    if error:
+        return error
+    try:
+        result = ConversionService.convert(ConversionRequest(
+            value=values['value'],
+            from_unit=values['from_unit'],
+            to_unit=values['to_unit'],
+            unit_type=UnitType(values['unit_type']),
+        ))
+    except ConversionError as e:
+        return jsonify({'error': str(e)}), 400
+    except (OverflowError, ZeroDivisionError):
+        return jsonify({'error': _OUT_OF_RANGE}), 400
+    return jsonify(to_json(result))
+
+@bp.route('/concentraciones', methods=['POST'])
+def concentration():
+    """Resuelve un cálculo de concentración; devuelve el ConcentrationResult."""
+    values, error = _validate(_CONCENTRATION_SCHEMA)
+    if error:
+        return error
+    try:
+        values['calculation_type'] = CalculationType(values['calculation_type'])
+        result = ConcentrationService.calculate(ConcentrationRequest(**values))
+    except ConcentrationError as e:
+        return jsonify({'error': str(e)}), 400
+    except (OverflowError, ZeroDivisionError):
+        return jsonify({'error': _OUT_OF_RANGE}), 400
+    return jsonify(to_json(result))
+
+@bp.route('/neubauer', methods=['POST'])
+def neubauer():
+    """Calcula la concentración celular de un conteo; devuelve el NeubauerResult."""
+    values, error = _validate(_NEUBAUER_SCHEMA)
+    if error:
+        return error
+    if values['num_quadrants'] is None:
+        values['num_quadrants'] = len(values['cell_counts'])
+    try:
+        result = NeubauerService.calculate_concentration(NeubauerRequest(**values))
+    except NeubauerError as e:
+        return jsonify({'error': str(e)}), 400
+    except (OverflowError, ZeroDivisionError):
+        return jsonify({'error': _OUT_OF_RANGE}), 400
+    return jsonify(to_json(result))
+
+@bp.route('/ph', methods=['POST'])
+def ph():
+    """Calcula el pH de una solución; devuelve el PHResult."""
+    values, error = _validate(_PH_API_SCHEMA)
+    if error:
+        return error
+    if values['kw'] is None:
+        values['kw'] = PHService.get_default_kw()
+    try:
+        values['calculation_type'] = PHCalculationType(values['calculation_type'])
+        result = PHService.calculate(PHRequest(**values))
+    except PHError as e:
+        return jsonify({'error': str(e)}), 400
+    except (OverflowError, ZeroDivisionError):
+        return jsonify({'error': _OUT_OF_RANGE}), 400
+    return jsonify(to_json(result))
@@ -0,0 +1,27 @@
+from flask import Blueprint, jsonify, request
+from ..services.compound_service import CompoundService
+
+bp = Blueprint('compounds', __name__)
+
+@bp.route('/api/compuestos/autocompletar')
+def autocomplete():
+    """Sugerencias de compuestos para el texto escrito hasta el momento."""
+    prefix = request.args.get('q', '')
+    try:
+        limit = min(int(request.args.get('limite', CompoundService.MAX_SUGGESTIONS)),
+                    CompoundService.MAX_SUGGESTIONS)
+    except ValueError:
+        return jsonify({'error': "El límite debe ser un número entero"}), 400
+    
+    return jsonify({
+        'sugerencias': [
+            {
+                'nombre': suggestion.compound.name,
+                'coincidencia': suggestion.matched_name,
+                'formula': suggestion.compound.formula,
+                'masa_molar': suggestion.compound.molar_mass,
+                'pka': suggestion.compound.pka_values,
+            }
+            for suggestion in CompoundService.suggest(prefix, limit)
+        ]
+    })
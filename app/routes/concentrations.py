@@ -1,110 +1,366 @@
-from flask import Blueprint, render_template, request
+import numpy as np
+from flask import Blueprint, Response, jsonify, render_template, request
 from ..services.concentration_service import ConcentrationService
-from ..models.concentration import ConcentrationRequest, ConcentrationError, CalculationType
-from ..utils.validators import validate_numeric_input, validate_required_field
+from ..services.plate_service import PlateService
+from ..services.recipe_service import RecipeService
+from ..models.concentration import (
+    ConcentrationRequest, ConcentrationError, CalculationType,
+    DilutionSeriesMode, DilutionSeriesRequest
+)
+from ..models.plate import PlateFormat, PlateLayoutRequest, PlateError
+from ..models.recipe import RecipeComponent, RecipeStock, RecipeRequest, RecipeError
+from ..utils.schema import Field, Schema, VariantSchema, client_schema
+from ..utils.validators import validate_required_field
+from .schemas import CONCENTRATION_SCHEMA
 
 bp = Blueprint('concentrations', __name__)
 
+_CONCENTRATION_CLIENT_SCHEMA = client_schema(CONCENTRATION_SCHEMA)
+
+_SERIES_BASE_FIELDS = (
+    Field('concentracion_stock', 'concentración del stock', minimum=0, exclusive_minimum=True,
+          target='stock_concentration'),
+    Field('volumen_final', 'volumen final', minimum=0, exclusive_minimum=True, target='final_volume'),
+)
+_SERIES_STEPS = Field('num_pasos', 'número de pasos', kind='int', minimum=0, exclusive_minimum=True,
+                      maximum=ConcentrationService.MAX_DILUTION_STEPS, target='num_steps')
+_SERIES_SCHEMA = VariantSchema(
+    Field('modo', 'modo de la serie', kind='choice', target='mode'),
+    {
+        DilutionSeriesMode.FACTOR.value: Schema(
+            *_SERIES_BASE_FIELDS,
+            _SERIES_STEPS,
+            Field('factor_dilucion', 'factor de dilución', minimum=1, exclusive_minimum=True,
+                  target='dilution_factor'),
+        ),
+        DilutionSeriesMode.LOGARITHMIC.value: Schema(
+            *_SERIES_BASE_FIELDS,
+            _SERIES_STEPS,
+            Field('concentracion_final', 'concentración final', minimum=0, exclusive_minimum=True,
+                  target='final_concentration'),
+        ),
+        DilutionSeriesMode.TARGETS.value: Schema(
+            *_SERIES_BASE_FIELDS,
+            Field('concentraciones_objetivo', 'concentraciones objetivo', kind='float_list', minimum=0,
+                  exclusive_minimum=True, target='target_concentrations'),
+        ),
+    },
+)
+_SERIES_CLIENT_SCHEMA = client_schema(_SERIES_SCHEMA)
+
+_PLATE_SCHEMA = Schema(
+    Field('formato_placa', 'formato de placa', kind='choice',
+          choices=tuple(plate_format.value for plate_format in PlateFormat), target='plate_format'),
+    Field('replicas', 'número de réplicas', kind='int', minimum=0, exclusive_minimum=True, target='replicates'),
+    Field('volumen_pocillo', 'volumen por pocillo', minimum=0, exclusive_minimum=True, target='well_volume'),
+    Field('volumen_minimo', 'volumen mínimo de pipeteo', minimum=0, target='min_transfer_volume'),
+    Field('concentraciones_stock', 'concentraciones de stock', kind='float_list', minimum=0,
+          exclusive_minimum=True, target='stock_concentrations'),
+    Field('concentraciones_objetivo', 'concentraciones objetivo', kind='float_list', minimum=0,
+          exclusive_minimum=True, target='target_concentrations'),
+)
+_PLATE_CLIENT_SCHEMA = client_schema(_PLATE_SCHEMA)
+
+_RECIPE_SCHEMA = Schema(
+    Field('volumen_final', 'volumen final', minimum=0, exclusive_minimum=True),
+    Field('volumen_minimo', 'volumen mínimo de pipeteo', minimum=0),
+    Field('componentes', 'componentes', kind='str'),
+    Field('stocks', 'stocks', kind='str', required=False, default=''),
+)
+_RECIPE_CLIENT_SCHEMA = client_schema(_RECIPE_SCHEMA)
+
+_REPRESENTATIONS_SCHEMA = Schema(
+    Field('expresion', 'concentración', kind='str'),
+    Field('masa_molar', 'masa molar', required=False, minimum=0, exclusive_minimum=True),
+    Field('densidad', 'densidad', required=False, default=1.0, minimum=0, exclusive_minimum=True),
+    Field('formula', 'fórmula química', kind='str', required=False),
+)
+_REPRESENTATIONS_CLIENT_SCHEMA = client_schema(_REPRESENTATIONS_SCHEMA)
+
 @bp.route('/concentraciones', methods=['GET', 'POST'])
 def concentrations():
     """Página de cálculos de concentraciones."""
+    calculation_types = ConcentrationService.get_calculation_types()
     if request.method == 'GET':
-        calculation_types = ConcentrationService.get_calculation_types()
         return render_template('concentraciones.html', 
                              calculation_types=calculation_types,
+                             esquema=_CONCENTRATION_CLIENT_SCHEMA,
                              resultado=None,
                              error=None)
     
     # Variables para mantener el estado del formulario
     resultado = None
     error = None
-    calculation_types = ConcentrationService.get_calculation_types()
     
-    try:
-        # Obtener tipo de cálculo
-        calc_type_str = request.form.get('calculation_type', '')
-        validate_required_field(calc_type_str, 'tipo de cálculo')
-        
+    form = CONCENTRATION_SCHEMA.validate(request.form)
+    if not form.ok:
+        error = form.message
+    else:
         try:
-            calc_type = CalculationType(calc_type_str)
-        except ValueError:
-            raise ValueError("Tipo de cálculo no válido")
-        
-        # Crear solicitud según el tipo de cálculo
-        concentration_request = _create_request_from_form(request.form, calc_type)
-        
-        # Realizar cálculo
-        resultado = ConcentrationService.calculate(concentration_request)
-        
-    except ValueError as e:
-        error = str(e)
-    except ConcentrationError as e:
-        error = str(e)
-    except Exception:
-        error = "Ha ocurrido un error inesperado. Por favor, inténtalo de nuevo."
+            values = dict(form.values, calculation_type=CalculationType(form.values['calculation_type']))
+            resultado = ConcentrationService.calculate(ConcentrationRequest(**values))
+        except ConcentrationError as e:
+            error = str(e)
+        except Exception:
+            error = "Ha ocurrido un error inesperado. Por favor, inténtalo de nuevo."
     
     return render_template('concentraciones.html', 
                          calculation_types=calculation_types,
+                         esquema=_CONCENTRATION_CLIENT_SCHEMA,
+                         resultado=resultado,
+                         error=error,
+                         form_data=request.form)
+
+@bp.route('/concentraciones/serie', methods=['GET', 'POST'])
+def dilution_series():
+    """Página para calcular una serie de diluciones completa."""
+    modes = ConcentrationService.get_dilution_series_modes()
+    if request.method == 'GET':
+        return render_template('dilucion_seriada.html',
+                             modes=modes,
+                             esquema=_SERIES_CLIENT_SCHEMA,
+                             resultado=None,
+                             error=None)
+    
+    resultado = None
+    error = None
+    
+    form = _SERIES_SCHEMA.validate(request.form)
+    if not form.ok:
+        error = form.message
+    else:
+        try:
+            values = dict(form.values, mode=DilutionSeriesMode(form.values['mode']))
+            resultado = ConcentrationService.calculate_dilution_series(DilutionSeriesRequest(**values))
+        except ConcentrationError as e:
+            error = str(e)
+        except Exception:
+            error = "Ha ocurrido un error inesperado. Por favor, inténtalo de nuevo."
+    
+    return render_template('dilucion_seriada.html',
+                         modes=modes,
+                         esquema=_SERIES_CLIENT_SCHEMA,
+                         resultado=resultado,
+                         error=error,
+                         form_data=request.form)
+
+@bp.route('/concentraciones/placa', methods=['GET', 'POST'])
+def plate_layout():
+    """Página para planificar las diluciones de una placa de 96 o 384 pocillos."""
+    plate_formats = PlateService.get_plate_formats()
+    if request.method == 'GET':
+        return render_template('placa.html',
+                             plate_formats=plate_formats,
+                             esquema=_PLATE_CLIENT_SCHEMA,
+                             resultado=None,
+                             error=None)
+    
+    resultado = None
+    error = None
+    
+    form = _PLATE_SCHEMA.validate(request.form)
+    if not form.ok:
+        error = form.message
+    else:
+        try:
+            resultado = PlateService.plan_layout(_plate_request(form.values))
+        except PlateError as e:
+            error = str(e)
+        except Exception:
+            error = "Ha ocurrido un error inesperado. Por favor, inténtalo de nuevo."
+    
+    return render_template('placa.html',
+                         plate_formats=plate_formats,
+                         esquema=_PLATE_CLIENT_SCHEMA,
+                         row_labels=PlateService.row_labels(resultado.rows) if resultado else [],
+                         resultado=resultado,
+                         error=error,
+                         form_data=request.form)
+
+@bp.route('/concentraciones/placa/worklist.csv', methods=['POST'])
+def plate_worklist():
+    """Descarga la lista de trabajo del mapa de placa en CSV."""
+    form = _PLATE_SCHEMA.validate(request.form)
+    try:
+        if not form.ok:
+            raise PlateError(form.message)
+        resultado = PlateService.plan_layout(_plate_request(form.values))
+    except PlateError as e:
+        return render_template('placa.html',
+                             plate_formats=PlateService.get_plate_formats(),
+                             esquema=_PLATE_CLIENT_SCHEMA,
+                             resultado=None,
+                             error=str(e),
+                             form_data=request.form), 400
+    
+    return Response(
+        PlateService.to_worklist_csv(resultado),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename=worklist_placa_{resultado.plate_format.value}.csv'}
+    )
+
+def _plate_request(values) -> PlateLayoutRequest:
+    """Crea una solicitud de mapa de placa a partir de los valores validados del formulario."""
+    return PlateLayoutRequest(**dict(values, plate_format=PlateFormat(values['plate_format'])))
+
+@bp.route('/concentraciones/receta', methods=['GET', 'POST'])
+def recipe():
+    """Página para resolver una receta con varios componentes y stocks."""
+    if request.method == 'GET':
+        return render_template('receta.html',
+                             esquema=_RECIPE_CLIENT_SCHEMA,
+                             resultado=None,
+                             error=None)
+    
+    resultado = None
+    error = None
+    
+    form = _RECIPE_SCHEMA.validate(request.form)
+    if not form.ok:
+        error = form.message
+    else:
+        try:
+            recipe_request = RecipeRequest(
+                final_volume_ml=form.values['volumen_final'],
+                components=RecipeService.parse_components(form.values['componentes']),
+                stocks=RecipeService.parse_stocks(form.values['stocks']),
+                min_transfer_volume_ml=form.values['volumen_minimo'] / 1000,
+            )
+            resultado = RecipeService.solve(recipe_request)
+            
+        except ValueError as e:
+            # Formato de las líneas de componentes o stocks
+            error = str(e)
+        except RecipeError as e:
+            error = str(e)
+        except Exception:
+            error = "Ha ocurrido un error inesperado. Por favor, inténtalo de nuevo."
+    
+    return render_template('receta.html',
+                         esquema=_RECIPE_CLIENT_SCHEMA,
                          resultado=resultado,
                          error=error,
                          form_data=request.form)
 
-def _create_request_from_form(form_data, calc_type: CalculationType) -> ConcentrationRequest:
-    """Crea una solicitud de concentración a partir de los datos del formulario."""
-    
-    def get_optional_float(field_name):
-        """Obtiene un valor float opcional del formulario."""
-        value = form_data.get(field_name, '').strip()
-        if not value:
-            return None
-        return validate_numeric_input(value, field_name)
-    
-    request_data = {
-        'calculation_type': calc_type
-    }
-    
-    if calc_type == CalculationType.MOLARITY:
-        request_data.update({
-            'moles': get_optional_float('moles'),
-            'volume_l': get_optional_float('volume_l'),
-            'molarity': get_optional_float('molarity'),
-            'mass_g': get_optional_float('mass_g'),
-            'molecular_weight': get_optional_float('molecular_weight')
-        })
+@bp.route('/api/concentraciones/recetas', methods=['POST'])
+def recipes_batch():
+    """
+    Resuelve muchas recetas con los mismos componentes y stocks en una sola solicitud JSON.
+    
+    Cuerpo: componentes [{nombre, unidad, masa_molar}], stocks [{nombre, unidad,
+    concentraciones: {soluto: valor}}], objetivos (una lista de concentraciones por
+    receta, en el orden de los componentes), volumenes_finales (mL) y
+    volumen_minimo (mL, opcional).
+    """
+    payload = request.get_json(silent=True)
+    
+    try:
+        if not isinstance(payload, dict):
+            raise ValueError("El cuerpo de la solicitud debe ser un objeto JSON")
         
-    elif calc_type == CalculationType.MOLALITY:
-        request_data.update({
-            'moles': get_optional_float('moles'),
-            'kg_solvent': get_optional_float('kg_solvent'),
-            'molality': get_optional_float('molality')
-        })
+        componentes = payload.get('componentes')
+        stocks = payload.get('stocks', [])
+        objetivos = payload.get('objetivos')
+        volumenes = payload.get('volumenes_finales')
+        if not isinstance(componentes, list) or not isinstance(stocks, list):
+            raise ValueError("Los campos componentes y stocks deben ser listas")
+        if not isinstance(objetivos, list) or not isinstance(volumenes, list):
+            raise ValueError("Los campos objetivos y volumenes_finales deben ser listas")
         
-    elif calc_type == CalculationType.DILUTION:
-        request_data.update({
-            'c1': get_optional_float('c1'),
-            'v1': get_optional_float('v1'),
-            'c2': get_optional_float('c2'),
-            'v2': get_optional_float('v2')
-        })
+        components = [
+            RecipeComponent(name=str(item['nombre']), target_concentration=0.0,
+                            unit=str(item.get('unidad', 'mM')),
+                            molar_mass=float(item['masa_molar']) if item.get('masa_molar') is not None else None)
+            for item in componentes
+        ]
+        stock_list = [
+            RecipeStock(name=str(item['nombre']), unit=str(item.get('unidad', 'mM')),
+                        concentrations={str(k): float(v) for k, v in item['concentraciones'].items()})
+            for item in stocks
+        ]
+        batch = RecipeService.solve_batch(components, stock_list, objetivos, volumenes,
+                                          float(payload.get('volumen_minimo', 0.001)))
+        
+    except (KeyError, TypeError, AttributeError):
+        return jsonify({'error': "Formato de componentes o stocks no válido"}), 400
+    except (ValueError, RecipeError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    def nullable(row):
+        return [None if np.isnan(value) else value for value in row.tolist()]
+    
+    return jsonify({
+        'stocks': batch.stock_names,
+        'solidos': batch.solid_names,
+        'volumenes_stock_ml': [nullable(row) for row in batch.stock_volumes_ml],
+        'masas_solidos_g': [nullable(row) for row in batch.solid_masses_g],
+        'volumenes_diluyente_ml': nullable(batch.diluent_volumes_ml),
+        'errores': [RecipeService.error_message(code) for code in batch.error_codes.tolist()],
+    })
+
+@bp.route('/concentraciones/representaciones', methods=['GET', 'POST'])
+def representations():
+    """Página que expresa una concentración en todas las unidades a la vez."""
+    if request.method == 'GET':
+        return render_template('representaciones.html',
+                             esquema=_REPRESENTATIONS_CLIENT_SCHEMA,
+                             resultado=None,
+                             error=None)
+    
+    resultado = None
+    error = None
+    
+    form = _REPRESENTATIONS_SCHEMA.validate(request.form)
+    if not form.ok:
+        error = form.message
+    else:
+        try:
+            value, unit = ConcentrationService.parse_concentration_expression(form.values['expresion'])
+            resultado = ConcentrationService.calculate_representations(
+                value, unit,
+                molar_mass=form.values['masa_molar'],
+                density=form.values['densidad'],
+                formula=form.values['formula'],
+            )
+            
+        except ConcentrationError as e:
+            error = str(e)
+        except Exception:
+            error = "Ha ocurrido un error inesperado. Por favor, inténtalo de nuevo."
+    
+    return render_template('representaciones.html',
+                         esquema=_REPRESENTATIONS_CLIENT_SCHEMA,
+                         resultado=resultado,
+                         error=error,
+                         form_data=request.form)
+
+@bp.route('/api/concentraciones/representaciones', methods=['POST'])
+def representations_batch():
+    """Expresa un arreglo de concentraciones en todas las unidades en una sola solicitud JSON."""
+    payload = request.get_json(silent=True)
+    
+    try:
+        if not isinstance(payload, dict):
+            raise ValueError("El cuerpo de la solicitud debe ser un objeto JSON")
         
-    elif calc_type == CalculationType.MASS_VOLUME:
-        request_data.update({
-            'mass_g': get_optional_float('mass_g'),
-            'volume_ml': get_optional_float('volume_ml'),
-            'concentration_mg_ml': get_optional_float('concentration_mg_ml')
-        })
+        valores = payload.get('valores')
+        if not isinstance(valores, list):
+            raise ValueError("El campo valores debe ser una lista de números")
+        unidad = validate_required_field(payload.get('unidad') or '', 'unidad')
         
-    elif calc_type == CalculationType.PPM:
-        request_data.update({
-            'ppm': get_optional_float('ppm_field'),
-            'percentage': get_optional_float('percentage_field'),
-            'concentration_mg_ml': get_optional_float('concentration_mg_ml_field')
-        })
+        converted = ConcentrationService.convert_representations(
+            valores, unidad,
+            molar_mass=payload.get('masa_molar'),
+            density=payload.get('densidad', 1.0),
+        )
         
-    elif calc_type == CalculationType.PERCENTAGE:
-        request_data.update({
-            'percentage': get_optional_float('percentage_only'),
-            'ppm': get_optional_float('ppm_only')
-        })
+    except (ValueError, ConcentrationError) as e:
+        return jsonify({'error': str(e)}), 400
     
-    return ConcentrationRequest(**request_data)
\ No newline at end of file
+    return jsonify({
+        'unidad': unidad,
+        'representaciones': {
+            target.value: [None if np.isnan(value) else value for value in column.tolist()]
+            for target, column in converted.items()
+        },
+    })
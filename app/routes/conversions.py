@@ -1,15 +1,24 @@
-from flask import Blueprint, render_template, request
+import io
+import json
+
+from flask import Blueprint, Response, jsonify, render_template, request, stream_with_context
 from ..services.conversion_service import ConversionService
+from ..services.unit_expression_service import UnitExpressionService
 from ..models.conversion import ConversionRequest, ConversionError, UnitType
-from ..utils.validators import validate_numeric_input, validate_required_field
+from ..utils.schema import client_schema
+from ..utils.validators import validate_required_field
+from .schemas import CONVERSION_SCHEMA
 
 bp = Blueprint('conversions', __name__)
 
+_CONVERSION_CLIENT_SCHEMA = client_schema(CONVERSION_SCHEMA)
+
 @bp.route('/conversiones', methods=['GET', 'POST'])
 def conversions():
     """Página de conversiones de unidades."""
     if request.method == 'GET':
         return render_template('conversiones.html', 
+                             esquema=_CONVERSION_CLIENT_SCHEMA,
                              resultado=None,
                              error=None,
                              valor='',
@@ -20,50 +29,165 @@ def conversions():
     # Variables para mantener el estado del formulario
     resultado = None
     error = None
-    valor_str = request.form.get('valor', '')
-    unidad_origen = request.form.get('unidad_origen', '')
-    unidad_destino = request.form.get('unidad_destino', '')
-    tipo_unidad = request.form.get('tipo_unidad', '')
+    
+    # Todos los campos se validan en una pasada para mostrar todos los errores juntos
+    form = CONVERSION_SCHEMA.validate(request.form)
+    if not form.ok:
+        error = form.message
+    else:
+        try:
+            # Crear solicitud de conversión
+            conversion_request = ConversionRequest(
+                value=form.values['value'],
+                from_unit=form.values['from_unit'],
+                to_unit=form.values['to_unit'],
+                unit_type=UnitType(form.values['unit_type'])
+            )
+            
+            # Realizar conversión
+            result = ConversionService.convert(conversion_request)
+            resultado = result.converted_value
+            
+        except ConversionError as e:
+            error = str(e)
+        except Exception:
+            error = "Ha ocurrido un error inesperado. Por favor, inténtalo de nuevo."
+    
+    return render_template('conversiones.html', 
+                         esquema=_CONVERSION_CLIENT_SCHEMA,
+                         resultado=resultado,
+                         error=error,
+                         valor=request.form.get('valor', ''),
+                         unidad_origen=request.form.get('unidad_origen', ''),
+                         unidad_destino=request.form.get('unidad_destino', ''),
+                         tipo_unidad=request.form.get('tipo_unidad', ''))
+
+@bp.route('/api/conversiones/batch', methods=['POST'])
+def conversions_batch():
+    """Convierte un arreglo de valores en una sola solicitud JSON."""
+    payload = request.get_json(silent=True)
     
     try:
-        # Validar campos requeridos
-        validate_required_field(valor_str, 'valor')
-        validate_required_field(unidad_origen, 'unidad origen')
-        validate_required_field(unidad_destino, 'unidad destino')
-        validate_required_field(tipo_unidad, 'tipo de unidad')
+        if not isinstance(payload, dict):
+            raise ValueError("El cuerpo de la solicitud debe ser un objeto JSON")
         
-        # Validar valor numérico
-        valor = validate_numeric_input(valor_str, 'valor')
+        valores = payload.get('valores')
+        if not isinstance(valores, list):
+            raise ValueError("El campo valores debe ser una lista de números")
+        
+        unidad_origen = validate_required_field(payload.get('unidad_origen') or '', 'unidad origen')
+        unidad_destino = validate_required_field(payload.get('unidad_destino') or '', 'unidad destino')
+        tipo_unidad = validate_required_field(payload.get('tipo_unidad') or '', 'tipo de unidad')
         
-        # Validar tipo de unidad
         try:
             unit_type = UnitType(tipo_unidad)
         except ValueError:
             raise ValueError("Tipo de unidad no válido")
         
-        # Crear solicitud de conversión
-        conversion_request = ConversionRequest(
-            value=valor,
-            from_unit=unidad_origen,
-            to_unit=unidad_destino,
-            unit_type=unit_type
-        )
-        
-        # Realizar conversión
-        result = ConversionService.convert(conversion_request)
-        resultado = result.converted_value
-        
-    except ValueError as e:
-        error = str(e)
-    except ConversionError as e:
-        error = str(e)
-    except Exception:
-        error = "Ha ocurrido un error inesperado. Por favor, inténtalo de nuevo."
+        convertidos = ConversionService.convert_many(valores, unidad_origen, unidad_destino, unit_type)
+        
+    except (ValueError, ConversionError) as e:
+        return jsonify({'error': str(e)}), 400
     
-    return render_template('conversiones.html', 
-                         resultado=resultado,
-                         error=error,
-                         valor=valor_str,
-                         unidad_origen=unidad_origen,
-                         unidad_destino=unidad_destino,
-                         tipo_unidad=tipo_unidad)
\ No newline at end of file
+    return jsonify({
+        'unidad_origen': unidad_origen,
+        'unidad_destino': unidad_destino,
+        'tipo_unidad': unit_type.value,
+        'valores_convertidos': convertidos.tolist(),
+    })
+
+
+@bp.route('/api/conversiones/stream', methods=['POST'])
+def conversions_stream():
+    """
+    Convierte columnas de un archivo CSV o NDJSON y devuelve las filas en flujo.
+    
+    Los parámetros (columnas, unidad_origen, unidad_destino, tipo_unidad y
+    formato) llegan en la query string y el archivo va directamente en el
+    cuerpo de la solicitud, que se lee a medida que se responde. No se acepta
+    multipart porque Werkzeug lo almacena completo antes de llamar a la vista.
+    Si un error aparece cuando la respuesta ya comenzó, se agrega una última
+    línea con el mensaje de error.
+    """
+    try:
+        columnas = [c.strip() for c in request.args.get('columnas', '').split(',') if c.strip()]
+        if not columnas:
+            raise ValueError("Debes indicar al menos una columna a convertir")
+        
+        unidad_origen = validate_required_field(request.args.get('unidad_origen', ''), 'unidad origen')
+        unidad_destino = validate_required_field(request.args.get('unidad_destino', ''), 'unidad destino')
+        tipo_unidad = validate_required_field(request.args.get('tipo_unidad', ''), 'tipo de unidad')
+        
+        try:
+            unit_type = UnitType(tipo_unidad)
+        except ValueError:
+            raise ValueError("Tipo de unidad no válido")
+        
+        formato = request.args.get('formato', '').lower()
+        if not formato:
+            formato = 'ndjson' if request.mimetype in ('application/x-ndjson', 'application/jsonl') else 'csv'
+        if formato not in ('csv', 'ndjson'):
+            raise ValueError("Formato no válido. Usa csv o ndjson")
+        
+        lines = io.TextIOWrapper(request.stream, encoding='utf-8-sig', newline='')
+        
+        if formato == 'csv':
+            chunks = ConversionService.convert_csv_stream(lines, columnas, unidad_origen, unidad_destino, unit_type)
+            mimetype = 'text/csv'
+        else:
+            chunks = ConversionService.convert_ndjson_stream(lines, columnas, unidad_origen, unidad_destino, unit_type)
+            mimetype = 'application/x-ndjson'
+        
+        # Procesar el primer bloque antes de responder para informar con 400
+        # los errores de parámetros, encabezado o primeras filas
+        first_chunk = next(chunks, '')
+        
+    except (ValueError, ConversionError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    def generate():
+        yield first_chunk
+        try:
+            yield from chunks
+        except ConversionError as e:
+            if formato == 'csv':
+                yield f"# error: {e}\n"
+            else:
+                yield json.dumps({'error': str(e)}, ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+
+@bp.route('/api/conversiones/compuestas', methods=['POST'])
+def compound_conversions():
+    """Convierte valores entre unidades compuestas (p. ej. mg/dL → mmol/L)."""
+    payload = request.get_json(silent=True)
+    
+    try:
+        if not isinstance(payload, dict):
+            raise ValueError("El cuerpo de la solicitud debe ser un objeto JSON")
+        
+        valores = payload.get('valores')
+        if not isinstance(valores, list):
+            raise ValueError("El campo valores debe ser una lista de números")
+        
+        unidad_origen = validate_required_field(payload.get('unidad_origen') or '', 'unidad origen')
+        unidad_destino = validate_required_field(payload.get('unidad_destino') or '', 'unidad destino')
+        
+        masa_molar = payload.get('masa_molar')
+        if masa_molar is not None and (isinstance(masa_molar, bool) or not isinstance(masa_molar, (int, float))):
+            raise ValueError("La masa molar debe ser un número")
+        
+        plan = UnitExpressionService.compile_plan(unidad_origen, unidad_destino, masa_molar)
+        convertidos = UnitExpressionService.convert_many(valores, unidad_origen, unidad_destino, masa_molar)
+        
+    except (ValueError, ConversionError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'unidad_origen': plan.from_expr,
+        'unidad_destino': plan.to_expr,
+        'masa_molar': plan.molar_mass,
+        'factor': plan.factor,
+        'valores_convertidos': convertidos.tolist(),
+    })
@@ -1,71 +1,375 @@
-from flask import Blueprint, render_template, request
+import io
+import itertools
+import json
+import math
+from functools import lru_cache
+
+from flask import Blueprint, Response, jsonify, render_template, request, stream_with_context
 from ..services.neubauer_service import NeubauerService
+from ..services.hemocytometer_service import HemocytometerService
+from ..services.counting_session_service import CountingSessionService
 from ..models.neubauer import NeubauerRequest, NeubauerError
+from ..models.hemocytometer import CellCountRequest, CellPolarity, HemocytometerError
+from ..models.counting_session import CountingSessionError, CountingSessionNotFound
+from ..utils.schema import Field, Schema, client_schema
 from ..utils.validators import validate_numeric_input, validate_integer_input
 
 bp = Blueprint('neubauer', __name__)
 
+# Cuadrantes grandes de la cámara (3 × 3); acota los esquemas de conteo que se compilan por formulario
+MAX_FORM_QUADRANTS = 9
+
+_NEUBAUER_SCHEMA = Schema(
+    Field('numCuadrantes', 'número de cuadrantes', kind='int', minimum=0, exclusive_minimum=True,
+          maximum=MAX_FORM_QUADRANTS, target='num_quadrants'),
+    Field('volumenCuadrante', 'volumen del cuadrante', minimum=0, exclusive_minimum=True,
+          target='quadrant_volume'),
+    Field('factorDilucion', 'factor de dilución', minimum=0, exclusive_minimum=True, target='dilution_factor'),
+)
+
+@lru_cache(maxsize=MAX_FORM_QUADRANTS)
+def _counts_schema(num_quadrants: int) -> Schema:
+    """Campos de conteo (vivas obligatorias, muertas opcionales) para cada cuadrante."""
+    return Schema(*(
+        spec
+        for i in range(1, num_quadrants + 1)
+        for spec in (
+            Field(f'celdasCuadrante{i}', f'conteo de células vivas del cuadrante {i}', kind='int',
+                  minimum=0, target=f'live_{i - 1}'),
+            Field(f'muertasCuadrante{i}', f'conteo de células muertas del cuadrante {i}', kind='int',
+                  required=False, minimum=0, target=f'dead_{i - 1}'),
+        )
+    ))
+
+# El navegador recibe los campos de conteo de todos los cuadrantes posibles y valida los que se muestran
+_NEUBAUER_CLIENT_SCHEMA = client_schema(
+    _NEUBAUER_SCHEMA.extend(*_counts_schema(MAX_FORM_QUADRANTS).fields)
+)
+
 @bp.route('/neubauer', methods=['GET', 'POST'])
 def neubauer():
     """Página de cálculos de Neubauer."""
     if request.method == 'GET':
-        return render_template('neubauer.html')
+        return render_template('neubauer.html', esquema=_NEUBAUER_CLIENT_SCHEMA)
     
     resultado = None
     error = None
     
+    # Todos los campos se validan en una pasada para mostrar todos los errores juntos
+    form = _NEUBAUER_SCHEMA.validate(request.form)
+    if 'numCuadrantes' in form.errors:
+        return render_template('neubauer.html', esquema=_NEUBAUER_CLIENT_SCHEMA, resultado=None, error=form.message)
+    counts = _counts_schema(form.values['num_quadrants']).validate(request.form)
+    if not form.ok or not counts.ok:
+        return render_template('neubauer.html', esquema=_NEUBAUER_CLIENT_SCHEMA, resultado=None,
+                               error='; '.join([*form.errors.values(), *counts.errors.values()]))
+    
     try:
-        # Obtener y validar parámetros básicos
-        num_cuadrantes = validate_integer_input(
-            request.form.get('numCuadrantes', ''), 
-            'número de cuadrantes'
+        num_cuadrantes = form.values['num_quadrants']
+        dead = [counts.values[f'dead_{i}'] for i in range(num_cuadrantes)]
+        
+        # Crear solicitud de cálculo
+        neubauer_request = NeubauerRequest(
+            num_quadrants=num_cuadrantes,
+            quadrant_volume=form.values['quadrant_volume'],
+            dilution_factor=form.values['dilution_factor'],
+            cell_counts=[counts.values[f'live_{i}'] for i in range(num_cuadrantes)],
+            # Los cuadrantes con la casilla de muertas vacía quedan fuera de la viabilidad
+            dead_counts=dead if any(count is not None for count in dead) else None
         )
         
+        # Realizar cálculo
+        resultado = NeubauerService.calculate_concentration(neubauer_request)
+        
+    except NeubauerError as e:
+        error = str(e)
+    except Exception:
+        error = "Ha ocurrido un error inesperado. Por favor, inténtalo de nuevo."
+    
+    return render_template('neubauer.html', esquema=_NEUBAUER_CLIENT_SCHEMA, resultado=resultado, error=error)
+
+def _number(value):
+    """Convierte NaN en None para la plantilla."""
+    value = float(value)
+    return None if math.isnan(value) else value
+
+def _batch_from_request():
+    """Lee las muestras del archivo subido o del texto pegado y las calcula en lote."""
+    upload = request.files.get('archivo')
+    if upload and upload.filename:
+        # El archivo se lee línea a línea; read_samples_csv limita el número de muestras
+        source = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+    else:
+        source = request.form.get('datos', '')
+        if not source.strip():
+            raise ValueError("Sube un archivo CSV o pega los conteos de las muestras")
+    
+    try:
+        sample_ids, counts, volumes, dilutions, dead_counts = NeubauerService.read_samples_csv(source)
+    except UnicodeDecodeError:
+        raise ValueError("El archivo debe estar codificado en UTF-8")
+    return NeubauerService.calculate_batch(counts, volumes, dilutions, sample_ids, dead_counts)
+
+@bp.route('/neubauer/lote', methods=['GET', 'POST'])
+def neubauer_batch():
+    """Procesamiento de muchas muestras desde un CSV."""
+    if request.method == 'GET':
+        return render_template('neubauer_lote.html')
+    
+    resultado = None
+    filas = []
+    error = None
+    
+    try:
+        resultado = _batch_from_request()
+        for i, sample_id in enumerate(resultado.sample_ids):
+            filas.append({
+                'muestra': sample_id,
+                'cuadrantes': int(resultado.num_quadrants[i]),
+                'total': float(resultado.total_cells[i]),
+                'promedio': float(resultado.average_cells[i]),
+                'concentracion': float(resultado.concentrations[i]),
+                'ic_inferior': float(resultado.concentration_ci_low[i]),
+                'ic_superior': float(resultado.concentration_ci_high[i]),
+                'cv': _number(resultado.cv_percent[i]),
+                'atipicos': (resultado.outliers[i].nonzero()[0] + 1).tolist(),
+                'viabilidad': _number(resultado.viability_percent[i]),
+                'error': NeubauerService.error_message(resultado.error_codes[i]),
+            })
+    except (ValueError, NeubauerError) as e:
+        error = str(e)
+    except Exception:
+        error = "Ha ocurrido un error inesperado. Por favor, inténtalo de nuevo."
+    
+    return render_template('neubauer_lote.html', resultado=resultado, filas=filas,
+                           form_data=request.form, error=error)
+
+@bp.route('/neubauer/lote.csv', methods=['POST'])
+def neubauer_batch_csv():
+    """Devuelve la tabla de resultados del lote en CSV, generada en flujo."""
+    try:
+        resultado = _batch_from_request()
+    except (ValueError, NeubauerError) as e:
+        return render_template('neubauer_lote.html', form_data=request.form, error=str(e)), 400
+    
+    return Response(
+        stream_with_context(NeubauerService.iter_results_csv(resultado)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': 'attachment; filename=neubauer_lote.csv'}
+    )
+
+@bp.route('/api/neubauer/imagen', methods=['POST'])
+def neubauer_image():
+    """
+    Cuenta las células de una micrografía de la cámara y calcula la concentración.
+    
+    Formulario multipart: imagen (archivo), diametro_celula (px), polaridad
+    (auto, clara u oscura), sensibilidad, max_cuadrantes, volumen_cuadrante (mm³)
+    y factor_dilucion; todos salvo la imagen son opcionales.
+    """
+    try:
+        upload = request.files.get('imagen')
+        if not upload or not upload.filename:
+            raise ValueError("Sube una imagen de la cámara de Neubauer")
+        
+        polaridades = {polarity.value: polarity for polarity in CellPolarity}
+        polaridad = request.form.get('polaridad', CellPolarity.AUTO.value)
+        if polaridad not in polaridades:
+            raise ValueError("La polaridad debe ser auto, clara u oscura")
+        max_cuadrantes = request.form.get('max_cuadrantes', '').strip()
+        count_request = CellCountRequest(
+            cell_diameter_px=validate_numeric_input(request.form.get('diametro_celula', '12'), 'diámetro de las células'),
+            polarity=polaridades[polaridad],
+            sensitivity=validate_numeric_input(request.form.get('sensibilidad', '5'), 'sensibilidad'),
+            max_quadrants=validate_integer_input(max_cuadrantes, 'número máximo de cuadrantes') if max_cuadrantes else None,
+        )
         volumen_cuadrante = validate_numeric_input(
-            request.form.get('volumenCuadrante', ''), 
+            request.form.get('volumen_cuadrante', str(NeubauerService.DEFAULT_QUADRANT_VOLUME)),
             'volumen del cuadrante'
         )
-        
         factor_dilucion = validate_numeric_input(
-            request.form.get('factorDilucion', ''), 
+            request.form.get('factor_dilucion', str(NeubauerService.DEFAULT_DILUTION_FACTOR)),
             'factor de dilución'
         )
         
-        # Obtener conteos de células para cada cuadrante
-        celdas = []
-        for i in range(1, num_cuadrantes + 1):
-            cell_count_str = request.form.get(f'celdasCuadrante{i}', '')
-            if not cell_count_str:
-                raise ValueError(f"El conteo de células del cuadrante {i} es requerido")
-            
-            try:
-                cell_count = int(cell_count_str)
-                if cell_count < 0:
-                    raise ValueError(f"El conteo de células del cuadrante {i} no puede ser negativo")
-                celdas.append(cell_count)
-            except ValueError as e:
-                if "cannot be negative" in str(e):
-                    raise
-                raise ValueError(f"El conteo de células del cuadrante {i} debe ser un número entero válido")
-        
-        # Crear solicitud de cálculo
-        neubauer_request = NeubauerRequest(
-            num_quadrants=num_cuadrantes,
-            quadrant_volume=volumen_cuadrante,
-            dilution_factor=factor_dilucion,
-            cell_counts=celdas
+        conteo = HemocytometerService.count_image(upload.read(), count_request)
+        resultado = NeubauerService.calculate_concentration(
+            HemocytometerService.to_neubauer_request(conteo, volumen_cuadrante, factor_dilucion)
         )
         
-        # Realizar cálculo
-        resultado = NeubauerService.calculate_concentration(neubauer_request)
+    except (ValueError, NeubauerError, HemocytometerError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'ancho': conteo.image_width,
+        'alto': conteo.image_height,
+        'polaridad': conteo.polarity.value,
+        'lineas_horizontales': conteo.row_lines,
+        'lineas_verticales': conteo.column_lines,
+        'cuadrantes': [
+            {'caja': list(box), 'celulas': count}
+            for box, count in zip(conteo.quadrant_boxes, conteo.quadrant_counts)
+        ],
+        'posiciones': [[round(x, 1), round(y, 1)] for x, y in conteo.cell_positions],
+        'franjas': conteo.tiles,
+        'notas': conteo.notes,
+        'resultado': {
+            'concentracion': resultado.concentration,
+            'ic_inferior': resultado.concentration_ci_low,
+            'ic_superior': resultado.concentration_ci_high,
+            'total_celulas': resultado.total_cells,
+            'promedio_celulas': resultado.average_cells,
+            'cv_porcentaje': resultado.cv_percent,
+            'cuadrantes_atipicos': resultado.outlier_quadrants,
+        },
+    })
+
+@bp.route('/neubauer/sesion')
+def counting_session_page():
+    """Página de conteo en vivo con un botón por cuadrante."""
+    return render_template('neubauer_sesion.html')
+
+def _snapshot_payload(snapshot):
+    """Estado de una sesión de conteo como diccionario JSON."""
+    return {
+        'sesion': snapshot.session_id,
+        'version': snapshot.version,
+        'vivas': snapshot.live_counts,
+        'muertas': snapshot.dead_counts,
+        'total_celulas': snapshot.total_cells,
+        'celulas_muertas': snapshot.dead_cells,
+        'promedio_celulas': snapshot.average_cells,
+        'concentracion': snapshot.concentration,
+        'ic_inferior': snapshot.concentration_ci_low,
+        'ic_superior': snapshot.concentration_ci_high,
+        'cv_porcentaje': snapshot.cv_percent,
+        'viabilidad_porcentaje': snapshot.viability_percent,
+    }
+
+def _session_error(error):
+    """Respuesta JSON para los errores de una sesión de conteo."""
+    status = 404 if isinstance(error, CountingSessionNotFound) else 400
+    return jsonify({'error': str(error)}), status
+
+def _json_number(payload, key, default):
+    """Número finito de un cuerpo JSON (sin textos, booleanos, Infinity ni NaN); None si no lo es."""
+    value = payload.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    try:
+        value = float(value)
+    except OverflowError:
+        return None
+    return value if math.isfinite(value) else None
+
+@bp.route('/api/neubauer/sesiones', methods=['POST'])
+def counting_session_create():
+    """
+    Abre una sesión de conteo en vivo.
+    
+    Cuerpo JSON: num_cuadrantes, volumen_cuadrante (mm³, 0.1 por defecto),
+    factor_dilucion (1 por defecto) y nivel_confianza (0.95 por defecto).
+    """
+    payload = request.get_json(silent=True)
+    try:
+        if not isinstance(payload, dict):
+            raise ValueError("El cuerpo de la solicitud debe ser un objeto JSON")
+        num_cuadrantes = payload.get('num_cuadrantes')
+        if isinstance(num_cuadrantes, bool) or not isinstance(num_cuadrantes, int):
+            raise ValueError("El número de cuadrantes debe ser un entero")
+        volumen, dilucion, confianza = (
+            _json_number(payload, 'volumen_cuadrante', NeubauerService.DEFAULT_QUADRANT_VOLUME),
+            _json_number(payload, 'factor_dilucion', NeubauerService.DEFAULT_DILUTION_FACTOR),
+            _json_number(payload, 'nivel_confianza', 0.95),
+        )
+        if None in (volumen, dilucion, confianza):
+            raise ValueError("El volumen, el factor de dilución y el nivel de confianza deben ser números finitos")
         
+        snapshot = CountingSessionService.create_session(num_cuadrantes, volumen, dilucion, confianza)
     except ValueError as e:
-        error = str(e)
+        return jsonify({'error': str(e)}), 400
+    except CountingSessionError as e:
+        return _session_error(e)
+    
+    return jsonify(_snapshot_payload(snapshot)), 201
+
+@bp.route('/api/neubauer/sesiones/<session_id>', methods=['GET'])
+def counting_session_state(session_id):
+    """Estado actual de una sesión de conteo."""
+    try:
+        snapshot = CountingSessionService.get_snapshot(session_id)
+    except CountingSessionError as e:
+        return _session_error(e)
+    return jsonify(_snapshot_payload(snapshot))
+
+@bp.route('/api/neubauer/sesiones/<session_id>/clics', methods=['POST'])
+def counting_session_click(session_id):
+    """
+    Registra un clic: cuerpo JSON con cuadrante (desde 1), muerta (opcional,
+    célula teñida) y delta (1 por defecto, -1 para deshacer).
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': "El cuerpo de la solicitud debe ser un objeto JSON"}), 400
+    try:
+        snapshot = CountingSessionService.record_click(
+            session_id,
+            payload.get('cuadrante'),
+            dead=payload.get('muerta', False),
+            delta=payload.get('delta', 1),
+        )
+    except CountingSessionError as e:
+        return _session_error(e)
+    return jsonify(_snapshot_payload(snapshot))
+
+@bp.route('/api/neubauer/sesiones/<session_id>/eventos', methods=['GET'])
+def counting_session_events(session_id):
+    """Envía el estado de la sesión por Server-Sent Events cada vez que cambia."""
+    # El primer estado se obtiene antes de responder para devolver 404 si la sesión no existe
+    updates = CountingSessionService.watch(session_id)
+    try:
+        first = next(updates)
+    except CountingSessionError as e:
+        return _session_error(e)
+    except StopIteration:
+        return _session_error(CountingSessionNotFound("La sesión de conteo ya se cerró"))
+    
+    def events():
+        for snapshot in itertools.chain([first], updates):
+            if snapshot is None:
+                yield ": sin cambios\n\n"
+            else:
+                yield f"data: {json.dumps(_snapshot_payload(snapshot))}\n\n"
+        yield "event: fin\ndata: {}\n\n"
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@bp.route('/api/neubauer/sesiones/<session_id>', methods=['DELETE'])
+def counting_session_finish(session_id):
+    """Cierra la sesión y devuelve el resultado completo de Neubauer."""
+    try:
+        resultado = CountingSessionService.finish(session_id)
+    except CountingSessionError as e:
+        return _session_error(e)
     except NeubauerError as e:
-        error = str(e)
-    except KeyError:
-        error = "Faltan datos en el formulario. Por favor, completa todos los campos."
-    except Exception:
-        error = "Ha ocurrido un error inesperado. Por favor, inténtalo de nuevo."
+        return jsonify({'error': str(e)}), 400
     
-    return render_template('neubauer.html', resultado=resultado, error=error)
\ No newline at end of file
+    return jsonify({
+        'concentracion': resultado.concentration,
+        'ic_inferior': resultado.concentration_ci_low,
+        'ic_superior': resultado.concentration_ci_high,
+        'total_celulas': resultado.total_cells,
+        'promedio_celulas': resultado.average_cells,
+        'num_cuadrantes': resultado.num_quadrants,
+        'cv_porcentaje': resultado.cv_percent,
+        'indice_dispersion': resultado.chi_square,
+        'cuadrantes_atipicos': resultado.outlier_quadrants,
+        'celulas_muertas': resultado.dead_cells,
+        'viabilidad_porcentaje': resultado.viability_percent,
+        'viabilidad_ic_inferior': resultado.viability_ci_low,
+        'viabilidad_ic_superior': resultado.viability_ci_high,
+    })
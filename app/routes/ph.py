@@ -1,15 +1,33 @@
-from flask import Blueprint, render_template, request
+import re
 
-from ..models.ph import PHCalculationType, PHError, PHRequest
+from flask import Blueprint, jsonify, render_template, request
+
+from ..models.ph import BufferRequest, PHCalculationType, PHError, PHRequest, TitrationRequest
+from ..services.compound_service import CompoundService
 from ..services.ph_service import PHService
-from ..utils.validators import validate_numeric_input
+from ..utils.schema import Field, Schema, client_schema
+from .schemas import PH_SCHEMA
 
 bp = Blueprint("ph", __name__)
 
+_PH_CLIENT_SCHEMA = client_schema(PH_SCHEMA)
+
+# Los pKa se leen con _pka_values, que también los busca en el catálogo por el nombre del compuesto
+_BUFFER_SCHEMA = Schema(
+    Field("compound", "compuesto", kind="str", required=False, default=""),
+    Field("pka_values", "pKa", kind="str", required=False, default=""),
+    Field("target_ph", "pH objetivo", minimum=0),
+    Field("concentration_m", "concentración", minimum=0, exclusive_minimum=True),
+    Field("volume_ml", "volumen", required=False, default=1000.0, minimum=0, exclusive_minimum=True),
+    Field("temperature_c", "temperatura", required=False, minimum=0, maximum=100),
+    Field("ionic_strength", "fuerza iónica", required=False, default=0.0, minimum=0, maximum=0.5),
+)
+_BUFFER_CLIENT_SCHEMA = client_schema(_BUFFER_SCHEMA)
+
 
 @bp.route("/ph", methods=["GET", "POST"])
 def ph_calculator():
-    """Calculadora de pH para soluciones fuertes."""
+    """Calculadora de pH para ácidos y bases fuertes y débiles."""
 
     calculation_types = PHService.get_calculation_types()
     default_kw = PHService.get_default_kw()
@@ -25,103 +43,390 @@ def ph_calculator():
             error=None,
             form_data=form_data,
             default_kw=default_kw,
+            esquema=_PH_CLIENT_SCHEMA,
         )
 
     form_data = request.form.to_dict()
 
-    try:
-        calc_type_str = form_data.get("calculation_type", "")
-from ..services.ph_service import PHService
-from ..models.ph import PHRequest, PHError, PHCalculationType
-from ..utils.validators import validate_numeric_input
+    # Todos los campos se validan en una pasada para mostrar todos los errores juntos
+    form = PH_SCHEMA.validate(form_data)
+    values = form.values
+    if not form.ok:
+        error = form.message
+    else:
+        pka_coefficient = None
+        if values["pka"] is not None:
+            pka_coefficient = PHService.pka_temperature_coefficient(
+                form_data.get("compound", "").strip(), values["pka"]
+            )
+        try:
+            ph_request = PHRequest(
+                calculation_type=PHCalculationType(values["calculation_type"]),
+                concentration_m=values["concentration_m"],
+                equivalents=values["equivalents"],
+                kw=values["kw"] if values["kw"] is not None else default_kw,
+                dissociation_constant=values["dissociation_constant"],
+                pka=values["pka"],
+                conjugate_concentration_m=values["conjugate_concentration_m"],
+                temperature_c=values["temperature_c"],
+                pka_temperature_coefficient=pka_coefficient or 0.0,
+                ionic_strength=values["ionic_strength"],
+            )
+            resultado = PHService.calculate(ph_request)
+            if values["pka"] is not None and values["temperature_c"] is not None and pka_coefficient is None:
+                note = "El pKa no coincide con ninguno del catálogo; se usa sin corrección por temperatura."
+                resultado.notes = " ".join(text for text in (resultado.notes, note) if text)
+        except PHError as exc:
+            error = str(exc)
+        except Exception:
+            error = "Ha ocurrido un error inesperado. Por favor, inténtalo de nuevo."
 
-bp = Blueprint('ph', __name__)
+    form_data.setdefault("equivalents", "1")
 
-@bp.route('/ph', methods=['GET', 'POST'])
-def ph_calculator():
-    """Calculadora de pH para soluciones fuertes."""
-    calculation_types = PHService.get_calculation_types()
+    return render_template(
+        "ph.html",
+        calculation_types=calculation_types,
+        resultado=resultado,
+        error=error,
+        form_data=form_data,
+        default_kw=default_kw,
+        esquema=_PH_CLIENT_SCHEMA,
+    )
 
-    if request.method == 'GET':
-        return render_template(
-            'ph.html',
-            calculation_types=calculation_types,
-            resultado=None,
-            error=None,
-            form_data=None
-        )
 
-    error = None
-    resultado = None
+@bp.route("/ph/titulacion")
+def titration_page():
+    """Página para graficar curvas de titulación."""
+
+    return render_template(
+        "ph_titulacion.html",
+        calculation_types=PHService.get_titration_types(),
+    )
 
+
+def _optional_float(payload, key, label):
+    value = payload.get(key)
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"El valor de {label} debe ser numérico.")
     try:
-        calc_type_str = request.form.get('calculation_type', '')
-        if not calc_type_str:
-            raise ValueError("Selecciona el tipo de solución a calcular.")
+        return float(value)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"El valor de {label} debe ser numérico.") from exc
 
-        try:
-            calc_type = PHCalculationType(calc_type_str)
-        except ValueError as exc:
-            raise ValueError("Tipo de cálculo no válido.") from exc
 
-        concentration = validate_numeric_input(
-            form_data.get("concentration_m", ""),
-            "concentración",
-        )
+def _titration_from_payload(payload):
+    """Construye la solicitud de titulación a partir del cuerpo JSON."""
 
-        equivalents_str = form_data.get("equivalents", "1") or "1"
-        equivalents = validate_numeric_input(equivalents_str, "equivalentes")
+    if not isinstance(payload, dict):
+        raise ValueError("El cuerpo de la solicitud debe ser un objeto JSON.")
+    analyte = payload.get("analito")
+    titrant = payload.get("titulante")
+    if not isinstance(analyte, dict) or not isinstance(titrant, dict):
+        raise ValueError("Debes indicar el analito y el titulante.")
 
-        kw_str = form_data.get("kw", "")
-        kw_value = (
-            validate_numeric_input(kw_str, "constante iónica del agua")
-            if kw_str
-            else None
-        )
-        except ValueError:
-            raise ValueError("Tipo de cálculo no válido.")
+    try:
+        analyte_type = PHCalculationType(analyte.get("tipo"))
+        titrant_type = PHCalculationType(titrant.get("tipo"))
+    except ValueError as exc:
+        raise ValueError("Tipo de cálculo no válido.") from exc
 
-        concentration = validate_numeric_input(
-            request.form.get('concentration_m', ''),
-            'concentración'
-        )
+    points = payload.get("puntos", 10001)
+    plot_points = payload.get("puntos_grafico", 500)
+    for value in (points, plot_points):
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError("El número de puntos debe ser un entero.")
 
-        equivalents_str = request.form.get('equivalents', '1')
-        equivalents = validate_numeric_input(equivalents_str, 'equivalentes')
+    kw = _optional_float(payload, "kw", "Kw")
+    ionic_strength = _optional_float(payload, "fuerza_ionica", "la fuerza iónica")
+    return TitrationRequest(
+        analyte_type=analyte_type,
+        analyte_concentration_m=_optional_float(analyte, "concentracion_m", "la concentración del analito"),
+        analyte_volume_ml=_optional_float(analyte, "volumen_ml", "el volumen del analito"),
+        titrant_type=titrant_type,
+        titrant_concentration_m=_optional_float(titrant, "concentracion_m", "la concentración del titulante"),
+        max_titrant_volume_ml=_optional_float(payload, "volumen_max_ml", "el volumen máximo"),
+        analyte_constant=_optional_float(analyte, "constante_disociacion", "Ka o Kb"),
+        analyte_pka=_optional_float(analyte, "pka", "pKa"),
+        titrant_constant=_optional_float(titrant, "constante_disociacion", "Ka o Kb"),
+        titrant_pka=_optional_float(titrant, "pka", "pKa"),
+        points=points,
+        plot_points=plot_points,
+        kw=kw if kw is not None else PHService.get_default_kw(),
+        temperature_c=_optional_float(payload, "temperatura_c", "la temperatura"),
+        ionic_strength=ionic_strength or 0.0,
+    )
 
-        kw_str = request.form.get('kw', '')
-        kw_value = None
-        if kw_str:
-            kw_value = validate_numeric_input(kw_str, 'constante iónica del agua')
 
-        ph_request = PHRequest(
-            calculation_type=calc_type,
-            concentration_m=concentration,
-            equivalents=equivalents,
-            kw=kw_value if kw_value is not None else default_kw,
-            kw=kw_value if kw_value is not None else PHService.DEFAULT_KW
-        )
+@bp.route("/api/ph/titulacion", methods=["POST"])
+def titration_curve():
+    """
+    Curva de titulación en JSON.
 
-        resultado = PHService.calculate(ph_request)
+    Cuerpo: analito y titulante ({tipo, concentracion_m, volumen_ml (solo el
+    analito), constante_disociacion o pka}), volumen_max_ml, puntos,
+    puntos_grafico, kw, temperatura_c y fuerza_ionica opcionales. Devuelve la curva reducida para graficar y
+    los puntos de equivalencia; con "completa": true incluye todos los puntos.
+    """
 
+    payload = request.get_json(silent=True)
+    try:
+        result = PHService.calculate_titration(_titration_from_payload(payload))
     except (ValueError, PHError) as exc:
-        error = str(exc)
-    except Exception:
-        error = "Ha ocurrido un error inesperado. Por favor, inténtalo de nuevo."
+        return jsonify({"error": str(exc)}), 400
 
-    form_data.setdefault("equivalents", "1")
+    response = {
+        "curva": {
+            "volumen_ml": result.plot_volumes_ml.tolist(),
+            "ph": result.plot_ph.tolist(),
+        },
+        "equivalencias": [
+            {"volumen_ml": volume, "ph": ph}
+            for volume, ph in zip(result.equivalence_volumes_ml, result.equivalence_ph)
+        ],
+        "volumen_equivalencia_teorico_ml": result.expected_equivalence_ml,
+        "puntos": len(result.volumes_ml),
+    }
+    if payload.get("completa") is True:
+        response["curva_completa"] = {
+            "volumen_ml": result.volumes_ml.tolist(),
+            "ph": result.ph.tolist(),
+        }
+    return jsonify(response)
+
+
+def _pka_values(compound_name, pka_text):
+    """
+    pKa escritos (texto separado por comas, espacios o |, un número JSON o una
+    lista) o, si faltan, los del catálogo.
+    """
+
+    if isinstance(pka_text, bool):
+        raise ValueError("Los pKa deben ser numéricos.")
+    if isinstance(pka_text, (int, float)):
+        values = [pka_text]
+    elif isinstance(pka_text, (list, tuple)):
+        values = list(pka_text)
+    elif pka_text is None or isinstance(pka_text, str):
+        values = [value for value in re.split(r"[|;,\s]+", pka_text or "") if value]
+    else:
+        raise ValueError("Los pKa deben ser un número, una lista o un texto separado por comas.")
+    if values:
+        if any(isinstance(value, bool) for value in values):
+            raise ValueError("Los pKa deben ser numéricos.")
+        try:
+            return tuple(float(value) for value in values)
+        except (TypeError, ValueError) as exc:
+            raise ValueError("Los pKa deben ser numéricos.") from exc
+
+    compound = CompoundService.find(compound_name) if compound_name else None
+    if compound is None or not compound.pka_values:
+        raise ValueError("Indica los pKa o elige un compuesto del catálogo que los tenga.")
+    return tuple(compound.pka_values)
 
+
+def _buffer_payload(result):
+    return {
+        "acido": result.acid_name,
+        "pka": result.pka_values,
+        "ph_objetivo": result.target_ph,
+        "concentracion_m": result.concentration_m,
+        "volumen_ml": result.volume_ml,
+        "pka_usado": result.pka_used,
+        "forma_acida": {"especie": result.acid_species, "concentracion_m": result.acid_form_m,
+                        "mmol": result.acid_form_mmol},
+        "forma_basica": {"especie": result.base_species, "concentracion_m": result.base_form_m,
+                         "mmol": result.base_form_mmol},
+        "relacion_exacta": result.exact_ratio,
+        "relacion_henderson": result.henderson_ratio,
+        "capacidad_amortiguadora": result.buffer_capacity,
+        "especies": dict(zip(result.species, result.species_fractions)),
+        "temperatura_c": result.temperature_c,
+        "fuerza_ionica": result.ionic_strength,
+        "notas": result.notes,
+    }
+
+
+@bp.route("/ph/amortiguadores", methods=["GET", "POST"])
+def buffer_designer():
+    """Diseño de amortiguadores con ácidos monopróticos o polipróticos."""
+
+    form_data = request.form.to_dict() if request.method == "POST" else {}
+    resultado = None
+    error = None
+
+    if request.method == "POST":
+        form = _BUFFER_SCHEMA.validate(form_data)
+        if not form.ok:
+            error = form.message
+        else:
+            try:
+                compound_name = form.values["compound"]
+                resultado = PHService.calculate_buffer(
+                    BufferRequest(
+                        acid_name=compound_name or "Ácido",
+                        pka_values=_pka_values(compound_name, form.values["pka_values"]),
+                        target_ph=form.values["target_ph"],
+                        concentration_m=form.values["concentration_m"],
+                        volume_ml=form.values["volume_ml"],
+                        temperature_c=form.values["temperature_c"],
+                        ionic_strength=form.values["ionic_strength"],
+                    )
+                )
+            except (ValueError, PHError) as exc:
+                error = str(exc)
+
+    form_data.setdefault("volume_ml", "1000")
     return render_template(
-        "ph.html",
-        calculation_types=calculation_types,
+        "ph_amortiguadores.html",
         resultado=resultado,
         error=error,
         form_data=form_data,
-        default_kw=default_kw,
-    return render_template(
-        'ph.html',
-        calculation_types=calculation_types,
-        resultado=resultado,
-        error=error,
-        form_data=request.form
+        esquema=_BUFFER_CLIENT_SCHEMA,
     )
+
+
+@bp.route("/api/ph/amortiguadores", methods=["POST"])
+def buffer_recipe():
+    """
+    Receta de un amortiguador en JSON.
+
+    Cuerpo: compuesto (nombre del catálogo) o pka (lista), ph_objetivo,
+    concentracion_m, y opcionalmente volumen_ml (1000 por defecto),
+    temperatura_c y fuerza_ionica.
+    """
+
+    payload = request.get_json(silent=True)
+    try:
+        if not isinstance(payload, dict):
+            raise ValueError("El cuerpo de la solicitud debe ser un objeto JSON.")
+        compound_name = str(payload.get("compuesto") or "").strip()
+        target_ph = _optional_float(payload, "ph_objetivo", "pH objetivo")
+        concentration = _optional_float(payload, "concentracion_m", "la concentración")
+        volume = _optional_float(payload, "volumen_ml", "el volumen")
+        ionic_strength = _optional_float(payload, "fuerza_ionica", "la fuerza iónica")
+        result = PHService.calculate_buffer(
+            BufferRequest(
+                acid_name=compound_name or "Ácido",
+                pka_values=_pka_values(compound_name, payload.get("pka")),
+                target_ph=target_ph,
+                concentration_m=concentration,
+                volume_ml=volume if volume is not None else 1000.0,
+                temperature_c=_optional_float(payload, "temperatura_c", "la temperatura"),
+                ionic_strength=ionic_strength or 0.0,
+            )
+        )
+    except (ValueError, PHError) as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(_buffer_payload(result))
+
+
+@bp.route("/api/ph/especiacion", methods=["POST"])
+def speciation():
+    """
+    Fracción de cada especie de un ácido poliprótico en una grilla de pH.
+
+    Cuerpo: compuesto o pka, y opcionalmente ph_min (0), ph_max (14), puntos
+    (281), temperatura_c y fuerza_ionica.
+    """
+
+    payload = request.get_json(silent=True)
+    try:
+        if not isinstance(payload, dict):
+            raise ValueError("El cuerpo de la solicitud debe ser un objeto JSON.")
+        compound_name = str(payload.get("compuesto") or "").strip()
+        pka_values = _pka_values(compound_name, payload.get("pka"))
+        ionic_strength = _optional_float(payload, "fuerza_ionica", "la fuerza iónica")
+        ph_min = _optional_float(payload, "ph_min", "pH mínimo")
+        ph_max = _optional_float(payload, "ph_max", "pH máximo")
+        points = payload.get("puntos", 281)
+        if isinstance(points, bool) or not isinstance(points, int):
+            raise ValueError("El número de puntos debe ser un entero.")
+        grid, fractions = PHService.species_distribution(
+            pka_values,
+            0.0 if ph_min is None else ph_min,
+            14.0 if ph_max is None else ph_max,
+            points,
+            acid_name=compound_name or None,
+            temperature_c=_optional_float(payload, "temperatura_c", "la temperatura"),
+            ionic_strength=ionic_strength or 0.0,
+        )
+    except (ValueError, PHError) as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    return jsonify({
+        "pka": sorted(pka_values),
+        "ph": grid.tolist(),
+        "especies": PHService.species_labels(
+            len(pka_values), (PHService.acid_properties(compound_name) or (0,))[0]
+        ),
+        "fracciones": fractions.T.tolist(),
+    })
+
+
+def _batch_column(payload, key, label, default=None):
+    """Columna numérica del lote: un valor común o una lista (None se toma como NaN)."""
+
+    value = payload.get(key)
+    if value is None:
+        return default
+    values = value if isinstance(value, list) else [value]
+    if any(isinstance(item, (bool, str, list, dict)) for item in values):
+        raise ValueError(f"Los valores de {label} deben ser numéricos.")
+    column = [float("nan") if item is None else item for item in values]
+    return column if isinstance(value, list) else column[0]
+
+
+@bp.route("/api/ph/lote", methods=["POST"])
+def ph_batch():
+    """
+    pH de muchas soluciones en una sola solicitud JSON, en columnas.
+
+    Cuerpo: tipos (un tipo común o uno por solución), concentraciones_m, y
+    opcionalmente equivalentes, kw, constantes_disociacion, pka,
+    concentraciones_conjugadas_m, temperatura_c, fuerza_ionica y
+    coeficientes_temperatura_pka, cada uno como valor común o lista. Las filas
+    con datos no válidos devuelven null y su mensaje en "errores".
+    """
+
+    payload = request.get_json(silent=True)
+    try:
+        if not isinstance(payload, dict):
+            raise ValueError("El cuerpo de la solicitud debe ser un objeto JSON.")
+        if not isinstance(payload.get("concentraciones_m"), list):
+            raise ValueError("El campo concentraciones_m debe ser una lista.")
+        calculation_types = payload.get("tipos")
+        if not isinstance(calculation_types, (str, list)):
+            raise ValueError("Indica el tipo de cálculo común o una lista con uno por solución.")
+        result = PHService.calculate_many(
+            calculation_types,
+            _batch_column(payload, "concentraciones_m", "la concentración"),
+            equivalents=_batch_column(payload, "equivalentes", "los equivalentes", 1.0),
+            kw=_batch_column(payload, "kw", "Kw", PHService.get_default_kw()),
+            dissociation_constants=_batch_column(payload, "constantes_disociacion", "Ka o Kb"),
+            pka=_batch_column(payload, "pka", "pKa"),
+            conjugate_concentrations=_batch_column(payload, "concentraciones_conjugadas_m", "la base conjugada"),
+            temperature_c=_batch_column(payload, "temperatura_c", "la temperatura"),
+            ionic_strength=_batch_column(payload, "fuerza_ionica", "la fuerza iónica", 0.0),
+            pka_temperature_coefficients=_batch_column(
+                payload, "coeficientes_temperatura_pka", "dpKa/dT", 0.0
+            ),
+        )
+    except (ValueError, PHError) as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    def nullable(column):
+        return [None if value != value else value for value in column.tolist()]
+
+    return jsonify({
+        "tipos": [calculation_type.value if calculation_type else None for calculation_type in result.calculation_types],
+        "ph": nullable(result.ph),
+        "poh": nullable(result.poh),
+        "h3o_m": nullable(result.hydronium),
+        "oh_m": nullable(result.hydroxide),
+        "pkw": nullable(result.pkw),
+        "ionizacion_porcentaje": nullable(result.ionization_percent),
+        "errores": [PHService.batch_error_message(code) for code in result.error_codes.tolist()],
+        "notas": [PHService.batch_note_messages(flags) for flags in result.notes.tolist()],
+    })
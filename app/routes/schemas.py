@@ -0,0 +1,81 @@
+"""
+Esquemas de los formularios que también valida la API JSON (`api.py`).
+
+Cada formulario lee los campos por su nombre y la API por su destino, que es
+el campo del dataclass de solicitud (`Schema.keyed_by_target`), de modo que
+ambos aplican los mismos límites y mensajes.
+"""
+from typing import Optional
+
+from ..models.concentration import CalculationType
+from ..models.conversion import UnitType
+from ..models.ph import PHCalculationType
+from ..utils.schema import Field, Schema, VariantSchema
+
+CONVERSION_SCHEMA = Schema(
+    Field('tipo_unidad', 'tipo de unidad', kind='choice', choices=tuple(unit_type.value for unit_type in UnitType),
+          target='unit_type'),
+    Field('unidad_origen', 'unidad origen', kind='str', target='from_unit'),
+    Field('unidad_destino', 'unidad destino', kind='str', target='to_unit'),
+    Field('valor', 'valor', minimum=0, target='value'),
+)
+
+def _amount(name: str, label: str, target: Optional[str] = None, positive: bool = False) -> Field:
+    """Campo numérico opcional no negativo (estrictamente positivo si `positive`)."""
+    return Field(name, label, required=False, minimum=0, exclusive_minimum=positive, target=target)
+
+# Campos de cada tipo de cálculo; los destinos son los campos de ConcentrationRequest
+CONCENTRATION_SCHEMA = VariantSchema(
+    Field('calculation_type', 'tipo de cálculo', kind='choice'),
+    {
+        CalculationType.MOLARITY.value: Schema(
+            _amount('moles', 'moles'),
+            _amount('volume_l', 'volumen', positive=True),
+            _amount('molarity', 'molaridad'),
+            _amount('mass_g', 'masa'),
+            _amount('molecular_weight', 'peso molecular', positive=True),
+            Field('formula', 'fórmula química', kind='str', required=False),
+        ),
+        CalculationType.MOLALITY.value: Schema(
+            _amount('moles', 'moles'),
+            _amount('kg_solvent', 'kg de disolvente', positive=True),
+            _amount('molality', 'molalidad'),
+        ),
+        CalculationType.DILUTION.value: Schema(
+            _amount('c1', 'concentración inicial', positive=True),
+            _amount('v1', 'volumen inicial', positive=True),
+            _amount('c2', 'concentración final', positive=True),
+            _amount('v2', 'volumen final', positive=True),
+        ),
+        CalculationType.MASS_VOLUME.value: Schema(
+            _amount('mass_g', 'masa'),
+            _amount('volume_ml', 'volumen', positive=True),
+            _amount('concentration_mg_ml', 'concentración'),
+            _amount('molecular_weight_mv', 'peso molecular', target='molecular_weight', positive=True),
+            Field('formula_mv', 'fórmula química', kind='str', required=False, target='formula'),
+        ),
+        CalculationType.PPM.value: Schema(
+            _amount('ppm_field', 'PPM', target='ppm'),
+            _amount('percentage_field', 'porcentaje', target='percentage'),
+            _amount('concentration_mg_ml_field', 'concentración', target='concentration_mg_ml'),
+        ),
+        CalculationType.PERCENTAGE.value: Schema(
+            _amount('percentage_only', 'porcentaje', target='percentage'),
+            _amount('ppm_only', 'PPM', target='ppm'),
+        ),
+    },
+)
+
+PH_SCHEMA = Schema(
+    Field('calculation_type', 'tipo de cálculo', kind='choice',
+          choices=tuple(calculation_type.value for calculation_type in PHCalculationType)),
+    Field('concentration_m', 'concentración', minimum=0, exclusive_minimum=True),
+    Field('equivalents', 'equivalentes', required=False, default=1.0, minimum=0, exclusive_minimum=True),
+    Field('kw', 'constante iónica del agua', required=False, minimum=0, exclusive_minimum=True),
+    Field('dissociation_constant', 'constante de disociación', required=False, minimum=0, exclusive_minimum=True),
+    Field('pka', 'pKa', required=False),
+    Field('conjugate_concentration_m', 'concentración de la base conjugada', required=False, minimum=0,
+          exclusive_minimum=True),
+    Field('temperature_c', 'temperatura', required=False),
+    Field('ionic_strength', 'fuerza iónica', required=False, default=0.0, minimum=0),
+)
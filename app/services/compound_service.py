@@ -0,0 +1,201 @@
+import csv
+import os
+import sqlite3
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from ..models.compound import Compound, CompoundError, CompoundSuggestion
+from ..models.formula import FormulaError
+from .formula_service import FormulaService
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS compounds (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    formula TEXT,
+    molar_mass REAL,
+    pka_values TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS compound_names (
+    compound_id INTEGER NOT NULL REFERENCES compounds(id),
+    name TEXT NOT NULL,
+    normalized TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_compound_names_normalized ON compound_names(normalized);
+CREATE INDEX IF NOT EXISTS idx_compound_names_compound ON compound_names(compound_id);
+CREATE INDEX IF NOT EXISTS idx_compounds_formula ON compounds(formula);
+"""
+
+class _TrieNode:
+    """Nodo del árbol de prefijos con las primeras sugerencias ya calculadas."""
+    __slots__ = ('children', 'matches')
+    
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.matches: List[Tuple[int, str]] = []
+
+class _PrefixTrie:
+    """
+    Árbol de prefijos en memoria para el autocompletado.
+    
+    Cada nodo guarda las primeras ``capacity`` coincidencias en orden alfabético,
+    así una búsqueda sólo recorre los caracteres del prefijo.
+    """
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.root = _TrieNode()
+    
+    def insert(self, key: str, compound_id: int, name: str) -> None:
+        """Inserta una clave; se espera que las claves lleguen en orden alfabético."""
+        node = self.root
+        self._add_match(node, compound_id, name)
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+            self._add_match(node, compound_id, name)
+    
+    def search(self, prefix: str) -> List[Tuple[int, str]]:
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.matches
+    
+    def _add_match(self, node: _TrieNode, compound_id: int, name: str) -> None:
+        if len(node.matches) < self.capacity and all(cid != compound_id for cid, _ in node.matches):
+            node.matches.append((compound_id, name))
+
+class CompoundService:
+    """Servicio para el catálogo de compuestos y el autocompletado por prefijo."""
+    
+    MAX_SUGGESTIONS = 10
+    SEED_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'compuestos.csv')
+    
+    _compounds: Dict[int, Compound] = {}
+    _names: Dict[str, int] = {}
+    _trie: Optional[_PrefixTrie] = None
+    
+    @classmethod
+    def init_app(cls, app) -> None:
+        """Carga el catálogo configurado en COMPOUND_DB_PATH al iniciar la aplicación."""
+        cls.load(app.config['COMPOUND_DB_PATH'])
+    
+    @classmethod
+    def load(cls, db_path: str) -> None:
+        """
+        Abre (o crea) la base SQLite del catálogo y construye los índices en memoria.
+        
+        Si la base está vacía se llena con el catálogo inicial de SEED_PATH.
+        
+        Raises:
+            CompoundError: Si la base de datos no se puede abrir o leer
+        """
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        
+        try:
+            connection = sqlite3.connect(db_path)
+            try:
+                with connection:
+                    connection.executescript(_SCHEMA)
+                    if connection.execute("SELECT COUNT(*) FROM compounds").fetchone()[0] == 0:
+                        cls._seed(connection)
+                compounds, names = cls._read_catalogue(connection)
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            raise CompoundError(f"No se pudo cargar el catálogo de compuestos: {e}")
+        
+        trie = _PrefixTrie(cls.MAX_SUGGESTIONS)
+        lookup = {}
+        for normalized, name, compound_id in sorted(names):
+            trie.insert(normalized, compound_id, name)
+            lookup.setdefault(normalized, compound_id)
+        
+        cls._compounds = compounds
+        cls._names = lookup
+        cls._trie = trie
+    
+    @classmethod
+    def suggest(cls, prefix: str, limit: int = MAX_SUGGESTIONS) -> List[CompoundSuggestion]:
+        """
+        Devuelve los compuestos cuyo nombre o sinónimo empieza con el prefijo.
+        
+        La búsqueda ignora mayúsculas y acentos y no recorre la tabla: sólo
+        desciende por el árbol de prefijos cargado al iniciar.
+        """
+        normalized = normalize_name(prefix)
+        if not normalized:
+            return []
+        cls._ensure_loaded()
+        return [
+            CompoundSuggestion(matched_name=name, compound=cls._compounds[compound_id])
+            for compound_id, name in cls._trie.search(normalized)[:max(0, limit)]
+        ]
+    
+    @classmethod
+    def find(cls, name: str) -> Optional[Compound]:
+        """Busca un compuesto por nombre o sinónimo exacto (sin distinguir mayúsculas ni acentos)."""
+        cls._ensure_loaded()
+        compound_id = cls._names.get(normalize_name(name))
+        return cls._compounds.get(compound_id) if compound_id is not None else None
+    
+    @classmethod
+    def _ensure_loaded(cls) -> None:
+        if cls._trie is None:
+            cls.load(':memory:')
+    
+    @classmethod
+    def _seed(cls, connection: sqlite3.Connection) -> None:
+        """Llena la base con el catálogo inicial; la masa molar se calcula desde la fórmula si falta."""
+        with open(cls.SEED_PATH, encoding='utf-8', newline='') as seed_file:
+            for row in csv.DictReader(seed_file, delimiter=';'):
+                formula = row['formula'].strip() or None
+                molar_mass = float(row['masa_molar']) if row['masa_molar'].strip() else None
+                if molar_mass is None and formula:
+                    try:
+                        molar_mass = round(FormulaService.molar_mass(formula), 3)
+                    except FormulaError:
+                        molar_mass = None
+                
+                cursor = connection.execute(
+                    "INSERT INTO compounds (name, formula, molar_mass, pka_values) VALUES (?, ?, ?, ?)",
+                    (row['nombre'].strip(), formula, molar_mass, row['pka'].strip())
+                )
+                names = [row['nombre']] + row['sinonimos'].split('|')
+                if formula:
+                    names.append(formula)
+                connection.executemany(
+                    "INSERT INTO compound_names (compound_id, name, normalized) VALUES (?, ?, ?)",
+                    [(cursor.lastrowid, name.strip(), normalize_name(name)) for name in names if name.strip()]
+                )
+    
+    @staticmethod
+    def _read_catalogue(connection: sqlite3.Connection) -> Tuple[Dict[int, Compound], List[Tuple[str, str, int]]]:
+        compounds = {}
+        for compound_id, name, formula, molar_mass, pka_values in connection.execute(
+            "SELECT id, name, formula, molar_mass, pka_values FROM compounds"
+        ):
+            compounds[compound_id] = Compound(
+                id=compound_id,
+                name=name,
+                formula=formula,
+                molar_mass=molar_mass,
+                pka_values=[float(value) for value in pka_values.split('|') if value.strip()]
+            )
+        
+        names = []
+        for compound_id, name, normalized in connection.execute(
+            "SELECT compound_id, name, normalized FROM compound_names"
+        ):
+            if name != compounds[compound_id].name:
+                compounds[compound_id].synonyms.append(name)
+            names.append((normalized, name, compound_id))
+        return compounds, names
+
+def normalize_name(name: str) -> str:
+    """Pasa a minúsculas, elimina acentos y espacios repetidos para comparar nombres."""
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    without_accents = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(without_accents.lower().split())
@@ -1,8 +1,163 @@
-from ..models.concentration import ConcentrationRequest, ConcentrationResult, ConcentrationError, CalculationType
+import re
+from dataclasses import fields, replace
+from typing import Dict, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..models.concentration import (
+    ConcentrationRequest, ConcentrationResult, ConcentrationError, CalculationType,
+    DilutionSeriesMode, DilutionSeriesRequest, DilutionSeriesResult,
+    BatchErrorCode, ConcentrationBatchResult, ConcentrationUnit, ConcentrationRepresentations
+)
+from ..models.formula import FormulaError
+from .equation_registry import EquationSystem, Relation
+from .formula_service import FormulaService
+
+# Relaciones de concentración, declaradas una sola vez y compartidas entre tipos de cálculo
+MOLARITY = Relation('molarity', ('moles',), ('volume_l',), positive=('volume_l',))
+MOLES_FROM_MASS = Relation('moles', ('mass_g',), ('molecular_weight',), positive=('molecular_weight',))
+MASS_CONCENTRATION = Relation('concentration_g_l', ('molarity', 'molecular_weight'), positive=('molecular_weight',))
+MOLALITY = Relation('molality', ('moles',), ('kg_solvent',), positive=('kg_solvent',))
+DILUTION = Relation('c1', ('c2', 'v2'), ('v1',), positive=('c1', 'v1', 'c2', 'v2'),
+                    positive_message="Todos los valores deben ser mayores a 0")
+MASS_PER_VOLUME = Relation('concentration_mg_ml', ('mass_g', 1000), ('volume_ml',), positive=('volume_ml',))
+MG_ML_TO_G_L = Relation('concentration_g_l', ('concentration_mg_ml',))
+PPM_TO_PERCENTAGE = Relation('percentage', ('ppm',), (10000,))
+PPM_TO_MG_ML = Relation('concentration_mg_ml', ('ppm',), (1000,))
+PERCENTAGE_TO_G_L = Relation('concentration_g_l', ('percentage', 10))
+
+POSITIVE_MESSAGES = {
+    'volume_l': "El volumen debe ser mayor a 0",
+    'volume_ml': "El volumen debe ser mayor a 0",
+    'molarity': "La molaridad debe ser mayor a 0",
+    'molecular_weight': "El peso molecular debe ser mayor a 0",
+    'kg_solvent': "La masa del disolvente debe ser mayor a 0",
+}
+
+# Cada representación como valor = g/L × escala × PM^exp_pm × densidad^exp_densidad
+# (PM en g/mol, densidad de la solución en g/mL; ppm y ppb son masa/masa)
+REPRESENTATION_SCALES = {
+    ConcentrationUnit.MOLAR: (1.0, -1, 0),
+    ConcentrationUnit.MILLIMOLAR: (1e3, -1, 0),
+    ConcentrationUnit.MICROMOLAR: (1e6, -1, 0),
+    ConcentrationUnit.MG_ML: (1.0, 0, 0),
+    ConcentrationUnit.G_L: (1.0, 0, 0),
+    ConcentrationUnit.PPM: (1e3, 0, -1),
+    ConcentrationUnit.PPB: (1e6, 0, -1),
+    ConcentrationUnit.PERCENT_WV: (0.1, 0, 0),
+}
+
+def _representation_matrices() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Factor y exponentes de PM y densidad para pasar de cada representación (fila) a cada otra (columna)."""
+    scales, mw_exps, density_exps = (np.array(column, dtype=np.float64)
+                                     for column in zip(*REPRESENTATION_SCALES.values()))
+    return (scales[None, :] / scales[:, None],
+            mw_exps[None, :] - mw_exps[:, None],
+            density_exps[None, :] - density_exps[:, None])
 
 class ConcentrationService:
     """Servicio voor manejar todos los cálculos de concentración."""
     
+    MAX_DILUTION_STEPS = 100
+    
+    # Campos de entrada y de salida de los cálculos por lotes
+    BATCH_TEXT_FIELDS = ('formula',)
+    BATCH_INPUT_FIELDS = tuple(
+        f.name for f in fields(ConcentrationRequest) if f.name not in ('calculation_type', 'formula')
+    )
+    BATCH_OUTPUT_FIELDS = (
+        'molarity', 'molality', 'moles', 'volume_l', 'kg_solvent', 'mass_g', 'molecular_weight',
+        'c1', 'v1', 'c2', 'v2', 'volume_ml', 'concentration_mg_ml', 'concentration_g_l', 'ppm', 'percentage',
+    )
+    
+    BATCH_ERROR_MESSAGES = {
+        BatchErrorCode.OK: None,
+        BatchErrorCode.INSUFFICIENT_PARAMETERS: "Parámetros insuficientes para el tipo de cálculo",
+        BatchErrorCode.NON_POSITIVE_VALUE: "Los valores usados como divisor deben ser mayores a 0",
+        BatchErrorCode.UNSUPPORTED_TYPE: "Tipo de cálculo no soportado",
+        BatchErrorCode.INVALID_FORMULA: "La fórmula química no es válida",
+        BatchErrorCode.OVERDETERMINED: "Sobran datos: un valor se puede calcular con los demás",
+    }
+    
+    # Los datos dados nunca se recalculan: si uno se puede obtener de los demás, podrían contradecirse
+    OVERDETERMINED_MESSAGE = ("Sobran datos: alguno de los valores ingresados se puede calcular con los demás "
+                              "y podrían contradecirse. Deja vacío el que quieras calcular")
+    
+    # Sistema de ecuaciones de cada tipo de cálculo, con un plan precompilado por combinación de datos
+    EQUATIONS: Dict[CalculationType, EquationSystem] = {
+        CalculationType.MOLARITY: EquationSystem(
+            (MOLARITY, MOLES_FROM_MASS, MASS_CONCENTRATION, MG_ML_TO_G_L),
+            required=('molarity', 'moles', 'volume_l'),
+            insufficient_message="Parámetros insuficientes para calcular molaridad. "
+                                 "Necesitas: (moles + volumen) o (molaridad + volumen) o "
+                                 "(molaridad + moles) o (masa + peso molecular + volumen)",
+            positive_messages=POSITIVE_MESSAGES,
+            overdetermined_message=OVERDETERMINED_MESSAGE,
+            outputs=BATCH_OUTPUT_FIELDS,
+        ),
+        CalculationType.MOLALITY: EquationSystem(
+            (MOLALITY,),
+            required=('molality', 'moles'),
+            insufficient_message="Parámetros insuficientes para calcular molalidad. "
+                                 "Necesitas: (moles + kg_disolvente) o (molalidad + kg_disolvente)",
+            positive_messages=POSITIVE_MESSAGES,
+            overdetermined_message=OVERDETERMINED_MESSAGE,
+            outputs=BATCH_OUTPUT_FIELDS,
+        ),
+        CalculationType.DILUTION: EquationSystem(
+            (DILUTION,),
+            required=('c1', 'v1', 'c2', 'v2'),
+            insufficient_message="Para calcular diluciones necesitas exactamente 3 de los 4 parámetros: "
+                                 "C₁, V₁, C₂, V₂",
+            outputs=BATCH_OUTPUT_FIELDS,
+        ),
+        CalculationType.MASS_VOLUME: EquationSystem(
+            (MASS_PER_VOLUME, MG_ML_TO_G_L, MASS_CONCENTRATION),
+            required=('mass_g', 'concentration_mg_ml', 'concentration_g_l'),
+            insufficient_message="Parámetros insuficientes para calcular concentración masa/volumen. "
+                                 "Necesitas: (masa + volumen) o (concentración + volumen)",
+            positive_messages=POSITIVE_MESSAGES,
+            overdetermined_message=OVERDETERMINED_MESSAGE,
+            outputs=BATCH_OUTPUT_FIELDS,
+        ),
+        CalculationType.PPM: EquationSystem(
+            (PPM_TO_PERCENTAGE, PPM_TO_MG_ML),
+            required=('ppm', 'percentage', 'concentration_mg_ml'),
+            insufficient_message="Necesitas especificar ppm, porcentaje o concentración mg/mL",
+            overdetermined_message=OVERDETERMINED_MESSAGE,
+            outputs=BATCH_OUTPUT_FIELDS,
+        ),
+        CalculationType.PERCENTAGE: EquationSystem(
+            (PPM_TO_PERCENTAGE, PERCENTAGE_TO_G_L),
+            required=('percentage', 'ppm', 'concentration_g_l'),
+            insufficient_message="Necesitas especificar porcentaje o ppm",
+            overdetermined_message=OVERDETERMINED_MESSAGE,
+            outputs=BATCH_OUTPUT_FIELDS,
+        ),
+    }
+    
+    FORMULAS_USED = {
+        CalculationType.MOLARITY: "M = moles / volumen(L)",
+        CalculationType.MOLALITY: "m = moles / kg_disolvente",
+        CalculationType.DILUTION: "C₁ × V₁ = C₂ × V₂",
+        CalculationType.MASS_VOLUME: "Concentración = masa / volumen",
+        CalculationType.PPM: "ppm = (masa_soluto / masa_solución) × 10⁶",
+        CalculationType.PERCENTAGE: "% = (masa_soluto / masa_solución) × 100",
+    }
+    
+    # Matrices precalculadas de conversión entre todas las representaciones
+    REPRESENTATION_UNITS = tuple(REPRESENTATION_SCALES)
+    _REPRESENTATION_FACTORS, _MOLAR_MASS_EXPONENTS, _DENSITY_EXPONENTS = _representation_matrices()
+    
+    # Nombres aceptados para cada representación (sin espacios)
+    _UNIT_ALIASES = {
+        **{unit.value.replace(' ', ''): unit for unit in ConcentrationUnit},
+        'uM': ConcentrationUnit.MICROMOLAR, 'μM': ConcentrationUnit.MICROMOLAR,
+        'mg/ml': ConcentrationUnit.MG_ML, 'g/l': ConcentrationUnit.G_L,
+        '%': ConcentrationUnit.PERCENT_WV, '%w/v': ConcentrationUnit.PERCENT_WV,
+    }
+    _EXPRESSION_PATTERN = re.compile(r'^\s*([-+]?(?:\d+(?:[.,]\d*)?|[.,]\d+)(?:[eE][-+]?\d+)?)\s*(.+?)\s*$')
+    
     @classmethod
     def calculate(cls, request: ConcentrationRequest) -> ConcentrationResult:
         """
@@ -17,238 +172,351 @@ class ConcentrationService:
         Raises:
             ConcentrationError: Si faltan parámetros o hay errores en el cálculo
         """
-        calculation_methods = {
-            CalculationType.MOLARITY: cls._calculate_molarity,
-            CalculationType.MOLALITY: cls._calculate_molality,
-            CalculationType.DILUTION: cls._calculate_dilution,
-            CalculationType.MASS_VOLUME: cls._calculate_mass_volume,
-            CalculationType.PPM: cls._calculate_ppm,
-            CalculationType.PERCENTAGE: cls._calculate_percentage,
-        }
-        
-        method = calculation_methods.get(request.calculation_type)
-        if not method:
+        system = cls.EQUATIONS.get(request.calculation_type)
+        if not system:
             raise ConcentrationError(f"Tipo de cálculo no soportado: {request.calculation_type}")
         
-        return method(request)
+        notes = None
+        if request.formula and request.molecular_weight is None:
+            request = replace(request, molecular_weight=cls._molar_mass_from_formula(request.formula))
+            notes = f"Masa molar de {request.formula}: {request.molecular_weight:.3f} g/mol"
+        
+        solved = system.solve({name: getattr(request, name) for name in system.variables})
+        return ConcentrationResult(
+            calculation_type=request.calculation_type,
+            formula_used=cls.FORMULAS_USED[request.calculation_type],
+            notes=notes,
+            **{name: value for name, value in solved.items() if name in cls.BATCH_OUTPUT_FIELDS}
+        )
+    
+    @staticmethod
+    def _molar_mass_from_formula(formula: str) -> float:
+        """Obtiene la masa molar de una fórmula (memorizada) o lanza ConcentrationError."""
+        try:
+            return FormulaService.molar_mass(formula)
+        except FormulaError as e:
+            raise ConcentrationError(str(e))
     
     @classmethod
-    def _calculate_molarity(cls, request: ConcentrationRequest) -> ConcentrationResult:
-        """Calcula molaridad: M = moles / volumen(L)"""
-        result = ConcentrationResult(
-            calculation_type=CalculationType.MOLARITY,
-            formula_used="M = moles / volumen(L)"
-        )
+    def calculate_batch(cls, calculation_types: Sequence[Union[CalculationType, str]],
+                        columns: Mapping[str, Sequence[Optional[float]]]) -> ConcentrationBatchResult:
+        """
+        Realiza muchos cálculos de concentración a partir de columnas de datos.
         
-        # Casos posibles:
-        # 1. Calcular molaridad a partir de moles y volumen
-        if request.moles is not None and request.volume_l is not None:
-            if request.volume_l <= 0:
-                raise ConcentrationError("El volumen debe ser mayor a 0")
-            result.molarity = request.moles / request.volume_l
-            result.moles = request.moles
-            result.volume_l = request.volume_l
-            
-        # 2. Calcular moles a partir de molaridad y volumen
-        elif request.molarity is not None and request.volume_l is not None:
-            if request.volume_l <= 0:
-                raise ConcentrationError("El volumen debe ser mayor a 0")
-            result.moles = request.molarity * request.volume_l
-            result.molarity = request.molarity
-            result.volume_l = request.volume_l
-            
-        # 3. Calcular volumen a partir de molaridad y moles
-        elif request.molarity is not None and request.moles is not None:
-            if request.molarity <= 0:
-                raise ConcentrationError("La molaridad debe ser mayor a 0")
-            result.volume_l = request.moles / request.molarity
-            result.molarity = request.molarity
-            result.moles = request.moles
+        Las filas se agrupan por tipo de cálculo y por los campos presentes, y cada
+        grupo se resuelve con una única expresión vectorizada. Los valores ausentes
+        se indican con None o NaN. En lugar de lanzar excepciones, cada fila recibe
+        un BatchErrorCode.
+        
+        Args:
+            calculation_types: Tipo de cálculo de cada fila (enum o su valor en texto)
+            columns: Columna de valores por campo de ConcentrationRequest
             
-        # 4. Calcular a partir de masa, peso molecular y volumen
-        elif request.mass_g is not None and request.molecular_weight is not None and request.volume_l is not None:
-            if request.molecular_weight <= 0:
-                raise ConcentrationError("El peso molecular debe ser mayor a 0")
-            if request.volume_l <= 0:
-                raise ConcentrationError("El volumen debe ser mayor a 0")
+        Returns:
+            ConcentrationBatchResult con una columna por campo de resultado y los códigos de error
             
-            moles = request.mass_g / request.molecular_weight
-            result.molarity = moles / request.volume_l
-            result.moles = moles
-            result.mass_g = request.mass_g
-            result.volume_l = request.volume_l
+        Raises:
+            ConcentrationError: Si hay columnas desconocidas o de distinta longitud
+        """
+        size = len(calculation_types)
+        inputs = cls._prepare_batch_columns(columns, size)
+        invalid_formula = cls._apply_batch_formulas(columns.get('formula'), inputs, size)
+        present = {name: ~np.isnan(values) for name, values in inputs.items()}
+        
+        outputs = {name: np.full(size, np.nan) for name in cls.BATCH_OUTPUT_FIELDS}
+        error_codes = np.full(size, BatchErrorCode.UNSUPPORTED_TYPE, dtype=np.int8)
+        
+        type_values = np.array([getattr(t, 'value', t) for t in calculation_types], dtype=object)
+        for calc_type, system in cls.EQUATIONS.items():
+            rows = np.flatnonzero(type_values == calc_type.value)
+            if not rows.size:
+                continue
+            error_codes[rows] = BatchErrorCode.INSUFFICIENT_PARAMETERS
             
-        else:
-            raise ConcentrationError("Parámetros insuficientes para calcular molaridad. "
-                                   "Necesitas: (moles + volumen) o (molaridad + volumen) o "
-                                   "(molaridad + moles) o (masa + peso molecular + volumen)")
+            # Una sola consulta a la tabla de planes por cada combinación distinta de campos presentes
+            masks = system.mask_array({name: present[name][rows] for name in system.variables}, rows.size)
+            for mask in np.unique(masks):
+                plan = system.plan(int(mask))
+                if plan is None:
+                    if system.is_overdetermined(int(mask)):
+                        error_codes[rows[masks == mask]] = BatchErrorCode.OVERDETERMINED
+                    continue
+                group = rows[masks == mask]
+                solved, invalid = plan.solve_arrays({name: inputs[name][group] for name in plan.given})
+                error_codes[group[invalid]] = BatchErrorCode.NON_POSITIVE_VALUE
+                
+                valid = group[~invalid]
+                for name, values in solved.items():
+                    if name in outputs:
+                        outputs[name][valid] = values[~invalid]
+                error_codes[valid] = BatchErrorCode.OK
         
-        # Agregar conversiones adicionales
-        if result.molarity is not None and request.molecular_weight is not None:
-            result.concentration_g_l = result.molarity * request.molecular_weight
-            result.concentration_mg_ml = result.concentration_g_l
+        for values in outputs.values():
+            values[invalid_formula] = np.nan
+        error_codes[invalid_formula] = BatchErrorCode.INVALID_FORMULA
         
-        return result
+        return ConcentrationBatchResult(columns=outputs, error_codes=error_codes)
     
     @classmethod
-    def _calculate_molality(cls, request: ConcentrationRequest) -> ConcentrationResult:
-        """Calcula molalidad: m = moles / kg_disolvente"""
-        result = ConcentrationResult(
-            calculation_type=CalculationType.MOLALITY,
-            formula_used="m = moles / kg_disolvente"
-        )
+    def _apply_batch_formulas(cls, formulas: Optional[Sequence[Optional[str]]],
+                              inputs: Dict[str, np.ndarray], size: int) -> np.ndarray:
+        """
+        Completa el peso molecular a partir de la columna de fórmulas donde falte.
         
-        # 1. Calcular molalidad a partir de moles y kg de disolvente
-        if request.moles is not None and request.kg_solvent is not None:
-            if request.kg_solvent <= 0:
-                raise ConcentrationError("La masa del disolvente debe ser mayor a 0")
-            result.molality = request.moles / request.kg_solvent
-            result.moles = request.moles
-            
-        # 2. Calcular moles a partir de molalidad y kg de disolvente
-        elif request.molality is not None and request.kg_solvent is not None:
-            if request.kg_solvent <= 0:
-                raise ConcentrationError("La masa del disolvente debe ser mayor a 0")
-            result.moles = request.molality * request.kg_solvent
-            result.molality = request.molality
-            
-        else:
-            raise ConcentrationError("Parámetros insuficientes para calcular molalidad. "
-                                   "Necesitas: (moles + kg_disolvente) o (molalidad + kg_disolvente)")
+        Cada fórmula distinta se resuelve una sola vez (y queda en la caché de
+        FormulaService). Devuelve la máscara de filas con fórmulas no válidas.
+        """
+        invalid = np.zeros(size, dtype=bool)
+        if formulas is None:
+            return invalid
+        if len(formulas) != size:
+            raise ConcentrationError(
+                f"La columna formula tiene {len(formulas)} valores y se esperaban {size}"
+            )
         
-        return result
+        molar_masses = {}
+        for formula in set(formulas):
+            if not formula:
+                continue
+            try:
+                molar_masses[formula] = FormulaService.molar_mass(formula)
+            except FormulaError:
+                molar_masses[formula] = np.nan
+        if not molar_masses:
+            return invalid
+        
+        resolved = np.array([molar_masses.get(formula, np.nan) if formula else np.nan
+                             for formula in formulas], dtype=np.float64)
+        has_formula = np.array([bool(formula) for formula in formulas])
+        missing_weight = np.isnan(inputs['molecular_weight'])
+        
+        invalid = has_formula & missing_weight & np.isnan(resolved)
+        inputs['molecular_weight'] = np.where(missing_weight, resolved, inputs['molecular_weight'])
+        return invalid
     
     @classmethod
-    def _calculate_dilution(cls, request: ConcentrationRequest) -> ConcentrationResult:
-        """Calcula diluciones: C1×V1 = C2×V2"""
-        result = ConcentrationResult(
-            calculation_type=CalculationType.DILUTION,
-            formula_used="C₁ × V₁ = C₂ × V₂"
-        )
+    def _prepare_batch_columns(cls, columns: Mapping[str, Sequence[Optional[float]]],
+                               size: int) -> Dict[str, np.ndarray]:
+        """Convierte las columnas de entrada a arreglos float64 con NaN para los ausentes."""
+        unknown = set(columns) - set(cls.BATCH_INPUT_FIELDS) - set(cls.BATCH_TEXT_FIELDS)
+        if unknown:
+            raise ConcentrationError(f"Columnas desconocidas: {', '.join(sorted(unknown))}")
         
-        # Contar cuántos parámetros tenemos
-        params = [request.c1, request.v1, request.c2, request.v2]
-        non_none_params = [p for p in params if p is not None]
-        
-        if len(non_none_params) != 3:
-            raise ConcentrationError("Para calcular diluciones necesitas exactamente 3 de los 4 parámetros: C₁, V₁, C₂, V₂")
-        
-        # Calcular el parámetro faltante
-        if request.c1 is None:
-            if request.v1 <= 0 or request.c2 <= 0 or request.v2 <= 0:
-                raise ConcentrationError("Todos los valores deben ser mayores a 0")
-            result.c1 = (request.c2 * request.v2) / request.v1
-            result.v1 = request.v1
-            result.c2 = request.c2
-            result.v2 = request.v2
-            
-        elif request.v1 is None:
-            if request.c1 <= 0 or request.c2 <= 0 or request.v2 <= 0:
-                raise ConcentrationError("Todos los valores deben ser mayores a 0")
-            result.v1 = (request.c2 * request.v2) / request.c1
-            result.c1 = request.c1
-            result.c2 = request.c2
-            result.v2 = request.v2
-            
-        elif request.c2 is None:
-            if request.c1 <= 0 or request.v1 <= 0 or request.v2 <= 0:
-                raise ConcentrationError("Todos los valores deben ser mayores a 0")
-            result.c2 = (request.c1 * request.v1) / request.v2
-            result.c1 = request.c1
-            result.v1 = request.v1
-            result.v2 = request.v2
-            
-        elif request.v2 is None:
-            if request.c1 <= 0 or request.v1 <= 0 or request.c2 <= 0:
-                raise ConcentrationError("Todos los valores deben ser mayores a 0")
-            result.v2 = (request.c1 * request.v1) / request.c2
-            result.c1 = request.c1
-            result.v1 = request.v1
-            result.c2 = request.c2
-        
-        return result
+        prepared = {}
+        for name in cls.BATCH_INPUT_FIELDS:
+            values = columns.get(name)
+            if values is None:
+                prepared[name] = np.full(size, np.nan)
+                continue
+            try:
+                array = np.array(values, dtype=np.float64)
+            except (TypeError, ValueError):
+                raise ConcentrationError(f"La columna {name} contiene valores no numéricos")
+            if array.shape != (size,):
+                raise ConcentrationError(
+                    f"La columna {name} tiene {array.size} valores y se esperaban {size}"
+                )
+            prepared[name] = array
+        return prepared
     
     @classmethod
-    def _calculate_mass_volume(cls, request: ConcentrationRequest) -> ConcentrationResult:
-        """Calcula concentraciones masa/volumen"""
-        result = ConcentrationResult(
-            calculation_type=CalculationType.MASS_VOLUME,
-            formula_used="Concentración = masa / volumen"
+    def calculate_representations(cls, value: float, unit: Union[ConcentrationUnit, str],
+                                  molar_mass: Optional[float] = None, density: float = 1.0,
+                                  formula: Optional[str] = None) -> ConcentrationRepresentations:
+        """
+        Expresa una concentración en todas las representaciones a la vez.
+        
+        Las unidades molares necesitan la masa molar (o una fórmula) cuando el valor
+        está en masa/volumen y viceversa; sin ella esas representaciones quedan en None.
+        
+        Raises:
+            ConcentrationError: Si la unidad no es válida, el valor es negativo o no finito,
+                o la masa molar o la densidad no son positivas
+        """
+        unit = cls._resolve_unit(unit)
+        notes = []
+        if formula and molar_mass is None:
+            molar_mass = cls._molar_mass_from_formula(formula)
+            notes.append(f"Masa molar de {formula}: {molar_mass:.3f} g/mol")
+        
+        converted = cls.convert_representations([value], unit, molar_mass, density)
+        values = {target: (None if np.isnan(column[0]) else float(column[0]))
+                  for target, column in converted.items()}
+        if molar_mass is None and None in values.values():
+            notes.append("Indica la masa molar para obtener las unidades que faltan")
+        if density == 1.0:
+            notes.append("ppm y ppb asumen una densidad de 1 g/mL")
+        
+        return ConcentrationRepresentations(
+            value=value,
+            unit=unit,
+            values=values,
+            molar_mass=molar_mass,
+            density=density,
+            notes=". ".join(notes) or None,
         )
+    
+    @classmethod
+    def convert_representations(cls, values: Union[np.ndarray, Sequence[float]],
+                                unit: Union[ConcentrationUnit, str],
+                                molar_mass: Union[None, float, np.ndarray] = None,
+                                density: Union[float, np.ndarray] = 1.0) -> Dict[ConcentrationUnit, np.ndarray]:
+        """
+        Convierte un arreglo de concentraciones a todas las representaciones con la matriz precalculada.
         
-        # 1. Calcular concentración a partir de masa y volumen
-        if request.mass_g is not None and request.volume_ml is not None:
-            if request.volume_ml <= 0:
-                raise ConcentrationError("El volumen debe ser mayor a 0")
-            result.concentration_mg_ml = (request.mass_g * 1000) / request.volume_ml  # mg/mL
-            result.concentration_g_l = request.mass_g / (request.volume_ml / 1000)    # g/L
-            result.mass_g = request.mass_g
-            
-        # 2. Calcular masa a partir de concentración y volumen
-        elif request.concentration_mg_ml is not None and request.volume_ml is not None:
-            if request.volume_ml <= 0:
-                raise ConcentrationError("El volumen debe ser mayor a 0")
-            result.mass_g = (request.concentration_mg_ml * request.volume_ml) / 1000
-            result.concentration_mg_ml = request.concentration_mg_ml
-            result.concentration_g_l = request.concentration_mg_ml  # mg/mL = g/L
-            
-        else:
-            raise ConcentrationError("Parámetros insuficientes para calcular concentración masa/volumen. "
-                                   "Necesitas: (masa + volumen) o (concentración + volumen)")
+        La masa molar y la densidad pueden ser escalares o un arreglo por valor; donde
+        falte la masa molar (None o NaN) las representaciones que la necesitan quedan en NaN.
+        
+        Raises:
+            ConcentrationError: Si la unidad no es válida, algún valor es negativo o no finito,
+                o la masa molar o la densidad no son positivas
+        """
+        row = cls.REPRESENTATION_UNITS.index(cls._resolve_unit(unit))
+        try:
+            values = np.asarray(values, dtype=np.float64).reshape(-1, 1)
+            molar_mass = np.asarray(np.nan if molar_mass is None else molar_mass, dtype=np.float64)
+            density = np.asarray(density, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ConcentrationError("Los valores, la masa molar y la densidad deben ser numéricos")
+        if np.any(~(np.isfinite(values) & (values >= 0))):
+            raise ConcentrationError("La concentración debe ser un número finito no negativo")
+        if np.any(molar_mass <= 0):
+            raise ConcentrationError("El peso molecular debe ser mayor a 0")
+        if np.any(~(density > 0)):
+            raise ConcentrationError("La densidad debe ser mayor a 0")
         
-        return result
+        # PM^0 = 1 aunque falte la masa molar, así solo quedan en NaN las columnas que la necesitan
+        matrix = (cls._REPRESENTATION_FACTORS[row]
+                  * np.power(molar_mass.reshape(-1, 1), cls._MOLAR_MASS_EXPONENTS[row])
+                  * np.power(density.reshape(-1, 1), cls._DENSITY_EXPONENTS[row]))
+        converted = values * matrix
+        return {target: converted[:, j] for j, target in enumerate(cls.REPRESENTATION_UNITS)}
     
     @classmethod
-    def _calculate_ppm(cls, request: ConcentrationRequest) -> ConcentrationResult:
-        """Calcula conversiones con ppm (partes por millón)"""
-        result = ConcentrationResult(
-            calculation_type=CalculationType.PPM,
-            formula_used="ppm = (masa_soluto / masa_solución) × 10⁶"
-        )
+    def parse_concentration_expression(cls, expr: str) -> Tuple[float, ConcentrationUnit]:
+        """
+        Separa una expresión como "2.5 mg/mL" o "150 mM" en valor y unidad.
         
-        # Conversiones entre ppm y otras unidades
-        if request.ppm is not None:
-            result.ppm = request.ppm
-            result.percentage = request.ppm / 10000  # ppm a %
-            result.concentration_mg_ml = request.ppm / 1000  # ppm a mg/mL (asumiendo densidad ~1)
-            
-        elif request.percentage is not None:
-            result.percentage = request.percentage
-            result.ppm = request.percentage * 10000  # % a ppm
-            result.concentration_mg_ml = (request.percentage * 10)  # % a mg/mL
+        Raises:
+            ConcentrationError: Si la expresión no tiene un número seguido de una unidad conocida
+        """
+        match = cls._EXPRESSION_PATTERN.match(expr or '')
+        if not match:
+            raise ConcentrationError(f"Expresión de concentración no válida: {expr}")
+        return float(match.group(1).replace(',', '.')), cls._resolve_unit(match.group(2))
+    
+    @classmethod
+    def _resolve_unit(cls, unit: Union[ConcentrationUnit, str]) -> ConcentrationUnit:
+        """Obtiene la representación a partir del enum o de su nombre."""
+        if isinstance(unit, ConcentrationUnit):
+            return unit
+        resolved = cls._UNIT_ALIASES.get(str(unit).replace(' ', ''))
+        if resolved is None:
+            raise ConcentrationError(f"Unidad de concentración no soportada: {unit}")
+        return resolved
+    
+    @classmethod
+    def get_representation_units(cls):
+        """Retorna las representaciones de concentración disponibles."""
+        return [{"value": unit.value, "label": unit.value} for unit in cls.REPRESENTATION_UNITS]
+    
+    @classmethod
+    def calculate_dilution_series(cls, request: DilutionSeriesRequest) -> DilutionSeriesResult:
+        """
+        Calcula una serie de diluciones completa en una sola pasada vectorizada.
+        
+        Cada tubo termina con el volumen final indicado; los tubos intermedios
+        preparan además el volumen que se transfiere al siguiente.
+        
+        Args:
+            request: Solicitud con el stock, el volumen final y la forma de definir la serie
             
-        elif request.concentration_mg_ml is not None:
-            result.concentration_mg_ml = request.concentration_mg_ml
-            result.ppm = request.concentration_mg_ml * 1000  # mg/mL a ppm
-            result.percentage = result.ppm / 10000  # ppm a %
+        Returns:
+            DilutionSeriesResult con concentraciones, factores y volumenes por tubo
             
-        else:
-            raise ConcentrationError("Necesitas especificar ppm, porcentaje o concentración mg/mL")
+        Raises:
+            ConcentrationError: Si faltan parámetros o no son válidos
+        """
+        if request.stock_concentration is None or request.stock_concentration <= 0:
+            raise ConcentrationError("La concentración del stock debe ser mayor a 0")
+        if request.final_volume is None or request.final_volume <= 0:
+            raise ConcentrationError("El volumen final por tubo debe ser mayor a 0")
+        
+        concentrations = cls._resolve_series_concentrations(request)
+        stock = request.stock_concentration
+        
+        previous = np.concatenate(([stock], concentrations[:-1]))
+        step_factors = previous / concentrations
+        
+        # Volumen total de cada tubo = volumen final + lo que se transfiere a los
+        # siguientes: V·Σ(c_k, k ≥ i) / c_i, calculado con una suma acumulada inversa
+        remaining = np.cumsum(concentrations[::-1])[::-1]
+        total_volumes = request.final_volume * remaining / concentrations
+        transfer_volumes = total_volumes / step_factors
+        diluent_volumes = total_volumes - transfer_volumes
         
-        return result
+        return DilutionSeriesResult(
+            mode=request.mode,
+            stock_concentration=stock,
+            final_volume=request.final_volume,
+            concentrations=concentrations.tolist(),
+            step_factors=step_factors.tolist(),
+            cumulative_dilutions=(stock / concentrations).tolist(),
+            transfer_volumes=transfer_volumes.tolist(),
+            diluent_volumes=diluent_volumes.tolist(),
+            total_volumes=total_volumes.tolist(),
+            stock_volume_needed=float(transfer_volumes[0]),
+            total_diluent_volume=float(diluent_volumes.sum()),
+            formula_used="Cᵢ = Cᵢ₋₁ / Fᵢ ; Vtransferido = Vtotal / Fᵢ",
+            notes="Cada tubo conserva el volumen final indicado después de transferir al siguiente."
+        )
     
     @classmethod
-    def _calculate_percentage(cls, request: ConcentrationRequest) -> ConcentrationResult:
-        """Calcula concentraciones porcentuales"""
-        result = ConcentrationResult(
-            calculation_type=CalculationType.PERCENTAGE,
-            formula_used="% = (masa_soluto / masa_solución) × 100"
-        )
+    def _resolve_series_concentrations(cls, request: DilutionSeriesRequest) -> np.ndarray:
+        """Obtiene la concentración de cada tubo según el modo de la serie."""
+        stock = request.stock_concentration
         
-        if request.percentage is not None:
-            result.percentage = request.percentage
-            result.ppm = request.percentage * 10000
-            result.concentration_g_l = request.percentage * 10  # % p/v a g/L
-            
-        elif request.ppm is not None:
-            result.ppm = request.ppm
-            result.percentage = request.ppm / 10000
-            result.concentration_g_l = result.percentage * 10
-            
-        else:
-            raise ConcentrationError("Necesitas especificar porcentaje o ppm")
+        if request.mode == DilutionSeriesMode.TARGETS:
+            if not request.target_concentrations:
+                raise ConcentrationError("Debes indicar al menos una concentración objetivo")
+            concentrations = np.asarray(request.target_concentrations, dtype=np.float64)
+            if len(concentrations) > cls.MAX_DILUTION_STEPS:
+                raise ConcentrationError(f"La serie no puede tener más de {cls.MAX_DILUTION_STEPS} pasos")
+            if np.any(concentrations <= 0):
+                raise ConcentrationError("Las concentraciones objetivo deben ser mayores a 0")
+            if np.any(np.diff(np.concatenate(([stock], concentrations))) >= 0):
+                raise ConcentrationError("Las concentraciones objetivo deben ser decrecientes y menores al stock")
+            return concentrations
+        
+        if request.num_steps is None or request.num_steps <= 0:
+            raise ConcentrationError("El número de pasos debe ser mayor a 0")
+        if request.num_steps > cls.MAX_DILUTION_STEPS:
+            raise ConcentrationError(f"La serie no puede tener más de {cls.MAX_DILUTION_STEPS} pasos")
+        steps = np.arange(1, request.num_steps + 1)
         
-        return result
+        if request.mode == DilutionSeriesMode.FACTOR:
+            if request.dilution_factor is None or request.dilution_factor <= 1:
+                raise ConcentrationError("El factor de dilución debe ser mayor a 1")
+            return stock / request.dilution_factor ** steps
+        
+        if request.mode == DilutionSeriesMode.LOGARITHMIC:
+            if request.final_concentration is None or request.final_concentration <= 0:
+                raise ConcentrationError("La concentración final debe ser mayor a 0")
+            if request.final_concentration >= stock:
+                raise ConcentrationError("La concentración final debe ser menor a la del stock")
+            return np.logspace(np.log10(stock), np.log10(request.final_concentration),
+                               request.num_steps + 1)[1:]
+        
+        raise ConcentrationError(f"Modo de serie no soportado: {request.mode}")
+    
+    @classmethod
+    def get_dilution_series_modes(cls):
+        """Retorna las formas disponibles de definir una serie de diluciones."""
+        return [
+            {"value": DilutionSeriesMode.FACTOR.value, "label": "Factor de dilución constante"},
+            {"value": DilutionSeriesMode.LOGARITHMIC.value, "label": "Espaciado logarítmico hasta una concentración final"},
+            {"value": DilutionSeriesMode.TARGETS.value, "label": "Concentraciones objetivo"},
+        ]
     
     @classmethod
     def get_calculation_types(cls):
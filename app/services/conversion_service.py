@@ -1,25 +1,67 @@
-from typing import Dict, Callable, List
+import csv
+import io
+import json
+from fractions import Fraction
+from itertools import islice, product
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
 from ..models.conversion import ConversionRequest, ConversionResult, ConversionError, UnitType
 
 class ConversionService:
     """Servicio para manejar todas las conversiones de unidades."""
     
-    # Diccionario con todas las conversiones disponibles
-    _CONVERSIONS: Dict[UnitType, Dict[tuple, Callable]] = {
+    # Registro de unidades: cada unidad se define una sola vez como una
+    # transformación afín (escala, desplazamiento) hacia la unidad base de su
+    # tipo, de modo que valor_base = valor * escala + desplazamiento.
+    # Bases: gramos (masa), kelvin (temperatura) y litros (volumen).
+    _UNITS: Dict[UnitType, Dict[str, Tuple[Fraction, Fraction]]] = {
         UnitType.MASS: {
-            ('gramos', 'kilogramos'): lambda x: x / 1000,
-            ('kilogramos', 'gramos'): lambda x: x * 1000,
+            'kilogramos': (Fraction(1000), Fraction(0)),
+            'gramos': (Fraction(1), Fraction(0)),
+            'miligramos': (Fraction(1, 10**3), Fraction(0)),
+            'microgramos': (Fraction(1, 10**6), Fraction(0)),
+            'nanogramos': (Fraction(1, 10**9), Fraction(0)),
         },
         UnitType.TEMPERATURE: {
-            ('celsius', 'fahrenheit'): lambda x: (x * 9/5) + 32,
-            ('fahrenheit', 'celsius'): lambda x: (x - 32) * 5/9,
+            'kelvin': (Fraction(1), Fraction(0)),
+            'celsius': (Fraction(1), Fraction(27315, 100)),
+            'fahrenheit': (Fraction(5, 9), Fraction(27315, 100) - Fraction(160, 9)),
         },
         UnitType.VOLUME: {
-            ('litros', 'mililitros'): lambda x: x * 1000,
-            ('mililitros', 'litros'): lambda x: x / 1000,
-        }
+            'litros': (Fraction(1), Fraction(0)),
+            'decilitros': (Fraction(1, 10), Fraction(0)),
+            'mililitros': (Fraction(1, 10**3), Fraction(0)),
+            'microlitros': (Fraction(1, 10**6), Fraction(0)),
+        },
     }
     
+    # Filas que se convierten juntas en cada paso de los flujos CSV/NDJSON
+    STREAM_CHUNK_SIZE = 1024
+    
+    # Tabla (tipo, origen, destino) -> (escala, desplazamiento), se llena al importar el módulo
+    _CONVERSION_TABLE: Dict[Tuple[UnitType, str, str], Tuple[float, float]] = {}
+    
+    @classmethod
+    def _build_conversion_table(cls) -> Dict[Tuple[UnitType, str, str], Tuple[float, float]]:
+        """
+        Precompila la transformación compuesta para cada par origen→destino.
+        
+        La composición se hace con fracciones exactas y sólo al final se
+        redondea a float, así las conversiones directas (p. ej. 0 °C → 32 °F)
+        no acumulan el error de pasar por la unidad base.
+        """
+        table = {}
+        for unit_type, units in cls._UNITS.items():
+            for (from_unit, (from_scale, from_offset)), (to_unit, (to_scale, to_offset)) in product(
+                units.items(), repeat=2
+            ):
+                scale = from_scale / to_scale
+                offset = (from_offset - to_offset) / to_scale
+                table[(unit_type, from_unit, to_unit)] = (float(scale), float(offset))
+        return table
+    
     @classmethod
     def convert(cls, request: ConversionRequest) -> ConversionResult:
         """
@@ -34,29 +76,267 @@ class ConversionService:
         Raises:
             ConversionError: Si la conversión no es soportada
         """
-        # Si las unidades son iguales, no hay conversión
-        if request.from_unit == request.to_unit:
-            converted_value = request.value
-        else:
-            conversion_key = (request.from_unit, request.to_unit)
-            conversions = cls._CONVERSIONS.get(request.unit_type, {})
-            
-            if conversion_key not in conversions:
-                raise ConversionError(
-                    f"Conversión no soportada: {request.from_unit} a {request.to_unit} "
-                    f"para el tipo {request.unit_type.value}"
-                )
-            
-            converted_value = conversions[conversion_key](request.value)
+        scale, offset = cls.get_conversion_factors(request.unit_type, request.from_unit, request.to_unit)
         
         return ConversionResult(
             original_value=request.value,
-            converted_value=converted_value,
+            converted_value=request.value * scale + offset,
             from_unit=request.from_unit,
             to_unit=request.to_unit,
             unit_type=request.unit_type
         )
     
+    @classmethod
+    def convert_many(cls, values: Union[np.ndarray, Sequence[float]], from_unit: str,
+                     to_unit: str, unit_type: UnitType) -> np.ndarray:
+        """
+        Convierte un arreglo completo de valores en una sola pasada vectorizada.
+        
+        Args:
+            values: Arreglo de NumPy o lista de valores numéricos
+            from_unit: Unidad de origen
+            to_unit: Unidad de destino
+            unit_type: El tipo de unidad
+            
+        Returns:
+            Arreglo de NumPy (float64) con los valores convertidos, en el mismo orden
+            
+        Raises:
+            ConversionError: Si la conversión no es soportada o algún valor no es numérico
+        """
+        scale, offset = cls.get_conversion_factors(unit_type, from_unit, to_unit)
+        array = cls.as_number_array(values)
+        
+        if cls._first_non_finite(array) is not None:
+            raise ConversionError("Los valores a convertir deben ser números finitos")
+        
+        return array * scale + offset
+    
+    @staticmethod
+    def as_number_array(values: Union[np.ndarray, Sequence[float]]) -> np.ndarray:
+        """
+        Convierte valores numéricos a un arreglo float64 sin coerciones implícitas.
+        
+        Raises:
+            ConversionError: Si algún valor es un texto, un booleano u otro tipo no numérico
+        """
+        if isinstance(values, np.ndarray):
+            numeric = values.dtype.kind in 'iuf'
+        else:
+            numeric = all(
+                isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool)
+                for value in values
+            )
+        if not numeric:
+            raise ConversionError("Todos los valores a convertir deben ser numéricos")
+        try:
+            return np.asarray(values, dtype=np.float64)
+        except OverflowError:
+            # Enteros de Python demasiado grandes para un float64
+            raise ConversionError("Los valores a convertir deben ser números finitos")
+    
+    @classmethod
+    def convert_csv_stream(cls, lines: Iterable[str], columns: Sequence[str], from_unit: str,
+                           to_unit: str, unit_type: UnitType) -> Iterator[str]:
+        """
+        Convierte columnas de un CSV fila a fila, sin cargar el archivo completo.
+        
+        Las filas se procesan en bloques de STREAM_CHUNK_SIZE para convertir cada
+        columna con una sola operación vectorizada; las celdas vacías se conservan.
+        
+        Args:
+            lines: Iterable de líneas de texto del CSV (la primera es el encabezado)
+            columns: Nombres de las columnas a convertir
+            from_unit: Unidad de origen
+            to_unit: Unidad de destino
+            unit_type: El tipo de unidad
+            
+        Yields:
+            Fragmentos de texto CSV: primero el encabezado y luego un fragmento por bloque
+            
+        Raises:
+            ConversionError: Si la conversión no es soportada, falta una columna o
+                una celda no es numérica
+        """
+        scale, offset = cls.get_conversion_factors(unit_type, from_unit, to_unit)
+        reader = csv.reader(lines)
+        
+        header = next(reader, None)
+        if header is None:
+            raise ConversionError("El archivo CSV está vacío")
+        indices = cls._resolve_stream_columns(columns, header)
+        
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        writer.writerow(header)
+        yield cls._drain_buffer(buffer)
+        
+        line_number = 1
+        for rows in cls._iter_chunks(reader):
+            for index in indices:
+                cells = []
+                for offset_row, row in enumerate(rows):
+                    if index >= len(row):
+                        raise ConversionError(
+                            f"La fila {line_number + offset_row + 1} no tiene la columna {header[index]}"
+                        )
+                    cells.append(row[index])
+                converted = cls._convert_cells(cells, scale, offset, line_number + 1)
+                for row, value in zip(rows, converted):
+                    row[index] = '' if value != value else repr(value)
+            writer.writerows(rows)
+            line_number += len(rows)
+            yield cls._drain_buffer(buffer)
+    
+    @classmethod
+    def convert_ndjson_stream(cls, lines: Iterable[str], columns: Sequence[str], from_unit: str,
+                              to_unit: str, unit_type: UnitType) -> Iterator[str]:
+        """
+        Convierte campos de un archivo NDJSON (un objeto JSON por línea) en flujo.
+        
+        Args:
+            lines: Iterable de líneas de texto, cada una con un objeto JSON
+            columns: Nombres de los campos a convertir
+            from_unit: Unidad de origen
+            to_unit: Unidad de destino
+            unit_type: El tipo de unidad
+            
+        Yields:
+            Fragmentos de texto NDJSON, uno por bloque de STREAM_CHUNK_SIZE líneas
+            
+        Raises:
+            ConversionError: Si la conversión no es soportada, una línea no es un
+                objeto JSON, falta un campo o un valor no es numérico
+        """
+        scale, offset = cls.get_conversion_factors(unit_type, from_unit, to_unit)
+        
+        line_number = 0
+        for chunk in cls._iter_chunks(lines):
+            records = []
+            record_lines = []
+            for line in chunk:
+                line_number += 1
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    raise ConversionError(f"La línea {line_number} no es un JSON válido")
+                if not isinstance(record, dict):
+                    raise ConversionError(f"La línea {line_number} debe ser un objeto JSON")
+                missing = [column for column in columns if column not in record]
+                if missing:
+                    raise ConversionError(
+                        f"La línea {line_number} no tiene el campo {', '.join(missing)}"
+                    )
+                records.append(record)
+                record_lines.append(line_number)
+            
+            if not records:
+                continue
+            
+            for column in columns:
+                # null o un texto vacío son celdas vacías y se conservan, como en el CSV
+                values = [record[column] for record in records]
+                blank = np.array([value is None or (isinstance(value, str) and not value.strip())
+                                  for value in values], dtype=bool)
+                for value, is_blank, line in zip(values, blank, record_lines):
+                    if not is_blank and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                        raise ConversionError(f"La línea {line} tiene un valor no numérico en {column}")
+                array = np.array([np.nan if is_blank else value for value, is_blank in zip(values, blank)],
+                                 dtype=np.float64)
+                position = cls._first_non_finite(array, blank)
+                if position is not None:
+                    raise ConversionError(f"La línea {record_lines[position]} tiene un valor no finito en {column}")
+                converted = array * scale + offset
+                for record, value, is_blank in zip(records, converted.tolist(), blank):
+                    if not is_blank:
+                        record[column] = value
+            
+            yield ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+    
+    @staticmethod
+    def _resolve_stream_columns(columns: Sequence[str], header: Sequence[str]) -> List[int]:
+        """Ubica las columnas solicitadas en el encabezado del CSV."""
+        if not columns:
+            raise ConversionError("Debes indicar al menos una columna a convertir")
+        missing = [column for column in columns if column not in header]
+        if missing:
+            raise ConversionError(f"Columnas no encontradas en el archivo: {', '.join(missing)}")
+        return [header.index(column) for column in columns]
+    
+    @classmethod
+    def _iter_chunks(cls, rows: Iterable) -> Iterator[list]:
+        """Agrupa un iterable en listas de STREAM_CHUNK_SIZE elementos."""
+        iterator = iter(rows)
+        while True:
+            chunk = list(islice(iterator, cls.STREAM_CHUNK_SIZE))
+            if not chunk:
+                return
+            yield chunk
+    
+    @classmethod
+    def _convert_cells(cls, cells: List[str], scale: float, offset: float, first_line: int) -> List[float]:
+        """Convierte un bloque de celdas de texto; las vacías se devuelven como NaN."""
+        blank = np.array([not cell.strip() for cell in cells])
+        try:
+            array = np.array([cell if cell.strip() else 'nan' for cell in cells], dtype=np.float64)
+        except ValueError:
+            for position, cell in enumerate(cells):
+                try:
+                    float(cell or 'nan')
+                except ValueError:
+                    raise ConversionError(
+                        f"La fila {first_line + position} contiene un valor no numérico: {cell}"
+                    )
+            raise
+        position = cls._first_non_finite(array, blank)
+        if position is not None:
+            raise ConversionError(
+                f"La fila {first_line + position} contiene un valor no finito: {cells[position]}"
+            )
+        return (array * scale + offset).tolist()
+    
+    @staticmethod
+    def _first_non_finite(array: np.ndarray, blank: Optional[np.ndarray] = None) -> Optional[int]:
+        """Posición del primer valor infinito o NaN que no sea una celda vacía; None si no hay."""
+        invalid = ~np.isfinite(array)
+        if blank is not None:
+            invalid &= ~blank
+        return int(np.argmax(invalid)) if invalid.any() else None
+    
+    @staticmethod
+    def _drain_buffer(buffer: io.StringIO) -> str:
+        """Devuelve el contenido acumulado del buffer y lo vacía."""
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+    
+    @classmethod
+    def get_conversion_factors(cls, unit_type: UnitType, from_unit: str, to_unit: str) -> Tuple[float, float]:
+        """
+        Retorna la transformación precompilada (escala, desplazamiento) de un par de unidades.
+        
+        Args:
+            unit_type: El tipo de unidad
+            from_unit: Unidad de origen
+            to_unit: Unidad de destino
+            
+        Returns:
+            Tupla (escala, desplazamiento) tal que destino = origen * escala + desplazamiento
+            
+        Raises:
+            ConversionError: Si la conversión no es soportada
+        """
+        factors = cls._CONVERSION_TABLE.get((unit_type, from_unit, to_unit))
+        if factors is None:
+            raise ConversionError(
+                f"Conversión no soportada: {from_unit} a {to_unit} "
+                f"para el tipo {unit_type.value}"
+            )
+        return factors
+    
     @classmethod
     def get_available_units(cls, unit_type: UnitType) -> List[str]:
         """
@@ -68,14 +348,11 @@ class ConversionService:
         Returns:
             Lista de unidades disponibles
         """
-        units = set()
-        conversions = cls._CONVERSIONS.get(unit_type, {})
-        for from_unit, to_unit in conversions.keys():
-            units.add(from_unit)
-            units.add(to_unit)
-        return sorted(list(units))
+        return sorted(cls._UNITS.get(unit_type, {}))
     
     @classmethod
     def get_all_unit_types(cls) -> List[UnitType]:
         """Retorna todos los tipos de unidades disponibles."""
-        return list(cls._CONVERSIONS.keys())
\ No newline at end of file
+        return list(cls._UNITS.keys())
+
+ConversionService._CONVERSION_TABLE = ConversionService._build_conversion_table()
@@ -0,0 +1,256 @@
+import math
+import threading
+import time
+import uuid
+from typing import Dict, Iterator, Optional
+
+from ..models.counting_session import CountingSnapshot, CountingSessionError, CountingSessionNotFound
+from ..models.neubauer import NeubauerRequest, NeubauerResult, NeubauerError
+from .neubauer_service import NeubauerService
+
+class RunningStatistics:
+    """
+    Media y varianza de un conjunto de valores con el algoritmo de Welford.
+    
+    Además de agregar valores permite reemplazar uno por otro en O(1), que es
+    lo que ocurre cuando un clic cambia el conteo de un cuadrante.
+    """
+    __slots__ = ('count', 'mean', 'm2')
+    
+    def __init__(self, count: int = 0):
+        # `count` valores iniciales iguales a 0
+        self.count = count
+        self.mean = 0.0
+        self.m2 = 0.0
+    
+    def add(self, value: float) -> None:
+        """Agrega un valor."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+    
+    def replace(self, old: float, new: float) -> None:
+        """Reemplaza un valor ya agregado por otro sin cambiar la cantidad."""
+        delta = new - old
+        previous_mean = self.mean
+        self.mean += delta / self.count
+        self.m2 = max(0.0, self.m2 + delta * (new - self.mean + old - previous_mean))
+    
+    @property
+    def variance(self) -> float:
+        """Varianza muestral; NaN con menos de dos valores."""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+class _Session:
+    """Estado en memoria de una sesión de conteo."""
+    __slots__ = ('session_id', 'quadrant_volume', 'dilution_factor', 'confidence_level', 'z',
+                 'factor', 'live', 'dead', 'live_stats', 'live_total', 'dead_total', 'version', 'closed',
+                 'condition', 'last_activity')
+    
+    def __init__(self, session_id: str, num_quadrants: int, quadrant_volume: float,
+                 dilution_factor: float, confidence_level: float):
+        self.session_id = session_id
+        self.quadrant_volume = quadrant_volume
+        self.dilution_factor = dilution_factor
+        self.confidence_level = confidence_level
+        self.z = NeubauerService.z_score(confidence_level)
+        self.factor = NeubauerService.concentration_factor(num_quadrants, quadrant_volume, dilution_factor)
+        self.live = [0] * num_quadrants
+        self.dead = [0] * num_quadrants
+        self.live_stats = RunningStatistics(num_quadrants)
+        self.live_total = 0
+        self.dead_total = 0
+        self.version = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        self.last_activity = time.monotonic()
+
+class CountingSessionService:
+    """Servicio de sesiones de conteo manual en vivo (contador de clics o tableta)."""
+    
+    # Las sesiones sin actividad se descartan después de este tiempo (segundos)
+    SESSION_TTL = 4 * 60 * 60
+    MAX_SESSIONS = 1000
+    MAX_QUADRANTS = 25
+    # Cada cuánto se envía un comentario para mantener abierta la conexión de eventos
+    KEEPALIVE_SECONDS = 15.0
+    
+    _sessions: Dict[str, _Session] = {}
+    _lock = threading.Lock()
+    
+    @classmethod
+    def create_session(cls, num_quadrants: int, quadrant_volume: float, dilution_factor: float,
+                       confidence_level: float = 0.95) -> CountingSnapshot:
+        """
+        Abre una sesión con todos los cuadrantes en 0.
+        
+        Raises:
+            CountingSessionError: Si los parámetros no son válidos o hay demasiadas sesiones abiertas
+        """
+        if not isinstance(num_quadrants, int) or not 1 <= num_quadrants <= cls.MAX_QUADRANTS:
+            raise CountingSessionError(f"El número de cuadrantes debe estar entre 1 y {cls.MAX_QUADRANTS}")
+        if not quadrant_volume > 0:
+            raise CountingSessionError("El volumen del cuadrante debe ser mayor a 0")
+        if not dilution_factor > 0:
+            raise CountingSessionError("El factor de dilución debe ser mayor a 0")
+        try:
+            session = _Session(uuid.uuid4().hex, num_quadrants, quadrant_volume,
+                               dilution_factor, confidence_level)
+        except NeubauerError as e:
+            raise CountingSessionError(str(e))
+        
+        with cls._lock:
+            cls._purge_expired()
+            if len(cls._sessions) >= cls.MAX_SESSIONS:
+                raise CountingSessionError("Hay demasiadas sesiones de conteo abiertas; cierra alguna")
+            cls._sessions[session.session_id] = session
+        return cls._snapshot(session)
+    
+    @classmethod
+    def record_click(cls, session_id: str, quadrant: int, dead: bool = False, delta: int = 1) -> CountingSnapshot:
+        """
+        Registra un clic (o lo deshace con delta=-1) y devuelve el estado actualizado.
+        
+        Solo se actualizan las sumas y la varianza de Welford: el costo no
+        depende de cuántas células se llevan contadas.
+        
+        Args:
+            session_id: Identificador de la sesión
+            quadrant: Cuadrante, empezando en 1
+            dead: True si la célula está teñida con azul tripano
+            delta: +1 para contar, -1 para deshacer
+        
+        Raises:
+            CountingSessionNotFound: Si la sesión no existe
+            CountingSessionError: Si el cuadrante, `dead` o el delta no son válidos
+        """
+        # bool es subclase de int: True no debe pasar por un cuadrante o un delta de 1
+        if isinstance(delta, bool) or delta not in (1, -1):
+            raise CountingSessionError("Cada clic suma 1 o, para deshacer, resta 1")
+        if not isinstance(dead, bool):
+            raise CountingSessionError("El campo muerta debe ser true o false")
+        session = cls._get(session_id)
+        with session.condition:
+            if session.closed:
+                raise CountingSessionNotFound("La sesión de conteo ya se cerró")
+            if isinstance(quadrant, bool) or not isinstance(quadrant, int) or not 1 <= quadrant <= len(session.live):
+                raise CountingSessionError(f"El cuadrante debe estar entre 1 y {len(session.live)}")
+            
+            index = quadrant - 1
+            counts = session.dead if dead else session.live
+            if counts[index] + delta < 0:
+                raise CountingSessionError(f"El cuadrante {quadrant} no tiene células para descontar")
+            counts[index] += delta
+            if dead:
+                session.dead_total += delta
+            else:
+                session.live_total += delta
+                session.live_stats.replace(counts[index] - delta, counts[index])
+            
+            session.version += 1
+            session.last_activity = time.monotonic()
+            snapshot = cls._snapshot(session)
+            session.condition.notify_all()
+        return snapshot
+    
+    @classmethod
+    def get_snapshot(cls, session_id: str) -> CountingSnapshot:
+        """Estado actual de la sesión."""
+        session = cls._get(session_id)
+        with session.condition:
+            return cls._snapshot(session)
+    
+    @classmethod
+    def watch(cls, session_id: str, keepalive: Optional[float] = None) -> Iterator[Optional[CountingSnapshot]]:
+        """
+        Genera el estado de la sesión cada vez que cambia.
+        
+        Empieza con el estado actual; si pasa `keepalive` segundos sin cambios
+        genera None para que el llamador mantenga viva la conexión. Termina
+        cuando la sesión se cierra o expira.
+        """
+        session = cls._get(session_id)
+        keepalive = cls.KEEPALIVE_SECONDS if keepalive is None else keepalive
+        version = -1
+        while True:
+            with session.condition:
+                session.condition.wait_for(lambda: session.closed or session.version != version, keepalive)
+                if session.closed:
+                    return
+                snapshot = cls._snapshot(session) if session.version != version else None
+            if snapshot is not None:
+                version = snapshot.version
+            yield snapshot
+    
+    @classmethod
+    def finish(cls, session_id: str) -> NeubauerResult:
+        """
+        Cierra la sesión y devuelve el resultado completo de Neubauer con sus conteos.
+        
+        Raises:
+            CountingSessionNotFound: Si la sesión no existe
+        """
+        with cls._lock:
+            cls._purge_expired()
+            session = cls._sessions.pop(session_id, None)
+        if session is None:
+            raise CountingSessionNotFound("La sesión de conteo no existe o expiró")
+        
+        with session.condition:
+            session.closed = True
+            session.condition.notify_all()
+            return NeubauerService.calculate_concentration(NeubauerRequest(
+                num_quadrants=len(session.live),
+                quadrant_volume=session.quadrant_volume,
+                dilution_factor=session.dilution_factor,
+                cell_counts=list(session.live),
+                dead_counts=list(session.dead) if session.dead_total else None,
+                confidence_level=session.confidence_level,
+            ))
+    
+    @classmethod
+    def _get(cls, session_id: str) -> _Session:
+        """Busca una sesión abierta; de paso descarta las que expiraron."""
+        with cls._lock:
+            cls._purge_expired()
+            session = cls._sessions.get(session_id)
+        if session is None:
+            raise CountingSessionNotFound("La sesión de conteo no existe o expiró")
+        return session
+    
+    @classmethod
+    def _purge_expired(cls) -> None:
+        """Cierra las sesiones sin actividad reciente (con _lock tomado)."""
+        limit = time.monotonic() - cls.SESSION_TTL
+        for session_id in [key for key, session in cls._sessions.items() if session.last_activity < limit]:
+            session = cls._sessions.pop(session_id)
+            with session.condition:
+                session.closed = True
+                session.condition.notify_all()
+    
+    @staticmethod
+    def _snapshot(session: _Session) -> CountingSnapshot:
+        """Calcula el estado a partir de las sumas acumuladas, en tiempo constante."""
+        stats = session.live_stats
+        total = session.live_total
+        low, high = NeubauerService.poisson_interval(total, session.z)
+        cv = math.sqrt(stats.variance) / stats.mean * 100 if stats.count > 1 and total > 0 else None
+        viability = None
+        if session.dead_total:
+            viability = total / (total + session.dead_total) * 100
+        
+        return CountingSnapshot(
+            session_id=session.session_id,
+            version=session.version,
+            live_counts=list(session.live),
+            dead_counts=list(session.dead),
+            total_cells=total,
+            dead_cells=session.dead_total,
+            average_cells=stats.mean,
+            concentration=total * session.factor,
+            concentration_ci_low=float(low) * session.factor,
+            concentration_ci_high=float(high) * session.factor,
+            cv_percent=cv,
+            viability_percent=viability,
+        )
@@ -0,0 +1,214 @@
+"""
+Registro de ecuaciones con resolvedores precompilados.
+
+Cada relación se declara una sola vez como producto de variables y constantes.
+Un EquationSystem agrupa relaciones y, al construirse, precompila un plan de
+resolución para cada combinación de variables presentes. Resolver consiste en
+calcular la máscara de bits de los campos presentes y buscar su plan en una
+tabla, sin cadenas de if/elif.
+"""
+from operator import mul
+from functools import reduce
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..models.concentration import ConcentrationError
+
+Term = Union[str, float]
+
+def _product(terms: Sequence[Term], values: Mapping[str, object]):
+    """Multiplica variables (por nombre) y constantes; devuelve None si no hay términos."""
+    factors = [values[term] if isinstance(term, str) else term for term in terms]
+    return reduce(mul, factors) if factors else None
+
+class Relation(NamedTuple):
+    """
+    Relación de la forma salida = Π(numerador) / Π(denominador).
+    
+    Los términos son nombres de variables o constantes numéricas, p. ej.
+    Relation('concentration_mg_ml', ('mass_g', 1000), ('volume_ml',)).
+    Las variables de `positive` deben ser mayores a 0 siempre que se use la
+    relación; los divisores se validan además automáticamente.
+    """
+    output: str
+    numerator: Tuple[Term, ...] = ()
+    denominator: Tuple[Term, ...] = ()
+    positive: Tuple[str, ...] = ()
+    positive_message: Optional[str] = None
+    
+    @property
+    def variables(self) -> Tuple[str, ...]:
+        """Variables de la relación, empezando por la salida."""
+        terms = (self.output,) + self.numerator + self.denominator
+        return tuple(term for term in terms if isinstance(term, str))
+    
+    def solver_for(self, target: str) -> Tuple[Callable[[Mapping[str, object]], object], Tuple[str, ...]]:
+        """Despeja `target` y devuelve la función que lo calcula y las variables que actúan como divisor."""
+        if target == self.output:
+            top, bottom = self.numerator, self.denominator
+        elif target in self.numerator:
+            rest = list(self.numerator)
+            rest.remove(target)
+            top, bottom = (self.output,) + self.denominator, tuple(rest)
+        elif target in self.denominator:
+            rest = list(self.denominator)
+            rest.remove(target)
+            top, bottom = self.numerator, (self.output,) + tuple(rest)
+        else:
+            raise ValueError(f"{target} no pertenece a la relación de {self.output}")
+    
+        def solve(values):
+            numerator = _product(top, values)
+            if numerator is None:
+                numerator = 1.0
+            denominator = _product(bottom, values)
+            return numerator if denominator is None else numerator / denominator
+    
+        return solve, tuple(term for term in bottom if isinstance(term, str))
+
+class _Step(NamedTuple):
+    """Paso de un plan: variable que se despeja, cómo y qué debe ser positivo antes."""
+    target: str
+    solve: Callable[[Mapping[str, object]], object]
+    checks: Tuple[Tuple[str, str], ...]
+
+class _SolverPlan(NamedTuple):
+    """Plan precompilado para una combinación de variables presentes."""
+    given: Tuple[str, ...]
+    steps: Tuple[_Step, ...]
+    known: Tuple[str, ...]
+    
+    def solve(self, values: Mapping[str, Optional[float]]) -> Dict[str, float]:
+        """Resuelve valores escalares; lanza ConcentrationError si un valor no es positivo."""
+        solved = {name: values[name] for name in self.given}
+        for step in self.steps:
+            for name, message in step.checks:
+                if solved[name] <= 0:
+                    raise ConcentrationError(message)
+            solved[step.target] = step.solve(solved)
+        return solved
+    
+    def solve_arrays(self, values: Mapping[str, np.ndarray]) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """Resuelve columnas completas; devuelve los valores y la máscara de filas con valores no positivos."""
+        solved = {name: values[name] for name in self.given}
+        invalid = np.zeros(len(next(iter(values.values()))), dtype=bool)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for step in self.steps:
+                for name, _ in step.checks:
+                    invalid |= ~(solved[name] > 0)
+                solved[step.target] = step.solve(solved)
+        return solved, invalid
+
+class EquationSystem:
+    """
+    Conjunto de relaciones con un plan precompilado por cada máscara de variables presentes.
+    
+    Los planes se obtienen propagando relaciones con una sola incógnita hasta
+    que no se pueda despejar nada más. Los valores dados nunca se recalculan,
+    por eso, salvo con `allow_overdetermined=True`, se rechazan las
+    combinaciones en las que una relación queda con todas sus variables
+    conocidas sin haberse usado para despejar ninguna: sus datos podrían
+    contradecirse (p. ej. moles, volumen y molaridad a la vez). Si se indican
+    `outputs`, el plan debe despejar al menos una de esas variables.
+    """
+    
+    DEFAULT_POSITIVE_MESSAGE = "El valor de {name} debe ser mayor a 0"
+    
+    def __init__(self, relations: Iterable[Relation], required: Sequence[str], insufficient_message: str,
+                 positive_messages: Optional[Mapping[str, str]] = None, allow_overdetermined: bool = False,
+                 overdetermined_message: Optional[str] = None, outputs: Optional[Iterable[str]] = None):
+        self.relations = tuple(relations)
+        self.required = tuple(required)
+        self.insufficient_message = insufficient_message
+        self.overdetermined_message = overdetermined_message or insufficient_message
+        self.positive_messages = dict(positive_messages or {})
+        self.allow_overdetermined = allow_overdetermined
+        self.outputs = None if outputs is None else frozenset(outputs)
+        self.variables = tuple(dict.fromkeys(
+            name for relation in self.relations for name in relation.variables
+        ))
+        self._bits = tuple((name, 1 << index) for index, name in enumerate(self.variables))
+        self._overdetermined = set()
+        self._plans: List[Optional[_SolverPlan]] = [
+            self._compile(mask) for mask in range(1 << len(self.variables))
+        ]
+    
+    def mask(self, values: Mapping[str, Optional[float]]) -> int:
+        """Máscara de bits de las variables presentes (distintas de None)."""
+        mask = 0
+        for name, bit in self._bits:
+            if values.get(name) is not None:
+                mask |= bit
+        return mask
+    
+    def mask_array(self, present: Mapping[str, np.ndarray], size: int) -> np.ndarray:
+        """Máscara de bits por fila a partir de máscaras booleanas de presencia."""
+        masks = np.zeros(size, dtype=np.int64)
+        for name, bit in self._bits:
+            if name in present:
+                masks[present[name]] |= bit
+        return masks
+    
+    def plan(self, mask: int) -> Optional[_SolverPlan]:
+        """Plan precompilado para la máscara, o None si los datos no alcanzan o sobran."""
+        return self._plans[mask]
+    
+    def is_overdetermined(self, mask: int) -> bool:
+        """True si la máscara no tiene plan porque sus datos podrían contradecirse."""
+        return mask in self._overdetermined
+    
+    def solve(self, values: Mapping[str, Optional[float]]) -> Dict[str, float]:
+        """
+        Despeja todas las variables posibles a partir de las presentes.
+    
+        Raises:
+            ConcentrationError: Si los datos no alcanzan, sobran o un valor no es positivo
+        """
+        mask = self.mask(values)
+        plan = self._plans[mask]
+        if plan is None:
+            raise ConcentrationError(self.overdetermined_message if mask in self._overdetermined
+                                     else self.insufficient_message)
+        return plan.solve(values)
+    
+    def _compile(self, mask: int) -> Optional[_SolverPlan]:
+        """Arma el plan de resolución para una máscara de variables presentes."""
+        given = tuple(name for name, bit in self._bits if mask & bit)
+        known = set(given)
+    
+        steps = []
+        used = set()
+        progress = True
+        while progress:
+            progress = False
+            for index, relation in enumerate(self.relations):
+                unknown = [name for name in relation.variables if name not in known]
+                if len(unknown) != 1:
+                    continue
+                used.add(index)
+                target = unknown[0]
+                solve, divisors = relation.solver_for(target)
+                checked = dict.fromkeys(name for name in relation.positive if name != target)
+                checked.update(dict.fromkeys(divisors))
+                checks = tuple((name, self._positive_message(relation, name)) for name in checked)
+                steps.append(_Step(target, solve, checks))
+                known.add(target)
+                progress = True
+    
+        if not self.allow_overdetermined and any(
+            index not in used and set(relation.variables) <= known
+            for index, relation in enumerate(self.relations)
+        ):
+            self._overdetermined.add(mask)
+            return None
+        if not known.issuperset(self.required):
+            return None
+        if self.outputs is not None and not any(step.target in self.outputs for step in steps):
+            return None
+        return _SolverPlan(given, tuple(steps), tuple(name for name in self.variables if name in known))
+    
+    def _positive_message(self, relation: Relation, name: str) -> str:
+        if relation.positive_message:
+            return relation.positive_message
+        return self.positive_messages.get(name, self.DEFAULT_POSITIVE_MESSAGE.format(name=name))
@@ -0,0 +1,110 @@
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from ..models.formula import ATOMIC_WEIGHTS, FormulaError
+
+class FormulaService:
+    """Servicio para interpretar fórmulas químicas y calcular masas molares."""
+    
+    # Número máximo de fórmulas distintas cuya masa molar se mantiene en memoria
+    FORMULA_CACHE_SIZE = 1024
+    
+    # Separadores de hidratos y aductos: CuSO4·5H2O, CuSO4.5H2O, CuSO4*5H2O
+    _ADDUCT_SEPARATORS = re.compile(r'[·•∙.*]')
+    _TOKEN_PATTERN = re.compile(r'([A-Z][a-z]?)|(\d+)|([(\[])|([)\]])|(\s+)|(.)')
+    _CLOSING = {'(': ')', '[': ']'}
+    
+    @classmethod
+    def molar_mass(cls, formula: str) -> float:
+        """
+        Calcula la masa molar (g/mol) de una fórmula como "Ca(OH)2" o "CuSO4·5H2O".
+        
+        El resultado se memoriza en una caché LRU, de modo que los mismos
+        reactivos no se vuelven a interpretar en cálculos repetidos.
+        
+        Raises:
+            FormulaError: Si la fórmula no es válida o contiene elementos desconocidos
+        """
+        if not isinstance(formula, str) or not formula.strip():
+            raise FormulaError("Debes indicar una fórmula química")
+        return cls._molar_mass_cached(formula.strip())
+    
+    @classmethod
+    def parse(cls, formula: str) -> Dict[str, int]:
+        """
+        Devuelve la composición elemental de una fórmula.
+        
+        Admite paréntesis y corchetes anidados con subíndices, y aductos
+        separados por "·", "." o "*" con coeficiente inicial opcional (5H2O).
+        
+        Returns:
+            Diccionario elemento -> número de átomos, en orden de aparición
+            
+        Raises:
+            FormulaError: Si la fórmula no es válida o contiene elementos desconocidos
+        """
+        if not isinstance(formula, str) or not formula.strip():
+            raise FormulaError("Debes indicar una fórmula química")
+        
+        composition = Counter()
+        for part in cls._ADDUCT_SEPARATORS.split(formula.strip()):
+            match = re.match(r'\s*(\d*)(.*)$', part)
+            coefficient = int(match.group(1) or 1)
+            body = match.group(2)
+            if not body.strip() or coefficient == 0:
+                raise FormulaError(f"Fórmula química no válida: {formula}")
+            for element, count in cls._parse_group(body, formula).items():
+                composition[element] += count * coefficient
+        return dict(composition)
+    
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Vacía la caché de masas molares."""
+        cls._molar_mass_cached.cache_clear()
+    
+    @classmethod
+    @lru_cache(maxsize=FORMULA_CACHE_SIZE)
+    def _molar_mass_cached(cls, formula: str) -> float:
+        return sum(ATOMIC_WEIGHTS[element] * count for element, count in cls.parse(formula).items())
+    
+    @classmethod
+    def _parse_group(cls, body: str, formula: str) -> Counter:
+        """Interpreta una fórmula sin aductos usando una pila para los grupos entre paréntesis."""
+        stack: List[Tuple[Counter, str]] = [(Counter(), '')]
+        last: Counter = None
+        
+        for element, digits, opening, closing, spaces, other in cls._TOKEN_PATTERN.findall(body):
+            if spaces:
+                continue
+            if other:
+                raise FormulaError(f"Carácter no válido {other!r} en la fórmula {formula}")
+            
+            if element:
+                if element not in ATOMIC_WEIGHTS:
+                    raise FormulaError(f"Elemento desconocido {element!r} en la fórmula {formula}")
+                last = Counter({element: 1})
+                stack[-1][0].update(last)
+            elif digits:
+                if last is None or int(digits) == 0:
+                    raise FormulaError(f"Subíndice fuera de lugar en la fórmula {formula}")
+                # El grupo anterior ya se sumó una vez; se agregan las repeticiones restantes
+                for name, count in last.items():
+                    stack[-1][0][name] += count * (int(digits) - 1)
+                last = None
+            elif opening:
+                stack.append((Counter(), cls._CLOSING[opening]))
+                last = None
+            elif closing:
+                group, expected = stack.pop() if len(stack) > 1 else (None, None)
+                if closing != expected or not group:
+                    raise FormulaError(f"Paréntesis desbalanceados en la fórmula {formula}")
+                stack[-1][0].update(group)
+                last = group
+        
+        if len(stack) != 1:
+            raise FormulaError(f"Paréntesis desbalanceados en la fórmula {formula}")
+        if not stack[0][0]:
+            raise FormulaError(f"Fórmula química no válida: {formula}")
+        return stack[0][0]
@@ -0,0 +1,485 @@
+import atexit
+import io
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from ..models.hemocytometer import CellCountRequest, CellCountResult, CellPolarity, HemocytometerError
+from ..models.neubauer import NeubauerRequest
+
+class _TileParams(NamedTuple):
+    """Parámetros del detector que se envían a cada franja."""
+    sign: float                 # +1 para células claras, -1 para oscuras
+    small_width: int            # Ancho de caja del suavizado fino (≈ σ del tamaño celular)
+    large_width: int            # Ancho de caja del suavizado del fondo
+    radius: int                 # Radio de la ventana de máximos locales
+    halo: int                   # Filas extra a cada lado para que los bordes no afecten
+    row_mask: np.ndarray        # Filas ocupadas por líneas de la cuadrícula
+    column_mask: np.ndarray     # Columnas ocupadas por líneas de la cuadrícula
+
+class HemocytometerService:
+    """Servicio para contar células automáticamente en micrografías de la cámara de Neubauer."""
+    
+    # Las imágenes se reducen para que una célula mida unos pocos píxeles
+    TARGET_CELL_DIAMETER = 6.0
+    # Franjas de trabajo (en píxeles reducidos) y tamaño mínimo para usar varios procesos
+    TILE_ROWS = 256
+    PARALLEL_MIN_PIXELS = 2_000_000
+    # Tope del grupo de procesos; una imagen de 20 MP tiene unas 8 franjas
+    MAX_WORKERS = 8
+    # Umbral de las líneas de la cuadrícula en desviaciones robustas del perfil
+    GRID_LINE_THRESHOLD = 6.0
+    GRID_LINE_RELATIVE = 0.25
+    PROFILE_SAMPLES = 512
+    # Factor de la MAD para estimar la desviación estándar de una normal
+    MAD_TO_SIGMA = 1.4826
+    
+    _executor: Optional[ProcessPoolExecutor] = None
+    _executor_lock = threading.Lock()
+    
+    @classmethod
+    def count_image(cls, data: bytes, request: CellCountRequest) -> CellCountResult:
+        """Decodifica una imagen y cuenta las células de cada cuadrante."""
+        return cls.count_cells(cls.decode_image(data), request)
+    
+    @classmethod
+    def count_cells(cls, image: np.ndarray, request: CellCountRequest) -> CellCountResult:
+        """
+        Cuenta las células de cada cuadrante de una micrografía en escala de grises.
+        
+        1. Reduce la imagen por promedio de bloques hasta que una célula mida
+           unos TARGET_CELL_DIAMETER píxeles.
+        2. Detecta las líneas de la cuadrícula como picos de los perfiles de
+           intensidad por fila y por columna; los cuadrantes son los espacios
+           entre líneas consecutivas.
+        3. Detecta las células como máximos locales de una diferencia de
+           suavizados (DoG) que superan `sensitivity` desviaciones robustas
+           del fondo, fuera de las líneas de la cuadrícula.
+        
+        El paso 3 se hace por franjas horizontales con un margen de solapamiento;
+        en imágenes grandes las franjas se reparten entre varios procesos que
+        leen la imagen desde memoria compartida.
+        
+        Raises:
+            HemocytometerError: Si la imagen o los parámetros no son válidos
+        """
+        image = np.asarray(image)
+        if image.ndim == 3:
+            image = cls._to_grayscale(image)
+        if image.ndim != 2 or min(image.shape) < 16:
+            raise HemocytometerError("La imagen debe ser una matriz 2D de al menos 16 × 16 píxeles")
+        if not request.cell_diameter_px > 0:
+            raise HemocytometerError("El diámetro de las células debe ser mayor a 0")
+        if not request.sensitivity > 0:
+            raise HemocytometerError("La sensibilidad debe ser mayor a 0")
+        if request.max_quadrants is not None and request.max_quadrants < 1:
+            raise HemocytometerError("El número máximo de cuadrantes debe ser al menos 1")
+        
+        height, width = image.shape
+        scale = max(1, int(request.cell_diameter_px // cls.TARGET_CELL_DIAMETER))
+        work = cls._downsample(image, scale)
+        diameter = request.cell_diameter_px / scale
+        
+        # Cuadrícula: bandas de líneas y cuadrantes entre ellas. La mediana hace que
+        # los perfiles reflejen las líneas, que cruzan toda la imagen, y no las células
+        min_spacing = max(4, int(round(4 * diameter)))
+        row_bands = cls._grid_bands(cls._profile(work, axis=1), min_spacing)
+        column_bands = cls._grid_bands(cls._profile(work, axis=0), min_spacing)
+        row_regions = cls._regions(row_bands, work.shape[0], min_spacing)
+        column_regions = cls._regions(column_bands, work.shape[1], min_spacing)
+        
+        # Borrar las líneas interpolando entre sus bordes para que el DoG no responda a ellas
+        work = cls._erase_bands(work, row_bands, axis=0)
+        work = cls._erase_bands(work, column_bands, axis=1)
+        
+        radius = max(1, int(round(diameter / 2)))
+        small_sigma = max(0.5, diameter / (2 * math.sqrt(2)))
+        large_width = _box_width(1.6 * small_sigma)
+        params = _TileParams(
+            sign=1.0,
+            small_width=_box_width(small_sigma),
+            large_width=large_width,
+            radius=radius,
+            halo=2 * large_width + radius,
+            row_mask=cls._band_mask(row_bands, work.shape[0], 1),
+            column_mask=cls._band_mask(column_bands, work.shape[1], 1),
+        )
+        polarity = request.polarity
+        if polarity == CellPolarity.AUTO:
+            polarity = cls._detect_polarity(work, params)
+        params = params._replace(sign=1.0 if polarity == CellPolarity.BRIGHT else -1.0)
+        
+        ys, xs, values, noise, tiles = cls._detect_peaks(work, params)
+        keep = values > request.sensitivity * noise
+        ys, xs = ys[keep], xs[keep]
+        
+        # Asignar cada célula al cuadrante que contiene su centro
+        boxes = [(c0, r0, c1, r1) for r0, r1 in row_regions for c0, c1 in column_regions]
+        if request.max_quadrants is not None:
+            boxes = boxes[:request.max_quadrants]
+        counts = []
+        positions = []
+        for x0, y0, x1, y1 in boxes:
+            inside = (ys >= y0) & (ys < y1) & (xs >= x0) & (xs < x1)
+            counts.append(int(inside.sum()))
+            positions.extend(zip(((xs[inside] + 0.5) * scale).tolist(), ((ys[inside] + 0.5) * scale).tolist()))
+        
+        notes = None
+        if len(boxes) == 1 and not (row_bands or column_bands):
+            notes = "No se detectaron líneas de la cuadrícula; se contó toda la imagen como un cuadrante"
+        
+        return CellCountResult(
+            image_width=width,
+            image_height=height,
+            row_lines=[int(((start + stop) / 2 + 0.5) * scale) for start, stop in row_bands],
+            column_lines=[int(((start + stop) / 2 + 0.5) * scale) for start, stop in column_bands],
+            quadrant_boxes=[(x0 * scale, y0 * scale, x1 * scale, y1 * scale) for x0, y0, x1, y1 in boxes],
+            quadrant_counts=counts,
+            cell_positions=positions,
+            polarity=polarity,
+            tiles=tiles,
+            notes=notes,
+        )
+    
+    @staticmethod
+    def to_neubauer_request(result: CellCountResult, quadrant_volume: float,
+                            dilution_factor: float) -> NeubauerRequest:
+        """Arma la solicitud de Neubauer con los conteos por cuadrante de la imagen."""
+        if not result.quadrant_counts:
+            raise HemocytometerError("No se detectó ningún cuadrante en la imagen")
+        return NeubauerRequest(
+            num_quadrants=len(result.quadrant_counts),
+            quadrant_volume=quadrant_volume,
+            dilution_factor=dilution_factor,
+            cell_counts=list(result.quadrant_counts),
+        )
+    
+    @classmethod
+    def decode_image(cls, data: bytes) -> np.ndarray:
+        """
+        Decodifica una imagen a escala de grises.
+        
+        PGM y PPM binarios (P5/P6) se leen directamente con NumPy; PNG, JPEG y
+        TIFF requieren Pillow.
+        
+        Raises:
+            HemocytometerError: Si el formato no es válido o no se puede leer
+        """
+        if not data:
+            raise HemocytometerError("La imagen está vacía")
+        if data[:2] in (b'P5', b'P6'):
+            return cls._decode_netpbm(data)
+        
+        try:
+            from PIL import Image
+        except ImportError:
+            raise HemocytometerError(
+                "Para leer PNG, JPEG o TIFF instala Pillow; sin él solo se aceptan imágenes PGM/PPM"
+            )
+        try:
+            with Image.open(io.BytesIO(data)) as picture:
+                return np.asarray(picture.convert('L'), dtype=np.float32)
+        except (OSError, ValueError):
+            raise HemocytometerError("No se pudo leer la imagen")
+    
+    @staticmethod
+    def _decode_netpbm(data: bytes) -> np.ndarray:
+        """Lee un PGM (P5) o PPM (P6) binario."""
+        tokens = []
+        position = 2
+        while len(tokens) < 3:
+            while position < len(data) and data[position:position + 1].isspace():
+                position += 1
+            if data[position:position + 1] == b'#':
+                position = data.find(b'\n', position) + 1 or len(data)
+                continue
+            start = position
+            while position < len(data) and not data[position:position + 1].isspace():
+                position += 1
+            if start == position:
+                raise HemocytometerError("Encabezado PGM/PPM incompleto")
+            tokens.append(data[start:position])
+        position += 1
+        
+        try:
+            width, height, maxval = (int(token) for token in tokens)
+        except ValueError:
+            raise HemocytometerError("Encabezado PGM/PPM no válido")
+        channels = 1 if data[:2] == b'P5' else 3
+        dtype = np.dtype('u1') if maxval < 256 else np.dtype('>u2')
+        size = width * height * channels
+        pixels = np.frombuffer(data, dtype=dtype, count=size, offset=position) \
+            if len(data) - position >= size * dtype.itemsize else None
+        if pixels is None:
+            raise HemocytometerError("La imagen PGM/PPM está truncada")
+        
+        image = pixels.reshape(height, width, channels).astype(np.float32)
+        if channels == 3:
+            return HemocytometerService._to_grayscale(image)
+        return image[:, :, 0]
+    
+    @staticmethod
+    def _to_grayscale(image: np.ndarray) -> np.ndarray:
+        """Luminancia de una imagen RGB(A)."""
+        return image[..., :3].astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    
+    @staticmethod
+    def _downsample(image: np.ndarray, scale: int) -> np.ndarray:
+        """Reduce la imagen promediando bloques de scale × scale píxeles."""
+        if scale == 1:
+            return np.ascontiguousarray(image, dtype=np.float32)
+        height, width = (image.shape[0] // scale) * scale, (image.shape[1] // scale) * scale
+        # Sumas de cortes con paso en lugar de sum(axis=(1, 3)) sobre bloques: la reducción
+        # por ejes no contiguos es varias veces más lenta en imágenes de decenas de megapíxeles
+        rows = np.zeros((height // scale, width), dtype=np.float32)
+        for offset in range(scale):
+            rows += image[offset:height:scale, :width]
+        blocks = np.zeros((height // scale, width // scale), dtype=np.float32)
+        for offset in range(scale):
+            blocks += rows[:, offset::scale]
+        blocks /= np.float32(scale * scale)
+        return blocks
+    
+    @classmethod
+    def _profile(cls, work: np.ndarray, axis: int) -> np.ndarray:
+        """Mediana de intensidad a lo largo de un eje, sobre una muestra de a lo sumo PROFILE_SAMPLES posiciones."""
+        step = max(1, work.shape[axis] // cls.PROFILE_SAMPLES)
+        sample = work[:, ::step] if axis == 1 else work[::step]
+        return np.median(sample, axis=axis)
+    
+    @classmethod
+    def _grid_bands(cls, profile: np.ndarray, min_spacing: int) -> List[Tuple[int, int]]:
+        """
+        Bandas (inicio, fin) de las líneas de la cuadrícula en un perfil de intensidad.
+        
+        Una línea es un pico del perfil respecto de su mediana móvil que supera
+        GRID_LINE_THRESHOLD desviaciones robustas y GRID_LINE_RELATIVE veces el
+        pico más marcado; los picos más cercanos que `min_spacing` (p. ej. las líneas triples) forman una sola banda.
+        """
+        window = min(2 * min_spacing + 1, profile.size // 2 * 2 - 1)
+        padded = np.pad(profile, window // 2, mode='edge')
+        trend = np.median(np.lib.stride_tricks.sliding_window_view(padded, window), axis=1)
+        deviation = profile - trend
+        center = np.median(deviation)
+        spread = cls.MAD_TO_SIGMA * np.median(np.abs(deviation - center))
+        if spread == 0:
+            spread = np.std(deviation)
+        if spread == 0:
+            return []
+        
+        # Las líneas reales tienen un contraste parecido entre sí y muy superior al de las
+        # filas con muchas células, así que también se exige una fracción de la más marcada
+        distance = np.abs(deviation - center)
+        threshold = max(cls.GRID_LINE_THRESHOLD * spread, cls.GRID_LINE_RELATIVE * distance.max())
+        lines = np.flatnonzero(distance > threshold)
+        if lines.size == 0:
+            return []
+        breaks = np.flatnonzero(np.diff(lines) > min_spacing)
+        starts = np.concatenate(([lines[0]], lines[breaks + 1]))
+        stops = np.concatenate((lines[breaks], [lines[-1]]))
+        return list(zip(starts.tolist(), stops.tolist()))
+    
+    @staticmethod
+    def _regions(bands: List[Tuple[int, int]], length: int, min_spacing: int) -> List[Tuple[int, int]]:
+        """Espacios entre bandas consecutivas; sin al menos dos líneas se usa toda la imagen."""
+        if len(bands) < 2:
+            return [(0, length)]
+        regions = [(bands[i][1] + 1, bands[i + 1][0]) for i in range(len(bands) - 1)]
+        return [(start, stop) for start, stop in regions if stop - start >= min_spacing]
+    
+    @staticmethod
+    def _erase_bands(work: np.ndarray, bands: List[Tuple[int, int]], axis: int) -> np.ndarray:
+        """Reemplaza cada banda por la interpolación lineal entre las filas (o columnas) que la rodean."""
+        if not bands:
+            return work
+        erased = np.moveaxis(work.copy(), axis, 0)
+        last = erased.shape[0] - 1
+        for start, stop in bands:
+            before, after = max(0, start - 1), min(last, stop + 1)
+            weights = np.linspace(0, 1, stop - start + 3, dtype=np.float32)[1:-1, None]
+            erased[start:stop + 1] = (1 - weights) * erased[before] + weights * erased[after]
+        return np.moveaxis(erased, 0, axis)
+    
+    @staticmethod
+    def _band_mask(bands: List[Tuple[int, int]], length: int, margin: int) -> np.ndarray:
+        """Marca las posiciones ocupadas por líneas, ensanchadas en `margin` píxeles."""
+        mask = np.zeros(length, dtype=bool)
+        for start, stop in bands:
+            mask[max(0, start - margin):stop + margin + 1] = True
+        return mask
+    
+    @classmethod
+    def _detect_polarity(cls, work: np.ndarray, params: _TileParams) -> CellPolarity:
+        """Decide si las células son claras u oscuras según los extremos del DoG en la zona central."""
+        rows = min(work.shape[0], cls.TILE_ROWS)
+        start = (work.shape[0] - rows) // 2
+        response = _difference_of_boxes(work[start:start + rows], params)
+        response = response[~params.row_mask[start:start + rows]][:, ~params.column_mask]
+        if response.size == 0:
+            return CellPolarity.BRIGHT
+        low, high = np.percentile(response, [0.1, 99.9])
+        return CellPolarity.BRIGHT if abs(high) >= abs(low) else CellPolarity.DARK
+    
+    @classmethod
+    def _detect_peaks(cls, work: np.ndarray, params: _TileParams
+                      ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float, int]:
+        """
+        Busca máximos locales del DoG franja por franja.
+        
+        Returns:
+            Filas, columnas y respuesta de cada candidato, ruido global estimado
+            (mediana de la MAD de cada franja) y número de franjas
+        """
+        bounds = [(start, min(start + cls.TILE_ROWS, work.shape[0]))
+                  for start in range(0, work.shape[0], cls.TILE_ROWS)]
+        
+        if cls._worker_count() > 1 and len(bounds) > 1 and work.size >= cls.PARALLEL_MIN_PIXELS:
+            memory = shared_memory.SharedMemory(create=True, size=work.nbytes)
+            try:
+                np.ndarray(work.shape, dtype=work.dtype, buffer=memory.buf)[:] = work
+                source = (memory.name, work.shape, work.dtype.str)
+                results = list(cls._get_executor().map(
+                    _detect_tile, [source] * len(bounds), *zip(*bounds), [params] * len(bounds)
+                ))
+            finally:
+                memory.close()
+                memory.unlink()
+        else:
+            results = [_detect_tile(work, start, stop, params) for start, stop in bounds]
+        
+        ys = np.concatenate([result[0] for result in results])
+        xs = np.concatenate([result[1] for result in results])
+        values = np.concatenate([result[2] for result in results])
+        noise = float(np.median([result[3] for result in results])) * cls.MAD_TO_SIGMA
+        return ys, xs, values, max(noise, np.finfo(np.float32).eps), len(bounds)
+    
+    @classmethod
+    def _worker_count(cls) -> int:
+        """Procesos del grupo: uno por núcleo, hasta MAX_WORKERS."""
+        return min(os.cpu_count() or 1, cls.MAX_WORKERS)
+    
+    @classmethod
+    def _get_executor(cls) -> ProcessPoolExecutor:
+        """
+        Grupo de procesos compartido entre solicitudes.
+        
+        Los procesos se crean con forkserver (spawn donde no existe) y no con fork:
+        el servidor atiende con hilos y un fork copiaría los locks que otro hilo
+        tuviera tomados en ese momento. El grupo se cierra al salir del proceso.
+        """
+        with cls._executor_lock:
+            if cls._executor is None:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+                cls._executor = ProcessPoolExecutor(max_workers=cls._worker_count(), mp_context=context)
+            return cls._executor
+    
+    @classmethod
+    def shutdown_executor(cls) -> None:
+        """Cierra el grupo de procesos, si existe; se vuelve a crear en el próximo uso."""
+        with cls._executor_lock:
+            executor, cls._executor = cls._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    @staticmethod
+    def get_polarities():
+        """Retorna las opciones de polaridad de las células."""
+        return [
+            {"value": CellPolarity.AUTO.value, "label": "Automática"},
+            {"value": CellPolarity.BRIGHT.value, "label": "Células claras sobre fondo oscuro"},
+            {"value": CellPolarity.DARK.value, "label": "Células oscuras sobre fondo claro"},
+        ]
+
+atexit.register(HemocytometerService.shutdown_executor)
+
+# Un píxel de cada NOISE_SAMPLE_STEP alcanza para estimar el ruido de una franja
+NOISE_SAMPLE_STEP = 7
+
+def _detect_tile(source: Union[np.ndarray, Tuple[str, Tuple[int, int], str]], start: int, stop: int,
+                 params: _TileParams) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+    """
+    Detecta candidatos en las filas [start, stop) de la imagen reducida.
+    
+    `source` es la imagen o, en los procesos del grupo, la referencia a la
+    memoria compartida. Se procesa la franja con `halo` filas extra para que
+    los suavizados no dependan del corte.
+    """
+    memory = None
+    if isinstance(source, tuple):
+        name, shape, dtype = source
+        memory = shared_memory.SharedMemory(name=name)
+        work = np.ndarray(shape, dtype=np.dtype(dtype), buffer=memory.buf)
+    else:
+        work = source
+    
+    try:
+        top = max(0, start - params.halo)
+        bottom = min(work.shape[0], stop + params.halo)
+        response = params.sign * _difference_of_boxes(work[top:bottom], params)
+    finally:
+        if memory is not None:
+            del work
+            memory.close()
+    
+    # Ruido de la franja: MAD del DoG fuera de las líneas, sobre una muestra de píxeles
+    core = response[start - top:stop - top]
+    valid = ~params.row_mask[start:stop, None] & ~params.column_mask[None, :]
+    sample = core[valid][::NOISE_SAMPLE_STEP] if valid.any() else np.zeros(1)
+    noise = float(np.median(np.abs(sample - np.median(sample))))
+    
+    peaks = (response == _max_filter(response, params.radius))[start - top:stop - top] & valid & (core > 0)
+    ys, xs = np.nonzero(peaks)
+    return ys + start, xs, core[ys, xs], noise
+
+def _difference_of_boxes(image: np.ndarray, params: _TileParams) -> np.ndarray:
+    """Diferencia de dos suavizados casi gaussianos (dos pasadas de caja por eje)."""
+    small = image
+    large = image
+    for axis in (0, 1):
+        for _ in range(2):
+            small = _box_blur(small, params.small_width, axis)
+            large = _box_blur(large, params.large_width, axis)
+    return small - large
+
+def _box_blur(values: np.ndarray, width: int, axis: int) -> np.ndarray:
+    """Promedio móvil de ancho impar a lo largo de un eje, con bordes replicados."""
+    if width <= 1:
+        return values.astype(np.float32, copy=False)
+    half = width // 2
+    moved = np.moveaxis(values, axis, 0)
+    padded = np.pad(moved, [(half + 1, half)] + [(0, 0)] * (moved.ndim - 1), mode='edge')
+    if axis == 0:
+        # np.cumsum por el primer eje de una matriz contigua es varias veces más lento
+        # que acumular fila por fila, donde cada suma recorre una fila completa
+        cumulative = padded.astype(np.float64)
+        for row in range(1, len(cumulative)):
+            cumulative[row] += cumulative[row - 1]
+    else:
+        cumulative = np.cumsum(padded, axis=0, dtype=np.float64)
+    blurred = ((cumulative[width:] - cumulative[:-width]) / width).astype(np.float32)
+    return np.moveaxis(blurred, 0, axis)
+
+def _max_filter(values: np.ndarray, radius: int) -> np.ndarray:
+    """Máximo en una ventana cuadrada de (2·radius + 1) píxeles, separable por ejes."""
+    result = values
+    for axis in (0, 1):
+        moved = np.moveaxis(result, axis, 0)
+        padded = np.pad(moved, [(radius, radius), (0, 0)], mode='constant', constant_values=-np.inf)
+        length = moved.shape[0]
+        maximum = padded[:length].copy()
+        for offset in range(1, 2 * radius + 1):
+            np.maximum(maximum, padded[offset:offset + length], out=maximum)
+        result = np.moveaxis(maximum, 0, axis)
+    return result
+
+def _box_width(sigma: float) -> int:
+    """Ancho impar de caja que, aplicado dos veces, aproxima un suavizado gaussiano de σ dado."""
+    width = int(round(math.sqrt(6 * sigma ** 2 + 1)))
+    return width if width % 2 else width + 1
@@ -1,8 +1,46 @@
-from ..models.neubauer import NeubauerRequest, NeubauerResult, NeubauerError
+import csv
+import io
+import itertools
+from statistics import NormalDist
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..models.neubauer import (
+    NeubauerRequest, NeubauerResult, NeubauerError, NeubauerBatchResult, NeubauerBatchErrorCode
+)
 
 class NeubauerService:
     """Servicio para realizar cálculos de concentración celular usando la cámara de Neubauer."""
     
+    # Columnas del CSV de muestras; el resto de las columnas son conteos por cuadrante
+    SAMPLE_COLUMN = 'muestra'
+    VOLUME_COLUMN = 'volumen_cuadrante'
+    DILUTION_COLUMN = 'factor_dilucion'
+    DEAD_COLUMN_PREFIX = 'muertas'   # Conteos de células teñidas, en el orden de los cuadrantes
+    DEFAULT_QUADRANT_VOLUME = 0.1
+    DEFAULT_DILUTION_FACTOR = 1.0
+    MAX_BATCH_ROWS = 100_000         # Muestras por archivo CSV
+    
+    RESULT_COLUMNS = (
+        'muestra', 'cuadrantes', 'total_celulas', 'promedio_celulas',
+        'volumen_cuadrante', 'factor_dilucion', 'concentracion_celulas_ml',
+        'ic_inferior_celulas_ml', 'ic_superior_celulas_ml', 'cv_porcentaje',
+        'cuadrantes_atipicos', 'viabilidad_porcentaje', 'error',
+    )
+    
+    # Un cuadrante es atípico si su aporte (x - x̄)²/x̄ supera el valor crítico de χ² con 1 grado de libertad
+    OUTLIER_SIGNIFICANCE = 0.05
+    OUTLIER_CHI_SQUARE = NormalDist().inv_cdf(1 - OUTLIER_SIGNIFICANCE / 2) ** 2
+    
+    BATCH_ERROR_MESSAGES = {
+        NeubauerBatchErrorCode.OK: None,
+        NeubauerBatchErrorCode.NO_COUNTS: "La muestra no tiene conteos",
+        NeubauerBatchErrorCode.NEGATIVE_COUNT: "Los conteos de células no pueden ser negativos",
+        NeubauerBatchErrorCode.NON_POSITIVE_PARAMETER: "El volumen del cuadrante y el factor de dilución deben ser números finitos mayores a 0",
+        NeubauerBatchErrorCode.NON_INTEGER_COUNT: "Los conteos de células deben ser números enteros",
+    }
+    
     @staticmethod
     def calculate_concentration(request: NeubauerRequest) -> NeubauerResult:
         """
@@ -37,6 +75,17 @@ class NeubauerService:
             if any(count < 0 for count in request.cell_counts):
                 raise NeubauerError("Los conteos de células no pueden ser negativos")
             
+            if request.dead_counts is not None:
+                if len(request.dead_counts) != request.num_quadrants:
+                    raise NeubauerError(
+                        f"El número de conteos de células muertas ({len(request.dead_counts)}) no coincide "
+                        f"con el número de cuadrantes ({request.num_quadrants})"
+                    )
+                if any(count is not None and count < 0 for count in request.dead_counts):
+                    raise NeubauerError("Los conteos de células muertas no pueden ser negativos")
+            
+            z = NeubauerService.z_score(request.confidence_level)
+            
             # Cálculos
             total_cells = sum(request.cell_counts)
             average_cells = total_cells / request.num_quadrants
@@ -48,13 +97,34 @@ class NeubauerService:
             # Conversión a mL (1 mL = 1000 mm³) y aplicar factor de dilución
             concentration_per_ml = concentration_per_mm3 * 1000 * request.dilution_factor
             
+            # Estadística de control de calidad, con el mismo código vectorizado que el lote
+            stats = NeubauerService._sample_statistics(
+                np.asarray([request.cell_counts], dtype=np.float64),
+                None if request.dead_counts is None else np.asarray([request.dead_counts], dtype=np.float64),
+                np.asarray([request.quadrant_volume], dtype=np.float64),
+                np.asarray([request.dilution_factor], dtype=np.float64),
+                z
+            )
+            
             return NeubauerResult(
                 concentration=concentration_per_ml,
                 total_cells=total_cells,
                 average_cells=average_cells,
                 num_quadrants=request.num_quadrants,
                 volume_per_quadrant=request.quadrant_volume,
-                dilution_factor=request.dilution_factor
+                dilution_factor=request.dilution_factor,
+                concentration_ci_low=_optional(stats['concentration_ci_low'][0]),
+                concentration_ci_high=_optional(stats['concentration_ci_high'][0]),
+                confidence_level=request.confidence_level,
+                cv_percent=_optional(stats['cv_percent'][0]),
+                chi_square=_optional(stats['chi_square'][0]),
+                outlier_quadrants=(np.flatnonzero(stats['outliers'][0]) + 1).tolist(),
+                dead_cells=None if request.dead_counts is None else sum(
+                    count for count in request.dead_counts if count is not None
+                ),
+                viability_percent=_optional(stats['viability_percent'][0]),
+                viability_ci_low=_optional(stats['viability_ci_low'][0]),
+                viability_ci_high=_optional(stats['viability_ci_high'][0])
             )
             
         except Exception as e:
@@ -93,4 +163,324 @@ class NeubauerService:
             raise NeubauerError(
                 f"El número de conteos ({len(cell_counts)}) no coincide "
                 f"con el número de cuadrantes ({num_quadrants})"
-            )
\ No newline at end of file
+            )
+    
+    @staticmethod
+    def calculate_batch(counts: Union[np.ndarray, Sequence[Sequence[float]]],
+                        quadrant_volumes: Union[np.ndarray, Sequence[float], float],
+                        dilution_factors: Union[np.ndarray, Sequence[float], float],
+                        sample_ids: Optional[Sequence[str]] = None,
+                        dead_counts: Optional[Union[np.ndarray, Sequence[Sequence[float]]]] = None,
+                        confidence_level: float = 0.95) -> NeubauerBatchResult:
+        """
+        Calcula la concentración de muchas muestras en una sola pasada de NumPy.
+        
+        Usa la misma fórmula que calculate_concentration. Cada fila de `counts` es
+        una muestra; los cuadrantes no contados se indican con NaN, así que cada
+        muestra puede tener un número distinto de cuadrantes. En lugar de lanzar
+        excepciones, cada muestra recibe un NeubauerBatchErrorCode. La estadística
+        de control de calidad (intervalos, CV, atípicos y viabilidad) se calcula
+        para todas las muestras a la vez.
+        
+        Args:
+            counts: Matriz muestras × cuadrantes con los conteos
+            quadrant_volumes: Volumen de cada cuadrante (mm³), uno por muestra o común
+            dilution_factors: Factor de dilución, uno por muestra o común
+            sample_ids: Identificadores de las muestras (por defecto 1, 2, 3...)
+            dead_counts: Conteos de células teñidas con azul tripano, con la forma de `counts`;
+                NaN en los cuadrantes sin conteo de muertas
+            confidence_level: Nivel de confianza de los intervalos
+            
+        Returns:
+            NeubauerBatchResult con una posición por muestra
+            
+        Raises:
+            NeubauerError: Si las dimensiones no coinciden
+        """
+        try:
+            counts = np.asarray(counts, dtype=np.float64)
+            if counts.ndim == 1:
+                counts = counts.reshape(-1, 1)
+            size = counts.shape[0]
+            volumes = np.broadcast_to(np.asarray(quadrant_volumes, dtype=np.float64), (size,)).copy()
+            dilutions = np.broadcast_to(np.asarray(dilution_factors, dtype=np.float64), (size,)).copy()
+            if dead_counts is not None:
+                dead_counts = np.asarray(dead_counts, dtype=np.float64).reshape(counts.shape)
+        except ValueError:
+            raise NeubauerError("Los conteos, volúmenes y factores de dilución deben ser numéricos y "
+                                "tener una posición por muestra")
+        if counts.ndim != 2:
+            raise NeubauerError("Los conteos deben ser una tabla de muestras × cuadrantes")
+        if sample_ids is None:
+            sample_ids = [str(i + 1) for i in range(size)]
+        if len(sample_ids) != size:
+            raise NeubauerError("Se esperaba un identificador por muestra")
+        z = NeubauerService.z_score(confidence_level)
+        
+        counted = ~np.isnan(counts)
+        num_quadrants = counted.sum(axis=1)
+        total_cells = np.where(counted, counts, 0.0).sum(axis=1)
+        negative = np.any(counts < 0, axis=1)
+        fractional = NeubauerService._fractional(counts)
+        if dead_counts is not None:
+            negative |= np.any(dead_counts < 0, axis=1)
+            fractional |= NeubauerService._fractional(dead_counts)
+        
+        error_codes = np.select(
+            [~((volumes > 0) & np.isfinite(volumes)) | ~((dilutions > 0) & np.isfinite(dilutions)), negative, fractional, num_quadrants == 0],
+            [NeubauerBatchErrorCode.NON_POSITIVE_PARAMETER, NeubauerBatchErrorCode.NEGATIVE_COUNT,
+             NeubauerBatchErrorCode.NON_INTEGER_COUNT, NeubauerBatchErrorCode.NO_COUNTS],
+            default=NeubauerBatchErrorCode.OK
+        ).astype(np.int8)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            average_cells = total_cells / num_quadrants
+            concentrations = average_cells / (num_quadrants * volumes) * 1000 * dilutions
+        stats = NeubauerService._sample_statistics(counts, dead_counts, volumes, dilutions, z)
+        
+        failed = error_codes != NeubauerBatchErrorCode.OK
+        for column in (total_cells, average_cells, concentrations, *stats.values()):
+            if column.dtype == bool:
+                column[failed] = False
+            else:
+                column[failed] = np.nan
+        
+        return NeubauerBatchResult(
+            sample_ids=list(sample_ids),
+            concentrations=concentrations,
+            total_cells=total_cells,
+            average_cells=average_cells,
+            num_quadrants=num_quadrants,
+            quadrant_volumes=volumes,
+            dilution_factors=dilutions,
+            error_codes=error_codes,
+            confidence_level=confidence_level,
+            **stats,
+        )
+    
+    @staticmethod
+    def _fractional(counts: np.ndarray) -> np.ndarray:
+        """Muestras con algún conteo no entero o infinito; los cuadrantes sin contar (NaN) no cuentan."""
+        with np.errstate(invalid='ignore'):
+            return np.any(~np.isnan(counts) & (np.mod(counts, 1) != 0), axis=1)
+    
+    @staticmethod
+    def z_score(confidence_level: float) -> float:
+        """Cuantil normal bilateral para el nivel de confianza indicado."""
+        if not 0 < confidence_level < 1:
+            raise NeubauerError("El nivel de confianza debe estar entre 0 y 1")
+        return NormalDist().inv_cdf(0.5 + confidence_level / 2)
+    
+    @staticmethod
+    def concentration_factor(num_quadrants, quadrant_volume, dilution_factor):
+        """
+        Células/mL por célula contada: la misma fórmula que calculate_concentration,
+        promedio / (cuadrantes · volumen) · 1000 · dilución, expresada sobre el total.
+        """
+        return 1000 * dilution_factor / (num_quadrants ** 2 * quadrant_volume)
+    
+    @staticmethod
+    def poisson_interval(total, z: float):
+        """
+        Límites de Poisson de un total contado (aproximación de Byar).
+        
+        Acepta escalares o arreglos; el límite inferior es 0 si no se contó nada.
+        """
+        total = np.asarray(total, dtype=np.float64)
+        upper_total = total + 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            low = np.where(total > 0, total * (1 - 1 / (9 * total) - z / (3 * np.sqrt(total))) ** 3, 0.0)
+        high = upper_total * (1 - 1 / (9 * upper_total) + z / (3 * np.sqrt(upper_total))) ** 3
+        return low, high
+    
+    @staticmethod
+    def wilson_interval(successes, trials, z: float):
+        """Intervalo de Wilson de una proporción, como fracción entre 0 y 1 (escalares o arreglos)."""
+        successes = np.asarray(successes, dtype=np.float64)
+        trials = np.asarray(trials, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            proportion = successes / trials
+            center = (proportion + z ** 2 / (2 * trials)) / (1 + z ** 2 / trials)
+            half_width = z * np.sqrt(
+                proportion * (1 - proportion) / trials + z ** 2 / (4 * trials ** 2)
+            ) / (1 + z ** 2 / trials)
+        return np.clip(center - half_width, 0, 1), np.clip(center + half_width, 0, 1)
+    
+    @classmethod
+    def _sample_statistics(cls, counts: np.ndarray, dead_counts: Optional[np.ndarray],
+                           volumes: np.ndarray, dilutions: np.ndarray, z: float) -> Dict[str, np.ndarray]:
+        """
+        Estadística de control de calidad de muchas muestras, sin bucles por muestra.
+        
+        - Intervalo de Poisson del total contado (aproximación de Byar), escalado
+          a concentración con el mismo factor que la concentración puntual.
+        - CV entre cuadrantes (desviación estándar muestral / media).
+        - Índice de dispersión χ² = Σ(x - x̄)²/x̄; un cuadrante es atípico si su
+          aporte supera el valor crítico de χ² con 1 grado de libertad.
+        - Viabilidad vivas / (vivas + muertas) con intervalo de Wilson; `counts`
+          son las células vivas y solo entran los cuadrantes con conteo de muertas.
+        
+        Los cuadrantes no contados son NaN en `counts`; los resultados que no
+        aplican (p. ej. CV con un solo cuadrante) son NaN.
+        """
+        counted = ~np.isnan(counts)
+        num_quadrants = counted.sum(axis=1)
+        total = np.where(counted, counts, 0.0).sum(axis=1)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = total / num_quadrants
+            deviations = np.where(counted, counts - mean[:, None], 0.0)
+            squares = deviations ** 2
+            sum_squares = squares.sum(axis=1)
+            
+            cv = np.sqrt(sum_squares / (num_quadrants - 1)) / mean * 100
+            cv[(num_quadrants < 2) | ~(mean > 0)] = np.nan
+            chi_square = np.where((num_quadrants >= 2) & (mean > 0), sum_squares / mean, np.nan)
+            outliers = counted & (mean[:, None] > 0) & (squares / mean[:, None] > cls.OUTLIER_CHI_SQUARE)
+            
+            low, high = cls.poisson_interval(total, z)
+            factor = cls.concentration_factor(num_quadrants, volumes, dilutions)
+            ci_low, ci_high = low * factor, high * factor
+            
+            if dead_counts is None:
+                dead = viability = viability_low = viability_high = np.full(len(total), np.nan)
+            else:
+                # Vivas y muertas se emparejan por cuadrante: un cuadrante sin conteo de muertas no entra
+                recorded = counted & ~np.isnan(dead_counts)
+                live = np.where(recorded, counts, 0.0).sum(axis=1)
+                dead = np.where(recorded, dead_counts, 0.0).sum(axis=1)
+                dead[~recorded.any(axis=1)] = np.nan
+                viability = live / (live + dead) * 100
+                viability_low, viability_high = cls.wilson_interval(live, live + dead, z)
+                viability_low, viability_high = viability_low * 100, viability_high * 100
+        
+        return {
+            'concentration_ci_low': ci_low,
+            'concentration_ci_high': ci_high,
+            'cv_percent': cv,
+            'chi_square': chi_square,
+            'outliers': outliers,
+            'dead_cells': dead.copy(),
+            'viability_percent': viability.copy(),
+            'viability_ci_low': viability_low.copy(),
+            'viability_ci_high': viability_high.copy(),
+        }
+    
+    @classmethod
+    def read_samples_csv(cls, source: Union[str, Iterable[str]]) -> Tuple[List[str], np.ndarray, np.ndarray,
+                                                                      np.ndarray, Optional[np.ndarray]]:
+        """
+        Lee una tabla de muestras × cuadrantes en CSV (separada por comas, punto y coma o tabuladores).
+        
+        Columnas reconocidas: muestra, volumen_cuadrante y factor_dilucion (opcionales);
+        las que empiezan por "muertas" son conteos de células teñidas con azul tripano,
+        en el mismo orden que los cuadrantes; todas las demás se interpretan como conteos
+        de un cuadrante. Las celdas vacías son cuadrantes no contados.
+        
+        `source` es el texto completo o un iterable de líneas (p. ej. un archivo
+        abierto en modo texto), que se lee fila a fila sin cargarlo entero.
+        
+        Returns:
+            Identificadores, matriz de conteos, volúmenes de cuadrante, factores de dilución
+            y matriz de células muertas (None si el archivo no las tiene)
+            
+        Raises:
+            NeubauerError: Si el archivo está vacío, no tiene columnas de conteo, tiene más de
+                MAX_BATCH_ROWS muestras o hay valores no numéricos
+        """
+        if isinstance(source, str) or source is None:
+            source = (source or '').splitlines()
+        lines = (line for line in source if line.strip())
+        header_line = next(lines, '').lstrip('\ufeff')
+        first_row = next(lines, None)
+        if first_row is None:
+            raise NeubauerError("El archivo debe tener una fila de encabezado y al menos una muestra")
+        
+        try:
+            dialect = csv.Sniffer().sniff(header_line, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        header = [name.strip().lower() for name in next(csv.reader([header_line], dialect))]
+        special = {cls.SAMPLE_COLUMN, cls.VOLUME_COLUMN, cls.DILUTION_COLUMN}
+        dead_columns = [i for i, name in enumerate(header) if name.startswith(cls.DEAD_COLUMN_PREFIX)]
+        quadrant_columns = [i for i, name in enumerate(header)
+                            if name not in special and i not in dead_columns]
+        if not quadrant_columns:
+            raise NeubauerError("El archivo no tiene columnas de conteo por cuadrante")
+        if dead_columns and len(dead_columns) != len(quadrant_columns):
+            raise NeubauerError("Debe haber una columna de células muertas por cada cuadrante")
+        
+        def column_index(name):
+            return header.index(name) if name in header else None
+        
+        sample_col = column_index(cls.SAMPLE_COLUMN)
+        volume_col = column_index(cls.VOLUME_COLUMN)
+        dilution_col = column_index(cls.DILUTION_COLUMN)
+        
+        def number(row, index, line_number, default):
+            value = row[index].strip() if index is not None and index < len(row) else ''
+            if not value:
+                return default
+            try:
+                return float(value.replace(',', '.')) if dialect.delimiter != ',' else float(value)
+            except ValueError:
+                raise NeubauerError(
+                    f"Fila {line_number}: valor no numérico en la columna {header[index]}"
+                )
+        
+        sample_ids = []
+        counts = []
+        volumes = []
+        dilutions = []
+        dead = []
+        for position, row in enumerate(csv.reader(itertools.chain([first_row], lines), dialect)):
+            if position == cls.MAX_BATCH_ROWS:
+                raise NeubauerError(f"El archivo puede tener hasta {cls.MAX_BATCH_ROWS} muestras")
+            line_number = position + 2
+            sample_ids.append(row[sample_col].strip() if sample_col is not None and sample_col < len(row)
+                              else str(position + 1))
+            counts.append([number(row, index, line_number, np.nan) for index in quadrant_columns])
+            if dead_columns:
+                dead.append([number(row, index, line_number, np.nan) for index in dead_columns])
+            volumes.append(number(row, volume_col, line_number, cls.DEFAULT_QUADRANT_VOLUME))
+            dilutions.append(number(row, dilution_col, line_number, cls.DEFAULT_DILUTION_FACTOR))
+        
+        return (sample_ids, np.array(counts, dtype=np.float64), np.array(volumes, dtype=np.float64),
+                np.array(dilutions, dtype=np.float64), np.array(dead, dtype=np.float64) if dead_columns else None)
+    
+    @classmethod
+    def iter_results_csv(cls, result: NeubauerBatchResult) -> Iterator[str]:
+        """Genera la tabla de resultados en CSV línea por línea."""
+        yield ','.join(cls.RESULT_COLUMNS) + '\n'
+        for i, sample_id in enumerate(result.sample_ids):
+            output = io.StringIO()
+            error = cls.BATCH_ERROR_MESSAGES[NeubauerBatchErrorCode(result.error_codes[i])]
+            csv.writer(output, lineterminator='\n').writerow((
+                sample_id,
+                int(result.num_quadrants[i]),
+                '' if error else f"{result.total_cells[i]:g}",
+                '' if error else f"{result.average_cells[i]:g}",
+                f"{result.quadrant_volumes[i]:g}",
+                f"{result.dilution_factors[i]:g}",
+                '' if error else f"{result.concentrations[i]:.6e}",
+                '' if error else f"{result.concentration_ci_low[i]:.6e}",
+                '' if error else f"{result.concentration_ci_high[i]:.6e}",
+                _format_optional(result.cv_percent[i], '.2f'),
+                ';'.join(str(j + 1) for j in np.flatnonzero(result.outliers[i])),
+                _format_optional(result.viability_percent[i], '.2f'),
+                error or '',
+            ))
+            yield output.getvalue()
+    
+    @classmethod
+    def error_message(cls, code: int) -> Optional[str]:
+        """Mensaje legible de un código de error por muestra."""
+        return cls.BATCH_ERROR_MESSAGES[NeubauerBatchErrorCode(code)]
+
+def _optional(value: float) -> Optional[float]:
+    """Convierte NaN en None para los resultados individuales."""
+    return None if np.isnan(value) else float(value)
+
+def _format_optional(value: float, spec: str) -> str:
+    """Formatea un valor para el CSV, dejando la celda vacía si es NaN."""
+    return '' if np.isnan(value) else format(value, spec)
@@ -1,21 +1,243 @@
 import math
-from typing import Dict, List, Tuple
+from dataclasses import replace
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
-from ..models.ph import PHCalculationType, PHError, PHRequest, PHResult
+import numpy as np
+
+from ..models.compact import freeze
+from ..models.ph import (
+    BufferRequest,
+    BufferResult,
+    FrozenTitrationRequest,
+    PHBatchErrorCode,
+    PHBatchNote,
+    PHBatchResult,
+    PHCalculationType,
+    PHError,
+    PHRequest,
+    PHResult,
+    TitrationRequest,
+    TitrationResult,
+)
+from .compound_service import CompoundService, normalize_name
 
 
 class PHService:
-    """Servicio para cálculos relacionados con pH de soluciones fuertes."""
+    """Servicio para cálculos de pH: ácidos y bases, amortiguadores, especiación y titulaciones."""
 
     MIN_CONCENTRATION = 1e-12
     MAX_CONCENTRATION = 1e2
     DEFAULT_KW = 1e-14
+    # Intervalo físico de pKa (de superácidos a alcanos); fuera de él 10^-pKa desborda o se anula
+    PKA_LIMITS = (-30.0, 70.0)
+    # Distancia máxima entre un pKa ingresado y el del catálogo cuyo dpKa/dT se usa
+    PKA_MATCH_TOLERANCE = 0.5
     VERY_DILUTE_NOTE = "La solución es muy diluida, se considera el aporte del agua pura."
+    # Desviación a partir de la cual se avisa que √(K·C) no es una buena aproximación
+    APPROXIMATION_WARNING = 0.05
+    NEWTON_TOLERANCE = 1e-14
+    NEWTON_MAX_ITERATIONS = 200
 
     _CALCULATION_MAP = {
         PHCalculationType.STRONG_ACID: "_calculate_strong_acid",
         PHCalculationType.STRONG_BASE: "_calculate_strong_base",
+        PHCalculationType.WEAK_ACID: "_calculate_weak_acid",
+        PHCalculationType.WEAK_BASE: "_calculate_weak_base",
+        PHCalculationType.BUFFER: "_calculate_buffer",
+    }
+    _WEAK_TYPES = (PHCalculationType.WEAK_ACID, PHCalculationType.WEAK_BASE)
+    # Tipos que necesitan Ka/Kb o pKa
+    _CONSTANT_TYPES = _WEAK_TYPES + (PHCalculationType.BUFFER,)
+    _ACID_TYPES = (PHCalculationType.STRONG_ACID, PHCalculationType.WEAK_ACID)
+    _TITRATION_TYPES = _WEAK_TYPES + (PHCalculationType.STRONG_ACID, PHCalculationType.STRONG_BASE)
+    _BATCH_TYPES = list(_CALCULATION_MAP)
+    _BATCH_TYPE_CODES = {calculation_type: code for code, calculation_type in enumerate(_CALCULATION_MAP)}
+    _BATCH_TYPE_VALUES = {calculation_type.value: calculation_type for calculation_type in _CALCULATION_MAP}
+
+    MAX_TITRATION_POINTS = 200_001
+    TITRATION_CACHE_SIZE = 64
+    # Iteraciones de bisección sobre ln[H₃O⁺]: el intervalo inicial se reduce 2⁻⁶⁴ veces
+    TITRATION_BISECTIONS = 64
+    # Un máximo de |dpH/dV| es punto de equivalencia si supera esta fracción del mayor
+    EQUIVALENCE_MIN_FRACTION = 0.1
+
+    BUFFER_CACHE_SIZE = 256
+    MAX_SPECIATION_POINTS = 100_001
+    # Más allá de esta distancia entre pH y pKa la capacidad amortiguadora es baja
+    BUFFER_RANGE = 1.0
+    # Diferencia de pH a partir de la cual se avisa que Henderson–Hasselbalch no alcanza
+    HENDERSON_WARNING = 0.05
+    REFERENCE_TEMPERATURE = 25.0
+    # Temperatura (°C), pKw del agua y constante A de Debye–Hückel (log₁₀) entre 0 y 100 °C
+    WATER_TABLE = np.array([
+        (0.0, 14.947, 0.4918),
+        (5.0, 14.734, 0.4952),
+        (10.0, 14.535, 0.4989),
+        (15.0, 14.346, 0.5028),
+        (20.0, 14.167, 0.5070),
+        (25.0, 13.995, 0.5115),
+        (30.0, 13.830, 0.5161),
+        (35.0, 13.680, 0.5211),
+        (40.0, 13.535, 0.5262),
+        (45.0, 13.396, 0.5317),
+        (50.0, 13.262, 0.5373),
+        (55.0, 13.137, 0.5432),
+        (60.0, 13.017, 0.5494),
+        (70.0, 12.800, 0.5625),
+        (80.0, 12.598, 0.5767),
+        (90.0, 12.422, 0.5920),
+        (100.0, 12.260, 0.6086),
+    ])
+    WATER_CACHE_SIZE = 1024
+    # La ecuación de Davies deja de ser fiable por encima de esta fuerza iónica
+    MAX_IONIC_STRENGTH = 0.5
+    # Carga de la especie más protonada y dpKa/dT (1/°C) de cada pKa del catálogo, en orden
+    ACID_PROPERTIES = {
+        "acido acetico": (0, (0.0002,)),
+        "acetato de sodio": (0, (0.0002,)),
+        "acido formico": (0, (0.0,)),
+        "acido fosforico": (0, (0.0044, -0.0028, -0.026)),
+        "fosfato monosodico": (0, (0.0044, -0.0028, -0.026)),
+        "fosfato disodico": (0, (0.0044, -0.0028, -0.026)),
+        "fosfato monopotasico": (0, (0.0044, -0.0028, -0.026)),
+        "acido citrico": (0, (-0.0024, -0.0016, 0.0)),
+        "acido carbonico": (0, (-0.0055, -0.009)),
+        "bicarbonato de sodio": (0, (-0.0055, -0.009)),
+        "carbonato de sodio": (0, (-0.0055, -0.009)),
+        "acido borico": (0, (-0.008,)),
+        "amoniaco": (1, (-0.031,)),
+        "cloruro de amonio": (1, (-0.031,)),
+        "sulfato de amonio": (1, (-0.031,)),
+        "tris": (1, (-0.028,)),
+        "hepes": (0, (-0.014,)),
+        "mes": (0, (-0.011,)),
+        "glicina": (1, (-0.002, -0.025)),
+        "imidazol": (1, (-0.020,)),
     }
+    MAX_BATCH_ROWS = 100_000
+    BATCH_ERROR_MESSAGES = {
+        PHBatchErrorCode.OK: "",
+        PHBatchErrorCode.UNSUPPORTED_TYPE: "Tipo de cálculo no soportado para la herramienta de pH.",
+        PHBatchErrorCode.NON_POSITIVE_CONCENTRATION: "La concentración debe ser mayor que cero.",
+        PHBatchErrorCode.NON_POSITIVE_EQUIVALENTS: "El número de equivalentes debe ser mayor que cero.",
+        PHBatchErrorCode.TOO_CONCENTRATED: "La concentración ingresada es demasiado alta para un cálculo fiable.",
+        PHBatchErrorCode.WEAK_EQUIVALENTS: (
+            "Los ácidos y bases débiles se calculan como monopróticos; deja los equivalentes en 1."
+        ),
+        PHBatchErrorCode.MISSING_CONSTANT: (
+            "Debes indicar una constante de disociación (Ka o Kb) mayor que cero o un pKa "
+            f"entre {PKA_LIMITS[0]:g} y {PKA_LIMITS[1]:g}."
+        ),
+        PHBatchErrorCode.MISSING_CONJUGATE: (
+            "Debes indicar una concentración de la base conjugada mayor que cero."
+        ),
+        PHBatchErrorCode.INVALID_CONDITIONS: (
+            "La temperatura debe estar entre 0 y 100 °C y la fuerza iónica entre 0 y 0.5 M."
+        ),
+    }
+    BATCH_NOTE_MESSAGES = {
+        PHBatchNote.VERY_DILUTE: VERY_DILUTE_NOTE,
+        PHBatchNote.APPROXIMATION: (
+            "La aproximación √(K·C) se aleja más de un 5 % del valor exacto; "
+            "se usa la solución del balance de carga."
+        ),
+        PHBatchNote.HENDERSON: (
+            "Henderson–Hasselbalch se aleja del balance de carga completo porque la "
+            "disociación no es despreciable."
+        ),
+    }
+    SUBSCRIPTS = str.maketrans("0123456789", "₀₁₂₃₄₅₆₇₈₉")
+    SUPERSCRIPTS = str.maketrans("0123456789", "⁰¹²³⁴⁵⁶⁷⁸⁹")
+
+    @classmethod
+    def kw_at_temperature(cls, temperature_c: float) -> float:
+        """Kw del agua a la temperatura dada, interpolado de la tabla de pKw."""
+
+        return 10.0 ** -cls._water_properties(float(temperature_c))[0]
+
+    @classmethod
+    def activity_coefficient(cls, charge, ionic_strength: float, temperature_c: float | None = None):
+        """
+        Coeficiente de actividad de Davies para iones de la carga dada.
+
+            log₁₀ γ = −A·z²·(√I / (1 + √I) − 0.3·I)
+
+        Es la ley de Debye–Hückel extendida con un término empírico, válida
+        hasta I ≈ 0.5 M. `charge` puede ser un arreglo de cargas.
+        """
+
+        cls._validate_ionic_strength(ionic_strength)
+        temperature = cls.REFERENCE_TEMPERATURE if temperature_c is None else float(temperature_c)
+        a = cls._water_properties(temperature)[1]
+        root = math.sqrt(ionic_strength)
+        log_gamma = -a * np.square(charge) * (root / (1 + root) - 0.3 * ionic_strength)
+        return 10.0 ** log_gamma
+
+    @classmethod
+    def acid_properties(cls, compound_name: str | None) -> Tuple[int, Tuple[float, ...]] | None:
+        """Carga y dpKa/dT de un compuesto del catálogo (por nombre o sinónimo), si se conocen."""
+
+        if not compound_name:
+            return None
+        compound = CompoundService.find(compound_name)
+        key = normalize_name(compound.name if compound else compound_name)
+        return cls.ACID_PROPERTIES.get(key)
+
+    @classmethod
+    def pka_temperature_coefficient(cls, compound_name: str | None, pka: float) -> float | None:
+        """
+        dpKa/dT del pKa del catálogo más cercano al ingresado.
+
+        Devuelve None si el compuesto no tiene coeficientes o si ningún pKa del
+        catálogo está a menos de PKA_MATCH_TOLERANCE del valor ingresado.
+        """
+
+        properties = cls.acid_properties(compound_name)
+        compound = CompoundService.find(compound_name) if compound_name else None
+        if properties is None or compound is None or len(compound.pka_values) != len(properties[1]):
+            return None
+        catalog = sorted(compound.pka_values)
+        index = min(range(len(catalog)), key=lambda i: abs(catalog[i] - pka))
+        if abs(catalog[index] - pka) > cls.PKA_MATCH_TOLERANCE:
+            return None
+        return properties[1][index]
+
+    @classmethod
+    def apparent_pka_values(
+        cls,
+        pka_values,
+        acid_name: str | None = None,
+        temperature_c: float | None = None,
+        ionic_strength: float = 0.0,
+    ) -> Tuple[np.ndarray, int, List[str]]:
+        """
+        pKa aparentes frente al pH medido (actividad de H₃O⁺) en las condiciones dadas.
+
+        Los pKa a 25 °C se corrigen con el dpKa/dT de la tabla y luego con la
+        fuerza iónica: para el par k, pKa' = pKa − log₁₀(γ_ácido / γ_base).
+        Devuelve los pKa aparentes ordenados, la carga de la especie más
+        protonada y las notas sobre datos que faltaron.
+        """
+
+        pkas = np.sort(np.asarray(pka_values, dtype=float))
+        properties = cls.acid_properties(acid_name)
+        charge, coefficients = properties if properties else (0, None)
+        notes = []
+
+        if temperature_c is not None and temperature_c != cls.REFERENCE_TEMPERATURE:
+            if coefficients is not None and len(coefficients) == pkas.size:
+                pkas = pkas + np.array(coefficients) * (temperature_c - cls.REFERENCE_TEMPERATURE)
+            else:
+                notes.append(
+                    "No hay coeficientes de temperatura para este ácido; se usan los pKa tal como se ingresaron."
+                )
+
+        if ionic_strength:
+            charges = charge - np.arange(pkas.size + 1)
+            gamma = cls.activity_coefficient(charges, ionic_strength, temperature_c)
+            pkas = pkas - np.log10(gamma[:-1] / gamma[1:])
+        return pkas, charge, notes
 
     @classmethod
     def get_default_kw(cls) -> float:
@@ -30,29 +252,714 @@ class PHService:
         return [
             {"value": PHCalculationType.STRONG_ACID.value, "label": "Ácido fuerte"},
             {"value": PHCalculationType.STRONG_BASE.value, "label": "Base fuerte"},
+            {"value": PHCalculationType.WEAK_ACID.value, "label": "Ácido débil"},
+            {"value": PHCalculationType.WEAK_BASE.value, "label": "Base débil"},
+            {"value": PHCalculationType.BUFFER.value, "label": "Amortiguador (ácido + base conjugada)"},
         ]
 
+    @classmethod
+    def get_titration_types(cls) -> List[Dict[str, str]]:
+        """Tipos que pueden ser analito o titulante en una titulación."""
+
+        titration_values = {calculation_type.value for calculation_type in cls._TITRATION_TYPES}
+        return [option for option in cls.get_calculation_types() if option["value"] in titration_values]
+
     @classmethod
     def calculate(cls, request: PHRequest) -> PHResult:
-        """Calcula el pH o pOH según el tipo de solución fuerte seleccionada."""
+        """Calcula el pH o pOH según el tipo de solución seleccionada."""
 
         cls._validate_request(request)
-        kw = cls._normalize_kw(request.kw)
+        kw, gamma = cls._conditions(request.kw, request.temperature_c, request.ionic_strength)
         effective_concentration, notes = cls._resolve_effective_concentration(
             request.concentration_m, request.equivalents
         )
+        constant = cls._resolve_dissociation_constant(request, kw)
+        if constant is not None:
+            # HA ⇌ H⁺ + A⁻ y B + H₂O ⇌ BH⁺ + OH⁻ forman dos iones monovalentes
+            constant /= gamma**2
 
         calculator = cls._get_calculator(request.calculation_type)
-        hydronium, hydroxide, formula = calculator(effective_concentration, kw)
+        hydronium, hydroxide, formula, extra_note = calculator(
+            effective_concentration, kw / gamma**2, constant, request.conjugate_concentration_m
+        )
+
+        ionization = None
+        if request.calculation_type in cls._WEAK_TYPES:
+            produced = hydronium if request.calculation_type == PHCalculationType.WEAK_ACID else hydroxide
+            ionization = round(constant / (constant + produced) * 100, 4)
 
         return cls._build_result(
             calculation_type=request.calculation_type,
             hydronium=hydronium,
             hydroxide=hydroxide,
             formula=formula,
+            notes=" ".join(note for note in (notes, extra_note) if note) or None,
+            ionization_percent=ionization,
+            kw=kw,
+            activity_coefficient=gamma,
+        )
+
+    @classmethod
+    def calculate_many(
+        cls,
+        calculation_types: Union[PHCalculationType, str, Sequence[Union[PHCalculationType, str, None]]],
+        concentrations: Union[np.ndarray, Sequence[float]],
+        equivalents: Union[np.ndarray, Sequence[float], float] = 1.0,
+        kw: Union[np.ndarray, Sequence[float], float] = DEFAULT_KW,
+        dissociation_constants: Optional[Union[np.ndarray, Sequence[float], float]] = None,
+        pka: Optional[Union[np.ndarray, Sequence[float], float]] = None,
+        conjugate_concentrations: Optional[Union[np.ndarray, Sequence[float], float]] = None,
+        temperature_c: Optional[Union[np.ndarray, Sequence[float], float]] = None,
+        ionic_strength: Union[np.ndarray, Sequence[float], float] = 0.0,
+        pka_temperature_coefficients: Union[np.ndarray, Sequence[float], float] = 0.0,
+    ) -> PHBatchResult:
+        """
+        Calcula el pH de muchas soluciones en una sola pasada de NumPy.
+
+        Cada argumento es un valor común o un arreglo con una posición por
+        fila; los valores que faltan se indican con NaN (o None). Da los mismos
+        resultados que `calculate` fila por fila. En lugar de lanzar
+        excepciones, cada fila recibe un PHBatchErrorCode y una combinación de
+        PHBatchNote. Los tipos se resuelven con máscaras, y cada grupo (fuertes,
+        débiles, amortiguadores) se resuelve con una sola llamada vectorizada.
+
+        Raises:
+            PHError: Si los arreglos no tienen una posición por fila o hay demasiadas filas
+        """
+
+        try:
+            concentrations = np.asarray(concentrations, dtype=np.float64).ravel()
+            size = concentrations.size
+            if size > cls.MAX_BATCH_ROWS:
+                raise PHError(f"Se pueden calcular hasta {cls.MAX_BATCH_ROWS} soluciones por lote.")
+
+            def column(values, default=np.nan):
+                values = default if values is None else values
+                return np.broadcast_to(np.asarray(values, dtype=np.float64), (size,)).copy()
+
+            equivalents = column(equivalents)
+            kw = column(kw)
+            constants = column(dissociation_constants)
+            pka = column(pka)
+            conjugates = column(conjugate_concentrations)
+            temperatures = column(temperature_c)
+            ionic = column(ionic_strength)
+            coefficients = column(pka_temperature_coefficients)
+        except (TypeError, ValueError):
+            raise PHError("Los valores del lote deben ser numéricos y tener una posición por solución.")
+        types = cls._batch_types(calculation_types, size)
+
+        strong_acid = types == cls._BATCH_TYPE_CODES[PHCalculationType.STRONG_ACID]
+        strong_base = types == cls._BATCH_TYPE_CODES[PHCalculationType.STRONG_BASE]
+        weak_acid = types == cls._BATCH_TYPE_CODES[PHCalculationType.WEAK_ACID]
+        weak_base = types == cls._BATCH_TYPE_CODES[PHCalculationType.WEAK_BASE]
+        buffer = types == cls._BATCH_TYPE_CODES[PHCalculationType.BUFFER]
+        needs_constant = weak_acid | weak_base | buffer
+
+        # Condiciones: Kw de la tabla cuando hay temperatura y γ de Davies
+        table = cls.WATER_TABLE
+        has_temperature = ~np.isnan(temperatures)
+        valid_conditions = (
+            ~has_temperature | ((temperatures >= table[0, 0]) & (temperatures <= table[-1, 0]))
+        ) & (ionic >= 0) & (ionic <= cls.MAX_IONIC_STRENGTH)
+        reference = np.where(has_temperature, temperatures, cls.REFERENCE_TEMPERATURE)
+        kw = np.where(kw > 0, kw, cls.DEFAULT_KW)
+        kw = np.where(has_temperature, 10.0 ** -np.interp(reference, table[:, 0], table[:, 1]), kw)
+        root = np.sqrt(np.where(valid_conditions, ionic, 0.0))
+        a = np.interp(reference, table[:, 0], table[:, 2])
+        gamma = 10.0 ** (-a * (root / (1 + root) - 0.3 * np.where(valid_conditions, ionic, 0.0)))
+        conditional_kw = kw / gamma**2
+
+        effective = concentrations * equivalents
+        # Como en `calculate`: una constante dada debe ser positiva y finita, un pKa dado
+        # debe estar en PKA_LIMITS y la constante resuelta, positiva y finita
+        low, high = cls.PKA_LIMITS
+        has_constant = ~np.isnan(constants)
+        has_pka = ~np.isnan(pka)
+        valid_inputs = ~(has_constant & ~((constants > 0) & (constants < np.inf))) & ~(
+            has_pka & ~((pka >= low) & (pka <= high))
+        )
+        pka = pka + np.where(has_temperature, coefficients * (reference - cls.REFERENCE_TEMPERATURE), 0.0)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            from_pka = 10.0 ** -pka
+            from_pka = np.where(weak_base, kw / from_pka, from_pka)
+        constants = np.where(has_constant, constants, from_pka)
+        valid_constant = valid_inputs & (constants > 0) & (constants < np.inf)
+
+        error_codes = np.select(
+            [
+                types < 0,
+                ~(concentrations > 0),
+                ~(equivalents > 0),
+                effective > cls.MAX_CONCENTRATION,
+                needs_constant & (equivalents != 1),
+                needs_constant & ~valid_constant,
+                buffer & ~((conjugates > 0) & (conjugates <= cls.MAX_CONCENTRATION)),
+                ~valid_conditions,
+            ],
+            [
+                PHBatchErrorCode.UNSUPPORTED_TYPE,
+                PHBatchErrorCode.NON_POSITIVE_CONCENTRATION,
+                PHBatchErrorCode.NON_POSITIVE_EQUIVALENTS,
+                PHBatchErrorCode.TOO_CONCENTRATED,
+                PHBatchErrorCode.WEAK_EQUIVALENTS,
+                PHBatchErrorCode.MISSING_CONSTANT,
+                PHBatchErrorCode.MISSING_CONJUGATE,
+                PHBatchErrorCode.INVALID_CONDITIONS,
+            ],
+            default=PHBatchErrorCode.OK,
+        ).astype(np.int8)
+        ok = error_codes == PHBatchErrorCode.OK
+
+        dilute = ok & (effective < cls.MIN_CONCENTRATION)
+        effective = np.where(dilute, cls.MIN_CONCENTRATION, effective)
+        conditional_constants = constants / gamma**2
+
+        hydronium = np.full(size, np.nan)
+        hydroxide = np.full(size, np.nan)
+        approximation = np.zeros(size, dtype=bool)
+        henderson = np.zeros(size, dtype=bool)
+
+        rows = ok & strong_acid
+        hydronium[rows] = effective[rows]
+        hydroxide[rows] = conditional_kw[rows] / effective[rows]
+
+        rows = ok & strong_base
+        hydroxide[rows] = effective[rows]
+        hydronium[rows] = conditional_kw[rows] / effective[rows]
+
+        for rows, acid in ((ok & weak_acid, True), (ok & weak_base, False)):
+            produced = cls.solve_weak_equilibrium(
+                effective[rows], conditional_constants[rows], conditional_kw[rows]
+            )
+            other = conditional_kw[rows] / produced
+            hydronium[rows], hydroxide[rows] = (produced, other) if acid else (other, produced)
+            deviation = np.abs(np.sqrt(conditional_constants[rows] * effective[rows]) - produced) / produced
+            approximation[rows] = deviation > cls.APPROXIMATION_WARNING
+
+        rows = ok & buffer
+        if rows.any():
+            solved = cls._solve_titration_hydronium(
+                effective[rows] + conjugates[rows],
+                conditional_constants[rows],
+                conjugates[rows],
+                0.0,
+                conditional_kw[rows],
+            )
+            hydronium[rows] = solved
+            hydroxide[rows] = conditional_kw[rows] / solved
+            predicted = np.log10(conjugates[rows] / (effective[rows] * conditional_constants[rows]))
+            henderson[rows] = np.abs(predicted + np.log10(solved)) > cls.HENDERSON_WARNING
+
+        pkw = -np.log10(kw)
+        with np.errstate(invalid="ignore"):
+            ph = np.clip(-np.log10(gamma * hydronium), 0.0, pkw)
+            ionization = np.full(size, np.nan)
+            rows = ok & weak_acid
+            ionization[rows] = conditional_constants[rows] / (conditional_constants[rows] + hydronium[rows]) * 100
+            rows = ok & weak_base
+            ionization[rows] = conditional_constants[rows] / (conditional_constants[rows] + hydroxide[rows]) * 100
+
+        ph = np.round(ph, 4)
+        poh = np.round(pkw - ph, 4)
+        pkw = np.where(ok, np.round(pkw, 4), np.nan)
+        notes = (
+            np.where(dilute, PHBatchNote.VERY_DILUTE, 0)
+            | np.where(approximation, PHBatchNote.APPROXIMATION, 0)
+            | np.where(henderson, PHBatchNote.HENDERSON, 0)
+        ).astype(np.int8)
+
+        return PHBatchResult(
+            calculation_types=[cls._BATCH_TYPES[code] if code >= 0 else None for code in types],
+            concentrations=concentrations,
+            ph=ph,
+            poh=poh,
+            hydronium=hydronium,
+            hydroxide=hydroxide,
+            pkw=pkw,
+            ionization_percent=np.round(ionization, 4),
+            error_codes=error_codes,
             notes=notes,
         )
 
+    @classmethod
+    def batch_error_message(cls, code: int) -> str:
+        """Mensaje en español para un código de error del lote."""
+
+        return cls.BATCH_ERROR_MESSAGES[PHBatchErrorCode(code)]
+
+    @classmethod
+    def batch_note_messages(cls, flags: int) -> List[str]:
+        """Mensajes de las notas activas en una fila del lote."""
+
+        return [message for note, message in cls.BATCH_NOTE_MESSAGES.items() if flags & note]
+
+    @classmethod
+    def _batch_types(cls, calculation_types, size: int) -> np.ndarray:
+        """Código entero por fila (−1 si el tipo no existe)."""
+
+        if isinstance(calculation_types, (PHCalculationType, str)) or calculation_types is None:
+            calculation_types = [calculation_types] * size
+        if len(calculation_types) != size:
+            raise PHError("Se esperaba un tipo de cálculo por solución.")
+
+        codes = np.empty(size, dtype=np.int8)
+        for index, value in enumerate(calculation_types):
+            if isinstance(value, str):
+                value = cls._BATCH_TYPE_VALUES.get(value)
+            codes[index] = cls._BATCH_TYPE_CODES.get(value, -1)
+        return codes
+
+    @classmethod
+    def solve_weak_equilibrium(cls, concentration, constant, kw: float = DEFAULT_KW) -> np.ndarray:
+        """
+        Resuelve el balance de carga exacto de un ácido (o base) débil monoprótico.
+
+        Con x = [H₃O⁺] para un ácido (x = [OH⁻] para una base), C la
+        concentración analítica y K = Ka (o Kb), el balance de carga
+        x = K·C/(K + x) + Kw/x equivale a la cúbica
+
+            x³ + K·x² − (Kw + K·C)·x − K·Kw = 0
+
+        que tiene una única raíz positiva. Se parte de x₀ = √(Kw + K·C), que
+        siempre está por encima de la raíz; como la cúbica es convexa para
+        x > 0, Newton desciende de forma monótona sin salirse del dominio.
+        `concentration` y `constant` pueden ser arreglos (se combinan por
+        broadcasting, igual que `kw`) y todos los elementos se resuelven a la vez.
+        """
+
+        concentration, constant, kw = np.broadcast_arrays(
+            np.asarray(concentration, dtype=float),
+            np.asarray(constant, dtype=float),
+            np.asarray(kw, dtype=float),
+        )
+        lower = np.sqrt(kw)
+        x = np.sqrt(kw + constant * concentration)
+        linear = kw + constant * concentration
+        independent = constant * kw
+
+        for _ in range(cls.NEWTON_MAX_ITERATIONS):
+            value = ((x + constant) * x - linear) * x - independent
+            slope = (3 * x + 2 * constant) * x - linear
+            step = value / slope
+            x = np.maximum(x - step, lower)
+            if np.all(np.abs(step) <= cls.NEWTON_TOLERANCE * x):
+                break
+        return x
+
+    @staticmethod
+    def species_fractions(pka_values, ph) -> np.ndarray:
+        """
+        Fracciones α de cada especie de un ácido poliprótico en cada pH.
+
+        Para HₙA con constantes Ka₁…Kaₙ, la especie que perdió j protones pesa
+        Tⱼ = [H₃O⁺]ⁿ⁻ʲ·Ka₁·…·Kaⱼ y αⱼ = Tⱼ / ΣTₖ. Los términos se arman en
+        logaritmos y se normalizan restando el mayor de cada fila, así no hay
+        desbordes ni en pH extremos. Devuelve un arreglo de forma
+        ph.shape + (n + 1,) calculado en una sola pasada para toda la grilla.
+        """
+
+        pka = np.asarray(pka_values, dtype=float)
+        ph = np.asarray(ph, dtype=float)
+        removed = np.arange(pka.size + 1)
+        log_products = np.concatenate(([0.0], -np.cumsum(pka)))
+
+        log_terms = (pka.size - removed) * -ph[..., None] + log_products
+        log_terms -= log_terms.max(axis=-1, keepdims=True)
+        terms = 10.0 ** log_terms
+        return terms / terms.sum(axis=-1, keepdims=True)
+
+    @classmethod
+    def species_distribution(
+        cls,
+        pka_values,
+        ph_min: float = 0.0,
+        ph_max: float = 14.0,
+        points: int = 281,
+        acid_name: str | None = None,
+        temperature_c: float | None = None,
+        ionic_strength: float = 0.0,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Grilla de pH y fracciones de cada especie en ella, validando los parámetros.
+
+        Con temperatura o fuerza iónica se usan los mismos pKa aparentes que
+        en el diseño de amortiguadores.
+        """
+
+        pka = np.asarray(pka_values, dtype=float)
+        if pka.ndim != 1 or pka.size == 0 or not np.all(np.isfinite(pka)):
+            raise PHError("Debes indicar al menos un pKa del ácido.")
+        if not (math.isfinite(ph_min) and math.isfinite(ph_max) and ph_min < ph_max):
+            raise PHError("El rango de pH no es válido.")
+        if not 2 <= points <= cls.MAX_SPECIATION_POINTS:
+            raise PHError(f"La grilla de pH debe tener entre 2 y {cls.MAX_SPECIATION_POINTS} puntos.")
+
+        cls._conditions(cls.DEFAULT_KW, temperature_c, ionic_strength)
+        apparent, _charge, _notes = cls.apparent_pka_values(pka, acid_name, temperature_c, ionic_strength)
+        grid = np.linspace(ph_min, ph_max, points)
+        return grid, cls.species_fractions(apparent, grid)
+
+    @classmethod
+    def species_labels(cls, protons: int, charge: int = 0) -> List[str]:
+        """Nombres genéricos de las especies: H₃A, H₂A⁻, HA²⁻, A³⁻ (o HA⁺, A si es catiónico)."""
+
+        labels = []
+        for removed in range(protons + 1):
+            hydrogens = protons - removed
+            prefix = "" if hydrogens == 0 else "H" if hydrogens == 1 else "H" + str(hydrogens).translate(cls.SUBSCRIPTS)
+            net = charge - removed
+            sign = "⁺" if net > 0 else "⁻"
+            suffix = "" if net == 0 else sign if abs(net) == 1 else str(abs(net)).translate(cls.SUPERSCRIPTS) + sign
+            labels.append(f"{prefix}A{suffix}")
+        return labels
+
+    @classmethod
+    def calculate_buffer(cls, request: BufferRequest) -> BufferResult:
+        """
+        Diseña un amortiguador con el par ácido-base cuyo pKa está más cerca del pH objetivo.
+
+        La receta se guarda en una caché LRU por (ácido, pKa, pH objetivo,
+        concentración, condiciones); el volumen solo escala las cantidades.
+        Con temperatura o fuerza iónica se trabaja con los pKa aparentes y
+        el pH objetivo es el que marcaría el pHmetro.
+        """
+
+        pka_values = tuple(sorted(float(value) for value in request.pka_values or ()))
+        if not pka_values or not all(math.isfinite(value) for value in pka_values):
+            raise PHError("Debes indicar al menos un pKa del ácido.")
+        if request.target_ph is None or not math.isfinite(request.target_ph):
+            raise PHError("Debes indicar el pH objetivo.")
+        if request.concentration_m is None or not 0 < request.concentration_m <= cls.MAX_CONCENTRATION:
+            raise PHError("La concentración del amortiguador debe ser mayor que cero.")
+        if request.volume_ml is None or not 0 < request.volume_ml < math.inf:
+            raise PHError("El volumen debe ser mayor que cero.")
+        cls._conditions(request.kw, request.temperature_c, request.ionic_strength)
+
+        recipe = cls._buffer_cached(
+            request.acid_name.strip(),
+            pka_values,
+            float(request.target_ph),
+            float(request.concentration_m),
+            cls._normalize_kw(request.kw),
+            None if request.temperature_c is None else float(request.temperature_c),
+            float(request.ionic_strength),
+        )
+        return replace(
+            recipe,
+            volume_ml=request.volume_ml,
+            acid_form_mmol=recipe.acid_form_m * request.volume_ml,
+            base_form_mmol=recipe.base_form_m * request.volume_ml,
+            species_fractions=list(recipe.species_fractions),
+        )
+
+    @classmethod
+    def clear_buffer_cache(cls) -> None:
+        """Vacía la caché de recetas de amortiguadores."""
+
+        cls._buffer_cached.cache_clear()
+
+    @classmethod
+    @lru_cache(maxsize=BUFFER_CACHE_SIZE)
+    def _buffer_cached(
+        cls,
+        acid_name: str,
+        pka_values: Tuple[float, ...],
+        target_ph: float,
+        concentration: float,
+        kw: float,
+        temperature_c: float | None,
+        ionic_strength: float,
+    ) -> BufferResult:
+        """
+        Receta exacta en el pH objetivo, sin resolver ecuaciones.
+
+        Si el par elegido es el k-ésimo, la forma ácida perdió k − 1 protones y
+        la básica k. Con la base aportando un contraión fuerte por cada protón
+        perdido, el balance de carga en [H₃O⁺] = h fija la fracción básica:
+
+            f = Σ j·αⱼ(h) − (k − 1) + (Kw/h − h) / C
+
+        con h y Kw en concentraciones (corregidos por actividad).
+        """
+
+        kw, gamma = cls._conditions(kw, temperature_c, ionic_strength)
+        pkas, charge, notes = cls.apparent_pka_values(pka_values, acid_name, temperature_c, ionic_strength)
+        thermodynamic_pkas, _charge, _notes = cls.apparent_pka_values(pka_values, acid_name, temperature_c)
+        pair = int(np.argmin(np.abs(pkas - target_ph)))
+        h = 10.0 ** -target_ph / gamma
+        conditional_kw = kw / gamma**2
+        fractions = cls.species_fractions(pkas, target_ph)
+        removed = np.arange(pkas.size + 1)
+        mean_removed = float(fractions @ removed)
+
+        base_fraction = mean_removed - pair + (conditional_kw / h - h) / concentration
+        if not 0 < base_fraction < 1:
+            raise PHError(
+                "El pH objetivo no se puede alcanzar con esta concentración mezclando "
+                "las dos formas del par ácido-base."
+            )
+        henderson_ratio = 10.0 ** (target_ph - float(thermodynamic_pkas[pair]))
+
+        capacity = math.log(10) * (
+            h + conditional_kw / h + concentration * (float(fractions @ removed**2) - mean_removed**2)
+        )
+
+        if abs(target_ph - pkas[pair]) > cls.BUFFER_RANGE:
+            notes.append(
+                f"El pH objetivo está a más de {cls.BUFFER_RANGE:g} unidad del pKa más cercano "
+                f"({pkas[pair]:.2f}); la capacidad amortiguadora será baja."
+            )
+        henderson_fraction = henderson_ratio / (1 + henderson_ratio)
+        if abs(henderson_fraction - base_fraction) > cls.HENDERSON_WARNING * base_fraction:
+            notes.append(
+                "La receta de Henderson–Hasselbalch se aleja más de un 5 % de la exacta; "
+                "usa las cantidades calculadas con el balance de carga."
+            )
+
+        labels = cls.species_labels(pkas.size, charge)
+        return BufferResult(
+            acid_name=acid_name,
+            pka_values=list(pka_values),
+            target_ph=target_ph,
+            concentration_m=concentration,
+            volume_ml=1000.0,
+            pka_used=round(float(pkas[pair]), 4),
+            acid_species=labels[pair],
+            base_species=labels[pair + 1],
+            henderson_ratio=henderson_ratio,
+            exact_ratio=base_fraction / (1 - base_fraction),
+            acid_form_m=concentration * (1 - base_fraction),
+            base_form_m=concentration * base_fraction,
+            acid_form_mmol=concentration * (1 - base_fraction) * 1000.0,
+            base_form_mmol=concentration * base_fraction * 1000.0,
+            buffer_capacity=capacity,
+            species=labels,
+            species_fractions=fractions.tolist(),
+            notes=" ".join(notes) or None,
+            temperature_c=temperature_c,
+            ionic_strength=ionic_strength,
+        )
+
+    @classmethod
+    def calculate_titration(cls, request: TitrationRequest) -> TitrationResult:
+        """
+        Calcula la curva de titulación completa, sus puntos de equivalencia y
+        una versión reducida para graficar.
+
+        Las curvas se guardan en una caché LRU indexada por todos los
+        parámetros de la solicitud, así que pedir de nuevo la misma curva
+        (por ejemplo, varios alumnos con el mismo ejercicio) no la recalcula.
+        """
+
+        cls._validate_titration(request)
+        return cls._titration_cached(freeze(request, FrozenTitrationRequest))
+
+    @classmethod
+    def clear_titration_cache(cls) -> None:
+        """Vacía la caché de curvas de titulación."""
+
+        cls._titration_cached.cache_clear()
+
+    @classmethod
+    @lru_cache(maxsize=TITRATION_CACHE_SIZE)
+    def _titration_cached(cls, request: FrozenTitrationRequest) -> TitrationResult:
+        kw, gamma = cls._conditions(request.kw, request.temperature_c, request.ionic_strength)
+        analyte_is_acid = request.analyte_type in cls._ACID_TYPES
+        expected = (
+            request.analyte_concentration_m * request.analyte_volume_ml / request.titrant_concentration_m
+        )
+        max_volume = request.max_titrant_volume_ml or 2 * expected
+
+        volumes = np.linspace(0.0, max_volume, request.points)
+        total_volumes = request.analyte_volume_ml + volumes
+        analyte = request.analyte_concentration_m * request.analyte_volume_ml / total_volumes
+        titrant = request.titrant_concentration_m * volumes / total_volumes
+
+        analyte_ka = cls._conjugate_ka(
+            request.analyte_type, request.analyte_constant, request.analyte_pka, kw, gamma
+        )
+        titrant_ka = cls._conjugate_ka(
+            request.titrant_type, request.titrant_constant, request.titrant_pka, kw, gamma
+        )
+        conditional_kw = kw / gamma**2
+        if analyte_is_acid:
+            hydronium = cls._solve_titration_hydronium(analyte, analyte_ka, titrant, titrant_ka, conditional_kw)
+        else:
+            hydronium = cls._solve_titration_hydronium(titrant, titrant_ka, analyte, analyte_ka, conditional_kw)
+        ph = -np.log10(gamma * hydronium)
+
+        equivalence_volumes, equivalence_ph = cls._find_equivalence_points(
+            volumes, ph, rising=analyte_is_acid
+        )
+        plot_indices = cls.downsample_lttb(volumes, ph, request.plot_points)
+
+        volumes.flags.writeable = False
+        ph.flags.writeable = False
+        plot_volumes = volumes[plot_indices]
+        plot_ph = ph[plot_indices]
+        plot_volumes.flags.writeable = False
+        plot_ph.flags.writeable = False
+
+        return TitrationResult(
+            volumes_ml=volumes,
+            ph=ph,
+            plot_volumes_ml=plot_volumes,
+            plot_ph=plot_ph,
+            equivalence_volumes_ml=equivalence_volumes,
+            equivalence_ph=equivalence_ph,
+            expected_equivalence_ml=expected,
+        )
+
+    @classmethod
+    def _validate_titration(cls, request: TitrationRequest) -> None:
+        if request.analyte_type not in cls._TITRATION_TYPES or request.titrant_type not in cls._TITRATION_TYPES:
+            raise PHError("Tipo de cálculo no soportado para la titulación.")
+        if (request.analyte_type in cls._ACID_TYPES) == (request.titrant_type in cls._ACID_TYPES):
+            raise PHError("Se debe titular un ácido con una base o una base con un ácido.")
+
+        for value, name in (
+            (request.analyte_concentration_m, "La concentración del analito"),
+            (request.analyte_volume_ml, "El volumen del analito"),
+            (request.titrant_concentration_m, "La concentración del titulante"),
+        ):
+            if value is None or not 0 < value < math.inf:
+                raise PHError(f"{name} debe ser mayor que cero.")
+        if request.analyte_concentration_m > cls.MAX_CONCENTRATION or (
+            request.titrant_concentration_m > cls.MAX_CONCENTRATION
+        ):
+            raise PHError("La concentración ingresada es demasiado alta para un cálculo fiable.")
+        if request.max_titrant_volume_ml is not None and not 0 < request.max_titrant_volume_ml < math.inf:
+            raise PHError("El volumen máximo de titulante debe ser mayor que cero.")
+
+        if request.analyte_type in cls._WEAK_TYPES:
+            cls._validate_weak_constant(request.analyte_constant, request.analyte_pka)
+        if request.titrant_type in cls._WEAK_TYPES:
+            cls._validate_weak_constant(request.titrant_constant, request.titrant_pka)
+
+        if not 3 <= request.points <= cls.MAX_TITRATION_POINTS:
+            raise PHError(f"La curva debe tener entre 3 y {cls.MAX_TITRATION_POINTS} puntos.")
+        if not 3 <= request.plot_points <= request.points:
+            raise PHError("Los puntos para graficar deben estar entre 3 y los puntos de la curva.")
+        cls._conditions(request.kw, request.temperature_c, request.ionic_strength)
+
+    @classmethod
+    def _conjugate_ka(
+        cls,
+        calculation_type: PHCalculationType,
+        constant: float | None,
+        pka: float | None,
+        kw: float,
+        gamma: float = 1.0,
+    ) -> float:
+        """
+        Ka del par ácido-base en la forma que usa el balance de carga (en concentraciones).
+
+        Un ácido fuerte tiene Ka infinito (siempre disociado) y el catión de una
+        base fuerte, Ka = 0 (nunca se protona); una base débil usa el Ka de su
+        ácido conjugado, Kw / Kb. Un ácido neutro HA forma dos iones y su Ka
+        se divide por γ²; en BH⁺ ⇌ B + H⁺ las actividades se compensan.
+        """
+
+        if calculation_type == PHCalculationType.STRONG_ACID:
+            return math.inf
+        if calculation_type == PHCalculationType.STRONG_BASE:
+            return 0.0
+        weak = cls._weak_constant(calculation_type, constant, pka, kw)
+        return weak / gamma**2 if calculation_type == PHCalculationType.WEAK_ACID else kw / weak
+
+    @classmethod
+    def _solve_titration_hydronium(cls, acid: np.ndarray, acid_ka, base: np.ndarray, base_ka, kw) -> np.ndarray:
+        """
+        Resuelve [H₃O⁺] en todos los puntos de la curva a la vez.
+
+        Balance de carga con la fracción disociada del ácido α = Ka/(Ka + h)
+        y la fracción protonada de la base β = h/(h + Ka'):
+
+            h + Cb·β(h) = Kw/h + Ca·α(h)
+
+        La diferencia entre ambos lados crece con h, así que la raíz es única
+        y se acota entre Kw/(Cb + √Kw) y Ca + √Kw. Se biseca sobre ln h, que
+        converge en todos los puntos sin importar lo lejos que esté la raíz.
+        """
+
+        root_kw = np.sqrt(kw)
+        low = np.log(kw / (base + root_kw))
+        high = np.log(acid + root_kw)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for _ in range(cls.TITRATION_BISECTIONS):
+                middle = 0.5 * (low + high)
+                h = np.exp(middle)
+                balance = h + base / (1.0 + base_ka / h) - kw / h - acid / (1.0 + h / acid_ka)
+                above = balance > 0
+                high = np.where(above, middle, high)
+                low = np.where(above, low, middle)
+        return np.exp(0.5 * (low + high))
+
+    @classmethod
+    def _find_equivalence_points(
+        cls, volumes: np.ndarray, ph: np.ndarray, rising: bool
+    ) -> Tuple[List[float], List[float]]:
+        """Máximos locales de la pendiente, refinados con una parábola por tres puntos."""
+
+        slope = np.gradient(ph, volumes)
+        if not rising:
+            slope = -slope
+
+        interior = slope[1:-1]
+        peaks = np.flatnonzero((interior > slope[:-2]) & (interior >= slope[2:])) + 1
+        if peaks.size == 0:
+            return [], []
+        peaks = peaks[slope[peaks] >= cls.EQUIVALENCE_MIN_FRACTION * slope[peaks].max()]
+
+        previous, current, following = slope[peaks - 1], slope[peaks], slope[peaks + 1]
+        curvature = previous - 2 * current + following
+        offset = np.divide(
+            0.5 * (previous - following), curvature, out=np.zeros_like(current), where=curvature != 0
+        )
+        step = volumes[1] - volumes[0]
+        equivalence_volumes = volumes[peaks] + offset * step
+        equivalence_ph = np.interp(equivalence_volumes, volumes, ph)
+        return equivalence_volumes.tolist(), equivalence_ph.tolist()
+
+    @staticmethod
+    def downsample_lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+        """
+        Índices de los puntos que conserva el algoritmo largest-triangle-three-buckets.
+
+        Se mantienen el primer y el último punto; el resto se reparte en
+        `threshold - 2` grupos y de cada uno se elige el punto que forma el
+        triángulo de mayor área con el punto elegido antes y el promedio del
+        grupo siguiente. Así el salto del punto de equivalencia no se pierde
+        al reducir la curva.
+        """
+
+        length = len(x)
+        if threshold >= length or threshold < 3:
+            return np.arange(length)
+
+        edges = np.linspace(1, length - 1, threshold - 1).astype(np.int64)
+        selected = np.empty(threshold, dtype=np.int64)
+        selected[0] = 0
+        selected[-1] = length - 1
+        chosen = 0
+
+        for bucket in range(threshold - 2):
+            start, end = edges[bucket], edges[bucket + 1]
+            following_end = edges[bucket + 2] if bucket + 2 < len(edges) else length
+            average_x = x[end:following_end].mean()
+            average_y = y[end:following_end].mean()
+
+            areas = np.abs(
+                (x[chosen] - average_x) * (y[start:end] - y[chosen])
+                - (x[chosen] - x[start:end]) * (average_y - y[chosen])
+            )
+            chosen = start + int(np.argmax(areas))
+            selected[bucket + 1] = chosen
+
+        return selected
+
     @classmethod
     def _validate_request(cls, request: PHRequest) -> None:
         if request.concentration_m is None:
@@ -64,12 +971,72 @@ class PHService:
         if request.equivalents is None or request.equivalents <= 0:
             raise PHError("El número de equivalentes debe ser mayor que cero.")
 
+        if request.calculation_type in cls._CONSTANT_TYPES:
+            if request.equivalents != 1:
+                raise PHError(
+                    "Los ácidos y bases débiles se calculan como monopróticos; deja los equivalentes en 1."
+                )
+            cls._validate_weak_constant(request.dissociation_constant, request.pka)
+
+        if request.calculation_type == PHCalculationType.BUFFER:
+            conjugate = request.conjugate_concentration_m
+            if conjugate is None or not 0 < conjugate <= cls.MAX_CONCENTRATION:
+                raise PHError("Debes indicar una concentración de la base conjugada mayor que cero.")
+
+    @classmethod
+    def _validate_weak_constant(cls, constant: float | None, pka: float | None) -> None:
+        if constant is None and pka is None:
+            raise PHError("Debes indicar la constante de disociación (Ka o Kb) o el pKa.")
+        if constant is not None and not 0 < constant < math.inf:
+            raise PHError("La constante de disociación debe ser mayor que cero.")
+        if pka is not None and not math.isfinite(pka):
+            raise PHError("El pKa debe ser un número finito.")
+        low, high = cls.PKA_LIMITS
+        if pka is not None and not low <= pka <= high:
+            raise PHError(f"El pKa debe estar entre {low:g} y {high:g}.")
+
     @classmethod
     def _normalize_kw(cls, kw: float) -> float:
         if kw and kw > 0:
             return kw
         return cls.DEFAULT_KW
 
+    @classmethod
+    def _conditions(
+        cls, kw: float, temperature_c: float | None, ionic_strength: float
+    ) -> Tuple[float, float]:
+        """Kw termodinámico y coeficiente de actividad de los iones monovalentes."""
+
+        if temperature_c is None:
+            kw = cls._normalize_kw(kw)
+        else:
+            kw = cls.kw_at_temperature(temperature_c)
+        gamma = float(cls.activity_coefficient(1, ionic_strength, temperature_c)) if ionic_strength else 1.0
+        return kw, gamma
+
+    @classmethod
+    def _validate_ionic_strength(cls, ionic_strength: float) -> None:
+        if ionic_strength is None or not 0 <= ionic_strength <= cls.MAX_IONIC_STRENGTH:
+            raise PHError(
+                f"La fuerza iónica debe estar entre 0 y {cls.MAX_IONIC_STRENGTH:g} M "
+                "para que la corrección de Davies sea válida."
+            )
+
+    @classmethod
+    @lru_cache(maxsize=WATER_CACHE_SIZE)
+    def _water_properties(cls, temperature_c: float) -> Tuple[float, float]:
+        """pKw y A de Debye–Hückel interpolados linealmente; se memorizan por temperatura."""
+
+        temperatures = cls.WATER_TABLE[:, 0]
+        if not temperatures[0] <= temperature_c <= temperatures[-1]:
+            raise PHError(
+                f"La temperatura debe estar entre {temperatures[0]:g} y {temperatures[-1]:g} °C."
+            )
+        return (
+            float(np.interp(temperature_c, temperatures, cls.WATER_TABLE[:, 1])),
+            float(np.interp(temperature_c, temperatures, cls.WATER_TABLE[:, 2])),
+        )
+
     @classmethod
     def _resolve_effective_concentration(
         cls, concentration_m: float, equivalents: float
@@ -86,6 +1053,36 @@ class PHService:
 
         return effective_concentration, None
 
+    @classmethod
+    def _resolve_dissociation_constant(cls, request: PHRequest, kw: float) -> float | None:
+        """Ka del ácido o Kb de la base; con pKa de una base se usa Kb = Kw / Ka."""
+
+        if request.calculation_type not in cls._CONSTANT_TYPES:
+            return None
+        pka = request.pka
+        if pka is not None and request.temperature_c is not None:
+            pka += request.pka_temperature_coefficient * (
+                request.temperature_c - cls.REFERENCE_TEMPERATURE
+            )
+        return cls._weak_constant(request.calculation_type, request.dissociation_constant, pka, kw)
+
+    @staticmethod
+    def _weak_constant(
+        calculation_type: PHCalculationType, constant: float | None, pka: float | None, kw: float
+    ) -> float:
+        if constant is not None:
+            return constant
+
+        # El pKa corregido por temperatura puede salir del intervalo validado
+        try:
+            ka = 10.0 ** -pka
+            constant = kw / ka if calculation_type == PHCalculationType.WEAK_BASE else ka
+        except (OverflowError, ZeroDivisionError):
+            constant = math.nan
+        if not 0 < constant < math.inf:
+            raise PHError("El pKa da una constante de disociación fuera del intervalo representable.")
+        return constant
+
     @classmethod
     def _get_calculator(cls, calculation_type: PHCalculationType):
         method_name = cls._CALCULATION_MAP.get(calculation_type)
@@ -94,7 +1091,7 @@ class PHService:
         return getattr(cls, method_name)
 
     @classmethod
-    def _calculate_strong_acid(cls, effective_concentration: float, kw: float):
+    def _calculate_strong_acid(cls, effective_concentration: float, kw: float, _constant=None, _conjugate=None):
         hydronium = effective_concentration
         hydroxide = kw / hydronium if hydronium > 0 else 0
         return cls._ensure_positive_species(
@@ -104,7 +1101,7 @@ class PHService:
         )
 
     @classmethod
-    def _calculate_strong_base(cls, effective_concentration: float, kw: float):
+    def _calculate_strong_base(cls, effective_concentration: float, kw: float, _constant=None, _conjugate=None):
         hydroxide = effective_concentration
         hydronium = kw / hydroxide if hydroxide > 0 else 0
         return cls._ensure_positive_species(
@@ -113,13 +1110,72 @@ class PHService:
             "pOH = -log₁₀([OH⁻])",
         )
 
+    @classmethod
+    def _calculate_weak_acid(cls, effective_concentration: float, kw: float, ka: float, _conjugate=None):
+        hydronium = float(cls.solve_weak_equilibrium(effective_concentration, ka, kw))
+        return cls._ensure_positive_species(
+            hydronium,
+            kw / hydronium,
+            "[H₃O⁺]³ + Ka·[H₃O⁺]² − (Kw + Ka·C)·[H₃O⁺] − Ka·Kw = 0",
+            cls._approximation_note(effective_concentration, ka, hydronium),
+        )
+
+    @classmethod
+    def _calculate_weak_base(cls, effective_concentration: float, kw: float, kb: float, _conjugate=None):
+        hydroxide = float(cls.solve_weak_equilibrium(effective_concentration, kb, kw))
+        return cls._ensure_positive_species(
+            kw / hydroxide,
+            hydroxide,
+            "[OH⁻]³ + Kb·[OH⁻]² − (Kw + Kb·C)·[OH⁻] − Kb·Kw = 0",
+            cls._approximation_note(effective_concentration, kb, hydroxide),
+        )
+
+    @classmethod
+    def _calculate_buffer(cls, effective_concentration: float, kw: float, ka: float, conjugate: float):
+        """
+        Mezcla de HA (concentration_m) y su sal NaA (conjugate): se resuelve el
+        balance de carga [H₃O⁺] + [Na⁺] = [OH⁻] + [A⁻] con los dos aportes.
+        """
+
+        hydronium = float(
+            cls._solve_titration_hydronium(
+                np.array([effective_concentration + conjugate]), ka, np.array([conjugate]), 0.0, kw
+            )[0]
+        )
+        henderson = -math.log10(ka) + math.log10(conjugate / effective_concentration)
+        deviation = abs(henderson + math.log10(hydronium))
+        note = None
+        if deviation > cls.HENDERSON_WARNING:
+            note = (
+                f"Henderson–Hasselbalch se desvía {deviation:.2f} unidades de pH del balance "
+                "de carga completo porque la disociación no es despreciable."
+            )
+        return cls._ensure_positive_species(
+            hydronium,
+            kw / hydronium,
+            "pH = pKa + log₁₀([A⁻]/[HA]), corregido con el balance de carga",
+            note,
+        )
+
+    @classmethod
+    def _approximation_note(cls, concentration: float, constant: float, exact: float) -> str | None:
+        """Avisa cuando la aproximación habitual √(K·C) se aleja de la solución exacta."""
+
+        deviation = abs(math.sqrt(constant * concentration) - exact) / exact
+        if deviation <= cls.APPROXIMATION_WARNING:
+            return None
+        return (
+            f"La aproximación √(K·C) se desvía un {deviation * 100:.1f} % del valor exacto; "
+            "se usa la solución del balance de carga."
+        )
+
     @staticmethod
     def _ensure_positive_species(
-        hydronium: float, hydroxide: float, formula: str
-    ) -> Tuple[float, float, str]:
+        hydronium: float, hydroxide: float, formula: str, note: str | None = None
+    ) -> Tuple[float, float, str, str | None]:
         if hydronium <= 0 or hydroxide <= 0:
             raise PHError("No se pudo calcular el equilibrio iónico de la solución.")
-        return hydronium, hydroxide, formula
+        return hydronium, hydroxide, formula, note
 
     @classmethod
     def _build_result(
@@ -130,13 +1186,16 @@ class PHService:
         hydroxide: float,
         formula: str,
         notes: str | None,
+        ionization_percent: float | None = None,
+        kw: float = DEFAULT_KW,
+        activity_coefficient: float = 1.0,
     ) -> PHResult:
-        ph = -math.log10(hydronium)
-        poh = -math.log10(hydroxide)
+        pkw = -math.log10(kw)
+        ph = -math.log10(activity_coefficient * hydronium)
 
-        # Ajustar valores extremos manteniendo consistencia 14 = pH + pOH
-        ph = max(0.0, min(14.0, ph))
-        poh = 14.0 - ph
+        # Ajustar valores extremos manteniendo consistencia pKw = pH + pOH
+        ph = max(0.0, min(pkw, ph))
+        poh = pkw - ph
 
         return PHResult(
             calculation_type=calculation_type,
@@ -146,4 +1205,7 @@ class PHService:
             hydroxide=hydroxide,
             formula_used=formula,
             notes=notes,
+            ionization_percent=ionization_percent,
+            pkw=round(pkw, 4),
+            activity_coefficient=activity_coefficient,
         )
@@ -0,0 +1,167 @@
+import csv
+import io
+import string
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from ..models.concentration import CalculationType
+from ..models.plate import PlateFormat, PlateLayoutRequest, PlateLayoutResult, PlateError
+from .concentration_service import ConcentrationService
+
+class PlateService:
+    """Servicio para planificar diluciones en placas de 96 y 384 pocillos."""
+    
+    # Filas y columnas de cada formato
+    PLATE_DIMENSIONS: Dict[PlateFormat, Tuple[int, int]] = {
+        PlateFormat.WELLS_96: (8, 12),
+        PlateFormat.WELLS_384: (16, 24),
+    }
+    
+    WORKLIST_HEADER = (
+        'pocillo', 'stock', 'concentracion_stock', 'volumen_stock_ul',
+        'volumen_diluyente_ul', 'concentracion_final',
+    )
+    
+    @classmethod
+    def plan_layout(cls, request: PlateLayoutRequest) -> PlateLayoutResult:
+        """
+        Calcula los volúmenes de stock y diluyente de todos los pocillos en una sola pasada.
+        
+        Los volúmenes salen de C₁V₁ = C₂V₂ (el mismo plan precompilado que usa
+        ConcentrationService) evaluado para cada par objetivo × stock. Para cada
+        objetivo se elige el stock que consume menos volumen sin bajar del volumen
+        mínimo pipeteable. Las réplicas ocupan pocillos consecutivos, fila por fila.
+        
+        Args:
+            request: Stocks, concentraciones objetivo, réplicas y formato de placa
+        
+        Returns:
+            PlateLayoutResult con el mapa de la placa y los volúmenes por pocillo
+        
+        Raises:
+            PlateError: Si los datos no son válidos, no caben en la placa o algún objetivo no se puede preparar
+        """
+        rows, columns = cls.PLATE_DIMENSIONS[request.plate_format]
+        stocks = np.asarray(request.stock_concentrations, dtype=np.float64)
+        targets = np.asarray(request.target_concentrations, dtype=np.float64)
+        cls._validate_request(request, stocks, targets, rows * columns)
+        
+        # Volumen de stock para cada par (objetivo, stock): V₁ = C₂·V₂ / C₁
+        dilution = ConcentrationService.EQUATIONS[CalculationType.DILUTION]
+        plan = dilution.plan(dilution.mask({'c1': 1.0, 'c2': 1.0, 'v2': 1.0}))
+        solved, _ = plan.solve_arrays({
+            'c1': np.tile(stocks, targets.size),
+            'c2': np.repeat(targets, stocks.size),
+            'v2': np.full(targets.size * stocks.size, request.well_volume),
+        })
+        volumes = solved['v1'].reshape(targets.size, stocks.size)
+        
+        # Elegir el stock de menor consumo entre los que se pueden pipetear
+        feasible = (volumes >= request.min_transfer_volume) & (volumes <= request.well_volume)
+        cls._check_feasible(feasible, targets, stocks, request)
+        choice = np.argmin(np.where(feasible, volumes, np.inf), axis=1)
+        chosen_volumes = volumes[np.arange(targets.size), choice]
+        
+        # Expandir a pocillos: cada objetivo ocupa `replicates` pocillos consecutivos
+        well_targets = np.repeat(targets, request.replicates)
+        well_stocks = np.repeat(choice, request.replicates)
+        stock_volumes = np.repeat(chosen_volumes, request.replicates)
+        diluent_volumes = request.well_volume - stock_volumes
+        
+        positions = np.arange(well_targets.size)
+        row_letters = cls.row_labels(rows)
+        wells = [f"{row_letters[r]}{c + 1}" for r, c in zip(positions // columns, positions % columns)]
+        
+        plate_map = np.full(rows * columns, np.nan)
+        plate_map[positions] = well_targets
+        
+        return PlateLayoutResult(
+            plate_format=request.plate_format,
+            rows=rows,
+            columns=columns,
+            well_volume=request.well_volume,
+            wells=wells,
+            target_concentrations=well_targets.tolist(),
+            stock_indices=well_stocks.tolist(),
+            stock_concentrations=stocks[well_stocks].tolist(),
+            stock_volumes=stock_volumes.tolist(),
+            diluent_volumes=diluent_volumes.tolist(),
+            stock_consumption=np.bincount(well_stocks, weights=stock_volumes, minlength=stocks.size).tolist(),
+            total_diluent_volume=float(diluent_volumes.sum()),
+            plate_map=[[None if np.isnan(value) else float(value) for value in row]
+                       for row in plate_map.reshape(rows, columns)],
+            notes=f"{well_targets.size} de {rows * columns} pocillos ocupados",
+        )
+    
+    @classmethod
+    def _validate_request(cls, request: PlateLayoutRequest, stocks: np.ndarray,
+                          targets: np.ndarray, capacity: int):
+        """Valida los datos de la solicitud antes de calcular."""
+        if stocks.size == 0:
+            raise PlateError("Debes indicar al menos una concentración de stock")
+        if targets.size == 0:
+            raise PlateError("Debes indicar al menos una concentración objetivo")
+        if np.any(stocks <= 0) or np.any(targets <= 0):
+            raise PlateError("Las concentraciones deben ser mayores a 0")
+        if request.replicates < 1:
+            raise PlateError("El número de réplicas debe ser al menos 1")
+        if request.well_volume <= 0:
+            raise PlateError("El volumen por pocillo debe ser mayor a 0")
+        if not 0 <= request.min_transfer_volume < request.well_volume:
+            raise PlateError("El volumen mínimo de pipeteo debe ser menor que el volumen por pocillo")
+        if targets.size * request.replicates > capacity:
+            raise PlateError(
+                f"Se necesitan {targets.size * request.replicates} pocillos y la placa "
+                f"de {request.plate_format.value} solo tiene {capacity}"
+            )
+    
+    @staticmethod
+    def _check_feasible(feasible: np.ndarray, targets: np.ndarray, stocks: np.ndarray,
+                        request: PlateLayoutRequest):
+        """Lanza PlateError si algún objetivo no puede prepararse con ningún stock."""
+        missing = ~feasible.any(axis=1)
+        if not missing.any():
+            return
+        
+        too_high = targets[missing & (targets > stocks.max())]
+        if too_high.size:
+            raise PlateError(
+                "Concentraciones objetivo mayores que el stock más concentrado: "
+                + ", ".join(f"{value:g}" for value in too_high)
+            )
+        too_low = targets[missing]
+        raise PlateError(
+            f"Estas concentraciones requieren pipetear menos de {request.min_transfer_volume:g} µL; "
+            "agrega un stock intermedio más diluido: " + ", ".join(f"{value:g}" for value in too_low)
+        )
+    
+    @staticmethod
+    def row_labels(rows: int) -> List[str]:
+        """Letras de las filas de la placa (A, B, C, ...)."""
+        return list(string.ascii_uppercase[:rows])
+    
+    @classmethod
+    def to_worklist_csv(cls, result: PlateLayoutResult) -> str:
+        """Genera la lista de trabajo en CSV: una línea por pocillo con sus volúmenes."""
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator='\n')
+        writer.writerow(cls.WORKLIST_HEADER)
+        for i, well in enumerate(result.wells):
+            writer.writerow((
+                well,
+                f"stock_{result.stock_indices[i] + 1}",
+                f"{result.stock_concentrations[i]:g}",
+                f"{result.stock_volumes[i]:.3f}",
+                f"{result.diluent_volumes[i]:.3f}",
+                f"{result.target_concentrations[i]:g}",
+            ))
+        return output.getvalue()
+    
+    @classmethod
+    def get_plate_formats(cls):
+        """Retorna los formatos de placa disponibles."""
+        return [
+            {"value": PlateFormat.WELLS_96.value, "label": "96 pocillos (8 × 12)"},
+            {"value": PlateFormat.WELLS_384.value, "label": "384 pocillos (16 × 24)"},
+        ]
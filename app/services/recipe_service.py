@@ -0,0 +1,260 @@
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+from ..models.concentration import CalculationType
+from ..models.conversion import ConversionError
+from ..models.recipe import (
+    RecipeComponent, RecipeStock, RecipeRequest, RecipeResult,
+    RecipeBatchResult, RecipeErrorCode, RecipeError
+)
+from .concentration_service import ConcentrationService
+from .unit_expression_service import UnitExpressionService
+
+class RecipeService:
+    """Servicio para resolver recetas de soluciones con varios componentes."""
+    
+    # Tolerancia relativa para aceptar la solución del sistema lineal
+    RESIDUAL_TOLERANCE = 1e-9
+    
+    ERROR_MESSAGES = {
+        RecipeErrorCode.OK: None,
+        RecipeErrorCode.UNREACHABLE: "Con estos stocks no se pueden obtener esas concentraciones a la vez",
+        RecipeErrorCode.NEGATIVE_VOLUME: "La receta necesitaría un volumen negativo de algún stock",
+        RecipeErrorCode.EXCEEDS_FINAL_VOLUME: "Los stocks necesarios superan el volumen final",
+        RecipeErrorCode.BELOW_MIN_VOLUME: "Algún volumen de stock es menor que el mínimo pipeteable; "
+                                          "reemplaza ese stock por uno más diluido",
+    }
+    
+    @classmethod
+    def solve(cls, request: RecipeRequest) -> RecipeResult:
+        """
+        Resuelve una receta: volumen de cada stock, masa de cada sólido y diluyente.
+        
+        Raises:
+            RecipeError: Si los datos no son válidos o la receta no se puede preparar
+        """
+        batch = cls.solve_batch(
+            request.components, request.stocks,
+            [[component.target_concentration for component in request.components]],
+            [request.final_volume_ml], request.min_transfer_volume_ml
+        )
+        code = RecipeErrorCode(batch.error_codes[0])
+        if code != RecipeErrorCode.OK:
+            raise RecipeError(cls.ERROR_MESSAGES[code])
+        
+        notes = None
+        if batch.solid_names:
+            notes = "Sin stock disponible para: " + ", ".join(batch.solid_names) + "; se pesan como sólidos"
+        return RecipeResult(
+            final_volume_ml=request.final_volume_ml,
+            stock_volumes_ml=dict(zip(batch.stock_names, batch.stock_volumes_ml[0].tolist())),
+            solid_masses_g=dict(zip(batch.solid_names, batch.solid_masses_g[0].tolist())),
+            diluent_volume_ml=float(batch.diluent_volumes_ml[0]),
+            notes=notes,
+        )
+    
+    @classmethod
+    def solve_batch(cls, components: Sequence[RecipeComponent], stocks: Sequence[RecipeStock],
+                    targets: Union[np.ndarray, Sequence[Sequence[float]]],
+                    final_volumes_ml: Union[np.ndarray, Sequence[float]],
+                    min_transfer_volume_ml: float = 0.001) -> RecipeBatchResult:
+        """
+        Resuelve muchas recetas que comparten componentes y stocks en una sola operación matricial.
+        
+        Cada stock aporta C₁·V₁ de cada soluto, así que para cada receta
+        S · v = c_objetivo · V_final, donde S tiene la concentración de cada soluto
+        (fila) en cada stock (columna). La pseudoinversa de S se calcula una vez y
+        se aplica a todas las recetas. Los solutos sin stock se pesan como sólidos
+        con la relación masa/volumen de ConcentrationService.
+        
+        Args:
+            components: Solutos de la receta; las concentraciones objetivo se toman de `targets`
+            stocks: Stocks disponibles
+            targets: Matriz (recetas × componentes) de concentraciones objetivo
+            final_volumes_ml: Volumen final de cada receta (mL)
+            min_transfer_volume_ml: Volumen mínimo que se puede pipetear (mL)
+        
+        Returns:
+            RecipeBatchResult con los volúmenes, las masas y un RecipeErrorCode por receta
+        
+        Raises:
+            RecipeError: Si los componentes, los stocks o las dimensiones no son válidos
+        """
+        targets = np.asarray(targets, dtype=np.float64)
+        final_volumes = np.asarray(final_volumes_ml, dtype=np.float64)
+        if targets.ndim != 2 or targets.shape[1] != len(components):
+            raise RecipeError("Se esperaba una concentración objetivo por componente en cada receta")
+        if final_volumes.shape != (targets.shape[0],):
+            raise RecipeError("Se esperaba un volumen final por receta")
+        if np.any(~np.isfinite(targets)) or np.any(targets < 0):
+            raise RecipeError("Las concentraciones objetivo no pueden ser negativas")
+        if np.any(~(final_volumes > 0)):
+            raise RecipeError("El volumen final debe ser mayor a 0")
+        if min_transfer_volume_ml < 0:
+            raise RecipeError("El volumen mínimo de pipeteo no puede ser negativo")
+        
+        matrix = cls._stock_matrix(components, stocks)
+        covered = matrix.any(axis=1)
+        solids = [i for i, has_stock in enumerate(covered) if not has_stock]
+        size = targets.shape[0]
+        
+        # Volúmenes de stock: v = S⁺ · (c · V), resuelto para todas las recetas a la vez
+        required = targets[:, covered] * final_volumes[:, None]
+        system = matrix[covered]
+        volumes = required @ np.linalg.pinv(system).T if stocks else np.zeros((size, 0))
+        residual = np.abs(volumes @ system.T - required)
+        scale = np.maximum(np.abs(required), np.finfo(float).tiny)
+        
+        tolerance = cls.RESIDUAL_TOLERANCE * final_volumes
+        unreachable = np.any(residual > cls.RESIDUAL_TOLERANCE * scale, axis=1)
+        negative = np.any(volumes < -tolerance[:, None], axis=1)
+        volumes = np.where(np.abs(volumes) <= tolerance[:, None], 0.0, volumes)
+        exceeds = volumes.sum(axis=1) > final_volumes * (1 + cls.RESIDUAL_TOLERANCE)
+        below_min = np.any((volumes > 0) & (volumes < min_transfer_volume_ml), axis=1)
+        
+        error_codes = np.select(
+            [unreachable, negative, exceeds, below_min],
+            [RecipeErrorCode.UNREACHABLE, RecipeErrorCode.NEGATIVE_VOLUME,
+             RecipeErrorCode.EXCEEDS_FINAL_VOLUME, RecipeErrorCode.BELOW_MIN_VOLUME],
+            default=RecipeErrorCode.OK
+        ).astype(np.int8)
+        
+        solid_masses = cls._solid_masses([components[i] for i in solids], targets[:, solids], final_volumes)
+        diluent = final_volumes - volumes.sum(axis=1)
+        
+        failed = error_codes != RecipeErrorCode.OK
+        volumes[failed] = np.nan
+        solid_masses[failed] = np.nan
+        diluent[failed] = np.nan
+        
+        return RecipeBatchResult(
+            stock_names=[stock.name for stock in stocks],
+            solid_names=[components[i].name for i in solids],
+            stock_volumes_ml=volumes.reshape(size, len(stocks)),
+            solid_masses_g=solid_masses,
+            diluent_volumes_ml=diluent,
+            error_codes=error_codes,
+        )
+    
+    @classmethod
+    def _stock_matrix(cls, components: Sequence[RecipeComponent], stocks: Sequence[RecipeStock]) -> np.ndarray:
+        """
+        Arma la matriz componentes × stocks con las concentraciones en la unidad de cada objetivo.
+        
+        Raises:
+            RecipeError: Si hay nombres repetidos o desconocidos, valores no positivos,
+                unidades incompatibles o stocks redundantes
+        """
+        if not components:
+            raise RecipeError("La receta debe tener al menos un componente")
+        index = {component.name: i for i, component in enumerate(components)}
+        if len(index) != len(components):
+            raise RecipeError("Los nombres de los componentes deben ser únicos")
+        if len({stock.name for stock in stocks}) != len(stocks):
+            raise RecipeError("Los nombres de los stocks deben ser únicos")
+        
+        matrix = np.zeros((len(components), len(stocks)))
+        for j, stock in enumerate(stocks):
+            if not stock.concentrations:
+                raise RecipeError(f"El stock {stock.name} no tiene solutos")
+            for name, concentration in stock.concentrations.items():
+                if name not in index:
+                    raise RecipeError(f"El stock {stock.name} contiene {name}, que no está en la receta")
+                if not concentration > 0:
+                    raise RecipeError(f"La concentración de {name} en {stock.name} debe ser mayor a 0")
+                component = index[name]
+                matrix[component, j] = concentration * cls._unit_factor(
+                    stock.unit, components[component].unit, components[component].molar_mass
+                )
+        
+        covered = matrix.any(axis=1)
+        if stocks and np.linalg.matrix_rank(matrix[covered]) < len(stocks):
+            # Con stocks dependientes la solución no es única y habría que optimizar con
+            # cotas; se pide elegir uno, por ejemplo un solo stock por soluto
+            raise RecipeError("Hay stocks redundantes: alguno es combinación de los demás; "
+                              "deja un solo stock por soluto")
+        return matrix
+    
+    @staticmethod
+    def _unit_factor(from_unit: str, to_unit: str, molar_mass: Optional[float]) -> float:
+        """Factor para expresar una concentración en la unidad del objetivo."""
+        try:
+            return UnitExpressionService.compile_plan(from_unit, to_unit, molar_mass).factor
+        except ConversionError as e:
+            raise RecipeError(str(e))
+    
+    @classmethod
+    def _solid_masses(cls, solids: List[RecipeComponent], targets: np.ndarray,
+                      final_volumes: np.ndarray) -> np.ndarray:
+        """Masa a pesar de cada soluto sin stock: m = C(g/L) · V(mL) / 1000."""
+        if not solids:
+            return np.zeros((targets.shape[0], 0))
+        
+        factors = np.array([cls._unit_factor(solid.unit, 'g/L', solid.molar_mass) for solid in solids])
+        mass_volume = ConcentrationService.EQUATIONS[CalculationType.MASS_VOLUME]
+        plan = mass_volume.plan(mass_volume.mask({'concentration_mg_ml': 1.0, 'volume_ml': 1.0}))
+        solved, _ = plan.solve_arrays({
+            'concentration_mg_ml': (targets * factors).ravel(),
+            'volume_ml': np.repeat(final_volumes, len(solids)),
+        })
+        return solved['mass_g'].reshape(targets.shape)
+    
+    @classmethod
+    def error_message(cls, code: int) -> Optional[str]:
+        """Mensaje legible de un código de error de receta."""
+        return cls.ERROR_MESSAGES[RecipeErrorCode(code)]
+    
+    @staticmethod
+    def parse_components(text: str) -> List[RecipeComponent]:
+        """
+        Lee componentes en líneas "nombre; concentración; unidad[; masa molar]".
+        
+        Raises:
+            ValueError: Si alguna línea no tiene el formato esperado
+        """
+        components = []
+        for line in _lines(text):
+            parts = [part.strip() for part in line.split(';')]
+            if len(parts) not in (3, 4):
+                raise ValueError(f"Línea de componente no válida: {line}")
+            components.append(RecipeComponent(
+                name=parts[0],
+                target_concentration=_parse_number(parts[1], line),
+                unit=parts[2],
+                molar_mass=_parse_number(parts[3], line) if len(parts) == 4 and parts[3] else None,
+            ))
+        return components
+    
+    @staticmethod
+    def parse_stocks(text: str) -> List[RecipeStock]:
+        """
+        Lee stocks en líneas "nombre; unidad; soluto=concentración, soluto=concentración".
+        
+        Raises:
+            ValueError: Si alguna línea no tiene el formato esperado
+        """
+        stocks = []
+        for line in _lines(text):
+            parts = [part.strip() for part in line.split(';')]
+            if len(parts) != 3:
+                raise ValueError(f"Línea de stock no válida: {line}")
+            concentrations = {}
+            for item in parts[2].split(','):
+                name, sep, value = item.partition('=')
+                if not sep:
+                    raise ValueError(f"Se esperaba soluto=concentración en: {line}")
+                concentrations[name.strip()] = _parse_number(value, line)
+            stocks.append(RecipeStock(name=parts[0], unit=parts[1], concentrations=concentrations))
+        return stocks
+
+def _lines(text: str) -> List[str]:
+    """Líneas no vacías de un texto."""
+    return [line.strip() for line in (text or '').splitlines() if line.strip()]
+
+def _parse_number(value: str, line: str) -> float:
+    """Convierte un número de una línea de receta o lanza ValueError."""
+    try:
+        return float(value.strip().replace(',', '.'))
+    except ValueError:
+        raise ValueError(f"Valor numérico no válido en: {line}")
@@ -0,0 +1,195 @@
+import math
+import re
+from fractions import Fraction
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..models.conversion import (
+    CompoundConversionRequest, CompoundConversionResult, ConversionError, ConversionPlan
+)
+from .conversion_service import ConversionService
+
+# Dimensiones como vector de exponentes (masa, longitud, cantidad de sustancia)
+Dimensions = Tuple[int, int, int]
+
+class UnitExpressionService:
+    """Servicio para convertir entre expresiones de unidades compuestas con prefijos SI."""
+    
+    # Unidades base: símbolo -> (escala respecto a g, m y mol; dimensiones)
+    # Las escalas son fracciones exactas para que componer prefijos no acumule error
+    _BASE_UNITS: Dict[str, Tuple[Fraction, Dimensions]] = {
+        'g': (Fraction(1), (1, 0, 0)),
+        'm': (Fraction(1), (0, 1, 0)),
+        'L': (Fraction(1, 10**3), (0, 3, 0)),
+        'l': (Fraction(1, 10**3), (0, 3, 0)),
+        'mol': (Fraction(1), (0, 0, 1)),
+        'M': (Fraction(10**3), (0, -3, 1)),
+    }
+    
+    _PREFIXES: Dict[str, Fraction] = {
+        'k': Fraction(10**3),
+        'h': Fraction(10**2),
+        'da': Fraction(10),
+        'd': Fraction(1, 10),
+        'c': Fraction(1, 10**2),
+        'm': Fraction(1, 10**3),
+        'µ': Fraction(1, 10**6),
+        'μ': Fraction(1, 10**6),
+        'u': Fraction(1, 10**6),
+        'n': Fraction(1, 10**9),
+        'p': Fraction(1, 10**12),
+        'f': Fraction(1, 10**15),
+    }
+    
+    # Número máximo de planes de conversión que se mantienen en memoria
+    PLAN_CACHE_SIZE = 512
+    
+    _OPERATOR_PATTERN = re.compile(r'\s*([*/·])\s*')
+    _TERM_PATTERN = re.compile(r'^([A-Za-zµμ]+)(?:\^?(-?\d+))?$')
+    
+    @classmethod
+    def convert(cls, request: CompoundConversionRequest) -> CompoundConversionResult:
+        """
+        Convierte un valor entre dos expresiones de unidades compuestas.
+        
+        Args:
+            request: Solicitud con el valor, las expresiones y la masa molar opcional
+            
+        Returns:
+            CompoundConversionResult con el valor convertido y el factor aplicado
+            
+        Raises:
+            ConversionError: Si alguna expresión no es válida o las dimensiones no son compatibles
+        """
+        plan = cls.compile_plan(request.from_expr, request.to_expr, request.molar_mass)
+        
+        return CompoundConversionResult(
+            original_value=request.value,
+            converted_value=request.value * plan.factor,
+            from_expr=plan.from_expr,
+            to_expr=plan.to_expr,
+            factor=plan.factor,
+            molar_mass=plan.molar_mass
+        )
+    
+    @classmethod
+    def convert_many(cls, values: Union[np.ndarray, Sequence[float]], from_expr: str, to_expr: str,
+                     molar_mass: Optional[float] = None) -> np.ndarray:
+        """
+        Convierte un arreglo de valores entre dos expresiones de unidades en una sola pasada.
+        
+        Raises:
+            ConversionError: Si la conversión no es válida o algún valor no es un número finito
+        """
+        plan = cls.compile_plan(from_expr, to_expr, molar_mass)
+        array = ConversionService.as_number_array(values)
+        
+        if not np.isfinite(array).all():
+            raise ConversionError("Los valores a convertir deben ser números finitos")
+        
+        return array * plan.factor
+    
+    @classmethod
+    def compile_plan(cls, from_expr: str, to_expr: str, molar_mass: Optional[float] = None) -> ConversionPlan:
+        """
+        Compila (o recupera de la caché LRU) el plan de conversión entre dos expresiones.
+        
+        Cuando las dimensiones difieren en masa ↔ cantidad de sustancia, cada gramo
+        se convierte a moles dividiendo por la masa molar (g/mol).
+        
+        Raises:
+            ConversionError: Si alguna expresión no es válida, falta la masa molar o
+                las dimensiones no son compatibles
+        """
+        if molar_mass is not None and not (math.isfinite(molar_mass) and molar_mass > 0):
+            raise ConversionError("La masa molar debe ser un número finito mayor a 0")
+        return cls._compile_plan_cached(from_expr.strip(), to_expr.strip(), molar_mass)
+    
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Vacía la caché de planes de conversión."""
+        cls._compile_plan_cached.cache_clear()
+    
+    @classmethod
+    @lru_cache(maxsize=PLAN_CACHE_SIZE)
+    def _compile_plan_cached(cls, from_expr: str, to_expr: str, molar_mass: Optional[float]) -> ConversionPlan:
+        from_scale, from_dims = cls.parse(from_expr)
+        to_scale, to_dims = cls.parse(to_expr)
+        
+        # Número de veces que hay que pasar de gramos a moles para igualar dimensiones
+        mass_to_amount = from_dims[0] - to_dims[0]
+        if (from_dims[1] != to_dims[1]
+                or to_dims[2] - from_dims[2] != mass_to_amount):
+            raise ConversionError(
+                f"Las unidades {from_expr} y {to_expr} no tienen dimensiones compatibles"
+            )
+        
+        factor = from_scale / to_scale
+        if mass_to_amount:
+            if molar_mass is None:
+                raise ConversionError(
+                    f"Se necesita la masa molar para convertir {from_expr} a {to_expr}"
+                )
+            factor /= Fraction(molar_mass) ** mass_to_amount
+        
+        return ConversionPlan(
+            from_expr=from_expr,
+            to_expr=to_expr,
+            molar_mass=molar_mass,
+            factor=float(factor)
+        )
+    
+    @classmethod
+    def parse(cls, expr: str) -> Tuple[Fraction, Dimensions]:
+        """
+        Analiza una expresión como "mg/dL", "mmol/L", "µg/mL" o "g·cm^-3".
+        
+        Admite prefijos SI, productos (*, ·), divisiones (/) y exponentes enteros
+        (cm^3 o cm3). Todo lo que sigue a una "/" queda en el denominador.
+        
+        Returns:
+            Tupla (escala respecto a g, m y mol; dimensiones)
+            
+        Raises:
+            ConversionError: Si la expresión no es válida
+        """
+        parts = cls._OPERATOR_PATTERN.split(expr.strip())
+        if not parts or not parts[0]:
+            raise ConversionError(f"Expresión de unidades no válida: {expr!r}")
+        
+        scale = Fraction(1)
+        dims = [0, 0, 0]
+        sign = 1
+        for position, part in enumerate(parts):
+            if position % 2:
+                if part == '/':
+                    sign = -1
+                continue
+            
+            match = cls._TERM_PATTERN.match(part)
+            if not match:
+                raise ConversionError(f"Expresión de unidades no válida: {expr!r}")
+            
+            unit_scale, unit_dims = cls._resolve_unit(match.group(1), expr)
+            exponent = sign * int(match.group(2) or 1)
+            scale *= unit_scale ** exponent
+            for axis in range(3):
+                dims[axis] += unit_dims[axis] * exponent
+        
+        return scale, tuple(dims)
+    
+    @classmethod
+    def _resolve_unit(cls, symbol: str, expr: str) -> Tuple[Fraction, Dimensions]:
+        """Resuelve un símbolo con prefijo opcional; la unidad sin prefijo tiene prioridad."""
+        if symbol in cls._BASE_UNITS:
+            return cls._BASE_UNITS[symbol]
+        
+        for prefix_length in (2, 1):
+            prefix, base = symbol[:prefix_length], symbol[prefix_length:]
+            if prefix in cls._PREFIXES and base in cls._BASE_UNITS:
+                base_scale, dims = cls._BASE_UNITS[base]
+                return cls._PREFIXES[prefix] * base_scale, dims
+        
+        raise ConversionError(f"Unidad desconocida {symbol!r} en la expresión {expr!r}")
@@ -0,0 +1,83 @@
+// Autocompletado de compuestos para los formularios de cálculo
+//
+// Uso: <input data-autocomplete="compuestos"
+//             data-fill-formula="id1,id2"
+//             data-fill-molar-mass="id3"
+//             data-fill-pka="id4"
+//             data-fill-pka-list="id5">
+// Al elegir una sugerencia se completan los campos indicados por su id
+// (data-fill-pka usa el primer pKa; data-fill-pka-list, todos separados por comas).
+
+document.addEventListener('DOMContentLoaded', function() {
+    const ENDPOINT = '/api/compuestos/autocompletar';
+    const DEBOUNCE_MS = 120;
+
+    function fillFields(idList, value) {
+        if (!idList || value === null || value === undefined) {
+            return;
+        }
+        idList.split(',').forEach(id => {
+            const field = document.getElementById(id.trim());
+            if (field) {
+                field.value = value;
+                field.dispatchEvent(new Event('input', { bubbles: true }));
+            }
+        });
+    }
+
+    document.querySelectorAll('input[data-autocomplete="compuestos"]').forEach(input => {
+        const datalist = document.createElement('datalist');
+        datalist.id = input.id + '-sugerencias';
+        input.setAttribute('list', datalist.id);
+        input.setAttribute('autocomplete', 'off');
+        input.after(datalist);
+
+        let suggestions = [];
+        let timer = null;
+        let controller = null;
+
+        function applySelection() {
+            const selected = suggestions.find(s => s.coincidencia === input.value || s.nombre === input.value);
+            if (!selected) {
+                return;
+            }
+            fillFields(input.dataset.fillFormula, selected.formula);
+            fillFields(input.dataset.fillMolarMass, selected.masa_molar);
+            if (selected.pka && selected.pka.length > 0) {
+                fillFields(input.dataset.fillPka, selected.pka[0]);
+                fillFields(input.dataset.fillPkaList, selected.pka.join(', '));
+            }
+        }
+
+        input.addEventListener('input', function() {
+            clearTimeout(timer);
+            const query = input.value.trim();
+            if (!query) {
+                datalist.innerHTML = '';
+                return;
+            }
+            timer = setTimeout(function() {
+                if (controller) {
+                    controller.abort();
+                }
+                controller = new AbortController();
+                fetch(ENDPOINT + '?q=' + encodeURIComponent(query), { signal: controller.signal })
+                    .then(response => response.ok ? response.json() : { sugerencias: [] })
+                    .then(data => {
+                        suggestions = data.sugerencias;
+                        datalist.innerHTML = '';
+                        suggestions.forEach(s => {
+                            const option = document.createElement('option');
+                            option.value = s.coincidencia;
+                            option.label = s.nombre + (s.formula ? ' (' + s.formula + ')' : '');
+                            datalist.appendChild(option);
+                        });
+                        applySelection();
+                    })
+                    .catch(() => {});
+            }, DEBOUNCE_MS);
+        });
+
+        input.addEventListener('change', applySelection);
+    });
+});
@@ -1,9 +1,8 @@
 // JavaScript para mejorar la experiencia de usuario en la calculadora de concentraciones
 
+// La validación de los campos la hace js/validacion.js con el esquema del servidor
+
 document.addEventListener('DOMContentLoaded', function() {
-    // Mejorar la validación en tiempo real
-    addRealTimeValidation();
-    
     // Agregar funcionalidad de limpiar campos específicos
     addClearFieldButtons();
     
@@ -13,79 +12,6 @@ document.addEventListener('DOMContentLoaded', function() {
 
 
 
-function addRealTimeValidation() {
-    const inputs = document.querySelectorAll('input[type="number"]');
-    
-    inputs.forEach(input => {
-        input.addEventListener('input', function() {
-            validateInput(this);
-        });
-        
-        input.addEventListener('blur', function() {
-            validateInput(this);
-        });
-    });
-}
-
-function validateInput(input) {
-    const value = parseFloat(input.value);
-    
-    // Remover clases de validación previas
-    input.classList.remove('invalid', 'valid');
-    
-    if (input.value === '') {
-        return; // Campo vacío es válido (opcional)
-    }
-    
-    if (isNaN(value)) {
-        input.classList.add('invalid');
-        showTooltip(input, 'Debe ser un número válido');
-        return;
-    }
-    
-    // Validaciones específicas por campo
-    const fieldName = input.name;
-    
-    if (['volume_l', 'volume_ml', 'molecular_weight', 'kg_solvent'].includes(fieldName) && value <= 0) {
-        input.classList.add('invalid');
-        showTooltip(input, 'Debe ser mayor a cero');
-        return;
-    }
-    
-    if (['c1', 'c2', 'v1', 'v2'].includes(fieldName) && value <= 0) {
-        input.classList.add('invalid');
-        showTooltip(input, 'Debe ser mayor a cero');
-        return;
-    }
-    
-    input.classList.add('valid');
-    hideTooltip(input);
-}
-
-function showTooltip(element, message) {
-    // Remover tooltip existente
-    hideTooltip(element);
-    
-    const tooltip = document.createElement('div');
-    tooltip.className = 'validation-tooltip';
-    tooltip.textContent = message;
-    
-    element.parentNode.appendChild(tooltip);
-    
-    // Posicionar tooltip
-    const rect = element.getBoundingClientRect();
-    tooltip.style.position = 'absolute';
-    tooltip.style.top = (rect.bottom + 5) + 'px';
-    tooltip.style.left = rect.left + 'px';
-}
-
-function hideTooltip(element) {
-    const existingTooltip = element.parentNode.querySelector('.validation-tooltip');
-    if (existingTooltip) {
-        existingTooltip.remove();
-    }
-}
-
 function addClearFieldButtons() {
     const fieldGroups = document.querySelectorAll('.calculation-fields');
     
@@ -104,11 +30,10 @@ function clearFieldGroup(group) {
     const inputs = group.querySelectorAll('input');
     inputs.forEach(input => {
         input.value = '';
-        input.classList.remove('invalid', 'valid');
+        input.classList.remove('invalid');
     });
     
-    const tooltips = group.querySelectorAll('.validation-tooltip');
-    tooltips.forEach(tooltip => tooltip.remove());
+    group.querySelectorAll('.validation-message').forEach(note => note.remove());
 }
 
 // Funciones de utilidad para formato de números
@@ -156,12 +81,11 @@ function clearForm() {
     const inputs = form.querySelectorAll('input[type="number"]');
     inputs.forEach(input => {
         input.value = '';
-        input.classList.remove('invalid', 'valid');
+        input.classList.remove('invalid');
     });
     
-    // Limpiar todos los tooltips
-    const tooltips = form.querySelectorAll('.validation-tooltip');
-    tooltips.forEach(tooltip => tooltip.remove());
+    // Limpiar los mensajes de validación
+    form.querySelectorAll('.validation-message').forEach(note => note.remove());
     
     // Resetear el dropdown
     const dropdown = document.getElementById('calculation_type');
@@ -1,4 +1,5 @@
 // JavaScript para la página de conversiones
+// La validación de los campos la hace js/validacion.js con el esquema del servidor
 
 document.addEventListener('DOMContentLoaded', function() {
     const tipoUnidadSelect = document.getElementById('tipo_unidad');
@@ -7,9 +8,9 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // Definir las unidades disponibles por tipo
     const unidadesPorTipo = {
-        masa: ['gramos', 'kilogramos'],
-        temperatura: ['celsius', 'fahrenheit'],
-        volumen: ['litros', 'mililitros']
+        masa: ['kilogramos', 'gramos', 'miligramos', 'microgramos', 'nanogramos'],
+        temperatura: ['celsius', 'fahrenheit', 'kelvin'],
+        volumen: ['litros', 'decilitros', 'mililitros', 'microlitros']
     };
 
     // Función para capitalizar la primera letra
@@ -69,48 +70,6 @@ document.addEventListener('DOMContentLoaded', function() {
     // Inicializar al cargar la página
     actualizarUnidades();
 
-    // Función para validar el formulario antes del envío
-    function validarFormulario(event) {
-        const valor = document.getElementById('valor').value;
-        const tipoUnidad = tipoUnidadSelect.value;
-        const unidadOrigen = unidadOrigenSelect.value;
-        const unidadDestino = unidadDestinoSelect.value;
-
-        let errores = [];
-
-        if (!valor || valor.trim() === '') {
-            errores.push('El valor a convertir es requerido');
-        } else if (isNaN(valor) || parseFloat(valor) < 0) {
-            errores.push('El valor debe ser un número válido mayor o igual a cero');
-        }
-
-        if (!tipoUnidad) {
-            errores.push('Debe seleccionar un tipo de unidad');
-        }
-
-        if (!unidadOrigen) {
-            errores.push('Debe seleccionar una unidad de origen');
-        }
-
-        if (!unidadDestino) {
-            errores.push('Debe seleccionar una unidad de destino');
-        }
-
-        if (errores.length > 0) {
-            event.preventDefault();
-            alert('Por favor, corrija los siguientes errores:\n\n' + errores.join('\n'));
-            return false;
-        }
-
-        return true;
-    }
-
-    // Añadir validación al formulario
-    const form = document.querySelector('.conversion-form');
-    if (form) {
-        form.addEventListener('submit', validarFormulario);
-    }
-
     // Función para limpiar el formulario
     function limpiarFormulario() {
         document.getElementById('valor').value = '';
@@ -1,4 +1,5 @@
 // JavaScript para la página de Neubauer
+// La validación de los campos la hace js/validacion.js con el esquema del servidor
 
 document.addEventListener('DOMContentLoaded', function() {
     // Inicializar los campos de cuadrantes al cargar la página
@@ -19,7 +20,7 @@ function actualizarCamposCuadrantes() {
         
         const label = document.createElement("label");
         label.setAttribute("for", `celdasCuadrante${i}`);
-        label.textContent = `Células en Cuadrante ${i}:`;
+        label.textContent = `Células vivas en Cuadrante ${i}:`;
         
         const input = document.createElement("input");
         input.setAttribute("type", "number");
@@ -27,117 +28,29 @@ function actualizarCamposCuadrantes() {
         input.setAttribute("name", `celdasCuadrante${i}`);
         input.setAttribute("min", "0");
         input.setAttribute("required", "true");
-        input.setAttribute("placeholder", "Ingrese el número de células");
+        input.setAttribute("placeholder", "Células sin teñir");
         input.className = "form-input";
         
-        // Agregar validación en tiempo real
-        input.addEventListener('input', function() {
-            validarCampoNumerico(this, `errorCeldas${i}`);
-        });
+        const deadLabel = document.createElement("label");
+        deadLabel.setAttribute("for", `muertasCuadrante${i}`);
+        deadLabel.textContent = `Células muertas (azul tripano, opcional):`;
         
-        const errorDiv = document.createElement("div");
-        errorDiv.setAttribute("id", `errorCeldas${i}`);
-        errorDiv.className = "error-message";
+        const deadInput = document.createElement("input");
+        deadInput.setAttribute("type", "number");
+        deadInput.setAttribute("id", `muertasCuadrante${i}`);
+        deadInput.setAttribute("name", `muertasCuadrante${i}`);
+        deadInput.setAttribute("min", "0");
+        deadInput.setAttribute("placeholder", "Células teñidas");
+        deadInput.className = "form-input";
         
         quadrantDiv.appendChild(label);
         quadrantDiv.appendChild(input);
-        quadrantDiv.appendChild(errorDiv);
+        quadrantDiv.appendChild(deadLabel);
+        quadrantDiv.appendChild(deadInput);
         camposCuadrantesDiv.appendChild(quadrantDiv);
     }
 }
 
-function validarCampoNumerico(input, errorDivId) {
-    const errorDiv = document.getElementById(errorDivId);
-    const valor = parseFloat(input.value);
-    
-    if (input.value === '') {
-        errorDiv.textContent = '';
-        return true;
-    }
-    
-    if (isNaN(valor) || valor < 0) {
-        errorDiv.textContent = 'Debe ser un número mayor o igual a cero';
-        input.classList.add('error');
-        return false;
-    }
-    
-    errorDiv.textContent = '';
-    input.classList.remove('error');
-    return true;
-}
-
-function validarFormulario() {
-    let valido = true;
-    const errores = [];
-    
-    // Validar volumen del cuadrante
-    const volumenCuadrante = parseFloat(document.getElementById("volumenCuadrante").value);
-    if (isNaN(volumenCuadrante) || volumenCuadrante <= 0) {
-        errores.push('El volumen del cuadrante debe ser un número mayor que cero');
-        valido = false;
-    }
-
-    // Validar factor de dilución
-    const factorDilucion = parseFloat(document.getElementById("factorDilucion").value);
-    if (isNaN(factorDilucion) || factorDilucion <= 0) {
-        errores.push('El factor de dilución debe ser un número mayor que cero');
-        valido = false;
-    }
-
-    // Validar número de células en cada cuadrante
-    const numCuadrantes = parseInt(document.getElementById("numCuadrantes").value);
-    for (let i = 1; i <= numCuadrantes; i++) {
-        const celdasInput = document.getElementById(`celdasCuadrante${i}`);
-        const celdas = parseInt(celdasInput.value);
-        
-        if (celdasInput.value === '' || isNaN(celdas) || celdas < 0) {
-            errores.push(`El número de células del cuadrante ${i} debe ser un número mayor o igual a cero`);
-            valido = false;
-        }
-    }
-
-    // Mostrar errores si los hay
-    if (!valido) {
-        alert('Por favor, corrija los siguientes errores:\n\n' + errores.join('\n'));
-    }
-
-    return valido;
-}
-
-// Agregar validación en tiempo real para todos los campos numéricos
-document.addEventListener('DOMContentLoaded', function() {
-    const volumenInput = document.getElementById('volumenCuadrante');
-    const dilucionInput = document.getElementById('factorDilucion');
-    
-    volumenInput.addEventListener('input', function() {
-        const valor = parseFloat(this.value);
-        if (this.value !== '' && (isNaN(valor) || valor <= 0)) {
-            this.classList.add('error');
-        } else {
-            this.classList.remove('error');
-        }
-    });
-    
-    dilucionInput.addEventListener('input', function() {
-        const valor = parseFloat(this.value);
-        if (this.value !== '' && (isNaN(valor) || valor <= 0)) {
-            this.classList.add('error');
-        } else {
-            this.classList.remove('error');
-        }
-    });
-    
-    // Agregar validación al formulario
-    const form = document.getElementById('neubauerForm');
-    if (form) {
-        form.addEventListener('submit', function(event) {
-            if (!validarFormulario()) {
-                event.preventDefault();
-            }
-        });
-    }
-});
-
 // Función para limpiar el formulario
 function limpiarFormulario() {
     // Restablecer valores por defecto
@@ -149,22 +62,12 @@ function limpiarFormulario() {
     actualizarCamposCuadrantes();
     
     // Limpiar cualquier mensaje de error
-    document.querySelectorAll('.error-message').forEach(function(errorDiv) {
-        errorDiv.textContent = '';
+    document.querySelectorAll('.validation-message').forEach(function(note) {
+        note.remove();
     });
     
     // Remover clases de error
-    document.querySelectorAll('.error').forEach(function(element) {
-        element.classList.remove('error');
+    document.querySelectorAll('.invalid').forEach(function(element) {
+        element.classList.remove('invalid');
     });
 }
-
-// CSS adicional para campos con error
-const style = document.createElement('style');
-style.textContent = `
-    .form-input.error {
-        border-color: #dc3545;
-        box-shadow: 0 0 0 3px rgba(220, 53, 69, 0.1);
-    }
-`;
-document.head.appendChild(style);
\ No newline at end of file
@@ -0,0 +1,178 @@
+// JavaScript para el conteo en vivo de Neubauer
+
+let sesionId = null;
+let eventos = null;
+let ultimaVersion = -1;
+
+document.addEventListener('DOMContentLoaded', function() {
+    document.getElementById('sesionForm').addEventListener('submit', function(event) {
+        event.preventDefault();
+        iniciarSesion();
+    });
+    document.getElementById('terminarConteo').addEventListener('click', terminarSesion);
+    document.addEventListener('keydown', manejarTecla);
+});
+
+async function enviarJSON(url, metodo, cuerpo) {
+    const respuesta = await fetch(url, {
+        method: metodo,
+        headers: { 'Content-Type': 'application/json' },
+        body: cuerpo === undefined ? undefined : JSON.stringify(cuerpo)
+    });
+    const datos = await respuesta.json();
+    if (!respuesta.ok) {
+        throw new Error(datos.error || 'Error inesperado');
+    }
+    return datos;
+}
+
+async function iniciarSesion() {
+    ocultarError();
+    try {
+        const estado = await enviarJSON('/api/neubauer/sesiones', 'POST', {
+            num_cuadrantes: parseInt(document.getElementById('numCuadrantes').value),
+            volumen_cuadrante: parseFloat(document.getElementById('volumenCuadrante').value),
+            factor_dilucion: parseFloat(document.getElementById('factorDilucion').value)
+        });
+        sesionId = estado.sesion;
+        ultimaVersion = -1;
+        crearBotones(estado.vivas.length);
+        mostrarEstado(estado);
+        document.getElementById('sesionForm').hidden = true;
+        document.getElementById('resultadoFinal').hidden = true;
+        document.getElementById('panelConteo').hidden = false;
+
+        // Las actualizaciones llegan por Server-Sent Events, también las de otros dispositivos
+        eventos = new EventSource(`/api/neubauer/sesiones/${sesionId}/eventos`);
+        eventos.onmessage = function(mensaje) {
+            mostrarEstado(JSON.parse(mensaje.data));
+        };
+        eventos.addEventListener('fin', function() {
+            eventos.close();
+        });
+    } catch (error) {
+        mostrarError(error.message);
+    }
+}
+
+function crearBotones(numCuadrantes) {
+    const contenedor = document.getElementById('botonesCuadrantes');
+    contenedor.innerHTML = '';
+    for (let i = 1; i <= numCuadrantes; i++) {
+        const div = document.createElement('div');
+        div.className = 'quadrant-input session-quadrant';
+        div.innerHTML = `
+            <button type="button" class="btn btn-primary session-count" data-cuadrante="${i}">
+                Cuadrante ${i}<br><span id="vivas${i}">0</span>
+            </button>
+            <div class="session-actions">
+                <button type="button" class="btn btn-secondary" data-cuadrante="${i}" data-muerta="1">
+                    Muerta (<span id="muertas${i}">0</span>)
+                </button>
+                <button type="button" class="btn btn-secondary" data-cuadrante="${i}" data-delta="-1">Deshacer</button>
+            </div>`;
+        contenedor.appendChild(div);
+    }
+    contenedor.querySelectorAll('button').forEach(function(boton) {
+        boton.addEventListener('click', function() {
+            registrarClic(parseInt(boton.dataset.cuadrante), boton.dataset.muerta === '1',
+                          parseInt(boton.dataset.delta || '1'));
+        });
+    });
+}
+
+async function registrarClic(cuadrante, muerta, delta) {
+    if (!sesionId) {
+        return;
+    }
+    try {
+        mostrarEstado(await enviarJSON(`/api/neubauer/sesiones/${sesionId}/clics`, 'POST', {
+            cuadrante: cuadrante, muerta: muerta, delta: delta
+        }));
+    } catch (error) {
+        mostrarError(error.message);
+    }
+}
+
+function manejarTecla(event) {
+    const digito = event.code && event.code.startsWith('Digit') ? parseInt(event.code.slice(5)) : NaN;
+    if (!sesionId || isNaN(digito) || digito < 1 || event.target.tagName === 'INPUT') {
+        return;
+    }
+    if (document.getElementById(`vivas${digito}`)) {
+        event.preventDefault();
+        registrarClic(digito, event.shiftKey, 1);
+    }
+}
+
+function mostrarEstado(estado) {
+    // La respuesta del clic y el evento pueden llegar en cualquier orden
+    if (estado.version <= ultimaVersion) {
+        return;
+    }
+    ultimaVersion = estado.version;
+    estado.vivas.forEach(function(valor, i) {
+        document.getElementById(`vivas${i + 1}`).textContent = valor;
+        document.getElementById(`muertas${i + 1}`).textContent = estado.muertas[i];
+    });
+    document.getElementById('concentracion').textContent = `${estado.concentracion.toExponential(2)} células/mL`;
+    document.getElementById('intervalo').textContent =
+        `IC 95%: ${estado.ic_inferior.toExponential(2)} – ${estado.ic_superior.toExponential(2)}`;
+    document.getElementById('totalCelulas').textContent = estado.total_celulas;
+    document.getElementById('cv').textContent =
+        estado.cv_porcentaje === null ? '—' : `${estado.cv_porcentaje.toFixed(1)} %`;
+    document.getElementById('viabilidad').textContent =
+        estado.viabilidad_porcentaje === null ? '—' : `${estado.viabilidad_porcentaje.toFixed(1)} %`;
+}
+
+async function terminarSesion() {
+    if (!sesionId) {
+        return;
+    }
+    try {
+        const resultado = await enviarJSON(`/api/neubauer/sesiones/${sesionId}`, 'DELETE');
+        if (eventos) {
+            eventos.close();
+        }
+        sesionId = null;
+        ultimaVersion = -1;
+
+        const detalles = [
+            `Concentración: ${resultado.concentracion.toExponential(2)} células/mL ` +
+                `(IC: ${resultado.ic_inferior.toExponential(2)} – ${resultado.ic_superior.toExponential(2)})`,
+            `Células vivas: ${resultado.total_celulas} en ${resultado.num_cuadrantes} cuadrantes`
+        ];
+        if (resultado.cv_porcentaje !== null) {
+            detalles.push(`CV entre cuadrantes: ${resultado.cv_porcentaje.toFixed(1)} %`);
+        }
+        if (resultado.cuadrantes_atipicos.length) {
+            detalles.push(`Cuadrantes atípicos: ${resultado.cuadrantes_atipicos.join(', ')}`);
+        }
+        if (resultado.viabilidad_porcentaje !== null) {
+            detalles.push(`Viabilidad: ${resultado.viabilidad_porcentaje.toFixed(1)} % ` +
+                          `(${resultado.celulas_muertas} células muertas)`);
+        }
+        const lista = document.getElementById('detallesFinales');
+        lista.innerHTML = '';
+        detalles.forEach(function(texto) {
+            const item = document.createElement('li');
+            item.textContent = texto;
+            lista.appendChild(item);
+        });
+
+        document.getElementById('panelConteo').hidden = true;
+        document.getElementById('sesionForm').hidden = false;
+        document.getElementById('resultadoFinal').hidden = false;
+    } catch (error) {
+        mostrarError(error.message);
+    }
+}
+
+function mostrarError(mensaje) {
+    document.getElementById('mensajeError').textContent = mensaje;
+    document.getElementById('errorConteo').hidden = false;
+}
+
+function ocultarError() {
+    document.getElementById('errorConteo').hidden = true;
+}
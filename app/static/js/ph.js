@@ -0,0 +1,23 @@
+// Muestra los campos de Ka/pKa solo para ácidos y bases débiles y amortiguadores
+
+document.addEventListener('DOMContentLoaded', function() {
+    const WEAK_TYPES = ['acido_debil', 'base_debil', 'amortiguador'];
+    const BUFFER_TYPE = 'amortiguador';
+    const select = document.getElementById('calculation_type');
+    const weakFields = document.querySelector('.weak-fields');
+    const equivalents = document.getElementById('equivalents');
+    const bufferField = document.querySelector('.buffer-field');
+
+    function toggleWeakFields() {
+        const weak = WEAK_TYPES.includes(select.value);
+        weakFields.style.display = weak ? '' : 'none';
+        bufferField.style.display = select.value === BUFFER_TYPE ? '' : 'none';
+        if (weak) {
+            equivalents.value = '1';
+        }
+        equivalents.readOnly = weak;
+    }
+
+    select.addEventListener('change', toggleWeakFields);
+    toggleWeakFields();
+});
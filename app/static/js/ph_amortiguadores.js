@@ -0,0 +1,59 @@
+// Gráfico de distribución de especies para la receta de amortiguador calculada
+
+document.addEventListener('DOMContentLoaded', function() {
+    const ENDPOINT = '/api/ph/especiacion';
+    const WIDTH = 640, HEIGHT = 360, MARGIN = 40;
+    const SVG_NS = 'http://www.w3.org/2000/svg';
+    const chart = document.getElementById('especiacionGrafico');
+    if (!chart) {
+        return;
+    }
+
+    function svg(tag, attributes, text) {
+        const element = document.createElementNS(SVG_NS, tag);
+        Object.entries(attributes).forEach(([key, value]) => element.setAttribute(key, value));
+        if (text !== undefined) {
+            element.textContent = text;
+        }
+        chart.appendChild(element);
+    }
+
+    const x = p => MARGIN + p / 14 * (WIDTH - 2 * MARGIN);
+    const y = f => HEIGHT - MARGIN - f * (HEIGHT - 2 * MARGIN);
+
+    fetch(ENDPOINT, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            pka: chart.dataset.pka.split(',').map(Number),
+            compuesto: chart.dataset.compound,
+            temperatura_c: chart.dataset.temperature,
+            fuerza_ionica: chart.dataset.ionicStrength
+        })
+    })
+        .then(response => response.ok ? response.json() : null)
+        .then(data => {
+            if (!data) {
+                return;
+            }
+            svg('line', { x1: MARGIN, y1: y(0), x2: WIDTH - MARGIN, y2: y(0), class: 'axis' });
+            svg('line', { x1: MARGIN, y1: y(0), x2: MARGIN, y2: y(1), class: 'axis' });
+            for (let p = 0; p <= 14; p += 2) {
+                svg('text', { x: x(p), y: HEIGHT - 20, class: 'axis-label', 'text-anchor': 'middle' }, p);
+            }
+            svg('text', { x: MARGIN - 8, y: y(1) + 4, class: 'axis-label', 'text-anchor': 'end' }, '1');
+            const target = Number(chart.dataset.targetPh);
+            svg('line', { x1: x(target), y1: y(0), x2: x(target), y2: y(1), class: 'axis target' });
+
+            data.fracciones.forEach((fractions, i) => {
+                svg('polyline', {
+                    class: 'curve species-' + (i % 4),
+                    points: data.ph.map((p, j) => x(p).toFixed(1) + ',' + y(fractions[j]).toFixed(1)).join(' ')
+                });
+                const peak = fractions.indexOf(Math.max(...fractions));
+                svg('text', { x: x(data.ph[peak]), y: y(fractions[peak]) - 6, class: 'axis-label',
+                              'text-anchor': 'middle' }, data.especies[i]);
+            });
+        })
+        .catch(() => {});
+});
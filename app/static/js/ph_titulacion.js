@@ -0,0 +1,106 @@
+// Curva de titulación: pide la curva reducida al servidor y la dibuja en SVG
+
+document.addEventListener('DOMContentLoaded', function() {
+    const ENDPOINT = '/api/ph/titulacion';
+    const WIDTH = 640, HEIGHT = 360, MARGIN = 40;
+    const SVG_NS = 'http://www.w3.org/2000/svg';
+
+    const form = document.getElementById('titulacionForm');
+    const resultPanel = document.getElementById('titulacionResultado');
+    const errorPanel = document.getElementById('titulacionError');
+    const chart = document.getElementById('titulacionGrafico');
+    const equivalences = document.getElementById('titulacionEquivalencias');
+
+    function species(prefix) {
+        const data = {
+            tipo: document.getElementById(prefix + '_tipo').value,
+            concentracion_m: document.getElementById(prefix + '_concentracion').value
+        };
+        const pka = document.getElementById(prefix + '_pka').value;
+        if (pka !== '') {
+            data.pka = pka;
+        }
+        return data;
+    }
+
+    function svg(tag, attributes, text) {
+        const element = document.createElementNS(SVG_NS, tag);
+        Object.entries(attributes).forEach(([key, value]) => element.setAttribute(key, value));
+        if (text !== undefined) {
+            element.textContent = text;
+        }
+        chart.appendChild(element);
+    }
+
+    function draw(data) {
+        const volumes = data.curva.volumen_ml;
+        const ph = data.curva.ph;
+        const maxVolume = volumes[volumes.length - 1] || 1;
+        const minPh = Math.min(0, ...ph), maxPh = Math.max(14, ...ph);
+        const x = v => MARGIN + v / maxVolume * (WIDTH - 2 * MARGIN);
+        const y = p => HEIGHT - MARGIN - (p - minPh) / (maxPh - minPh) * (HEIGHT - 2 * MARGIN);
+
+        chart.innerHTML = '';
+        svg('line', { x1: MARGIN, y1: HEIGHT - MARGIN, x2: WIDTH - MARGIN, y2: HEIGHT - MARGIN, class: 'axis' });
+        svg('line', { x1: MARGIN, y1: MARGIN, x2: MARGIN, y2: HEIGHT - MARGIN, class: 'axis' });
+        for (let p = Math.ceil(minPh); p <= maxPh; p += 2) {
+            svg('text', { x: MARGIN - 8, y: y(p) + 4, class: 'axis-label', 'text-anchor': 'end' }, p);
+        }
+        svg('text', { x: WIDTH - MARGIN, y: HEIGHT - 10, class: 'axis-label', 'text-anchor': 'end' },
+            maxVolume.toFixed(1) + ' mL');
+        svg('polyline', {
+            class: 'curve',
+            points: volumes.map((v, i) => x(v).toFixed(1) + ',' + y(ph[i]).toFixed(1)).join(' ')
+        });
+
+        equivalences.innerHTML = '';
+        data.equivalencias.forEach((point, i) => {
+            svg('circle', { cx: x(point.volumen_ml), cy: y(point.ph), r: 5, class: 'equivalence' });
+            const card = document.createElement('div');
+            card.className = 'result-card';
+            card.innerHTML = '<span class="result-label">Equivalencia ' + (i + 1) + '</span>' +
+                '<span class="result-value">' + point.volumen_ml.toFixed(2) + ' mL · pH ' + point.ph.toFixed(2) + '</span>';
+            equivalences.appendChild(card);
+        });
+    }
+
+    form.addEventListener('submit', function(event) {
+        event.preventDefault();
+        const analyte = species('analito');
+        analyte.volumen_ml = document.getElementById('analito_volumen').value;
+        const body = { analito: analyte, titulante: species('titulante') };
+        const maxVolume = document.getElementById('volumen_max').value;
+        if (maxVolume !== '') {
+            body.volumen_max_ml = maxVolume;
+        }
+        const temperature = document.getElementById('temperatura').value;
+        if (temperature !== '') {
+            body.temperatura_c = temperature;
+        }
+        const ionicStrength = document.getElementById('fuerza_ionica').value;
+        if (ionicStrength !== '') {
+            body.fuerza_ionica = ionicStrength;
+        }
+
+        fetch(ENDPOINT, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(body)
+        })
+            .then(response => response.json().then(data => ({ ok: response.ok, data })))
+            .then(({ ok, data }) => {
+                resultPanel.hidden = !ok;
+                errorPanel.hidden = ok;
+                if (ok) {
+                    draw(data);
+                } else {
+                    errorPanel.querySelector('.error-text').textContent = data.error;
+                }
+            })
+            .catch(() => {
+                resultPanel.hidden = true;
+                errorPanel.hidden = false;
+                errorPanel.querySelector('.error-text').textContent = 'No se pudo contactar al servidor.';
+            });
+    });
+});
@@ -0,0 +1,154 @@
+// Validador genérico de formularios a partir del esquema del servidor
+//
+// Uso: <script type="application/json" data-formulario="#idFormulario">{{ esquema }}</script>
+// El descriptor lo genera Schema.descriptor() en app/utils/schema.py: las mismas
+// reglas y los mismos mensajes que aplica el servidor. Solo se validan los
+// campos visibles; los requeridos que no se muestran quedan para el servidor.
+
+(function() {
+    const FLOAT = /^[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?$/;
+    // Mismo límite que MAX_INTEGER_TEXT en app/utils/schema.py
+    const INTEGER = /^(?=.{1,20}$)[+-]?\d+$/;
+    const LIST_SEPARATOR = /[,;\s]+/;
+
+    function parseNumber(text, kind) {
+        if (!(kind === 'int' ? INTEGER : FLOAT).test(text)) {
+            return null;
+        }
+        const value = Number(text);
+        return Number.isFinite(value) ? value : null;
+    }
+
+    function outOfRange(field, value) {
+        if (field.min !== undefined && (value < field.min || (field.exclusiveMin && value === field.min))) {
+            return field.messages.low;
+        }
+        if (field.max !== undefined && value > field.max) {
+            return field.messages.high;
+        }
+        return null;
+    }
+
+    // Devuelve el mensaje de error del campo o null si el valor es válido
+    function checkValue(field, input) {
+        const kind = field.kind || 'float';
+        const text = input.value.trim();
+        if (input.validity && input.validity.badInput) {
+            return field.messages.type;
+        }
+        if (text === '') {
+            return field.optional ? null : field.messages.required;
+        }
+        if (kind === 'str') {
+            return null;
+        }
+        if (kind === 'choice') {
+            return field.choices.includes(text) ? null : field.messages.type;
+        }
+        if (kind === 'float_list' || kind === 'int_list') {
+            const itemKind = kind === 'int_list' ? 'int' : 'float';
+            const values = text.split(LIST_SEPARATOR).filter(item => item).map(item => parseNumber(item, itemKind));
+            if (!values.length || values.includes(null)) {
+                return field.messages.type;
+            }
+            for (const value of values) {
+                const error = outOfRange(field, value);
+                if (error) {
+                    return error;
+                }
+            }
+            return null;
+        }
+        const value = parseNumber(text, kind);
+        return value === null ? field.messages.type : outOfRange(field, value);
+    }
+
+    function activeFields(form, schema) {
+        const variants = schema.variants;
+        if (!variants) {
+            return schema.fields;
+        }
+        const selector = form.elements[variants.field];
+        return schema.fields.concat((selector && variants.schemas[selector.value]) || []);
+    }
+
+    function visibleInputs(form, name) {
+        return Array.from(form.querySelectorAll(`[name="${name}"]`))
+            .filter(input => input.type !== 'hidden' && input.offsetParent !== null);
+    }
+
+    function showError(input, message) {
+        let note = input.parentNode.querySelector(`.validation-message[data-campo="${input.id || input.name}"]`);
+        input.classList.toggle('invalid', Boolean(message));
+        if (!message) {
+            if (note) {
+                note.remove();
+            }
+            return;
+        }
+        if (!note) {
+            note = document.createElement('div');
+            note.className = 'validation-message';
+            note.dataset.campo = input.id || input.name;
+            input.insertAdjacentElement('afterend', note);
+        }
+        note.textContent = message;
+    }
+
+    function validateForm(form, schema) {
+        let firstInvalid = null;
+        activeFields(form, schema).forEach(field => {
+            visibleInputs(form, field.name).forEach(input => {
+                const message = checkValue(field, input);
+                showError(input, message);
+                if (message && !firstInvalid) {
+                    firstInvalid = input;
+                }
+            });
+        });
+        return firstInvalid;
+    }
+
+    function attach(form, schema) {
+        function onChange(event) {
+            const input = event.target;
+            if (!input.name || input.offsetParent === null) {
+                return;
+            }
+            const field = activeFields(form, schema).find(item => item.name === input.name);
+            if (field) {
+                showError(input, checkValue(field, input));
+            }
+        }
+
+        form.addEventListener('input', onChange);
+        form.addEventListener('focusout', onChange);
+        form.addEventListener('change', function(event) {
+            // Al cambiar de variante se limpian los errores de los campos que dejaron de verse
+            if (schema.variants && event.target.name === schema.variants.field) {
+                form.querySelectorAll('.validation-message').forEach(note => note.remove());
+                form.querySelectorAll('.invalid').forEach(input => input.classList.remove('invalid'));
+            }
+        });
+        form.addEventListener('submit', function(event) {
+            const firstInvalid = validateForm(form, schema);
+            if (firstInvalid) {
+                event.preventDefault();
+                firstInvalid.focus();
+            }
+        });
+        form.addEventListener('reset', function() {
+            form.querySelectorAll('.validation-message').forEach(note => note.remove());
+            form.querySelectorAll('.invalid').forEach(input => input.classList.remove('invalid'));
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function() {
+        document.querySelectorAll('script[type="application/json"][data-formulario]').forEach(script => {
+            const form = document.querySelector(script.dataset.formulario);
+            if (form) {
+                attach(form, JSON.parse(script.textContent));
+            }
+        });
+    });
+})();
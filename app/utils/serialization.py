@@ -0,0 +1,101 @@
+"""
+Serialización rápida de dataclasses a valores JSON.
+
+`dataclasses.asdict` recorre los campos por reflexión y copia recursivamente
+cada valor en cada llamada. Aquí el encoder de cada clase se genera una sola
+vez a partir de las anotaciones de sus campos: los escalares se copian tal
+cual y solo los enums, listas, diccionarios, arreglos de numpy y dataclasses
+anidados pasan por una función de conversión.
+"""
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Optional, Union, get_args, get_origin
+
+import numpy as np
+
+_SCALARS = (float, int, str, bool, type(None))
+
+_enum_value = attrgetter('value')
+
+def to_json(instance: Any) -> Dict[str, Any]:
+    """Convierte una instancia de dataclass en un diccionario serializable a JSON."""
+    return encoder_for(type(instance))(instance)
+
+@lru_cache(maxsize=None)
+def encoder_for(cls: type) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Encoder precompilado de una clase dataclass.
+
+    Genera una función con un literal de diccionario por campo, de modo que
+    serializar un resultado cuesta una llamada y no un recorrido de `fields`.
+    """
+    if not is_dataclass(cls):
+        raise TypeError(f"{cls!r} no es un dataclass")
+    namespace = {}
+    items = []
+    for index, spec in enumerate(fields(cls)):
+        convert = _converter(spec.type)
+        if convert is None:
+            items.append(f"{spec.name!r}: instance.{spec.name}")
+        else:
+            namespace[f'_convert{index}'] = convert
+            items.append(f"{spec.name!r}: _convert{index}(instance.{spec.name})")
+    source = f"def encode(instance):\n    return {{{', '.join(items)}}}\n"
+    exec(source, namespace)
+    encode = namespace['encode']
+    encode.__qualname__ = f"encoder_for.<{cls.__name__}>"
+    return encode
+
+def _converter(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """Función que convierte un valor del tipo anotado; None si ya es un valor JSON."""
+    origin = get_origin(annotation)
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        convert = _converter(args[0]) if len(args) == 1 else _any_value
+        if convert is None:
+            return None
+        return lambda value: None if value is None else convert(value)
+
+    if origin in (list, List, tuple):
+        args = get_args(annotation)
+        convert = _converter(args[0]) if args else _any_value
+        if convert is None:
+            return list
+        return lambda values: [convert(value) for value in values]
+
+    if origin in (dict, Dict):
+        key_type, value_type = get_args(annotation) or (Any, Any)
+        convert_key = _converter(key_type) or (lambda key: key)
+        convert_value = _converter(value_type) or (lambda value: value)
+        return lambda mapping: {convert_key(key): convert_value(value) for key, value in mapping.items()}
+
+    if annotation in _SCALARS:
+        return None
+    if isinstance(annotation, type):
+        if issubclass(annotation, Enum):
+            return _enum_value
+        if issubclass(annotation, np.ndarray):
+            return np.ndarray.tolist
+        if is_dataclass(annotation):
+            return encoder_for(annotation)
+    return _any_value
+
+def _any_value(value: Any) -> Any:
+    """Conversión por el tipo del valor cuando la anotación no lo determina."""
+    if isinstance(value, _SCALARS):
+        return value
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if is_dataclass(value):
+        return to_json(value)
+    if isinstance(value, dict):
+        return {_any_value(key): _any_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_any_value(item) for item in value]
+    return value
@@ -1,5 +1,7 @@
 """Validadores para los formularios de la aplicación."""
 
+from .schema import parse_float, parse_int
+
 def validate_numeric_input(value_str: str, field_name: str = "valor") -> float:
     """
     Valida que un string sea un número válido.
@@ -17,15 +19,12 @@ def validate_numeric_input(value_str: str, field_name: str = "valor") -> float:
     if not value_str or value_str.strip() == "":
         raise ValueError(f"El {field_name} no puede estar vacío")
     
-    try:
-        value = float(value_str)
-        if value < 0:
-            raise ValueError(f"El {field_name} no puede ser negativo")
-        return value
-    except ValueError as e:
-        if "cannot be negative" in str(e):
-            raise
+    value = parse_float(value_str)
+    if value is None:
         raise ValueError(f"El {field_name} debe ser un número válido")
+    if value < 0:
+        raise ValueError(f"El {field_name} no puede ser negativo")
+    return value
 
 def validate_integer_input(value_str: str, field_name: str = "valor") -> int:
     """
@@ -44,15 +43,12 @@ def validate_integer_input(value_str: str, field_name: str = "valor") -> int:
     if not value_str or value_str.strip() == "":
         raise ValueError(f"El {field_name} no puede estar vacío")
     
-    try:
-        value = int(value_str)
-        if value <= 0:
-            raise ValueError(f"El {field_name} debe ser mayor a cero")
-        return value
-    except ValueError as e:
-        if "must be greater than zero" in str(e):
-            raise
+    value = parse_int(value_str)
+    if value is None:
         raise ValueError(f"El {field_name} debe ser un número entero válido")
+    if value <= 0:
+        raise ValueError(f"El {field_name} debe ser mayor a cero")
+    return value
 
 def validate_required_field(value: str, field_name: str) -> str:
     """
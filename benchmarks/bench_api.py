@@ -0,0 +1,49 @@
+"""
+Compara el costo de responder un cálculo de pH como página HTML y como JSON de
+`/api/v1/ph`, y el de serializar el resultado con `dataclasses.asdict` (más la
+conversión de enums) frente al encoder precompilado de `app/utils/serialization.py`.
+
+Uso:
+    python -m benchmarks.bench_api [solicitudes]
+"""
+import sys
+import time
+from dataclasses import asdict
+from enum import Enum
+
+from app import create_app
+from app.models.ph import PHCalculationType, PHRequest
+from app.services.ph_service import PHService
+from app.utils.serialization import to_json
+
+FORM = {'calculation_type': 'acido_debil', 'concentration_m': '0.1', 'pka': '4.76'}
+
+def reflective_json(result):
+    """Serialización por reflexión: asdict y luego los enums a su valor."""
+    return {key: value.value if isinstance(value, Enum) else value for key, value in asdict(result).items()}
+
+def per_call(function, count: int) -> float:
+    """Microsegundos por llamada."""
+    start = time.perf_counter()
+    for _ in range(count):
+        function()
+    return (time.perf_counter() - start) / count * 1e6
+
+def main(count: int) -> None:
+    result = PHService.calculate(PHRequest(PHCalculationType.WEAK_ACID, 0.1, pka=4.76))
+    assert reflective_json(result) == to_json(result)
+    print(f"Serialización de PHResult ({count * 10} llamadas)")
+    reflective = per_call(lambda: reflective_json(result), count * 10)
+    compiled = per_call(lambda: to_json(result), count * 10)
+    print(f"  asdict + enums       {reflective:7.2f} µs")
+    print(f"  encoder precompilado {compiled:7.2f} µs  {compiled / reflective:6.2%}")
+
+    client = create_app().test_client()
+    print(f"Solicitud completa ({count} solicitudes)")
+    html = per_call(lambda: client.post('/ph', data=FORM), count)
+    api = per_call(lambda: client.post('/api/v1/ph', json={**FORM, 'concentration_m': 0.1, 'pka': 4.76}), count)
+    print(f"  POST /ph (HTML)      {html:7.1f} µs")
+    print(f"  POST /api/v1/ph      {api:7.1f} µs  {api / html:6.2%}")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000)
@@ -0,0 +1,52 @@
+"""
+Mide el tiempo del conteo automático de células en una micrografía sintética grande.
+
+Uso:
+    python -m benchmarks.bench_hemocytometer [megapíxeles]
+"""
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from app.models.hemocytometer import CellCountRequest
+from app.services.hemocytometer_service import HemocytometerService
+
+def synthetic_image(megapixels: float, cell_diameter: int = 12, seed: int = 0) -> np.ndarray:
+    """Cuadrícula de 3 × 3 cuadrantes con una célula clara cada ~60 píxeles."""
+    rng = np.random.default_rng(seed)
+    height = int(math.sqrt(megapixels * 1e6 * 4 / 5))
+    width = int(height * 5 / 4)
+    image = (180 + rng.normal(0, 6, (height, width))).astype(np.float32)
+    for position in np.linspace(0.05, 0.95, 4):
+        image[int(position * height):int(position * height) + 3, :] = 70
+        image[:, int(position * width):int(position * width) + 3] = 70
+    
+    radius = cell_diameter // 2
+    yy, xx = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+    disc = (yy ** 2 + xx ** 2 <= radius ** 2).astype(np.float32) * 60
+    centers_y = np.arange(3 * radius, height - 3 * radius, 60)
+    centers_x = np.arange(3 * radius, width - 3 * radius, 60)
+    for y in centers_y:
+        for x in centers_x:
+            image[y - radius:y + radius + 1, x - radius:x + radius + 1] += disc
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+def main(megapixels: float) -> None:
+    image = synthetic_image(megapixels)
+    request = CellCountRequest(cell_diameter_px=12)
+    print(f"Imagen de {image.shape[1]} × {image.shape[0]} ({image.size / 1e6:.1f} MP), "
+          f"{os.cpu_count()} núcleos")
+    
+    # La primera corrida incluye el arranque del grupo de procesos
+    for run in ('primera corrida', 'segunda corrida'):
+        start = time.perf_counter()
+        result = HemocytometerService.count_cells(image, request)
+        elapsed = time.perf_counter() - start
+        print(f"{run:<16} {elapsed:7.3f} s  {result.tiles} franjas  "
+              f"{sum(result.quadrant_counts)} células en {len(result.quadrant_counts)} cuadrantes")
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 20.0)
@@ -0,0 +1,63 @@
+"""
+Compara la memoria que ocupan muchos resultados de concentración según su representación.
+
+Uso:
+    python -m benchmarks.bench_model_memory [cantidad]
+"""
+import sys
+import tracemalloc
+from dataclasses import fields, make_dataclass
+
+from app.models.compact import StructOfArrays, freeze
+from app.models.concentration import (
+    CalculationType, ConcentrationRequest, ConcentrationResult, FrozenConcentrationResult
+)
+from app.services.concentration_service import ConcentrationService
+
+# Misma forma que ConcentrationResult pero con __dict__ por instancia (representación anterior)
+DictConcentrationResult = make_dataclass(
+    'DictConcentrationResult', [(f.name, f.type, f.default) for f in fields(ConcentrationResult)]
+)
+
+def measure(build):
+    """Devuelve (objeto construido, bytes retenidos) midiendo con tracemalloc."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    built = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return built, retained
+
+def main(count: int) -> None:
+    results = [
+        ConcentrationService.calculate(ConcentrationRequest(
+            calculation_type=CalculationType.MOLARITY,
+            moles=i * 0.001 + 0.5,
+            volume_l=1.0 + (i % 7),
+            molecular_weight=58.44,
+        ))
+        for i in range(count)
+    ]
+    
+    layouts = {
+        'dataclass con __dict__': lambda: [
+            DictConcentrationResult(**{f.name: getattr(r, f.name) for f in fields(r)}) for r in results
+        ],
+        'dataclass con __slots__': lambda: [
+            ConcentrationResult(**{f.name: getattr(r, f.name) for f in fields(r)}) for r in results
+        ],
+        'dataclass inmutable con __slots__': lambda: [freeze(r, FrozenConcentrationResult) for r in results],
+        'StructOfArrays': lambda: StructOfArrays.from_records(ConcentrationResult, results),
+    }
+    
+    print(f"{count} resultados de concentración")
+    baseline = None
+    for name, build in layouts.items():
+        _, retained = measure(build)
+        baseline = baseline or retained
+        print(f"{name:<36} {retained / 1e6:10.2f} MB  {retained / count:8.1f} B/resultado  "
+              f"{retained / baseline:6.2%}")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,83 @@
+import unittest
+from unittest.mock import patch
+
+from app import create_app
+from app.services.ph_service import PHService
+
+class TestAPI(unittest.TestCase):
+    """Pruebas para la API JSON versionada (/api/v1)."""
+
+    def setUp(self):
+        self.client = create_app().test_client()
+
+    def test_conversion(self):
+        """Prueba una conversión y que el valor usa los mismos límites que el formulario."""
+        response = self.client.post('/api/v1/conversiones', json={
+            'value': 2, 'from_unit': 'kilogramos', 'to_unit': 'gramos', 'unit_type': 'masa'})
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(response.get_json()['converted_value'], 2000)
+
+        for value in (-1, '1e999'):
+            response = self.client.post('/api/v1/conversiones', json={
+                'value': value, 'from_unit': 'kilogramos', 'to_unit': 'gramos', 'unit_type': 'masa'})
+            self.assertEqual(response.status_code, 400, value)
+            self.assertEqual(response.get_json()['errores'][0]['campo'], 'value')
+
+    def test_concentration(self):
+        """Prueba que se validan los campos del tipo de cálculo con sus nombres en español."""
+        response = self.client.post('/api/v1/concentraciones', json={
+            'calculation_type': 'molaridad', 'moles': 1, 'volume_l': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(response.get_json()['molarity'], 0.5)
+
+        response = self.client.post('/api/v1/concentraciones', json={
+            'calculation_type': 'molaridad', 'moles': 1, 'volume_l': 0})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['errores'],
+                         [{'campo': 'volume_l', 'mensaje': "El campo volumen debe ser mayor a cero"}])
+
+    def test_neubauer(self):
+        """Prueba un conteo con el número de cuadrantes deducido de la lista."""
+        response = self.client.post('/api/v1/neubauer', json={'cell_counts': [10, 20], 'quadrant_volume': 0.1})
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(response.get_json()['average_cells'], 15.0)
+
+        response = self.client.post('/api/v1/neubauer', json={'cell_counts': [10, -1], 'quadrant_volume': 0.1})
+        self.assertEqual(response.status_code, 400)
+
+    def test_counting_session_numbers(self):
+        """Prueba que la sesión de conteo solo acepta números JSON finitos en volumen, dilución y confianza."""
+        response = self.client.post('/api/neubauer/sesiones', json={'num_cuadrantes': 4, 'volumen_cuadrante': 0.1})
+        self.assertEqual(response.status_code, 201)
+        self.client.delete(f"/api/neubauer/sesiones/{response.get_json()['sesion']}")
+
+        for key, value in (('volumen_cuadrante', '0.1'), ('factor_dilucion', True), ('nivel_confianza', None),
+                           ('volumen_cuadrante', 10 ** 400)):
+            response = self.client.post('/api/neubauer/sesiones', json={'num_cuadrantes': 4, key: value})
+            self.assertEqual(response.status_code, 400, (key, value))
+            self.assertIn("números finitos", response.get_json()['error'])
+        for literal in ('Infinity', 'NaN'):
+            response = self.client.post('/api/neubauer/sesiones', content_type='application/json',
+                                        data=f'{{"num_cuadrantes": 4, "factor_dilucion": {literal}}}')
+            self.assertEqual(response.status_code, 400, literal)
+
+    def test_ph(self):
+        """Prueba el pH de un ácido fuerte y el rechazo de un cuerpo que no es un objeto."""
+        response = self.client.post('/api/v1/ph', json={'calculation_type': 'acido_fuerte', 'concentration_m': 0.01})
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(response.get_json()['ph'], 2.0, places=3)
+
+        response = self.client.post('/api/v1/ph', json=[0.01])
+        self.assertEqual(response.status_code, 400)
+
+    def test_numeric_overflow_is_client_error(self):
+        """Prueba que un desborde numérico del cálculo responde 400 y no un error del servidor."""
+        for error in (OverflowError, ZeroDivisionError):
+            with patch.object(PHService, 'calculate', side_effect=error):
+                response = self.client.post('/api/v1/ph', json={
+                    'calculation_type': 'acido_fuerte', 'concentration_m': 0.01})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("fuera del rango numérico", response.get_json()['error'])
+
+if __name__ == '__main__':
+    unittest.main()
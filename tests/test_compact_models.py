@@ -0,0 +1,113 @@
+import dataclasses
+import unittest
+
+from app.models.compact import StructOfArrays, freeze
+from app.models.concentration import (
+    CalculationType, ConcentrationRequest, ConcentrationResult, DilutionSeriesMode, DilutionSeriesRequest,
+    FrozenConcentrationResult
+)
+from app.models.neubauer import FrozenNeubauerRequest, NeubauerResult
+from app.models.ph import PHCalculationType, PHRequest, PHResult
+from app.services.concentration_service import ConcentrationService
+from app.services.ph_service import PHService
+
+class TestCompactModels(unittest.TestCase):
+    """Pruebas para las variantes compactas de los modelos."""
+    
+    def _molarity_results(self, count):
+        return [
+            ConcentrationService.calculate(ConcentrationRequest(
+                calculation_type=CalculationType.MOLARITY,
+                moles=0.1 * (i + 1),
+                volume_l=0.5,
+                molecular_weight=58.44 if i % 2 else None,
+            ))
+            for i in range(count)
+        ]
+    
+    def test_models_use_slots(self):
+        """Prueba que los modelos no crean un __dict__ por instancia."""
+        result = self._molarity_results(1)[0]
+        self.assertFalse(hasattr(result, '__dict__'))
+        with self.assertRaises(AttributeError):
+            result.unknown_field = 1
+    
+    def test_frozen_variant_is_immutable(self):
+        """Prueba que la variante inmutable conserva los valores y no admite cambios."""
+        result = self._molarity_results(1)[0]
+        frozen = freeze(result, FrozenConcentrationResult)
+        
+        self.assertEqual(frozen.molarity, result.molarity)
+        self.assertEqual(frozen.calculation_type, CalculationType.MOLARITY)
+        self.assertEqual(FrozenConcentrationResult.__name__, 'FrozenConcentrationResult')
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            frozen.molarity = 1.0
+        # Al ser inmutable puede usarse como clave
+        self.assertEqual(len({frozen, freeze(result, FrozenConcentrationResult)}), 1)
+    
+    def test_frozen_variant_keeps_defaults(self):
+        """Prueba que la variante inmutable copia los valores por defecto."""
+        request = FrozenNeubauerRequest(num_quadrants=4, quadrant_volume=0.1,
+                                        dilution_factor=1.0, cell_counts=[10, 12, 11, 9])
+        self.assertEqual(request.num_quadrants, 4)
+        self.assertEqual(ConcentrationResult(CalculationType.MOLARITY).notes, None)
+    
+    def test_struct_of_arrays_round_trip(self):
+        """Prueba que el contenedor columnar reconstruye los mismos resultados."""
+        results = self._molarity_results(10)
+        store = StructOfArrays.from_records(ConcentrationResult, results)
+        
+        self.assertEqual(len(store), 10)
+        self.assertEqual(list(store), results)
+        self.assertEqual(store[-1], results[-1])
+        self.assertEqual(store.column('molarity').dtype.name, 'float64')
+        self.assertEqual(store.categories('calculation_type'), [CalculationType.MOLARITY])
+        with self.assertRaises(IndexError):
+            store[10]
+    
+    def test_struct_of_arrays_other_models(self):
+        """Prueba el contenedor con resultados de Neubauer y de pH."""
+        neubauer = [NeubauerResult(1.0e6 * i, 40 * i, 10.0 * i, 4, 0.1, 2.0) for i in range(5)]
+        store = StructOfArrays.from_records(NeubauerResult, neubauer)
+        self.assertEqual(list(store), neubauer)
+        self.assertEqual(store.column('total_cells').dtype.name, 'int64')
+        
+        ph_results = [
+            PHService.calculate(PHRequest(calculation_type=kind, concentration_m=0.01))
+            for kind in (PHCalculationType.STRONG_ACID, PHCalculationType.STRONG_BASE)
+        ]
+        store = StructOfArrays.from_records(PHResult, ph_results)
+        self.assertEqual(list(store), ph_results)
+        self.assertAlmostEqual(store.column('ph')[0], 2.0)
+    
+    def test_struct_of_arrays_keeps_optional_ints(self):
+        """Prueba que los enteros opcionales vuelven como int (o None) y no como float."""
+        results = [NeubauerResult(1.0e6, 40, 10.0, 4, 0.1, 2.0, dead_cells=dead)
+                   for dead in (3, None, 2 ** 60 + 1)]
+        store = StructOfArrays.from_records(NeubauerResult, results)
+        
+        self.assertEqual(list(store), results)
+        self.assertIs(type(store[0].dead_cells), int)
+        self.assertIsNone(store[1].dead_cells)
+        self.assertEqual(store[2].dead_cells, 2 ** 60 + 1)
+        self.assertEqual(store.column('dead_cells').dtype.name, 'int64')
+        self.assertEqual(store.missing('dead_cells').tolist(), [False, True, False])
+        
+        series = [DilutionSeriesRequest(DilutionSeriesMode.FACTOR, 100.0, 1.0, num_steps=steps) for steps in (5, None)]
+        self.assertEqual([type(request.num_steps) for request in StructOfArrays.from_records(
+            DilutionSeriesRequest, series)], [int, type(None)])
+    
+    def test_struct_of_arrays_nbytes(self):
+        """Prueba que la memoria de los arreglos crece linealmente con los registros."""
+        small = StructOfArrays.from_records(ConcentrationResult, self._molarity_results(10))
+        large = StructOfArrays.from_records(ConcentrationResult, self._molarity_results(20))
+        self.assertGreater(small.nbytes, 0)
+        self.assertEqual(large.nbytes, 2 * small.nbytes)
+    
+    def test_struct_of_arrays_rejects_non_dataclass(self):
+        """Prueba que solo se aceptan dataclasses."""
+        with self.assertRaises(TypeError):
+            StructOfArrays.from_records(dict, [])
+
+if __name__ == '__main__':
+    unittest.main()
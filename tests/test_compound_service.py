@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from app.services.compound_service import CompoundService, normalize_name
+
+class TestCompoundService(unittest.TestCase):
+    """Pruebas para el catálogo de compuestos."""
+    
+    @classmethod
+    def setUpClass(cls):
+        CompoundService.load(':memory:')
+    
+    def test_suggest_ignores_case_and_accents(self):
+        """Prueba que el prefijo no distingue mayúsculas ni acentos."""
+        names = [s.compound.name for s in CompoundService.suggest('ACIDO FO')]
+        self.assertIn('Ácido fórmico', names)
+        self.assertIn('Ácido fosfórico', names)
+    
+    def test_suggest_matches_synonyms_and_formulas(self):
+        """Prueba coincidencias por sinónimo y por fórmula."""
+        by_synonym = CompoundService.suggest('sosa')
+        self.assertEqual(by_synonym[0].compound.name, 'Hidróxido de sodio')
+        self.assertEqual(by_synonym[0].matched_name, 'sosa cáustica')
+        
+        by_formula = CompoundService.suggest('nacl')
+        self.assertEqual(by_formula[0].compound.name, 'Cloruro de sodio')
+    
+    def test_suggest_respects_limit_and_unknown_prefix(self):
+        """Prueba el límite de sugerencias y prefijos sin coincidencias."""
+        self.assertEqual(len(CompoundService.suggest('a', limit=3)), 3)
+        self.assertEqual(CompoundService.suggest('zzz'), [])
+        self.assertEqual(CompoundService.suggest('   '), [])
+    
+    def test_suggestions_are_unique_compounds(self):
+        """Prueba que un compuesto no se repite aunque coincidan varios de sus nombres."""
+        ids = [s.compound.id for s in CompoundService.suggest('ac')]
+        self.assertEqual(len(ids), len(set(ids)))
+    
+    def test_find_returns_catalogue_data(self):
+        """Prueba la búsqueda exacta y los datos cargados del catálogo."""
+        compound = CompoundService.find('acido fosforico')
+        self.assertEqual(compound.formula, 'H3PO4')
+        self.assertEqual(compound.pka_values, [2.15, 7.20, 12.35])
+        self.assertAlmostEqual(compound.molar_mass, 97.994, places=2)
+        self.assertIsNone(CompoundService.find('no existe'))
+    
+    def test_catalogue_persists_on_disk(self):
+        """Prueba que la base SQLite se crea una vez y se reutiliza."""
+        with tempfile.TemporaryDirectory() as directory:
+            db_path = os.path.join(directory, 'catalogo', 'compuestos.db')
+            CompoundService.load(db_path)
+            self.assertTrue(os.path.exists(db_path))
+            CompoundService.load(db_path)
+            self.assertEqual(len(CompoundService.suggest('glucosa')), 1)
+        CompoundService.load(':memory:')
+    
+    def test_normalize_name(self):
+        """Prueba la normalización de nombres."""
+        self.assertEqual(normalize_name('  Ácido   Cítrico '), 'acido citrico')
+
+if __name__ == '__main__':
+    unittest.main()
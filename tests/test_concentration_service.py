@@ -1,6 +1,12 @@
+import math
 import unittest
+import numpy as np
+from dataclasses import asdict
 from app.services.concentration_service import ConcentrationService
-from app.models.concentration import ConcentrationRequest, ConcentrationError, CalculationType
+from app.models.concentration import (
+    ConcentrationRequest, ConcentrationError, CalculationType,
+    DilutionSeriesMode, DilutionSeriesRequest, BatchErrorCode, ConcentrationUnit
+)
 
 class TestConcentrationService(unittest.TestCase):
     """Pruebas para el servicio de concentraciones."""
@@ -150,6 +156,37 @@ class TestConcentrationService(unittest.TestCase):
         with self.assertRaises(ConcentrationError):
             ConcentrationService.calculate(request)
     
+    def test_solved_fields_are_returned(self):
+        """Prueba que el campo despejado se devuelve también cuando es kg de disolvente o volumen en mL."""
+        result = ConcentrationService.calculate(ConcentrationRequest(
+            calculation_type=CalculationType.MOLALITY, moles=1.0, molality=2.0))
+        self.assertAlmostEqual(result.kg_solvent, 0.5)
+        
+        result = ConcentrationService.calculate(ConcentrationRequest(
+            calculation_type=CalculationType.MASS_VOLUME, mass_g=2.0, concentration_mg_ml=4.0))
+        self.assertAlmostEqual(result.volume_ml, 500.0)
+        
+        batch = ConcentrationService.calculate_batch(['molalidad'], {'moles': [1.0], 'molality': [2.0]})
+        self.assertAlmostEqual(batch.columns['kg_solvent'][0], 0.5)
+    
+    def test_rejects_inputs_that_solve_nothing_or_contradict(self):
+        """Prueba que no se aceptan datos que no despejan nada ni datos de más que podrían contradecirse."""
+        with self.assertRaisesRegex(ConcentrationError, "Parámetros insuficientes para calcular molalidad"):
+            ConcentrationService.calculate(ConcentrationRequest(
+                calculation_type=CalculationType.MOLALITY, molality=2.0))
+        with self.assertRaisesRegex(ConcentrationError, "Sobran datos"):
+            ConcentrationService.calculate(ConcentrationRequest(
+                calculation_type=CalculationType.MOLARITY, moles=1.0, volume_l=2.0, molarity=5.0))
+        with self.assertRaisesRegex(ConcentrationError, "Sobran datos"):
+            ConcentrationService.calculate(ConcentrationRequest(
+                calculation_type=CalculationType.MOLARITY, mass_g=58.44, molecular_weight=58.44,
+                volume_l=1.0, molarity=5.0))
+        
+        batch = ConcentrationService.calculate_batch(
+            ['molaridad'], {'moles': [1.0], 'volume_l': [2.0], 'molarity': [5.0]})
+        self.assertEqual(batch.error_codes.tolist(), [BatchErrorCode.OVERDETERMINED])
+        self.assertTrue(np.isnan(batch.columns['molarity'][0]))
+    
     def test_get_calculation_types(self):
         """Prueba obtener tipos de cálculo disponibles."""
         calc_types = ConcentrationService.get_calculation_types()
@@ -161,6 +198,280 @@ class TestConcentrationService(unittest.TestCase):
         for calc_type in calc_types:
             self.assertIn('value', calc_type)
             self.assertIn('label', calc_type)
+    
+    def test_dilution_series_constant_factor(self):
+        """Prueba una serie 1:10 donde cada tubo conserva el volumen final."""
+        request = DilutionSeriesRequest(
+            mode=DilutionSeriesMode.FACTOR,
+            stock_concentration=100.0,
+            final_volume=1.0,
+            num_steps=3,
+            dilution_factor=10.0
+        )
+        result = ConcentrationService.calculate_dilution_series(request)
+        
+        for actual, expected in zip(result.concentrations, [10.0, 1.0, 0.1]):
+            self.assertAlmostEqual(actual, expected)
+        for actual, expected in zip(result.cumulative_dilutions, [10.0, 100.0, 1000.0]):
+            self.assertAlmostEqual(actual, expected)
+        for actual, expected in zip(result.total_volumes, [1.11, 1.1, 1.0]):
+            self.assertAlmostEqual(actual, expected)
+        self.assertAlmostEqual(result.stock_volume_needed, 0.111)
+        
+        # Cada tubo cumple C₁V₁ = C₂V₂ con el volumen transferido
+        previous = [100.0] + result.concentrations[:-1]
+        for i, concentration in enumerate(result.concentrations):
+            self.assertAlmostEqual(previous[i] * result.transfer_volumes[i],
+                                   concentration * result.total_volumes[i])
+            self.assertAlmostEqual(result.transfer_volumes[i] + result.diluent_volumes[i],
+                                   result.total_volumes[i])
+    
+    def test_dilution_series_logarithmic(self):
+        """Prueba una serie con espaciado logarítmico hasta una concentración final."""
+        request = DilutionSeriesRequest(
+            mode=DilutionSeriesMode.LOGARITHMIC,
+            stock_concentration=1000.0,
+            final_volume=0.5,
+            num_steps=3,
+            final_concentration=1.0
+        )
+        result = ConcentrationService.calculate_dilution_series(request)
+        
+        for actual, expected in zip(result.concentrations, [100.0, 10.0, 1.0]):
+            self.assertAlmostEqual(actual, expected)
+        for factor in result.step_factors:
+            self.assertAlmostEqual(factor, 10.0)
+    
+    def test_dilution_series_targets(self):
+        """Prueba una serie con concentraciones objetivo explícitas."""
+        request = DilutionSeriesRequest(
+            mode=DilutionSeriesMode.TARGETS,
+            stock_concentration=100.0,
+            final_volume=1.0,
+            target_concentrations=[50.0, 10.0]
+        )
+        result = ConcentrationService.calculate_dilution_series(request)
+        
+        self.assertEqual(result.step_factors, [2.0, 5.0])
+        self.assertAlmostEqual(result.total_volumes[0], 1.2)
+        self.assertAlmostEqual(result.transfer_volumes[0], 0.6)
+    
+    def test_dilution_series_rejects_increasing_targets(self):
+        """Prueba que las concentraciones objetivo deben ser decrecientes."""
+        request = DilutionSeriesRequest(
+            mode=DilutionSeriesMode.TARGETS,
+            stock_concentration=100.0,
+            final_volume=1.0,
+            target_concentrations=[10.0, 50.0]
+        )
+        with self.assertRaises(ConcentrationError):
+            ConcentrationService.calculate_dilution_series(request)
+    
+    def test_dilution_series_requires_factor_above_one(self):
+        """Prueba que el factor de dilución debe ser mayor a 1."""
+        request = DilutionSeriesRequest(
+            mode=DilutionSeriesMode.FACTOR,
+            stock_concentration=100.0,
+            final_volume=1.0,
+            num_steps=3,
+            dilution_factor=1.0
+        )
+        with self.assertRaises(ConcentrationError):
+            ConcentrationService.calculate_dilution_series(request)
+    
+    def test_calculate_batch_matches_scalar_calculation(self):
+        """Prueba que el cálculo por lotes coincide fila a fila con el individual."""
+        requests = [
+            ConcentrationRequest(CalculationType.MOLARITY, moles=0.5, volume_l=2.0, molecular_weight=58.44),
+            ConcentrationRequest(CalculationType.MOLARITY, molarity=0.1, volume_l=0.5),
+            ConcentrationRequest(CalculationType.MOLARITY, molarity=2.0, moles=1.0),
+            ConcentrationRequest(CalculationType.MOLARITY, mass_g=58.5, molecular_weight=58.5, volume_l=1.0),
+            ConcentrationRequest(CalculationType.MOLALITY, moles=2.0, kg_solvent=0.5),
+            ConcentrationRequest(CalculationType.MOLALITY, molality=1.5, kg_solvent=2.0),
+            ConcentrationRequest(CalculationType.DILUTION, v1=10.0, c2=0.1, v2=100.0),
+            ConcentrationRequest(CalculationType.DILUTION, c1=1.0, c2=0.1, v2=100.0),
+            ConcentrationRequest(CalculationType.DILUTION, c1=1.0, v1=10.0, v2=100.0),
+            ConcentrationRequest(CalculationType.DILUTION, c1=1.0, v1=10.0, c2=0.1),
+            ConcentrationRequest(CalculationType.MASS_VOLUME, mass_g=2.0, volume_ml=500.0),
+            ConcentrationRequest(CalculationType.MASS_VOLUME, concentration_mg_ml=4.0, volume_ml=250.0),
+            ConcentrationRequest(CalculationType.MASS_VOLUME, mass_g=1.0, volume_ml=100.0, molecular_weight=40.0),
+            ConcentrationRequest(CalculationType.PPM, ppm=500.0),
+            ConcentrationRequest(CalculationType.PPM, percentage=0.5),
+            ConcentrationRequest(CalculationType.PPM, concentration_mg_ml=0.2),
+            ConcentrationRequest(CalculationType.PERCENTAGE, percentage=5.0),
+            ConcentrationRequest(CalculationType.PERCENTAGE, ppm=2500.0),
+        ]
+        
+        batch = ConcentrationService.calculate_batch(
+            [r.calculation_type for r in requests],
+            {name: [getattr(r, name) for r in requests] for name in ConcentrationService.BATCH_INPUT_FIELDS}
+        )
+        
+        self.assertTrue(np.all(batch.error_codes == BatchErrorCode.OK))
+        for row, request in enumerate(requests):
+            expected = asdict(ConcentrationService.calculate(request))
+            for name in ConcentrationService.BATCH_OUTPUT_FIELDS:
+                actual = batch.columns[name][row]
+                if expected[name] is None:
+                    self.assertTrue(math.isnan(actual), f"fila {row}, campo {name}")
+                else:
+                    self.assertAlmostEqual(actual, expected[name], msg=f"fila {row}, campo {name}")
+    
+    def test_calculate_batch_reports_errors_per_row(self):
+        """Prueba que las filas inválidas reciben un código de error sin interrumpir el lote."""
+        batch = ConcentrationService.calculate_batch(
+            ['molaridad', 'molaridad', 'dilucion', 'desconocido', CalculationType.MOLALITY],
+            {
+                'moles': [1.0, 1.0, None, None, 1.0],
+                'volume_l': [2.0, 0.0, None, None, None],
+                'c1': [None, None, 1.0, None, None],
+                'v1': [None, None, 1.0, None, None],
+                'c2': [None, None, 1.0, None, None],
+                'v2': [None, None, 1.0, None, None],
+            }
+        )
+        
+        self.assertEqual(batch.error_codes.tolist(), [
+            BatchErrorCode.OK,
+            BatchErrorCode.NON_POSITIVE_VALUE,
+            BatchErrorCode.OVERDETERMINED,
+            BatchErrorCode.UNSUPPORTED_TYPE,
+            BatchErrorCode.INSUFFICIENT_PARAMETERS,
+        ])
+        self.assertEqual(batch.columns['molarity'][0], 0.5)
+        self.assertTrue(np.isnan(batch.columns['molarity'][1:]).all())
+    
+    def test_molarity_from_formula(self):
+        """Prueba cálculo de molaridad usando una fórmula en lugar del peso molecular."""
+        request = ConcentrationRequest(
+            calculation_type=CalculationType.MOLARITY,
+            mass_g=24.968,
+            formula='CuSO4·5H2O',
+            volume_l=0.1
+        )
+        result = ConcentrationService.calculate(request)
+        
+        self.assertAlmostEqual(result.molarity, 1.0, places=3)
+        self.assertAlmostEqual(result.molecular_weight, 249.68, places=1)
+        self.assertIn('CuSO4·5H2O', result.notes)
+    
+    def test_mass_volume_with_formula_adds_molarity(self):
+        """Prueba que masa/volumen con fórmula también devuelve la molaridad."""
+        request = ConcentrationRequest(
+            calculation_type=CalculationType.MASS_VOLUME,
+            mass_g=5.844,
+            volume_ml=100.0,
+            formula='NaCl'
+        )
+        result = ConcentrationService.calculate(request)
+        
+        self.assertAlmostEqual(result.concentration_g_l, 58.44)
+        self.assertAlmostEqual(result.molarity, 1.0, places=3)
+    
+    def test_invalid_formula_raises_concentration_error(self):
+        """Prueba que una fórmula no válida produce un error de concentración."""
+        request = ConcentrationRequest(
+            calculation_type=CalculationType.MOLARITY,
+            mass_g=1.0,
+            formula='Xq2',
+            volume_l=1.0
+        )
+        with self.assertRaises(ConcentrationError):
+            ConcentrationService.calculate(request)
+    
+    def test_calculate_batch_with_formula_column(self):
+        """Prueba que el lote resuelve fórmulas y marca las no válidas."""
+        batch = ConcentrationService.calculate_batch(
+            ['molaridad'] * 4,
+            {
+                'mass_g': [58.44, 116.88, 1.0, 40.0],
+                'volume_l': [1.0, 1.0, 1.0, 1.0],
+                'molecular_weight': [None, None, None, 40.0],
+                'formula': ['NaCl', 'NaCl', 'Qq', None],
+            }
+        )
+        
+        self.assertEqual(batch.error_codes.tolist(), [
+            BatchErrorCode.OK, BatchErrorCode.OK, BatchErrorCode.INVALID_FORMULA, BatchErrorCode.OK
+        ])
+        np.testing.assert_allclose(batch.columns['molarity'][[0, 1, 3]], [1.0, 2.0, 1.0], rtol=1e-4)
+        self.assertTrue(np.isnan(batch.columns['molarity'][2]))
+    
+    def test_mass_volume_from_concentration_g_l(self):
+        """Prueba que el sistema de ecuaciones despeja la masa a partir de g/L y volumen."""
+        request = ConcentrationRequest(
+            calculation_type=CalculationType.MASS_VOLUME,
+            concentration_g_l=20.0,
+            volume_ml=50.0
+        )
+        result = ConcentrationService.calculate(request)
+        
+        self.assertAlmostEqual(result.mass_g, 1.0)
+        self.assertAlmostEqual(result.concentration_mg_ml, 20.0)
+    
+    def test_representations_from_molar(self):
+        """Prueba que una concentración molar se expresa en todas las unidades."""
+        result = ConcentrationService.calculate_representations(150.0, 'mM', molar_mass=58.44)
+        
+        self.assertAlmostEqual(result.values[ConcentrationUnit.MOLAR], 0.15)
+        self.assertAlmostEqual(result.values[ConcentrationUnit.MICROMOLAR], 150000.0)
+        self.assertAlmostEqual(result.values[ConcentrationUnit.G_L], 8.766)
+        self.assertAlmostEqual(result.values[ConcentrationUnit.PPM], 8766.0)
+        self.assertAlmostEqual(result.values[ConcentrationUnit.PERCENT_WV], 0.8766)
+    
+    def test_representations_without_molar_mass(self):
+        """Prueba que sin masa molar solo faltan las unidades molares."""
+        value, unit = ConcentrationService.parse_concentration_expression('0,9 %')
+        result = ConcentrationService.calculate_representations(value, unit)
+        
+        self.assertEqual(unit, ConcentrationUnit.PERCENT_WV)
+        self.assertIsNone(result.values[ConcentrationUnit.MOLAR])
+        self.assertAlmostEqual(result.values[ConcentrationUnit.MG_ML], 9.0)
+        self.assertIn('masa molar', result.notes)
+    
+    def test_representations_use_formula_and_density(self):
+        """Prueba la masa molar desde una fórmula y ppm con densidad distinta de 1."""
+        result = ConcentrationService.calculate_representations(1.0, ConcentrationUnit.MOLAR, formula='NaCl', density=1.2)
+        self.assertAlmostEqual(result.values[ConcentrationUnit.G_L], 58.44, places=2)
+        self.assertAlmostEqual(result.values[ConcentrationUnit.PPM], 58440 / 1.2, delta=5)
+    
+    def test_convert_representations_arrays(self):
+        """Prueba la conversión vectorizada con una masa molar por valor."""
+        converted = ConcentrationService.convert_representations(
+            [1.0, 2.0, 3.0], 'mg/mL', np.array([10.0, 20.0, np.nan])
+        )
+        np.testing.assert_allclose(converted[ConcentrationUnit.MILLIMOLAR][:2], [100.0, 100.0])
+        self.assertTrue(np.isnan(converted[ConcentrationUnit.MOLAR][2]))
+        np.testing.assert_allclose(converted[ConcentrationUnit.PPB], [1e6, 2e6, 3e6])
+        with self.assertRaises(ConcentrationError):
+            ConcentrationService.convert_representations([1.0], 'mol/kg')
+        for value in (-1.0, np.inf, np.nan):
+            with self.assertRaisesRegex(ConcentrationError, "no negativo"):
+                ConcentrationService.convert_representations([1.0, value], 'mM')
+    
+    def test_non_positive_molecular_weight_as_multiplier(self):
+        """Prueba que un peso molecular ≤ 0 se rechaza también cuando multiplica, en ambos caminos."""
+        for calc_type, values in ((CalculationType.MOLARITY, {'molarity': 2.0, 'volume_l': 1.0}),
+                                  (CalculationType.MASS_VOLUME, {'concentration_mg_ml': 2.0, 'volume_ml': 1.0})):
+            for weight in (0.0, -1.0):
+                with self.assertRaisesRegex(ConcentrationError, "peso molecular"):
+                    ConcentrationService.calculate(
+                        ConcentrationRequest(calculation_type=calc_type, molecular_weight=weight, **values)
+                    )
+                result = ConcentrationService.calculate_batch(
+                    [calc_type], {name: [value] for name, value in dict(values, molecular_weight=weight).items()}
+                )
+                self.assertEqual(result.error_codes.tolist(), [BatchErrorCode.NON_POSITIVE_VALUE])
+    
+    def test_calculate_batch_rejects_unknown_columns(self):
+        """Prueba que una columna desconocida produce un error."""
+        with self.assertRaises(ConcentrationError):
+            ConcentrationService.calculate_batch(['molaridad'], {'volumen': [1.0]})
+    
+    def test_calculate_batch_rejects_mismatched_lengths(self):
+        """Prueba que las columnas deben tener una fila por tipo de cálculo."""
+        with self.assertRaises(ConcentrationError):
+            ConcentrationService.calculate_batch(['molaridad', 'molaridad'], {'moles': [1.0]})
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
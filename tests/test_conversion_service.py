@@ -1,6 +1,11 @@
+import io
+import json
 import unittest
-from app.services.conversion_service import ConversionService
+
+import numpy as np
+
 from app.models.conversion import ConversionRequest, ConversionError, UnitType
+from app.services.conversion_service import ConversionService
 
 class TestConversionService(unittest.TestCase):
     """Pruebas para el servicio de conversiones."""
@@ -91,6 +96,152 @@ class TestConversionService(unittest.TestCase):
         temp_units = ConversionService.get_available_units(UnitType.TEMPERATURE)
         self.assertIn('celsius', temp_units)
         self.assertIn('fahrenheit', temp_units)
+    
+    def test_mass_conversion_milligrams_to_micrograms(self):
+        """Prueba conversión entre submúltiplos sin par escrito a mano."""
+        request = ConversionRequest(
+            value=2.5,
+            from_unit='miligramos',
+            to_unit='microgramos',
+            unit_type=UnitType.MASS
+        )
+        result = ConversionService.convert(request)
+        self.assertAlmostEqual(result.converted_value, 2500.0)
+    
+    def test_temperature_conversion_kelvin_to_fahrenheit(self):
+        """Prueba conversión de Kelvin a Fahrenheit."""
+        request = ConversionRequest(
+            value=373.15,
+            from_unit='kelvin',
+            to_unit='fahrenheit',
+            unit_type=UnitType.TEMPERATURE
+        )
+        result = ConversionService.convert(request)
+        self.assertAlmostEqual(result.converted_value, 212.0)
+    
+    def test_volume_conversion_microliters_to_deciliters(self):
+        """Prueba conversión de microlitros a decilitros."""
+        request = ConversionRequest(
+            value=500,
+            from_unit='microlitros',
+            to_unit='decilitros',
+            unit_type=UnitType.VOLUME
+        )
+        result = ConversionService.convert(request)
+        self.assertAlmostEqual(result.converted_value, 0.005)
+    
+    def test_conversion_table_covers_all_pairs(self):
+        """Prueba que la tabla precompilada cubre cada par de unidades."""
+        for unit_type in ConversionService.get_all_unit_types():
+            units = ConversionService.get_available_units(unit_type)
+            for from_unit in units:
+                for to_unit in units:
+                    scale, offset = ConversionService.get_conversion_factors(unit_type, from_unit, to_unit)
+                    back_scale, back_offset = ConversionService.get_conversion_factors(unit_type, to_unit, from_unit)
+                    self.assertAlmostEqual((10 * scale + offset) * back_scale + back_offset, 10)
+    
+    def test_convert_many_matches_scalar_conversion(self):
+        """Prueba que la conversión vectorizada coincide con la escalar."""
+        values = np.array([-40.0, 0.0, 36.6, 100.0])
+        converted = ConversionService.convert_many(values, 'celsius', 'fahrenheit', UnitType.TEMPERATURE)
+        
+        for value, expected in zip(values, converted):
+            request = ConversionRequest(
+                value=float(value),
+                from_unit='celsius',
+                to_unit='fahrenheit',
+                unit_type=UnitType.TEMPERATURE
+            )
+            self.assertEqual(ConversionService.convert(request).converted_value, expected)
+    
+    def test_convert_many_accepts_lists(self):
+        """Prueba la conversión vectorizada a partir de una lista."""
+        converted = ConversionService.convert_many([1, 2.5], 'litros', 'mililitros', UnitType.VOLUME)
+        np.testing.assert_allclose(converted, [1000.0, 2500.0])
+    
+    def test_convert_many_rejects_non_numeric_values(self):
+        """Prueba que un valor no numérico produce un error de conversión."""
+        with self.assertRaises(ConversionError):
+            ConversionService.convert_many([1, 'abc'], 'gramos', 'kilogramos', UnitType.MASS)
+    
+    def test_convert_many_rejects_strings_and_booleans(self):
+        """Prueba que no se convierten textos numéricos ni booleanos."""
+        for values in ([1, '2'], [1, True], np.array([True, False]), np.array(['1', '2'])):
+            with self.assertRaises(ConversionError):
+                ConversionService.convert_many(values, 'gramos', 'miligramos', UnitType.MASS)
+    
+    def test_convert_many_unsupported_conversion(self):
+        """Prueba conversión vectorizada no soportada."""
+        with self.assertRaises(ConversionError):
+            ConversionService.convert_many([1, 2], 'gramos', 'libras', UnitType.MASS)
+    
+    def test_convert_csv_stream_converts_selected_columns(self):
+        """Prueba la conversión en flujo de columnas de un CSV."""
+        lines = io.StringIO("muestra,temp,vol\nA,0,1\nB,100,\nC,37,2\n")
+        chunks = ConversionService.convert_csv_stream(
+            lines, ['temp'], 'celsius', 'kelvin', UnitType.TEMPERATURE
+        )
+        output = ''.join(chunks)
+        self.assertEqual(output, "muestra,temp,vol\nA,273.15,1\nB,373.15,\nC,310.15,2\n")
+    
+    def test_convert_csv_stream_yields_before_reading_everything(self):
+        """Prueba que el encabezado se emite sin consumir el resto del archivo."""
+        def lines():
+            yield "valor\n"
+            raise AssertionError("No debería leerse más allá del encabezado")
+        
+        chunks = ConversionService.convert_csv_stream(
+            lines(), ['valor'], 'gramos', 'miligramos', UnitType.MASS
+        )
+        self.assertEqual(next(chunks), "valor\n")
+    
+    def test_convert_csv_stream_missing_column(self):
+        """Prueba que una columna inexistente produce un error."""
+        chunks = ConversionService.convert_csv_stream(
+            io.StringIO("a,b\n1,2\n"), ['c'], 'gramos', 'kilogramos', UnitType.MASS
+        )
+        with self.assertRaises(ConversionError):
+            next(chunks)
+    
+    def test_convert_csv_stream_reports_invalid_row(self):
+        """Prueba que una celda no numérica indica la fila con el error."""
+        chunks = ConversionService.convert_csv_stream(
+            io.StringIO("a\n1\nxx\n"), ['a'], 'gramos', 'kilogramos', UnitType.MASS
+        )
+        with self.assertRaisesRegex(ConversionError, "fila 3"):
+            list(chunks)
+    
+    def test_convert_ndjson_stream(self):
+        """Prueba la conversión en flujo de un archivo NDJSON."""
+        lines = io.StringIO('{"id": 1, "v": 1.5}\n\n{"id": 2, "v": null}\n')
+        chunks = ConversionService.convert_ndjson_stream(
+            lines, ['v'], 'litros', 'mililitros', UnitType.VOLUME
+        )
+        records = [json.loads(line) for line in ''.join(chunks).splitlines()]
+        self.assertEqual(records, [{'id': 1, 'v': 1500.0}, {'id': 2, 'v': None}])
+    
+    def test_streams_reject_non_finite_values(self):
+        """Prueba que ambos flujos rechazan infinitos y NaN y conservan las celdas vacías."""
+        with self.assertRaisesRegex(ConversionError, "fila 3"):
+            list(ConversionService.convert_csv_stream(
+                io.StringIO("a\n1\ninf\n"), ['a'], 'gramos', 'kilogramos', UnitType.MASS
+            ))
+        with self.assertRaisesRegex(ConversionError, "fila 2"):
+            list(ConversionService.convert_csv_stream(
+                io.StringIO("a\nnan\n"), ['a'], 'gramos', 'kilogramos', UnitType.MASS
+            ))
+        with self.assertRaisesRegex(ConversionError, "línea 2"):
+            list(ConversionService.convert_ndjson_stream(
+                io.StringIO('{"v": 1}\n{"v": 1e999}\n'), ['v'], 'gramos', 'kilogramos', UnitType.MASS
+            ))
+        with self.assertRaisesRegex(ConversionError, "línea 1"):
+            list(ConversionService.convert_ndjson_stream(
+                io.StringIO('{"v": "12"}\n'), ['v'], 'gramos', 'kilogramos', UnitType.MASS
+            ))
+        output = ''.join(ConversionService.convert_ndjson_stream(
+            io.StringIO('{"v": ""}\n{"v": 2000}\n'), ['v'], 'gramos', 'kilogramos', UnitType.MASS
+        ))
+        self.assertEqual([json.loads(line) for line in output.splitlines()], [{'v': ''}, {'v': 2.0}])
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,156 @@
+import math
+import threading
+import unittest
+
+from app.services.counting_session_service import CountingSessionService, RunningStatistics
+from app.services.neubauer_service import NeubauerService
+from app.models.counting_session import CountingSessionError, CountingSessionNotFound
+from app.models.neubauer import NeubauerRequest
+
+class TestRunningStatistics(unittest.TestCase):
+    """Pruebas para la media y varianza de Welford."""
+    
+    def test_add_and_replace(self):
+        """Agregar y reemplazar valores da la misma media y varianza que calcularlas de nuevo."""
+        values = [0.0, 0.0, 0.0, 0.0]
+        stats = RunningStatistics(len(values))
+        for index, new in [(0, 5), (2, 3), (0, 7), (3, 1), (2, 2)]:
+            stats.replace(values[index], new)
+            values[index] = new
+        
+        mean = sum(values) / len(values)
+        variance = sum((value - mean) ** 2 for value in values) / (len(values) - 1)
+        self.assertAlmostEqual(stats.mean, mean)
+        self.assertAlmostEqual(stats.variance, variance)
+        
+        stats.add(10)
+        values.append(10)
+        mean = sum(values) / len(values)
+        self.assertAlmostEqual(stats.variance, sum((v - mean) ** 2 for v in values) / (len(values) - 1))
+    
+    def test_variance_needs_two_values(self):
+        """La varianza muestral no está definida con un solo valor."""
+        self.assertTrue(math.isnan(RunningStatistics(1).variance))
+
+class TestCountingSessionService(unittest.TestCase):
+    """Pruebas para las sesiones de conteo en vivo."""
+    
+    def setUp(self):
+        self.session = CountingSessionService.create_session(4, 0.1, 2.0).session_id
+    
+    def tearDown(self):
+        try:
+            CountingSessionService.finish(self.session)
+        except CountingSessionNotFound:
+            pass
+    
+    def click(self, counts, dead=False):
+        snapshot = None
+        for quadrant, count in enumerate(counts, start=1):
+            for _ in range(count):
+                snapshot = CountingSessionService.record_click(self.session, quadrant, dead=dead)
+        return snapshot
+    
+    def test_snapshot_matches_full_calculation(self):
+        """El estado incremental coincide con el cálculo completo de Neubauer."""
+        snapshot = self.click([25, 30, 28, 60])
+        full = NeubauerService.calculate_concentration(NeubauerRequest(
+            num_quadrants=4, quadrant_volume=0.1, dilution_factor=2.0, cell_counts=[25, 30, 28, 60]
+        ))
+        
+        self.assertEqual(snapshot.version, 143)
+        self.assertEqual(snapshot.live_counts, [25, 30, 28, 60])
+        self.assertEqual(snapshot.total_cells, 143)
+        self.assertAlmostEqual(snapshot.concentration, full.concentration)
+        self.assertAlmostEqual(snapshot.concentration_ci_low, full.concentration_ci_low)
+        self.assertAlmostEqual(snapshot.concentration_ci_high, full.concentration_ci_high)
+        self.assertAlmostEqual(snapshot.cv_percent, full.cv_percent)
+        self.assertIsNone(snapshot.viability_percent)
+    
+    def test_undo_and_viability(self):
+        """Deshacer resta un clic y las células muertas dan la viabilidad."""
+        self.click([10, 10, 10, 10])
+        self.click([1, 0, 1, 0], dead=True)
+        snapshot = CountingSessionService.record_click(self.session, 1, delta=-1)
+        
+        self.assertEqual(snapshot.live_counts, [9, 10, 10, 10])
+        self.assertEqual(snapshot.dead_cells, 2)
+        self.assertAlmostEqual(snapshot.viability_percent, 39 / 41 * 100)
+        
+        result = CountingSessionService.finish(self.session)
+        self.assertEqual(result.total_cells, 39)
+        self.assertEqual(result.dead_cells, 2)
+        self.assertAlmostEqual(result.viability_percent, 39 / 41 * 100)
+    
+    def test_invalid_clicks(self):
+        """Rechaza cuadrantes fuera de rango, deltas no válidos y conteos negativos."""
+        with self.assertRaises(CountingSessionError):
+            CountingSessionService.record_click(self.session, 5)
+        with self.assertRaises(CountingSessionError):
+            CountingSessionService.record_click(self.session, 1, delta=2)
+        with self.assertRaises(CountingSessionError):
+            CountingSessionService.record_click(self.session, 1, delta=-1)
+        with self.assertRaises(CountingSessionNotFound):
+            CountingSessionService.record_click('no-existe', 1)
+        for dead in ('false', 0, None):
+            with self.assertRaisesRegex(CountingSessionError, "muerta"):
+                CountingSessionService.record_click(self.session, 1, dead=dead)
+        with self.assertRaises(CountingSessionError):
+            CountingSessionService.record_click(self.session, True)
+        with self.assertRaises(CountingSessionError):
+            CountingSessionService.record_click(self.session, 1, delta=True)
+        self.assertEqual(CountingSessionService.get_snapshot(self.session).version, 0)
+    
+    def test_invalid_session_parameters(self):
+        """Rechaza parámetros de sesión no válidos."""
+        with self.assertRaises(CountingSessionError):
+            CountingSessionService.create_session(0, 0.1, 1.0)
+        with self.assertRaises(CountingSessionError):
+            CountingSessionService.create_session(4, 0.0, 1.0)
+        with self.assertRaises(CountingSessionError):
+            CountingSessionService.create_session(4, 0.1, 1.0, confidence_level=1.0)
+    
+    def test_watch_receives_updates(self):
+        """El observador recibe el estado inicial, cada cambio y termina al cerrar la sesión."""
+        updates = CountingSessionService.watch(self.session, keepalive=0.01)
+        self.assertEqual(next(updates).version, 0)
+        self.assertIsNone(next(updates))
+        
+        CountingSessionService.record_click(self.session, 2)
+        self.assertEqual(next(updates).live_counts, [0, 1, 0, 0])
+        
+        closer = threading.Timer(0.05, CountingSessionService.finish, args=(self.session,))
+        closer.start()
+        remaining = list(updates)
+        closer.join()
+        self.assertTrue(all(update is None for update in remaining))
+        with self.assertRaises(CountingSessionNotFound):
+            CountingSessionService.get_snapshot(self.session)
+    
+    def test_expired_sessions_are_purged(self):
+        """Las sesiones sin actividad se descartan al abrir otras."""
+        original = CountingSessionService.SESSION_TTL
+        CountingSessionService.SESSION_TTL = -1
+        try:
+            other = CountingSessionService.create_session(1, 0.1, 1.0).session_id
+        finally:
+            CountingSessionService.SESSION_TTL = original
+        
+        with self.assertRaises(CountingSessionNotFound):
+            CountingSessionService.get_snapshot(self.session)
+        CountingSessionService.finish(other)
+    
+    def test_expired_sessions_are_purged_on_lookup(self):
+        """Una sesión expirada deja de responder a consultas y clics sin esperar a que se abra otra."""
+        original = CountingSessionService.SESSION_TTL
+        CountingSessionService.SESSION_TTL = -1
+        try:
+            with self.assertRaises(CountingSessionNotFound):
+                CountingSessionService.record_click(self.session, 1)
+        finally:
+            CountingSessionService.SESSION_TTL = original
+        with self.assertRaises(CountingSessionNotFound):
+            CountingSessionService.finish(self.session)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+
+import numpy as np
+
+from app.models.concentration import ConcentrationError
+from app.services.equation_registry import EquationSystem, Relation
+
+class TestEquationRegistry(unittest.TestCase):
+    """Pruebas para el registro de ecuaciones con planes precompilados."""
+    
+    def setUp(self):
+        self.density = Relation('density', ('mass',), ('volume',), positive=('volume',))
+        self.system = EquationSystem(
+            (self.density,), required=('density', 'mass', 'volume'),
+            insufficient_message="Faltan datos", positive_messages={'volume': "El volumen debe ser mayor a 0"},
+        )
+    
+    def test_solves_each_variable(self):
+        """Prueba que una sola declaración resuelve cualquiera de sus variables."""
+        self.assertEqual(self.system.solve({'mass': 10.0, 'volume': 4.0})['density'], 2.5)
+        self.assertEqual(self.system.solve({'density': 2.5, 'volume': 4.0})['mass'], 10.0)
+        self.assertEqual(self.system.solve({'density': 2.5, 'mass': 10.0})['volume'], 4.0)
+    
+    def test_plans_are_precompiled_per_mask(self):
+        """Prueba que hay un plan por máscara y que las combinaciones insuficientes no tienen plan."""
+        self.assertEqual(self.system.variables, ('density', 'mass', 'volume'))
+        self.assertIsNone(self.system.plan(self.system.mask({'mass': 1.0})))
+        plan = self.system.plan(self.system.mask({'mass': 1.0, 'volume': 2.0}))
+        self.assertEqual([step.target for step in plan.steps], ['density'])
+        with self.assertRaisesRegex(ConcentrationError, "Faltan datos"):
+            self.system.solve({'mass': 1.0})
+    
+    def test_validates_positive_values_and_divisors(self):
+        """Prueba que se validan los valores positivos declarados y los divisores."""
+        with self.assertRaisesRegex(ConcentrationError, "El volumen"):
+            self.system.solve({'density': 2.0, 'volume': 0.0})
+        with self.assertRaisesRegex(ConcentrationError, "density"):
+            self.system.solve({'density': 0.0, 'mass': 1.0})
+    
+    def test_chains_relations(self):
+        """Prueba que las relaciones se encadenan hasta despejar todo lo posible."""
+        system = EquationSystem(
+            (Relation('moles', ('mass',), ('weight',)), Relation('molarity', ('moles',), ('volume',))),
+            required=('molarity',), insufficient_message="Faltan datos",
+        )
+        solved = system.solve({'mass': 58.44, 'weight': 58.44, 'volume': 0.5})
+        self.assertAlmostEqual(solved['molarity'], 2.0)
+    
+    def test_rejects_overdetermined_combinations(self):
+        """Prueba que se rechazan relaciones con todas sus variables conocidas sin haberse usado."""
+        system = EquationSystem((self.density,), required=(), insufficient_message="Faltan datos",
+                                overdetermined_message="Sobran datos")
+        with self.assertRaisesRegex(ConcentrationError, "Sobran datos"):
+            system.solve({'density': 1.0, 'mass': 1.0, 'volume': 1.0})
+        self.assertTrue(system.is_overdetermined(system.mask({'density': 1.0, 'mass': 1.0, 'volume': 1.0})))
+        
+        # El peso molecular despejado deja la relación de molaridad con todo conocido
+        chained = EquationSystem(
+            (Relation('moles', ('mass',), ('weight',)), Relation('molarity', ('moles',), ('volume',))),
+            required=(), insufficient_message="Faltan datos",
+        )
+        with self.assertRaises(ConcentrationError):
+            chained.solve({'mass': 1.0, 'weight': 1.0, 'volume': 1.0, 'molarity': 5.0})
+        allowed = EquationSystem((self.density,), required=(), insufficient_message="Faltan datos",
+                                 allow_overdetermined=True)
+        self.assertEqual(allowed.solve({'density': 1.0, 'mass': 1.0, 'volume': 1.0})['density'], 1.0)
+    
+    def test_plan_must_solve_an_output(self):
+        """Prueba que con `outputs` no hay plan si solo se despejan variables que no se devuelven."""
+        system = EquationSystem((self.density,), required=(), insufficient_message="Faltan datos",
+                                outputs=('density', 'mass'))
+        with self.assertRaisesRegex(ConcentrationError, "Faltan datos"):
+            system.solve({'density': 1.0, 'mass': 1.0})
+        self.assertEqual(system.solve({'mass': 2.0, 'volume': 1.0})['density'], 2.0)
+    
+    def test_solve_arrays_marks_invalid_rows(self):
+        """Prueba la resolución vectorizada de un grupo de filas."""
+        plan = self.system.plan(self.system.mask({'mass': 1.0, 'volume': 1.0}))
+        solved, invalid = plan.solve_arrays({'mass': np.array([10.0, 3.0]), 'volume': np.array([4.0, 0.0])})
+        self.assertEqual(solved['density'][0], 2.5)
+        self.assertEqual(invalid.tolist(), [False, True])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import io
+import unittest
+from unittest.mock import patch
+
+from app import create_app
+from app.services.neubauer_service import NeubauerService
+
+class TestFormRoutes(unittest.TestCase):
+    """Pruebas para la validación con esquema de los formularios de cálculo."""
+
+    PAGES = ('/conversiones', '/concentraciones/serie', '/concentraciones/placa', '/concentraciones/receta',
+             '/concentraciones/representaciones', '/ph/amortiguadores')
+
+    def setUp(self):
+        self.client = create_app().test_client()
+
+    def test_pages_embed_schema_descriptor(self):
+        """Prueba que cada formulario publica su esquema para el validador del navegador."""
+        for url in self.PAGES:
+            page = self.client.get(url).get_data(as_text=True)
+            self.assertIn('data-formulario', page, url)
+            self.assertIn('js/validacion.js', page, url)
+
+    def test_reports_all_field_errors(self):
+        """Prueba que un envío inválido muestra los errores de todos los campos juntos."""
+        page = self.client.post('/concentraciones/placa', data={
+            'formato_placa': '96', 'replicas': '0', 'volumen_pocillo': '100', 'volumen_minimo': '0.5',
+            'concentraciones_stock': '1000, abc', 'concentraciones_objetivo': '1e999',
+        }).get_data(as_text=True)
+        self.assertIn("El campo número de réplicas debe ser mayor a cero", page)
+        self.assertIn("El campo concentraciones de stock debe ser una lista de números", page)
+        self.assertIn("El campo concentraciones objetivo debe ser una lista de números", page)
+
+        page = self.client.post('/concentraciones/serie', data={
+            'modo': 'factor', 'concentracion_stock': '100', 'volumen_final': '1', 'num_pasos': '5',
+            'factor_dilucion': '1',
+        }).get_data(as_text=True)
+        self.assertIn("El campo factor de dilución debe ser mayor a 1", page)
+
+    def test_oversized_count_is_a_field_error(self):
+        """Prueba que un conteo de miles de dígitos muestra el error del campo en lugar de fallar con 500."""
+        response = self.client.post('/neubauer', data={
+            'numCuadrantes': '1', 'volumenCuadrante': '0.1', 'factorDilucion': '1', 'celdasCuadrante1': '9' * 5000,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("debe ser un número entero válido", response.get_data(as_text=True))
+
+    def test_neubauer_form_has_its_own_quadrant_limit(self):
+        """Prueba que el formulario admite los 9 cuadrantes de la cámara, con un límite propio y no el de las sesiones."""
+        form = {'numCuadrantes': '9', 'volumenCuadrante': '0.1', 'factorDilucion': '1'}
+        form.update({f'celdasCuadrante{i}': '20' for i in range(1, 10)})
+        page = self.client.post('/neubauer', data=form).get_data(as_text=True)
+        self.assertIn("180 células", page)
+
+        form['numCuadrantes'] = '10'
+        page = self.client.post('/neubauer', data=form).get_data(as_text=True)
+        self.assertIn("El campo número de cuadrantes debe ser menor o igual a 9", page)
+
+    def test_neubauer_batch_upload_is_streamed(self):
+        """Prueba que el CSV subido se lee línea a línea, con límite de muestras y volúmenes finitos."""
+        upload = io.BytesIO("\ufeffmuestra,c1,c2,volumen_cuadrante\nA,10,20,0.1\nB,10,20,inf\n".encode('utf-8'))
+        page = self.client.post('/neubauer/lote', data={'archivo': (upload, 'conteos.csv')},
+                                content_type='multipart/form-data').get_data(as_text=True)
+        self.assertIn("deben ser números finitos mayores a 0", page)
+
+        with patch.object(NeubauerService, 'MAX_BATCH_ROWS', 1):
+            upload = io.BytesIO(b"c1\n1\n2\n")
+            page = self.client.post('/neubauer/lote', data={'archivo': (upload, 'conteos.csv')},
+                                    content_type='multipart/form-data').get_data(as_text=True)
+        self.assertIn("El archivo puede tener hasta 1 muestras", page)
+
+        page = self.client.post('/neubauer/lote', data={'archivo': (io.BytesIO(b"c1\n\xff\n"), 'conteos.csv')},
+                                content_type='multipart/form-data').get_data(as_text=True)
+        self.assertIn("codificado en UTF-8", page)
+
+    def test_valid_submission_is_calculated(self):
+        """Prueba que los valores validados llegan al servicio."""
+        response = self.client.post('/concentraciones/placa/worklist.csv', data={
+            'formato_placa': '96', 'replicas': '2', 'volumen_pocillo': '100', 'volumen_minimo': '0.5',
+            'concentraciones_stock': '1000; 10', 'concentraciones_objetivo': '100 50 10',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/csv')
+
+        page = self.client.post('/ph/amortiguadores', data={
+            'pka_values': '4.76', 'target_ph': '4.5', 'concentration_m': '0.1', 'volume_ml': '',
+        }).get_data(as_text=True)
+        self.assertIn("Receta para 1000 mL", page)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from app.services.formula_service import FormulaService
+from app.models.formula import FormulaError
+
+class TestFormulaService(unittest.TestCase):
+    """Pruebas para el servicio de fórmulas químicas."""
+    
+    def setUp(self):
+        FormulaService.clear_cache()
+    
+    def test_simple_formula(self):
+        """Prueba la composición de una fórmula simple."""
+        self.assertEqual(FormulaService.parse('H2O'), {'H': 2, 'O': 1})
+        self.assertAlmostEqual(FormulaService.molar_mass('NaCl'), 58.44, places=2)
+    
+    def test_parentheses(self):
+        """Prueba grupos entre paréntesis con subíndice."""
+        self.assertEqual(FormulaService.parse('Ca(OH)2'), {'Ca': 1, 'O': 2, 'H': 2})
+        self.assertEqual(FormulaService.parse('(NH4)2SO4'), {'N': 2, 'H': 8, 'S': 1, 'O': 4})
+    
+    def test_nested_brackets(self):
+        """Prueba corchetes con paréntesis anidados."""
+        self.assertEqual(FormulaService.parse('K4[Fe(CN)6]'), {'K': 4, 'Fe': 1, 'C': 6, 'N': 6})
+    
+    def test_hydrate(self):
+        """Prueba hidratos con coeficiente."""
+        self.assertEqual(FormulaService.parse('CuSO4·5H2O'), {'Cu': 1, 'S': 1, 'O': 9, 'H': 10})
+        self.assertEqual(FormulaService.parse('CuSO4.5H2O'), FormulaService.parse('CuSO4·5H2O'))
+        self.assertAlmostEqual(FormulaService.molar_mass('CuSO4·5H2O'), 249.68, places=1)
+    
+    def test_invalid_formulas(self):
+        """Prueba fórmulas no válidas."""
+        for formula in ['', 'Xx', 'Ca(OH', 'H2O)', '2', 'Na+', 'H0', '()']:
+            with self.assertRaises(FormulaError):
+                FormulaService.parse(formula)
+    
+    def test_molar_mass_is_cached(self):
+        """Prueba que las masas molares repetidas se obtienen de la caché."""
+        FormulaService.molar_mass('C6H12O6')
+        FormulaService.molar_mass(' C6H12O6 ')
+        self.assertEqual(FormulaService._molar_mass_cached.cache_info().hits, 1)
+
+if __name__ == '__main__':
+    unittest.main()
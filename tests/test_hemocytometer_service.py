@@ -0,0 +1,151 @@
+import unittest
+
+import numpy as np
+
+from app.services.hemocytometer_service import HemocytometerService
+from app.services.neubauer_service import NeubauerService
+from app.models.hemocytometer import CellCountRequest, CellPolarity, HemocytometerError
+
+LINES = (30, 210, 390)
+
+def synthetic_micrograph(cells_per_quadrant, dark=False, size=420, radius=6, seed=0):
+    """Micrografía sintética: cuadrícula de líneas oscuras y células como discos."""
+    rng = np.random.default_rng(seed)
+    image = np.full((size, size), 180.0) + rng.normal(0, 6, (size, size))
+    for position in LINES:
+        image[position:position + 3, :] = 70
+        image[:, position:position + 3] = 70
+    
+    yy, xx = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+    disc = yy ** 2 + xx ** 2 <= radius ** 2
+    spans = [(LINES[i] + 3 + 2 * radius, LINES[i + 1] - 2 * radius) for i in range(len(LINES) - 1)]
+    quadrants = [(rows, columns) for rows in spans for columns in spans]
+    for (rows, columns), count in zip(quadrants, cells_per_quadrant):
+        placed = []
+        while len(placed) < count:
+            y, x = rng.integers(*rows), rng.integers(*columns)
+            if all((y - a) ** 2 + (x - b) ** 2 > (3 * radius) ** 2 for a, b in placed):
+                placed.append((y, x))
+                patch = image[y - radius:y + radius + 1, x - radius:x + radius + 1]
+                patch[disc] += -70 if dark else 60
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+class TestHemocytometerService(unittest.TestCase):
+    """Pruebas para el conteo automático de células en imágenes."""
+    
+    def test_counts_bright_cells_per_quadrant(self):
+        """Detecta la cuadrícula y cuenta las células claras de cada cuadrante."""
+        image = synthetic_micrograph([5, 8, 3, 10])
+        result = HemocytometerService.count_cells(image, CellCountRequest(cell_diameter_px=12))
+        
+        self.assertEqual(result.quadrant_counts, [5, 8, 3, 10])
+        self.assertEqual(result.polarity, CellPolarity.BRIGHT)
+        self.assertEqual(len(result.row_lines), 3)
+        self.assertEqual(len(result.column_lines), 3)
+        self.assertEqual(len(result.cell_positions), 26)
+        self.assertEqual((result.image_width, result.image_height), (420, 420))
+    
+    def test_counts_dark_cells(self):
+        """La polaridad automática reconoce células oscuras."""
+        image = synthetic_micrograph([4, 6, 2, 7], dark=True, seed=1)
+        result = HemocytometerService.count_cells(image, CellCountRequest(cell_diameter_px=12))
+        
+        self.assertEqual(result.polarity, CellPolarity.DARK)
+        self.assertEqual(result.quadrant_counts, [4, 6, 2, 7])
+    
+    def test_tiles_match_single_pass(self):
+        """Procesar la imagen en varias franjas no cambia el conteo."""
+        image = synthetic_micrograph([6, 6, 6, 6], seed=2)
+        request = CellCountRequest(cell_diameter_px=12)
+        whole = HemocytometerService.count_cells(image, request)
+        
+        original = HemocytometerService.TILE_ROWS
+        HemocytometerService.TILE_ROWS = 40
+        try:
+            tiled = HemocytometerService.count_cells(image, request)
+        finally:
+            HemocytometerService.TILE_ROWS = original
+        
+        self.assertGreater(tiled.tiles, whole.tiles)
+        self.assertEqual(tiled.quadrant_counts, whole.quadrant_counts)
+    
+    def test_process_pool_matches_single_process(self):
+        """El grupo de procesos (forkserver o spawn) da el mismo conteo y se puede cerrar y recrear."""
+        image = synthetic_micrograph([6, 6, 6, 6], seed=2)
+        request = CellCountRequest(cell_diameter_px=12)
+        single = HemocytometerService.count_cells(image, request)
+        
+        originals = (HemocytometerService.TILE_ROWS, HemocytometerService.PARALLEL_MIN_PIXELS,
+                     HemocytometerService.__dict__['_worker_count'])
+        HemocytometerService.TILE_ROWS = 40
+        HemocytometerService.PARALLEL_MIN_PIXELS = 0
+        HemocytometerService._worker_count = classmethod(lambda cls: 2)
+        try:
+            pooled = HemocytometerService.count_cells(image, request)
+            context = HemocytometerService._get_executor()._mp_context.get_start_method()
+        finally:
+            HemocytometerService.shutdown_executor()
+            (HemocytometerService.TILE_ROWS, HemocytometerService.PARALLEL_MIN_PIXELS,
+             HemocytometerService._worker_count) = originals
+        
+        self.assertIn(context, ('forkserver', 'spawn'))
+        self.assertIsNone(HemocytometerService._executor)
+        self.assertEqual(pooled.quadrant_counts, single.quadrant_counts)
+    
+    def test_max_quadrants(self):
+        """Se pueden usar solo los primeros cuadrantes detectados."""
+        image = synthetic_micrograph([5, 8, 3, 10])
+        result = HemocytometerService.count_cells(image, CellCountRequest(cell_diameter_px=12, max_quadrants=2))
+        
+        self.assertEqual(result.quadrant_counts, [5, 8])
+    
+    def test_image_without_grid(self):
+        """Sin líneas de cuadrícula se cuenta toda la imagen como un cuadrante."""
+        rng = np.random.default_rng(3)
+        image = np.full((120, 120), 180.0) + rng.normal(0, 6, (120, 120))
+        image[40:52, 40:52] += 60
+        result = HemocytometerService.count_cells(image, CellCountRequest(cell_diameter_px=12))
+        
+        self.assertEqual(result.quadrant_counts, [1])
+        self.assertIsNotNone(result.notes)
+    
+    def test_counts_feed_neubauer(self):
+        """Los conteos de la imagen alimentan directamente el cálculo de Neubauer."""
+        image = synthetic_micrograph([5, 8, 3, 10])
+        counts = HemocytometerService.count_cells(image, CellCountRequest(cell_diameter_px=12))
+        request = HemocytometerService.to_neubauer_request(counts, quadrant_volume=0.1, dilution_factor=2.0)
+        result = NeubauerService.calculate_concentration(request)
+        
+        self.assertEqual(request.num_quadrants, 4)
+        self.assertEqual(result.total_cells, 26)
+        self.assertAlmostEqual(result.concentration, 6.5 / 0.4 * 1000 * 2.0)
+    
+    def test_decode_netpbm(self):
+        """Lee imágenes PGM y PPM binarias sin dependencias adicionales."""
+        image = synthetic_micrograph([2, 2, 2, 2])
+        pgm = b'P5\n# camara\n420 420\n255\n' + image.tobytes()
+        decoded = HemocytometerService.decode_image(pgm)
+        np.testing.assert_array_equal(decoded, image)
+        
+        rgb = np.repeat(image[:, :, None], 3, axis=2)
+        ppm = b'P6 420 420 255\n' + rgb.tobytes()
+        np.testing.assert_allclose(HemocytometerService.decode_image(ppm), image, atol=0.01)
+        
+        counts = HemocytometerService.count_image(pgm, CellCountRequest(cell_diameter_px=12))
+        self.assertEqual(counts.quadrant_counts, [2, 2, 2, 2])
+    
+    def test_invalid_input(self):
+        """Rechaza imágenes vacías, truncadas o demasiado pequeñas y parámetros no válidos."""
+        with self.assertRaises(HemocytometerError):
+            HemocytometerService.decode_image(b'')
+        with self.assertRaises(HemocytometerError):
+            HemocytometerService.decode_image(b'P5\n10 10\n255\n' + bytes(20))
+        with self.assertRaises(HemocytometerError):
+            HemocytometerService.count_cells(np.zeros((8, 8)), CellCountRequest())
+        with self.assertRaises(HemocytometerError):
+            HemocytometerService.count_cells(np.zeros((64, 64)), CellCountRequest(cell_diameter_px=0))
+        with self.assertRaises(HemocytometerError):
+            HemocytometerService.count_cells(np.zeros((64, 64)), CellCountRequest(sensitivity=-1))
+
+if __name__ == '__main__':
+    unittest.main()
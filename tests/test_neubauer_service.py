@@ -1,6 +1,10 @@
+import io
+import math
 import unittest
+from unittest.mock import patch
+
 from app.services.neubauer_service import NeubauerService
-from app.models.neubauer import NeubauerRequest, NeubauerError
+from app.models.neubauer import NeubauerRequest, NeubauerError, NeubauerBatchErrorCode
 
 class TestNeubauerService(unittest.TestCase):
     """Pruebas para el servicio de Neubauer."""
@@ -133,6 +137,245 @@ class TestNeubauerService(unittest.TestCase):
         # Parámetros inválidos
         with self.assertRaises(NeubauerError):
             NeubauerService.validate_parameters(-1, 0.1, 1.0, [10])
+    
+    def test_batch_matches_single_calculation(self):
+        """El lote usa la misma fórmula que el cálculo individual."""
+        request = NeubauerRequest(
+            num_quadrants=4,
+            quadrant_volume=0.1,
+            dilution_factor=2.0,
+            cell_counts=[25, 30, 28, 27]
+        )
+        single = NeubauerService.calculate_concentration(request)
+        batch = NeubauerService.calculate_batch([[25, 30, 28, 27]], 0.1, 2.0)
+        
+        self.assertEqual(len(batch), 1)
+        self.assertEqual(batch.sample_ids, ['1'])
+        self.assertAlmostEqual(batch.concentrations[0], single.concentration)
+        self.assertEqual(batch.total_cells[0], single.total_cells)
+        self.assertAlmostEqual(batch.average_cells[0], single.average_cells)
+    
+    def test_batch_error_codes(self):
+        """Cada muestra inválida recibe su código de error y NaN, sin afectar a las demás."""
+        nan = float('nan')
+        batch = NeubauerService.calculate_batch(
+            [[50, 45, nan, nan], [nan, nan, nan, nan], [10, -1, 5, 5], [10, 10, 10, 10]],
+            [0.1, 0.1, 0.1, 0.0],
+            [10, 1, 1, 1],
+            ['A', 'B', 'C', 'D']
+        )
+        
+        self.assertEqual(batch.num_quadrants[0], 2)
+        self.assertAlmostEqual(batch.concentrations[0], 47.5 / 0.2 * 1000 * 10)
+        self.assertEqual(
+            batch.error_codes.tolist(),
+            [NeubauerBatchErrorCode.OK, NeubauerBatchErrorCode.NO_COUNTS,
+             NeubauerBatchErrorCode.NEGATIVE_COUNT, NeubauerBatchErrorCode.NON_POSITIVE_PARAMETER]
+        )
+        self.assertTrue(all(map(math.isnan, batch.concentrations[1:])))
+        self.assertIsNone(NeubauerService.error_message(batch.error_codes[0]))
+        self.assertIsNotNone(NeubauerService.error_message(batch.error_codes[1]))
+    
+    def test_batch_mismatched_ids(self):
+        """Se espera un identificador por muestra."""
+        with self.assertRaises(NeubauerError):
+            NeubauerService.calculate_batch([[1, 2], [3, 4]], 0.1, 1.0, ['A'])
+    
+    def test_read_samples_csv(self):
+        """Lee columnas especiales, detecta el separador y usa valores por defecto."""
+        text = (
+            "muestra;c1;c2;c3;c4;factor_dilucion\n"
+            "A;25;30;28;27;1\n"
+            "B;50;45;;;10\n"
+        )
+        sample_ids, counts, volumes, dilutions, dead_counts = NeubauerService.read_samples_csv(text)
+        
+        self.assertEqual(sample_ids, ['A', 'B'])
+        self.assertEqual(counts.shape, (2, 4))
+        self.assertTrue(math.isnan(counts[1, 2]))
+        self.assertEqual(volumes.tolist(), [0.1, 0.1])
+        self.assertEqual(dilutions.tolist(), [1.0, 10.0])
+        self.assertIsNone(dead_counts)
+    
+    def test_read_samples_csv_invalid(self):
+        """Rechaza archivos sin muestras, sin conteos o con valores no numéricos."""
+        with self.assertRaises(NeubauerError):
+            NeubauerService.read_samples_csv("muestra,c1\n")
+        with self.assertRaises(NeubauerError):
+            NeubauerService.read_samples_csv("muestra,factor_dilucion\nA,1\n")
+        with self.assertRaises(NeubauerError):
+            NeubauerService.read_samples_csv("muestra,c1,c2\nA,10,diez\n")
+    
+    def test_iter_results_csv(self):
+        """La tabla de resultados tiene encabezado y una línea por muestra."""
+        batch = NeubauerService.calculate_batch([[10, 20], [-1, 5]], 0.1, 1.0, ['A', 'B'])
+        lines = ''.join(NeubauerService.iter_results_csv(batch)).splitlines()
+        
+        self.assertEqual(lines[0].split(','), list(NeubauerService.RESULT_COLUMNS))
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith('A,2,30,15,'))
+        self.assertIn('negativos', lines[2])
+    
+    def test_poisson_confidence_interval(self):
+        """El intervalo de Poisson del total contado se escala a concentración."""
+        request = NeubauerRequest(
+            num_quadrants=4,
+            quadrant_volume=0.1,
+            dilution_factor=1.0,
+            cell_counts=[25, 30, 28, 60]
+        )
+        result = NeubauerService.calculate_concentration(request)
+        factor = result.concentration / result.total_cells
+        
+        # Límites exactos de Poisson al 95% para 143 eventos: 120.5 - 168.5
+        self.assertAlmostEqual(result.concentration_ci_low / factor, 120.5, delta=0.2)
+        self.assertAlmostEqual(result.concentration_ci_high / factor, 168.5, delta=0.2)
+        self.assertLess(result.concentration_ci_low, result.concentration)
+        self.assertGreater(result.concentration_ci_high, result.concentration)
+    
+    def test_zero_cells_confidence_interval(self):
+        """Sin células el límite inferior es 0 y el superior sigue siendo positivo."""
+        request = NeubauerRequest(num_quadrants=1, quadrant_volume=0.1, dilution_factor=1.0, cell_counts=[0])
+        result = NeubauerService.calculate_concentration(request)
+        
+        self.assertEqual(result.concentration_ci_low, 0.0)
+        self.assertAlmostEqual(result.concentration_ci_high / 10000, 3.689, delta=0.05)
+        self.assertIsNone(result.cv_percent)
+        self.assertIsNone(result.chi_square)
+    
+    def test_cv_and_outliers(self):
+        """CV entre cuadrantes e identificación de cuadrantes atípicos por χ²."""
+        request = NeubauerRequest(
+            num_quadrants=4,
+            quadrant_volume=0.1,
+            dilution_factor=1.0,
+            cell_counts=[25, 30, 28, 60]
+        )
+        result = NeubauerService.calculate_concentration(request)
+        
+        self.assertAlmostEqual(result.cv_percent, 45.585, places=2)
+        self.assertAlmostEqual(result.chi_square, 22.2867, places=3)
+        self.assertEqual(result.outlier_quadrants, [4])
+        
+        uniform = NeubauerService.calculate_concentration(NeubauerRequest(
+            num_quadrants=4, quadrant_volume=0.1, dilution_factor=1.0, cell_counts=[25, 30, 28, 27]
+        ))
+        self.assertEqual(uniform.outlier_quadrants, [])
+    
+    def test_viability(self):
+        """Viabilidad con azul tripano e intervalo de Wilson."""
+        request = NeubauerRequest(
+            num_quadrants=4,
+            quadrant_volume=0.1,
+            dilution_factor=1.0,
+            cell_counts=[45, 50, 48, 47],
+            dead_counts=[5, 4, 6, 5]
+        )
+        result = NeubauerService.calculate_concentration(request)
+        
+        self.assertEqual(result.dead_cells, 20)
+        self.assertAlmostEqual(result.viability_percent, 190 / 210 * 100)
+        self.assertLess(result.viability_ci_low, result.viability_percent)
+        self.assertGreater(result.viability_ci_high, result.viability_percent)
+        self.assertLessEqual(result.viability_ci_high, 100)
+        
+        without_dead = NeubauerService.calculate_concentration(NeubauerRequest(
+            num_quadrants=1, quadrant_volume=0.1, dilution_factor=1.0, cell_counts=[10]
+        ))
+        self.assertIsNone(without_dead.viability_percent)
+    
+    def test_viability_pairs_quadrants_with_dead_counts(self):
+        """Los cuadrantes sin conteo de muertas no entran en la viabilidad, en ambos caminos."""
+        result = NeubauerService.calculate_concentration(NeubauerRequest(
+            num_quadrants=2, quadrant_volume=0.1, dilution_factor=1.0,
+            cell_counts=[40, 100], dead_counts=[10, None]
+        ))
+        batch = NeubauerService.calculate_batch([[40, 100]], 0.1, 1.0, dead_counts=[[10, math.nan]])
+        
+        self.assertEqual(result.total_cells, 140)
+        self.assertEqual(result.dead_cells, 10)
+        self.assertAlmostEqual(result.viability_percent, 40 / 50 * 100)
+        self.assertAlmostEqual(batch.viability_percent[0], result.viability_percent)
+    
+    def test_invalid_dead_counts(self):
+        """Los conteos de células muertas deben coincidir con los cuadrantes y no ser negativos."""
+        with self.assertRaises(NeubauerError):
+            NeubauerService.calculate_concentration(NeubauerRequest(
+                num_quadrants=2, quadrant_volume=0.1, dilution_factor=1.0,
+                cell_counts=[10, 10], dead_counts=[1]
+            ))
+        with self.assertRaises(NeubauerError):
+            NeubauerService.calculate_concentration(NeubauerRequest(
+                num_quadrants=2, quadrant_volume=0.1, dilution_factor=1.0,
+                cell_counts=[10, 10], dead_counts=[1, -1]
+            ))
+        with self.assertRaises(NeubauerError):
+            NeubauerService.calculate_concentration(NeubauerRequest(
+                num_quadrants=1, quadrant_volume=0.1, dilution_factor=1.0,
+                cell_counts=[10], confidence_level=1.5
+            ))
+    
+    def test_batch_statistics_match_single(self):
+        """La estadística del lote coincide con la del cálculo individual."""
+        samples = [([25, 30, 28, 60], [2, 3, 1, 4]), ([45, 50, 48, 47], [5, 4, 6, 5])]
+        batch = NeubauerService.calculate_batch(
+            [counts for counts, _ in samples], 0.1, 1.0, dead_counts=[dead for _, dead in samples]
+        )
+        for i, (counts, dead) in enumerate(samples):
+            single = NeubauerService.calculate_concentration(NeubauerRequest(
+                num_quadrants=4, quadrant_volume=0.1, dilution_factor=1.0,
+                cell_counts=counts, dead_counts=dead
+            ))
+            self.assertAlmostEqual(batch.concentration_ci_low[i], single.concentration_ci_low)
+            self.assertAlmostEqual(batch.concentration_ci_high[i], single.concentration_ci_high)
+            self.assertAlmostEqual(batch.cv_percent[i], single.cv_percent)
+            self.assertEqual((batch.outliers[i].nonzero()[0] + 1).tolist(), single.outlier_quadrants)
+            self.assertAlmostEqual(batch.viability_percent[i], single.viability_percent)
+    
+    def test_read_samples_csv_dead_columns(self):
+        """Las columnas "muertas" se leen como células teñidas por cuadrante."""
+        text = "muestra,c1,c2,muertas1,muertas2\nA,10,20,1,1\nB,5,,,\n"
+        sample_ids, counts, _, _, dead_counts = NeubauerService.read_samples_csv(text)
+        batch = NeubauerService.calculate_batch(counts, 0.1, 1.0, sample_ids, dead_counts)
+        
+        self.assertEqual(dead_counts.shape, counts.shape)
+        self.assertAlmostEqual(batch.viability_percent[0], 30 / 32 * 100)
+        self.assertTrue(math.isnan(batch.viability_percent[1]))
+        
+        with self.assertRaises(NeubauerError):
+            NeubauerService.read_samples_csv("muestra,c1,c2,muertas1\nA,10,20,1\n")
+    
+    def test_fractional_counts_fail_per_sample(self):
+        """Los conteos con decimales marcan solo su muestra, como en el formulario."""
+        text = "muestra,c1,c2,muertas1,muertas2\nA,10,20,1,1\nB,12.5,20,,\nC,10,20,0.5,\nD,inf,20,,\n"
+        sample_ids, counts, _, _, dead_counts = NeubauerService.read_samples_csv(text)
+        batch = NeubauerService.calculate_batch(counts, 0.1, 1.0, sample_ids, dead_counts)
+        
+        self.assertEqual(batch.error_codes.tolist(), [NeubauerBatchErrorCode.OK]
+                         + [NeubauerBatchErrorCode.NON_INTEGER_COUNT] * 3)
+        self.assertTrue(all(map(math.isnan, batch.concentrations[1:])))
+        self.assertIn("enteros", NeubauerService.error_message(batch.error_codes[1]))
+    
+    def test_read_samples_csv_from_lines(self):
+        """Lee un archivo línea a línea y limita el número de muestras."""
+        lines = io.StringIO("muestra,c1,c2\r\nA,10,20\r\n\r\nB,30,40\r\n")
+        sample_ids, counts, _, _, _ = NeubauerService.read_samples_csv(lines)
+        self.assertEqual(sample_ids, ['A', 'B'])
+        self.assertEqual(counts.tolist(), [[10, 20], [30, 40]])
+        
+        with patch.object(NeubauerService, 'MAX_BATCH_ROWS', 2):
+            with self.assertRaisesRegex(NeubauerError, "hasta 2 muestras"):
+                NeubauerService.read_samples_csv(iter(["c1\n", "1\n", "2\n", "3\n"]))
+    
+    def test_non_finite_volumes_fail_per_sample(self):
+        """Los volúmenes o factores de dilución infinitos o NaN marcan solo su muestra."""
+        text = "muestra,c1,volumen_cuadrante,factor_dilucion\nA,10,0.1,1\nB,10,inf,1\nC,10,0.1,nan\n"
+        sample_ids, counts, volumes, dilutions, _ = NeubauerService.read_samples_csv(text)
+        batch = NeubauerService.calculate_batch(counts, volumes, dilutions, sample_ids)
+        
+        self.assertEqual(batch.error_codes.tolist(), [NeubauerBatchErrorCode.OK]
+                         + [NeubauerBatchErrorCode.NON_POSITIVE_PARAMETER] * 2)
+        self.assertIn("finitos", NeubauerService.error_message(batch.error_codes[1]))
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,46 @@
+import re
+import unittest
+
+from app import create_app
+
+class TestPHRoutes(unittest.TestCase):
+    """Pruebas para las rutas de la herramienta de pH."""
+
+    def setUp(self):
+        self.client = create_app().test_client()
+
+    def test_pka_accepts_number_list_or_text(self):
+        """Prueba que el pKa puede ser un número JSON, una lista o un texto separado por comas."""
+        for pka in (4.76, 5, [2.15, 7.2], "2.15, 7.2"):
+            response = self.client.post('/api/ph/especiacion', json={'pka': pka})
+            self.assertEqual(response.status_code, 200, pka)
+        response = self.client.post('/api/ph/amortiguadores',
+                                    json={'pka': 4.76, 'ph_objetivo': 4.5, 'concentracion_m': 0.1})
+        self.assertEqual(response.status_code, 200)
+
+    def test_pka_rejects_other_types(self):
+        """Prueba que booleanos, objetos y listas no numéricas dan 400 y no un error del servidor."""
+        for pka in (True, {'valor': 4.76}, [True], ['abc']):
+            for url in ('/api/ph/especiacion', '/api/ph/amortiguadores'):
+                response = self.client.post(url, json={'pka': pka, 'ph_objetivo': 4.5, 'concentracion_m': 0.1})
+                self.assertEqual(response.status_code, 400, (url, pka))
+                self.assertIn('pKa', response.get_json()['error'])
+
+    def test_form_uses_dpka_dt_of_matching_catalog_pka(self):
+        """Prueba que el formulario corrige el pKa₂ del fosfato con su propio dpKa/dT."""
+        form = {'calculation_type': 'acido_debil', 'concentration_m': '0.1', 'equivalents': '1',
+                'compound': 'fosfato monosodico', 'temperature_c': '37'}
+        at_25 = self.client.post('/ph', data={**form, 'pka': '7.2', 'temperature_c': '25'}).get_data(as_text=True)
+        at_37 = self.client.post('/ph', data={**form, 'pka': '7.2'}).get_data(as_text=True)
+        unmatched = self.client.post('/ph', data={**form, 'pka': '9.5'}).get_data(as_text=True)
+
+        # dpKa/dT = -0.0028: el pKa baja 0.034 y el pH de un ácido débil, la mitad
+        self.assertAlmostEqual(_ph(at_25) - _ph(at_37), 0.017, delta=0.006)
+        self.assertIn("sin corrección por temperatura", unmatched)
+
+def _ph(page):
+    """pH mostrado en la página de resultados."""
+    return float(re.search(r'result-label">pH</span>\s*<span class="result-value">([\d.]+)', page).group(1))
+
+if __name__ == '__main__':
+    unittest.main()
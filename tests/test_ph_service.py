@@ -1,8 +1,17 @@
 import math
 
+import numpy as np
 import pytest
 
-from app.models.ph import PHRequest, PHCalculationType, PHError
+from app.models.ph import (
+    BufferRequest,
+    PHBatchErrorCode,
+    PHBatchNote,
+    PHCalculationType,
+    PHError,
+    PHRequest,
+    TitrationRequest,
+)
 from app.services.ph_service import PHService
 
 def test_strong_acid_ph_calculation():
@@ -59,3 +68,434 @@ def test_invalid_concentration_raises_error():
 
     with pytest.raises(PHError):
         PHService.calculate(request)
+
+def test_weak_acid_solves_exact_charge_balance():
+    request = PHRequest(
+        calculation_type=PHCalculationType.WEAK_ACID,
+        concentration_m=0.1,
+        pka=4.76,
+    )
+
+    result = PHService.calculate(request)
+    ka = 10 ** -4.76
+    hydronium = result.hydronium
+
+    assert hydronium == pytest.approx(ka * 0.1 / (ka + hydronium) + 1e-14 / hydronium, rel=1e-12)
+    assert result.ph == pytest.approx(2.883, abs=1e-3)
+    assert result.ionization_percent == pytest.approx(1.31, abs=0.01)
+    assert result.notes is None
+
+def test_weak_base_uses_pka_of_conjugate_acid():
+    by_pka = PHService.calculate(
+        PHRequest(calculation_type=PHCalculationType.WEAK_BASE, concentration_m=0.1, pka=9.25)
+    )
+    by_kb = PHService.calculate(
+        PHRequest(
+            calculation_type=PHCalculationType.WEAK_BASE,
+            concentration_m=0.1,
+            dissociation_constant=10 ** -4.75,
+        )
+    )
+
+    assert by_pka.ph == pytest.approx(11.12, abs=0.01)
+    assert by_pka.hydroxide == pytest.approx(by_kb.hydroxide, rel=1e-9)
+
+def test_dilute_weak_acid_notes_failed_approximation():
+    request = PHRequest(
+        calculation_type=PHCalculationType.WEAK_ACID,
+        concentration_m=1e-7,
+        dissociation_constant=1e-5,
+    )
+
+    result = PHService.calculate(request)
+
+    assert 6.7 < result.ph < 7.0
+    assert result.notes is not None
+
+def test_solve_weak_equilibrium_is_vectorized():
+    concentrations = np.logspace(-10, 1, 200)
+    constants = np.logspace(-12, 3, 200)
+
+    x = PHService.solve_weak_equilibrium(concentrations, constants[:, None])
+
+    assert x.shape == (200, 200)
+    residual = x - constants[:, None] * concentrations / (constants[:, None] + x) - 1e-14 / x
+    assert np.max(np.abs(residual / x)) < 1e-12
+
+def test_weak_acid_requires_constant():
+    request = PHRequest(calculation_type=PHCalculationType.WEAK_ACID, concentration_m=0.1)
+
+    with pytest.raises(PHError):
+        PHService.calculate(request)
+
+@pytest.mark.parametrize(
+    "calculation_type, pka",
+    [(PHCalculationType.WEAK_ACID, -400.0), (PHCalculationType.WEAK_BASE, 400.0), (PHCalculationType.BUFFER, 75.0)],
+)
+def test_pka_outside_physical_range_is_rejected(calculation_type, pka):
+    with pytest.raises(PHError, match="pKa"):
+        PHService.calculate(
+            PHRequest(
+                calculation_type=calculation_type,
+                concentration_m=0.1,
+                pka=pka,
+                conjugate_concentration_m=0.1,
+            )
+        )
+    with pytest.raises(PHError, match="pKa"):
+        PHService.calculate_titration(
+            TitrationRequest(
+                analyte_type=PHCalculationType.WEAK_BASE,
+                analyte_concentration_m=0.1,
+                analyte_volume_ml=25.0,
+                titrant_type=PHCalculationType.STRONG_ACID,
+                titrant_concentration_m=0.1,
+                analyte_pka=pka,
+            )
+        )
+
+def test_temperature_corrected_pka_must_give_finite_constant():
+    with pytest.raises(PHError, match="pKa"):
+        PHService.calculate(
+            PHRequest(
+                calculation_type=PHCalculationType.WEAK_BASE,
+                concentration_m=0.1,
+                pka=9.25,
+                temperature_c=100.0,
+                pka_temperature_coefficient=10.0,
+            )
+        )
+
+def test_weak_acid_titration_curve():
+    request = TitrationRequest(
+        analyte_type=PHCalculationType.WEAK_ACID,
+        analyte_concentration_m=0.1,
+        analyte_volume_ml=25.0,
+        titrant_type=PHCalculationType.STRONG_BASE,
+        titrant_concentration_m=0.1,
+        analyte_pka=4.76,
+    )
+
+    result = PHService.calculate_titration(request)
+
+    assert len(result.volumes_ml) == 10001
+    assert result.volumes_ml[-1] == pytest.approx(50.0)
+    assert result.ph[0] == pytest.approx(2.883, abs=1e-3)
+    # En la mitad de la equivalencia pH = pKa
+    assert np.interp(12.5, result.volumes_ml, result.ph) == pytest.approx(4.76, abs=0.01)
+    assert result.equivalence_volumes_ml == pytest.approx([25.0], abs=0.01)
+    assert result.equivalence_ph[0] == pytest.approx(8.73, abs=0.02)
+    assert len(result.plot_volumes_ml) == 500
+    assert result.plot_volumes_ml[0] == 0.0 and result.plot_volumes_ml[-1] == pytest.approx(50.0)
+
+def test_base_titrated_with_acid_decreases():
+    request = TitrationRequest(
+        analyte_type=PHCalculationType.STRONG_BASE,
+        analyte_concentration_m=0.05,
+        analyte_volume_ml=20.0,
+        titrant_type=PHCalculationType.STRONG_ACID,
+        titrant_concentration_m=0.1,
+        max_titrant_volume_ml=15.0,
+        points=3001,
+    )
+
+    result = PHService.calculate_titration(request)
+
+    assert np.all(np.diff(result.ph) < 0)
+    assert result.expected_equivalence_ml == pytest.approx(10.0)
+    assert result.equivalence_volumes_ml == pytest.approx([10.0], abs=0.01)
+    assert result.equivalence_ph[0] == pytest.approx(7.0, abs=0.05)
+
+def test_titration_is_cached():
+    PHService.clear_titration_cache()
+    request = TitrationRequest(
+        analyte_type=PHCalculationType.STRONG_ACID,
+        analyte_concentration_m=0.1,
+        analyte_volume_ml=10.0,
+        titrant_type=PHCalculationType.STRONG_BASE,
+        titrant_concentration_m=0.1,
+    )
+
+    first = PHService.calculate_titration(request)
+    second = PHService.calculate_titration(request)
+
+    assert second is first
+    assert not first.ph.flags.writeable
+
+def test_titration_requires_acid_and_base():
+    request = TitrationRequest(
+        analyte_type=PHCalculationType.STRONG_ACID,
+        analyte_concentration_m=0.1,
+        analyte_volume_ml=10.0,
+        titrant_type=PHCalculationType.WEAK_ACID,
+        titrant_concentration_m=0.1,
+        titrant_pka=4.76,
+    )
+
+    with pytest.raises(PHError):
+        PHService.calculate_titration(request)
+
+def test_lttb_keeps_endpoints_and_jump():
+    x = np.linspace(0, 1, 1001)
+    y = np.where(x < 0.5, 0.0, 1.0)
+
+    indices = PHService.downsample_lttb(x, y, 20)
+
+    assert len(indices) == 20
+    assert indices[0] == 0 and indices[-1] == 1000
+    assert np.all(np.diff(indices) > 0)
+    assert {499, 500} & set(indices.tolist())
+
+def test_species_fractions_for_whole_grid():
+    grid = np.linspace(0, 14, 1401)
+
+    fractions = PHService.species_fractions([2.15, 7.20, 12.35], grid)
+
+    assert fractions.shape == (1401, 4)
+    assert np.allclose(fractions.sum(axis=1), 1.0)
+    # En cada pKa las dos especies del par están en igual proporción
+    at_pka = PHService.species_fractions([2.15, 7.20, 12.35], [2.15, 7.20, 12.35])
+    assert at_pka[0, 0] == pytest.approx(at_pka[0, 1], rel=1e-3)
+    assert at_pka[1, 1] == pytest.approx(at_pka[1, 2], rel=1e-9)
+    assert at_pka[2, 2] == pytest.approx(at_pka[2, 3], rel=1e-3)
+
+def test_phosphate_buffer_recipe():
+    PHService.clear_buffer_cache()
+    request = BufferRequest(
+        acid_name="Fosfato",
+        pka_values=(12.35, 2.15, 7.20),
+        target_ph=7.4,
+        concentration_m=0.1,
+        volume_ml=500.0,
+    )
+
+    result = PHService.calculate_buffer(request)
+
+    assert result.pka_used == 7.20
+    assert (result.acid_species, result.base_species) == ("H₂A⁻", "HA²⁻")
+    assert result.henderson_ratio == pytest.approx(10 ** 0.2)
+    assert result.exact_ratio == pytest.approx(result.henderson_ratio, rel=1e-3)
+    assert result.acid_form_m + result.base_form_m == pytest.approx(0.1)
+    assert result.base_form_mmol == pytest.approx(result.base_form_m * 500.0)
+    assert result.species == ["H₃A", "H₂A⁻", "HA²⁻", "A³⁻"]
+    assert sum(result.species_fractions) == pytest.approx(1.0)
+    assert result.notes is None
+
+def test_buffer_recipe_is_memoized_across_volumes():
+    PHService.clear_buffer_cache()
+    small = PHService.calculate_buffer(BufferRequest("Acetato", (4.76,), 5.0, 0.05, volume_ml=100.0))
+    large = PHService.calculate_buffer(BufferRequest("Acetato", (4.76,), 5.0, 0.05, volume_ml=1000.0))
+
+    assert PHService._buffer_cached.cache_info().hits == 1
+    assert large.base_form_mmol == pytest.approx(10 * small.base_form_mmol)
+
+def test_dilute_buffer_exact_ph_differs_from_henderson():
+    request = PHRequest(
+        calculation_type=PHCalculationType.BUFFER,
+        concentration_m=1e-4,
+        pka=3.0,
+        conjugate_concentration_m=1e-4,
+    )
+
+    result = PHService.calculate(request)
+
+    assert result.ph > 3.5
+    assert result.notes is not None
+
+def test_buffer_requires_conjugate_concentration():
+    request = PHRequest(calculation_type=PHCalculationType.BUFFER, concentration_m=0.1, pka=4.76)
+
+    with pytest.raises(PHError):
+        PHService.calculate(request)
+
+def test_kw_is_interpolated_from_temperature_table():
+    assert PHService.kw_at_temperature(25) == pytest.approx(10 ** -13.995)
+    assert -math.log10(PHService.kw_at_temperature(37)) == pytest.approx(13.62, abs=0.01)
+
+    with pytest.raises(PHError):
+        PHService.kw_at_temperature(150)
+
+def test_ph_plus_poh_equals_pkw_at_temperature():
+    request = PHRequest(
+        calculation_type=PHCalculationType.STRONG_ACID,
+        concentration_m=0.01,
+        temperature_c=37.0,
+    )
+
+    result = PHService.calculate(request)
+
+    assert result.ph == pytest.approx(2.0, abs=1e-4)
+    assert result.pkw == pytest.approx(13.62, abs=0.01)
+    assert result.ph + result.poh == pytest.approx(result.pkw, abs=1e-4)
+
+def test_davies_activity_correction():
+    gamma = PHService.activity_coefficient(1, 0.1)
+    request = PHRequest(
+        calculation_type=PHCalculationType.STRONG_ACID,
+        concentration_m=0.01,
+        ionic_strength=0.1,
+    )
+
+    result = PHService.calculate(request)
+
+    assert gamma == pytest.approx(0.78, abs=0.01)
+    assert result.ph == pytest.approx(2.0 - math.log10(gamma), abs=1e-4)
+    assert result.activity_coefficient == pytest.approx(gamma)
+
+    with pytest.raises(PHError):
+        PHService.calculate(
+            PHRequest(
+                calculation_type=PHCalculationType.STRONG_ACID,
+                concentration_m=0.01,
+                ionic_strength=2.0,
+            )
+        )
+
+def test_weak_acid_pka_corrected_for_temperature():
+    at_25 = PHService.calculate(
+        PHRequest(calculation_type=PHCalculationType.WEAK_ACID, concentration_m=0.05, pka=8.07)
+    )
+    at_37 = PHService.calculate(
+        PHRequest(
+            calculation_type=PHCalculationType.WEAK_ACID,
+            concentration_m=0.05,
+            pka=8.07,
+            temperature_c=37.0,
+            pka_temperature_coefficient=-0.028,
+        )
+    )
+
+    assert at_25.ph - at_37.ph == pytest.approx(0.5 * 0.028 * 12, abs=0.01)
+
+def test_buffer_uses_catalog_temperature_and_ionic_strength():
+    PHService.clear_buffer_cache()
+    at_25 = PHService.calculate_buffer(BufferRequest("Tris", (8.07,), 7.4, 0.05))
+    at_37 = PHService.calculate_buffer(BufferRequest("tris", (8.07,), 7.4, 0.05, temperature_c=37.0))
+    phosphate = PHService.calculate_buffer(
+        BufferRequest("fosfato disódico", (2.15, 7.20, 12.35), 7.4, 0.1, temperature_c=37.0, ionic_strength=0.15)
+    )
+
+    assert at_25.species == ["HA⁺", "A"]
+    assert at_37.pka_used == pytest.approx(8.07 - 0.028 * 12)
+    assert at_37.exact_ratio > at_25.exact_ratio
+    # pKa₂ aparente del fosfato en condiciones fisiológicas ≈ 6.8
+    assert phosphate.pka_used == pytest.approx(6.8, abs=0.05)
+
+def test_titration_equivalence_at_temperature_is_neutral_pkw():
+    request = TitrationRequest(
+        analyte_type=PHCalculationType.STRONG_ACID,
+        analyte_concentration_m=0.1,
+        analyte_volume_ml=25.0,
+        titrant_type=PHCalculationType.STRONG_BASE,
+        titrant_concentration_m=0.1,
+        temperature_c=37.0,
+    )
+
+    result = PHService.calculate_titration(request)
+
+    assert result.equivalence_ph[0] == pytest.approx(-math.log10(PHService.kw_at_temperature(37.0)) / 2, abs=0.01)
+
+def test_calculate_many_matches_scalar_calculation():
+    requests = [
+        PHRequest(PHCalculationType.STRONG_ACID, 0.01),
+        PHRequest(PHCalculationType.STRONG_BASE, 0.05, equivalents=2),
+        PHRequest(PHCalculationType.WEAK_ACID, 0.1, pka=4.76),
+        PHRequest(PHCalculationType.WEAK_ACID, 1e-7, dissociation_constant=1e-5, ionic_strength=0.1),
+        PHRequest(PHCalculationType.WEAK_BASE, 0.1, pka=9.25, temperature_c=37.0, pka_temperature_coefficient=-0.031),
+        PHRequest(PHCalculationType.BUFFER, 0.1, pka=4.76, conjugate_concentration_m=0.2, temperature_c=37.0),
+    ]
+
+    batch = PHService.calculate_many(
+        [request.calculation_type for request in requests],
+        [request.concentration_m for request in requests],
+        equivalents=[request.equivalents for request in requests],
+        dissociation_constants=[request.dissociation_constant for request in requests],
+        pka=[request.pka for request in requests],
+        conjugate_concentrations=[request.conjugate_concentration_m for request in requests],
+        temperature_c=[request.temperature_c for request in requests],
+        ionic_strength=[request.ionic_strength for request in requests],
+        pka_temperature_coefficients=[request.pka_temperature_coefficient for request in requests],
+    )
+
+    assert len(batch) == len(requests)
+    assert (batch.error_codes == PHBatchErrorCode.OK).all()
+    for index, request in enumerate(requests):
+        single = PHService.calculate(request)
+        assert batch.ph[index] == single.ph
+        assert batch.poh[index] == single.poh
+        assert batch.pkw[index] == single.pkw
+        assert batch.hydronium[index] == pytest.approx(single.hydronium, rel=1e-9)
+        if single.ionization_percent is not None:
+            assert batch.ionization_percent[index] == single.ionization_percent
+
+def test_calculate_many_flags_rows_instead_of_raising():
+    batch = PHService.calculate_many(
+        ["acido_fuerte", "desconocido", "acido_fuerte", "acido_debil", "base_debil", "amortiguador", "acido_fuerte"],
+        [0.1, 0.1, -1.0, 0.1, 0.1, 0.1, 0.1],
+        equivalents=[1, 1, 1, 2, 1, 1, 1],
+        pka=[None, None, None, 4.76, None, 4.76, None],
+        temperature_c=[None] * 6 + [120.0],
+    )
+
+    assert batch.error_codes.tolist() == [
+        PHBatchErrorCode.OK,
+        PHBatchErrorCode.UNSUPPORTED_TYPE,
+        PHBatchErrorCode.NON_POSITIVE_CONCENTRATION,
+        PHBatchErrorCode.WEAK_EQUIVALENTS,
+        PHBatchErrorCode.MISSING_CONSTANT,
+        PHBatchErrorCode.MISSING_CONJUGATE,
+        PHBatchErrorCode.INVALID_CONDITIONS,
+    ]
+    assert batch.ph[0] == pytest.approx(1.0)
+    assert np.isnan(batch.ph[1:]).all()
+    assert batch.calculation_types[1] is None
+    assert PHService.batch_error_message(batch.error_codes[2]) == "La concentración debe ser mayor que cero."
+
+def test_calculate_many_rejects_invalid_constants_like_calculate():
+    batch = PHService.calculate_many(
+        ["acido_debil", "acido_debil", "acido_debil", "base_debil", "base_debil", "acido_debil"],
+        [0.1] * 6,
+        pka=[4.76, -400.0, None, 400.0, 9.25, 9.25],
+        dissociation_constants=[-1.0, None, 1e-5, None, 0.0, None],
+        temperature_c=[None] * 5 + [100.0],
+        pka_temperature_coefficients=[0.0] * 5 + [-10.0],
+    )
+
+    assert batch.error_codes.tolist() == [
+        PHBatchErrorCode.MISSING_CONSTANT,
+        PHBatchErrorCode.MISSING_CONSTANT,
+        PHBatchErrorCode.OK,
+        PHBatchErrorCode.MISSING_CONSTANT,
+        PHBatchErrorCode.MISSING_CONSTANT,
+        PHBatchErrorCode.MISSING_CONSTANT,
+    ]
+    for pka, constant in ((4.76, -1.0), (-400.0, None), (400.0, None)):
+        with pytest.raises(PHError):
+            PHService.calculate(
+                PHRequest(PHCalculationType.WEAK_ACID, 0.1, pka=pka, dissociation_constant=constant)
+            )
+
+def test_calculate_many_notes_and_dilute_clamp():
+    batch = PHService.calculate_many(
+        ["acido_fuerte", "acido_debil", "amortiguador"],
+        [1e-15, 1e-7, 1e-4],
+        dissociation_constants=[None, 1e-5, 1e-3],
+        conjugate_concentrations=1e-4,
+    )
+
+    assert batch.notes.tolist() == [PHBatchNote.VERY_DILUTE, PHBatchNote.APPROXIMATION, PHBatchNote.HENDERSON]
+    assert batch.hydronium[0] == PHService.MIN_CONCENTRATION
+    assert PHService.batch_note_messages(batch.notes[0]) == [PHService.VERY_DILUTE_NOTE]
+
+def test_calculate_many_rejects_mismatched_columns():
+    with pytest.raises(PHError):
+        PHService.calculate_many(["acido_fuerte"], [0.1, 0.2])
+    with pytest.raises(PHError):
+        PHService.calculate_many("acido_fuerte", [0.1, 0.2], equivalents=[1, 1, 1])
+
+def test_pka_temperature_coefficient_matches_closest_catalog_pka():
+    assert PHService.pka_temperature_coefficient("fosfato monosodico", 2.15) == 0.0044
+    assert PHService.pka_temperature_coefficient("Fosfato monosódico", 7.2) == -0.0028
+    assert PHService.pka_temperature_coefficient("fosfato monosodico", 12.1) == -0.026
+    assert PHService.pka_temperature_coefficient("fosfato monosodico", 9.5) is None
+    assert PHService.pka_temperature_coefficient("", 4.76) is None
@@ -0,0 +1,90 @@
+import unittest
+
+from app.models.plate import PlateFormat, PlateLayoutRequest, PlateError
+from app.services.plate_service import PlateService
+
+class TestPlateService(unittest.TestCase):
+    """Pruebas para el planificador de placas multipocillo."""
+    
+    def test_layout_volumes_and_wells(self):
+        """Prueba los volúmenes por pocillo y la posición de las réplicas."""
+        request = PlateLayoutRequest(
+            plate_format=PlateFormat.WELLS_96,
+            stock_concentrations=[1000.0],
+            target_concentrations=[100.0, 10.0],
+            replicates=3,
+            well_volume=100.0
+        )
+        result = PlateService.plan_layout(request)
+        
+        self.assertEqual(result.wells, ['A1', 'A2', 'A3', 'A4', 'A5', 'A6'])
+        self.assertEqual(result.target_concentrations, [100.0] * 3 + [10.0] * 3)
+        self.assertAlmostEqual(result.stock_volumes[0], 10.0)
+        self.assertAlmostEqual(result.diluent_volumes[0], 90.0)
+        self.assertAlmostEqual(result.stock_volumes[3], 1.0)
+        self.assertAlmostEqual(result.stock_consumption[0], 33.0)
+        self.assertEqual(result.plate_map[0][:6], [100.0] * 3 + [10.0] * 3)
+        self.assertIsNone(result.plate_map[1][0])
+    
+    def test_chooses_stock_with_lowest_consumption(self):
+        """Prueba que se usa el stock más concentrado que se puede pipetear."""
+        request = PlateLayoutRequest(
+            plate_format=PlateFormat.WELLS_96,
+            stock_concentrations=[10.0, 1000.0],
+            target_concentrations=[100.0, 0.1],
+            well_volume=100.0,
+            min_transfer_volume=0.5
+        )
+        result = PlateService.plan_layout(request)
+        
+        # 100 solo puede salir del stock de 1000; 0.1 requeriría 0.01 µL de ese stock
+        self.assertEqual(result.stock_indices, [1, 0])
+        self.assertAlmostEqual(result.stock_volumes[0], 10.0)
+        self.assertAlmostEqual(result.stock_volumes[1], 1.0)
+        self.assertEqual(len(result.stock_consumption), 2)
+    
+    def test_384_well_layout_wraps_rows(self):
+        """Prueba que los pocillos pasan a la fila siguiente al completar una fila."""
+        request = PlateLayoutRequest(
+            plate_format=PlateFormat.WELLS_384,
+            stock_concentrations=[100.0],
+            target_concentrations=[float(i + 1) for i in range(25)],
+        )
+        result = PlateService.plan_layout(request)
+        
+        self.assertEqual((result.rows, result.columns), (16, 24))
+        self.assertEqual(result.wells[23], 'A24')
+        self.assertEqual(result.wells[24], 'B1')
+    
+    def test_rejects_layout_larger_than_plate(self):
+        """Prueba que no se aceptan más pocillos de los que tiene la placa."""
+        request = PlateLayoutRequest(
+            plate_format=PlateFormat.WELLS_96,
+            stock_concentrations=[100.0],
+            target_concentrations=[float(i + 1) for i in range(33)],
+            replicates=3
+        )
+        with self.assertRaises(PlateError):
+            PlateService.plan_layout(request)
+    
+    def test_rejects_unreachable_targets(self):
+        """Prueba los objetivos más concentrados que el stock o demasiado diluidos."""
+        too_high = PlateLayoutRequest(PlateFormat.WELLS_96, [10.0], [50.0])
+        with self.assertRaisesRegex(PlateError, "mayores que el stock"):
+            PlateService.plan_layout(too_high)
+        
+        too_low = PlateLayoutRequest(PlateFormat.WELLS_96, [1000.0], [0.001])
+        with self.assertRaisesRegex(PlateError, "stock intermedio"):
+            PlateService.plan_layout(too_low)
+    
+    def test_worklist_csv(self):
+        """Prueba el formato de la lista de trabajo."""
+        request = PlateLayoutRequest(PlateFormat.WELLS_96, [1000.0], [100.0], replicates=2)
+        lines = PlateService.to_worklist_csv(PlateService.plan_layout(request)).splitlines()
+        
+        self.assertEqual(lines[0], ','.join(PlateService.WORKLIST_HEADER))
+        self.assertEqual(lines[1], 'A1,stock_1,1000,10.000,90.000,100')
+        self.assertEqual(len(lines), 3)
+
+if __name__ == '__main__':
+    unittest.main()
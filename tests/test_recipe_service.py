@@ -0,0 +1,115 @@
+import unittest
+
+import numpy as np
+
+from app.models.recipe import (
+    RecipeComponent, RecipeStock, RecipeRequest, RecipeErrorCode, RecipeError
+)
+from app.services.recipe_service import RecipeService
+
+class TestRecipeService(unittest.TestCase):
+    """Pruebas para el resolvedor de recetas con varios componentes."""
+    
+    def setUp(self):
+        self.components = [
+            RecipeComponent('NaCl', 150.0, 'mM', 58.44),
+            RecipeComponent('Tris', 20.0, 'mM'),
+            RecipeComponent('EDTA', 1.0, 'mM'),
+        ]
+        self.stocks = [
+            RecipeStock('NaCl 5 M', {'NaCl': 5.0}, 'M'),
+            RecipeStock('TE 20x', {'Tris': 400.0, 'EDTA': 20.0}, 'mM'),
+        ]
+    
+    def test_solves_mixed_stocks(self):
+        """Prueba una receta con un stock simple y otro con dos solutos."""
+        result = RecipeService.solve(RecipeRequest(100.0, self.components, self.stocks))
+        
+        self.assertAlmostEqual(result.stock_volumes_ml['NaCl 5 M'], 3.0)
+        self.assertAlmostEqual(result.stock_volumes_ml['TE 20x'], 5.0)
+        self.assertAlmostEqual(result.diluent_volume_ml, 92.0)
+        self.assertEqual(result.solid_masses_g, {})
+    
+    def test_converts_mass_units_with_molar_mass(self):
+        """Prueba un stock en g/L para un objetivo en mM."""
+        stocks = [RecipeStock('NaCl', {'NaCl': 292.2}, 'g/L'), self.stocks[1]]
+        result = RecipeService.solve(RecipeRequest(100.0, self.components, stocks))
+        self.assertAlmostEqual(result.stock_volumes_ml['NaCl'], 3.0)
+    
+    def test_components_without_stock_are_weighed(self):
+        """Prueba que los componentes sin stock se pesan como sólidos."""
+        components = self.components + [RecipeComponent('Glucosa', 5.0, 'g/L')]
+        result = RecipeService.solve(RecipeRequest(200.0, components, self.stocks))
+        
+        self.assertAlmostEqual(result.solid_masses_g['Glucosa'], 1.0)
+        self.assertIn('Glucosa', result.notes)
+    
+    def test_unreachable_ratio(self):
+        """Prueba que un stock mixto no permite proporciones distintas a las suyas."""
+        components = [RecipeComponent('Tris', 20.0, 'mM'), RecipeComponent('EDTA', 5.0, 'mM')]
+        with self.assertRaisesRegex(RecipeError, "no se pueden obtener"):
+            RecipeService.solve(RecipeRequest(100.0, components, self.stocks[1:]))
+    
+    def test_rejects_invalid_stocks(self):
+        """Prueba stocks con solutos desconocidos, unidades incompatibles o redundantes."""
+        with self.assertRaises(RecipeError):
+            RecipeService.solve(RecipeRequest(100.0, self.components, [RecipeStock('X', {'KCl': 1.0}, 'M')]))
+        with self.assertRaises(RecipeError):
+            RecipeService.solve(RecipeRequest(100.0, self.components[1:], [RecipeStock('X', {'Tris': 1.0}, 'g/L')]))
+        redundant = self.stocks + [RecipeStock('NaCl 1 M', {'NaCl': 1.0}, 'M')]
+        with self.assertRaisesRegex(RecipeError, "redundantes"):
+            RecipeService.solve(RecipeRequest(100.0, self.components, redundant))
+    
+    def test_below_min_volume_with_dilute_replacement(self):
+        """Prueba que reemplazar el stock concentrado por uno más diluido resuelve el volumen mínimo."""
+        components = [RecipeComponent('NaCl', 0.5, 'mM')]
+        concentrated = RecipeRequest(1.0, components, [RecipeStock('NaCl 5 M', {'NaCl': 5.0}, 'M')])
+        with self.assertRaisesRegex(RecipeError, "reemplaza ese stock"):
+            RecipeService.solve(concentrated)
+        dilute = RecipeRequest(1.0, components, [RecipeStock('NaCl 100 mM', {'NaCl': 100.0}, 'mM')])
+        self.assertAlmostEqual(RecipeService.solve(dilute).stock_volumes_ml['NaCl 100 mM'], 0.005)
+    
+    def test_solve_batch_reports_errors_per_recipe(self):
+        """Prueba la resolución vectorizada con un código de error por receta."""
+        batch = RecipeService.solve_batch(
+            self.components, self.stocks,
+            [[150.0, 20.0, 1.0], [150.0, 20.0, 2.0], [6000.0, 20.0, 1.0], [0.01, 20.0, 1.0]],
+            [100.0, 100.0, 100.0, 100.0],
+            min_transfer_volume_ml=0.001
+        )
+        
+        self.assertEqual(batch.error_codes.tolist(), [
+            RecipeErrorCode.OK,
+            RecipeErrorCode.UNREACHABLE,
+            RecipeErrorCode.EXCEEDS_FINAL_VOLUME,
+            RecipeErrorCode.BELOW_MIN_VOLUME,
+        ])
+        np.testing.assert_allclose(batch.stock_volumes_ml[0], [3.0, 5.0])
+        self.assertTrue(np.isnan(batch.stock_volumes_ml[1:]).all())
+    
+    def test_solve_batch_many_recipes(self):
+        """Prueba que cientos de recetas se resuelven con la misma matriz."""
+        rng = np.random.default_rng(0)
+        nacl = rng.uniform(10, 200, 500)
+        tris = rng.uniform(5, 50, 500)
+        batch = RecipeService.solve_batch(
+            self.components, self.stocks,
+            np.column_stack([nacl, tris, tris / 20]), np.full(500, 50.0)
+        )
+        
+        self.assertTrue(np.all(batch.error_codes == RecipeErrorCode.OK))
+        np.testing.assert_allclose(batch.stock_volumes_ml[:, 0], nacl * 50 / 5000)
+    
+    def test_parse_text_lines(self):
+        """Prueba la lectura de componentes y stocks desde texto."""
+        components = RecipeService.parse_components("NaCl; 150; mM; 58.44\nTris; 20; mM\n")
+        stocks = RecipeService.parse_stocks("TE; mM; Tris=400, EDTA=20")
+        
+        self.assertEqual(components[0].molar_mass, 58.44)
+        self.assertIsNone(components[1].molar_mass)
+        self.assertEqual(stocks[0].concentrations, {'Tris': 400.0, 'EDTA': 20.0})
+        with self.assertRaises(ValueError):
+            RecipeService.parse_stocks("TE; mM; Tris")
+
+if __name__ == '__main__':
+    unittest.main()
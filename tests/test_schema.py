@@ -0,0 +1,165 @@
+import json
+import unittest
+
+from app.utils.schema import Field, Schema, VariantSchema, client_schema, field_errors, parse_float, parse_int
+from app.utils.validators import validate_integer_input, validate_numeric_input
+
+class TestSchema(unittest.TestCase):
+    """Pruebas para el validador declarativo de formularios."""
+
+    def setUp(self):
+        self.schema = Schema(
+            Field('volumen', 'volumen', minimum=0, exclusive_minimum=True, target='volume'),
+            Field('cuadrantes', 'número de cuadrantes', kind='int', minimum=0, exclusive_minimum=True, maximum=16),
+            Field('factor', 'factor de dilución', required=False, default=1.0, minimum=0),
+            Field('modo', 'modo', kind='choice', choices=('factor', 'final')),
+            Field('objetivos', 'concentraciones objetivo', kind='float_list', required=False, minimum=0),
+        )
+
+    def test_returns_typed_values(self):
+        """Prueba que los valores válidos se convierten a su tipo y usan su clave de destino."""
+        result = self.schema.validate({
+            'volumen': ' 0.5 ', 'cuadrantes': '4', 'factor': '', 'modo': 'final', 'objetivos': '1, 2.5;3',
+        })
+        self.assertTrue(result.ok)
+        self.assertEqual(result.values, {
+            'volume': 0.5, 'cuadrantes': 4, 'factor': 1.0, 'modo': 'final', 'objetivos': [1.0, 2.5, 3.0],
+        })
+
+    def test_accepts_json_values(self):
+        """Prueba que los números de un cuerpo JSON se aceptan sin pasar por texto."""
+        result = self.schema.validate({'volumen': 2, 'cuadrantes': 4.0, 'modo': 'factor', 'objetivos': [1, 2]})
+        self.assertTrue(result.ok)
+        self.assertEqual(result.values['volume'], 2.0)
+        self.assertIs(type(result.values['cuadrantes']), int)
+        self.assertEqual(result.values['objetivos'], [1.0, 2.0])
+
+    def test_collects_every_error(self):
+        """Prueba que se reportan todos los campos inválidos en una sola pasada."""
+        result = self.schema.validate({
+            'volumen': 'abc', 'cuadrantes': '20', 'factor': '-1', 'modo': 'otro', 'objetivos': '1,x',
+        })
+        self.assertFalse(result.ok)
+        self.assertEqual(result.values, {})
+        self.assertEqual(result.errors, {
+            'volumen': "El campo volumen debe ser un número válido",
+            'cuadrantes': "El campo número de cuadrantes debe ser menor o igual a 16",
+            'factor': "El campo factor de dilución no puede ser negativo",
+            'modo': "El campo modo no tiene un valor válido",
+            'objetivos': "El campo concentraciones objetivo debe ser una lista de números separados por comas",
+        })
+        self.assertIn("; ", result.message)
+
+    def test_required_and_bounds(self):
+        """Prueba los campos requeridos vacíos y el mínimo exclusivo."""
+        result = self.schema.validate({'volumen': '0', 'cuadrantes': '2.5', 'modo': '  '})
+        self.assertEqual(result.errors['volumen'], "El campo volumen debe ser mayor a cero")
+        self.assertEqual(result.errors['cuadrantes'], "El campo número de cuadrantes debe ser un número entero válido")
+        self.assertEqual(result.errors['modo'], "El campo modo es requerido")
+        self.assertEqual(field_errors({'modo': 'x'}), [{'campo': 'modo', 'mensaje': 'x'}])
+
+    def test_rejects_non_finite_and_booleans(self):
+        """Prueba que no se aceptan infinitos, NaN ni booleanos como números."""
+        self.assertIsNone(parse_float('inf'))
+        self.assertIsNone(parse_float('nan'))
+        self.assertIsNone(parse_float(float('inf')))
+        self.assertIsNone(parse_float(True))
+        self.assertIsNone(parse_float('1e999'))
+        self.assertEqual(self.schema.validate({'volumen': '1e999', 'cuadrantes': '4', 'modo': 'final'}).errors,
+                         {'volumen': "El campo volumen debe ser un número válido"})
+        self.assertEqual(self.schema.validate({'volumen': '1', 'cuadrantes': '4', 'modo': 'final',
+                                               'objetivos': '1, -1e999'}).errors,
+                         {'objetivos': "El campo concentraciones objetivo debe ser una lista de números separados por comas"})
+        self.assertEqual(parse_float('-1.5e3'), -1500.0)
+        self.assertIsNone(parse_int('1.5'))
+        self.assertEqual(parse_int('+7'), 7)
+
+    def test_oversized_integers_are_invalid_not_errors(self):
+        """Prueba que un entero de miles de dígitos da el mensaje del campo y no un ValueError de int()."""
+        huge = '9' * 5000
+        self.assertIsNone(parse_int(huge))
+        self.assertEqual(self.schema.validate({'volumen': '1', 'cuadrantes': huge, 'modo': 'final'}).errors,
+                         {'cuadrantes': "El campo número de cuadrantes debe ser un número entero válido"})
+        schema = Schema(Field('conteos', 'conteos', kind='int_list', minimum=0))
+        self.assertIn('conteos', schema.validate({'conteos': f'1, {huge}'}).errors)
+
+    def test_fail_fast_stops_at_first_error(self):
+        """Prueba que con fail_fast solo se informa el primer error y el resultado normal no cambia."""
+        data = {'volumen': 'abc', 'cuadrantes': '0', 'modo': 'otro'}
+        self.assertEqual(self.schema.validate(data, fail_fast=True).errors,
+                         {'volumen': "El campo volumen debe ser un número válido"})
+        self.assertEqual(len(self.schema.validate(data).errors), 3)
+        self.assertTrue(self.schema.validate({'volumen': '1', 'cuadrantes': '4', 'modo': 'final'},
+                                             fail_fast=True).ok)
+
+    def test_integer_lists(self):
+        """Prueba las listas de enteros desde texto y desde JSON."""
+        schema = Schema(Field('conteos', 'conteos', kind='int_list', minimum=0))
+        self.assertEqual(schema.validate({'conteos': '3, 4 5'}).values, {'conteos': [3, 4, 5]})
+        self.assertEqual(schema.validate({'conteos': [3, 4.0]}).values, {'conteos': [3, 4]})
+        self.assertEqual(schema.validate({'conteos': [3, 4.5]}).errors,
+                         {'conteos': "El campo conteos debe ser una lista de números enteros separados por comas"})
+        self.assertEqual(schema.validate({'conteos': [3, -1]}).errors, {'conteos': "El campo conteos no puede ser negativo"})
+
+    def test_unsupported_kind(self):
+        """Prueba que un tipo de campo desconocido se rechaza al compilar."""
+        with self.assertRaises(ValueError):
+            Schema(Field('x', 'x', kind='fecha'))
+
+    def test_descriptor_shares_rules_and_messages(self):
+        """Prueba que el descriptor del navegador lleva las reglas y los mensajes del servidor."""
+        fields = {item['name']: item for item in self.schema.descriptor()['fields']}
+        self.assertEqual(fields['volumen'], {
+            'name': 'volumen', 'min': 0, 'exclusiveMin': True,
+            'messages': {
+                'required': "El campo volumen es requerido",
+                'type': "El campo volumen debe ser un número válido",
+                'low': "El campo volumen debe ser mayor a cero",
+            },
+        })
+        self.assertEqual(fields['cuadrantes']['kind'], 'int')
+        self.assertEqual(fields['cuadrantes']['max'], 16)
+        self.assertTrue(fields['factor']['optional'])
+        self.assertEqual(fields['modo']['choices'], ['factor', 'final'])
+        errors = self.schema.validate({'volumen': '0', 'cuadrantes': '99', 'modo': 'x'}).errors
+        self.assertEqual(errors['volumen'], fields['volumen']['messages']['low'])
+        self.assertEqual(errors['cuadrantes'], fields['cuadrantes']['messages']['high'])
+        self.assertEqual(errors['modo'], fields['modo']['messages']['type'])
+
+    def test_variant_schema(self):
+        """Prueba que el selector elige los campos a validar y que el descriptor incluye cada variante."""
+        schema = VariantSchema(
+            Field('tipo', 'tipo de cálculo', kind='choice'),
+            {'a': Schema(Field('x', 'x', minimum=0)), 'b': Schema(Field('y', 'y', kind='int'))},
+        )
+        self.assertEqual(schema.validate({'tipo': 'a', 'x': '2', 'y': 'no'}).values, {'tipo': 'a', 'x': 2.0})
+        self.assertEqual(schema.validate({'tipo': 'b', 'x': '-1'}).errors, {'y': "El campo y es requerido"})
+        self.assertEqual(set(schema.validate({'tipo': 'c'}).errors), {'tipo'})
+        descriptor = json.loads(client_schema(schema))
+        self.assertEqual(descriptor['fields'][0]['choices'], ['a', 'b'])
+        self.assertEqual(descriptor['variants']['field'], 'tipo')
+        self.assertEqual([item['name'] for item in descriptor['variants']['schemas']['b']], ['y'])
+        self.assertNotIn('<', str(client_schema(Schema(Field('z', '</script>')))))
+
+    def test_keyed_by_target(self):
+        """Prueba que el esquema por destino lee las claves de los valores con los mismos límites."""
+        schema = VariantSchema(
+            Field('tipo_form', 'tipo de cálculo', kind='choice', target='tipo'),
+            {'a': Schema(Field('x_form', 'x', minimum=0, exclusive_minimum=True, target='x'))},
+        ).keyed_by_target()
+        self.assertEqual(schema.validate({'tipo': 'a', 'x': 2}).values, {'tipo': 'a', 'x': 2.0})
+        self.assertEqual(schema.validate({'tipo': 'a', 'x': 0, 'x_form': 1}).errors,
+                         {'x': "El campo x debe ser mayor a cero"})
+
+    def test_legacy_validators_use_spanish_messages(self):
+        """Prueba que los validadores sueltos conservan sus mensajes en español."""
+        self.assertEqual(validate_numeric_input('3.5'), 3.5)
+        with self.assertRaisesRegex(ValueError, "no puede ser negativo"):
+            validate_numeric_input('-1', 'volumen')
+        with self.assertRaisesRegex(ValueError, "debe ser un número válido"):
+            validate_numeric_input('abc', 'volumen')
+        with self.assertRaisesRegex(ValueError, "debe ser mayor a cero"):
+            validate_integer_input('0', 'réplicas')
+
+if __name__ == '__main__':
+    unittest.main()
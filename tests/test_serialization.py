@@ -0,0 +1,70 @@
+import json
+import unittest
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.models.concentration import ConcentrationRepresentations, ConcentrationUnit
+from app.models.neubauer import FrozenNeubauerResult, NeubauerRequest
+from app.models.ph import PHCalculationType, PHResult
+from app.services.neubauer_service import NeubauerService
+from app.utils.serialization import encoder_for, to_json
+
+@dataclass
+class _Inner:
+    kind: PHCalculationType
+    values: np.ndarray
+
+@dataclass
+class _Outer:
+    name: str
+    inner: Optional[_Inner] = None
+    items: List[_Inner] = field(default_factory=list)
+    by_unit: Dict[ConcentrationUnit, Optional[float]] = field(default_factory=dict)
+    extra: object = None
+
+class TestSerialization(unittest.TestCase):
+    """Pruebas para los encoders precompilados de dataclasses."""
+
+    def test_matches_asdict_for_plain_results(self):
+        """Prueba que un resultado sin enums se serializa igual que con asdict."""
+        result = NeubauerService.calculate_concentration(
+            NeubauerRequest(num_quadrants=4, quadrant_volume=0.1, dilution_factor=2, cell_counts=[10, 20, 30, 40])
+        )
+        self.assertEqual(to_json(result), asdict(result))
+        self.assertIsNot(to_json(result)['outlier_quadrants'], result.outlier_quadrants)
+
+    def test_converts_enums_and_nested_values(self):
+        """Prueba que enums, arreglos, dataclasses anidados y claves enum quedan como valores JSON."""
+        inner = _Inner(PHCalculationType.BUFFER, np.array([1.0, 2.0]))
+        outer = _Outer('x', inner, [inner], {ConcentrationUnit.MOLAR: None},
+                       extra=np.float64(1.5))
+        encoded = to_json(outer)
+        self.assertEqual(encoded, {
+            'name': 'x',
+            'inner': {'kind': 'amortiguador', 'values': [1.0, 2.0]},
+            'items': [{'kind': 'amortiguador', 'values': [1.0, 2.0]}],
+            'by_unit': {'M': None},
+            'extra': 1.5,
+        })
+        self.assertIsNone(to_json(_Outer('y'))['inner'])
+        json.dumps(encoded)
+
+    def test_model_results(self):
+        """Prueba los modelos con enums y las variantes congeladas."""
+        result = PHResult(PHCalculationType.STRONG_ACID, 1.0, 13.0, 0.1, 1e-13, "pH = -log[H+]")
+        self.assertEqual(to_json(result)['calculation_type'], 'acido_fuerte')
+        representations = ConcentrationRepresentations(1.0, ConcentrationUnit.MOLAR, {ConcentrationUnit.MOLAR: 1.0})
+        self.assertEqual(to_json(representations)['values'], {'M': 1.0})
+        frozen = FrozenNeubauerResult(1.0, 1, 1.0, 1, 0.1, 1.0)
+        self.assertEqual(set(to_json(frozen)), set(FrozenNeubauerResult.__dataclass_fields__))
+
+    def test_encoder_is_cached(self):
+        """Prueba que el encoder de cada clase se genera una sola vez."""
+        self.assertIs(encoder_for(PHResult), encoder_for(PHResult))
+        with self.assertRaises(TypeError):
+            encoder_for(int)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import numpy as np
+from app.services.unit_expression_service import UnitExpressionService
+from app.models.conversion import CompoundConversionRequest, ConversionError
+
+class TestUnitExpressionService(unittest.TestCase):
+    """Pruebas para el servicio de unidades compuestas."""
+    
+    def setUp(self):
+        UnitExpressionService.clear_cache()
+    
+    def test_glucose_mg_dl_to_mmol_l(self):
+        """Prueba conversión de glucosa de mg/dL a mmol/L."""
+        request = CompoundConversionRequest(
+            value=180.16,
+            from_expr='mg/dL',
+            to_expr='mmol/L',
+            molar_mass=180.16
+        )
+        result = UnitExpressionService.convert(request)
+        self.assertAlmostEqual(result.converted_value, 10.0)
+    
+    def test_ug_ml_to_nanomolar(self):
+        """Prueba conversión de µg/mL a nM."""
+        request = CompoundConversionRequest(
+            value=1,
+            from_expr='µg/mL',
+            to_expr='nM',
+            molar_mass=1000
+        )
+        result = UnitExpressionService.convert(request)
+        self.assertAlmostEqual(result.converted_value, 1000.0)
+    
+    def test_g_l_to_molar(self):
+        """Prueba conversión de g/L a M."""
+        request = CompoundConversionRequest(
+            value=116.88,
+            from_expr='g/L',
+            to_expr='M',
+            molar_mass=58.44
+        )
+        result = UnitExpressionService.convert(request)
+        self.assertAlmostEqual(result.converted_value, 2.0)
+    
+    def test_same_dimensions_without_molar_mass(self):
+        """Prueba conversiones con exponentes que no requieren masa molar."""
+        request = CompoundConversionRequest(value=1, from_expr='g/cm^3', to_expr='kg/L')
+        result = UnitExpressionService.convert(request)
+        self.assertAlmostEqual(result.converted_value, 1.0)
+    
+    def test_missing_molar_mass(self):
+        """Prueba que mezclar masa y moles sin masa molar produce un error."""
+        request = CompoundConversionRequest(value=1, from_expr='mg/dL', to_expr='mmol/L')
+        with self.assertRaises(ConversionError):
+            UnitExpressionService.convert(request)
+    
+    def test_non_finite_molar_mass(self):
+        """Prueba que una masa molar infinita o NaN produce un error en español."""
+        for molar_mass in (float('inf'), float('nan'), -1.0):
+            with self.assertRaisesRegex(ConversionError, "masa molar"):
+                UnitExpressionService.compile_plan('mg/dL', 'mmol/L', molar_mass)
+    
+    def test_incompatible_dimensions(self):
+        """Prueba expresiones con dimensiones incompatibles."""
+        request = CompoundConversionRequest(value=1, from_expr='g/L', to_expr='mL', molar_mass=10)
+        with self.assertRaises(ConversionError):
+            UnitExpressionService.convert(request)
+    
+    def test_invalid_expression(self):
+        """Prueba expresiones mal formadas o con unidades desconocidas."""
+        for expr in ['', 'mg/', 'xyz/L', 'mg//L']:
+            with self.assertRaises(ConversionError):
+                UnitExpressionService.parse(expr)
+    
+    def test_plans_are_cached(self):
+        """Prueba que las conversiones repetidas reutilizan el plan compilado."""
+        first = UnitExpressionService.compile_plan('mg/dL', 'mmol/L', 180.16)
+        second = UnitExpressionService.compile_plan('mg/dL', 'mmol/L', 180.16)
+        self.assertIs(first, second)
+        self.assertEqual(UnitExpressionService._compile_plan_cached.cache_info().hits, 1)
+    
+    def test_convert_many(self):
+        """Prueba la conversión vectorizada de unidades compuestas."""
+        converted = UnitExpressionService.convert_many([90.08, 180.16], 'mg/dL', 'mmol/L', 180.16)
+        np.testing.assert_allclose(converted, [5.0, 10.0])
+    
+    def test_convert_many_rejects_non_finite_values(self):
+        """Prueba que los valores infinitos, NaN o fuera del rango de float64 se rechazan como en ConversionService."""
+        for values in ([1.0, float('inf')], np.array([float('nan')]), [1, 10 ** 400]):
+            with self.assertRaisesRegex(ConversionError, "números finitos"):
+                UnitExpressionService.convert_many(values, 'mg/dL', 'g/L')
+
+if __name__ == '__main__':
+    unittest.main()